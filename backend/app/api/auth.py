@@ -4,7 +4,7 @@ from typing import List
 from app.core.database import get_db
 from app.core.config import get_settings
 from app.models.domain import ConnectedAccount, Project
-from app.core.security import encrypt_token
+from app.core.security import encrypt_token, token_cache
 from app.core.logging import logger
 from app.schemas.common.base import StandardResponse
 from pydantic import BaseModel
@@ -46,6 +46,7 @@ def disconnect_account(account_id: int, db: Session = Depends(get_db)):
     account.access_token_encrypted = None # Borrar tokens por seguridad
     
     db.commit()
+    token_cache.invalidate_account(account.id)
     return StandardResponse(data=True, message="Cuenta desconectada exitosamente")
 
 @router.get("/linkedin/login")
@@ -198,6 +199,8 @@ async def linkedin_callback(
     
     db.commit()
     db.refresh(account)
+    # Token nuevo: descartar el descifrado anterior
+    token_cache.invalidate_account(account.id)
     
     logger.info(f"Successfully connected LinkedIn account: {linkedin_id} ({full_name}) for Project {project_id}")
     
@@ -1,96 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Optional
 
 from app.core.database import get_db
-from app.models.domain import Campaign, Project, Post, ContentStatus
+from app.models.domain import Campaign, Project
 from app.schemas.campaigns.campaign import CampaignCreate, CampaignRead, CampaignUpdate
-from app.schemas.common.base import StandardResponse
-from app.services.ai_generator import AIGeneratorService
-from app.services.tracking_service import TrackingService
+from app.schemas.campaigns.generation_job import CampaignGenerateRequest, CampaignGenerationJobRead
+from app.services.campaign_generation_service import CampaignGenerationService, IdempotencyConflictError
 
 router = APIRouter()
 
-ai_service = AIGeneratorService() # Instancia global por ahora
-
-@router.post("/{campaign_id}/generate", status_code=status.HTTP_201_CREATED)
-async def generate_campaign_posts(
+@router.post("/{campaign_id}/generate", response_model=CampaignGenerationJobRead,
+             status_code=status.HTTP_202_ACCEPTED)
+def generate_campaign_posts(
     campaign_id: int, 
-    payload: Dict[str, Any] = Body(...), 
+    response: Response,
+    payload: CampaignGenerateRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """
-    Genera borradores de posts para una campaña usando IA.
+    Encola la generación de borradores de posts con IA y retorna el job de inmediato.
     Payload: {"count": 3, "platform": "linkedin"}
+    Los borradores aparecen en la campaña a medida que se generan; el progreso se consulta
+    en GET /campaigns/{id}/generation-jobs/{job_id}.
+    Idempotency-Key: un reintento con la misma clave devuelve el mismo job (200) sin generar de nuevo.
     """
     campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    count = payload.get("count", 1)
-    platform = payload.get("platform", "linkedin")
-
-    # 1. Llamar al Generador
-    try:
-        generated_data = await ai_service.generate_posts(campaign, count=count, platform=platform)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI Generation failed: {str(e)}")
-
-    # 2. Guardar como Borradores (PENDING)
-    created_posts = []
-    for item in generated_data:
-        # Convert hashtags list to string/json if needed, or store as simple string for now
-        # El generador ahora devuelve hashtags como string JSON si lo normalizó, o lista si no.
-        # Aseguramos que sea string para la DB.
-        hashtags_val = item.get("hashtags")
-        if isinstance(hashtags_val, list):
-            hashtags_str = " ".join(hashtags_val)
-        else:
-            hashtags_str = str(hashtags_val)
-        
-        new_post = Post(
-            project_id=campaign.project_id,
-            campaign_id=campaign.id,
-            title=item.get("title"),
-            content_text=item.get("content"),
-            hashtags=hashtags_str,
-            cta=item.get("cta"),
-            platform=item.get("platform", platform),
-            status=ContentStatus.PENDING,
-            ai_model="multi-provider-v1", # En el futuro vendrá del servicio
-            tokens_used=0
-        )
-        db.add(new_post)
-        created_posts.append(new_post)
-    
-    db.commit()
-
-    # Tracking Loop
     try:
-        tracker = TrackingService(db)
-        for p in created_posts:
-            db.refresh(p)
-            tracker.record_generation({
-                "user_id": "campaign-generator",
-                "project_id": campaign.project_id,
-                "project_name": "Campaign Run",
-                "objective": campaign.objective,
-                "topic": "Campaign Content",
-                "platform": p.platform,
-                "content_type": "text",
-                "ai_agent": p.ai_model,
-                "generated_url": f"/posts/{p.id}",
-                "status": "generated",
-                "correlation_id": f"campaign-{campaign.id}-post-{p.id}"
-            })
-    except Exception as e:
-        print(f"Tracking failed: {e}")
-    
-    return {
-        "status": "success",
-        "generated_count": len(created_posts),
-        "message": f"Generated {len(created_posts)} drafts for campaign '{campaign.name}'"
-    }
+        job, created = CampaignGenerationService(db).enqueue(campaign, payload.count, payload.platform, idempotency_key)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job
+
+@router.get("/{campaign_id}/generation-jobs/{job_id}", response_model=CampaignGenerationJobRead)
+def get_generation_job(campaign_id: int, job_id: str, db: Session = Depends(get_db)):
+    """Estado y progreso de una generación (queued, running, succeeded, failed)"""
+    job = CampaignGenerationService(db).get_job(campaign_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
 
 @router.post("/", response_model=CampaignRead, status_code=status.HTTP_201_CREATED)
 def create_campaign(campaign: CampaignCreate, db: Session = Depends(get_db)):
@@ -1,49 +1,86 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
 import jwt
 from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.jwt_verifier import token_verifier
+from app.models.domain import Project
+from app.schemas.auth import Principal, TenantContext
 
 settings = get_settings()
 security = HTTPBearer(auto_error=False)
 
-def get_current_user_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> str:
+def get_optional_principal(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[Principal]:
     """
-    Validates Supabase JWT and returns the user ID (sub).
-    Required for protected endpoints.
+    Principal del request si viene un Bearer token; None si no hay credenciales.
+    Un token presente pero inválido sigue siendo 401.
     """
     if not credentials:
+        return None
+
+    try:
+        # Verificación cacheada por hash del token hasta su exp (ver TokenVerifier)
+        return token_verifier.verify(credentials.credentials)
+    except jwt.InvalidTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authentication credentials",
+            detail=f"Could not validate credentials: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token = credentials.credentials
-    
-    try:
-        # If we have a secret, verify signature.
-        if settings.SUPABASE_JWT_SECRET:
-            payload = jwt.decode(
-                token, 
-                settings.SUPABASE_JWT_SECRET, 
-                algorithms=["HS256"],
-                audience="authenticated" # Supabase default audience
-            )
-        else:
-            # Fallback for development if secret is not set (WARNING: INSECURE)
-            # Only use this if you know what you are doing (e.g. local dev with mock tokens)
-            payload = jwt.decode(token, options={"verify_signature": False})
-        
-        user_id = payload.get("sub")
-        if not user_id:
-             raise HTTPException(status_code=401, detail="Invalid token payload: missing sub")
-             
-        return user_id
-        
-    except jwt.InvalidTokenError as e:
+def get_current_principal(principal: Optional[Principal] = Depends(get_optional_principal)) -> Principal:
+    """
+    Validates Supabase JWT and returns the typed principal.
+    Required for protected endpoints.
+    """
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {str(e)}",
+            detail="Missing authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return principal
+
+def get_current_user_id(principal: Principal = Depends(get_current_principal)) -> str:
+    """
+    Validates Supabase JWT and returns the user ID (sub).
+    Required for protected endpoints.
+    """
+    return principal.user_id
+
+def get_tenant_context(
+    project_id: Optional[int] = Query(None, description="Proyecto explícito (debe pertenecer al usuario)"),
+    x_project_id: Optional[int] = Header(None),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+    db: Session = Depends(get_db)
+) -> TenantContext:
+    """
+    Resuelve el proyecto (tenant) del request.
+    - Autenticado: proyecto solicitado (si le pertenece), app_metadata.project_id del token,
+      o su primer proyecto. Sin proyectos -> 403 (nunca cae en el tenant por defecto).
+    - Anónimo (MVP sin login): solo DEFAULT_PROJECT_ID; pedir otro proyecto -> 403.
+    """
+    requested = project_id or x_project_id
+
+    if not principal:
+        if requested and requested != settings.DEFAULT_PROJECT_ID:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Authentication required to select a project")
+        return TenantContext(project_id=settings.DEFAULT_PROJECT_ID)
+
+    if requested:
+        if requested == principal.project_id:
+            return TenantContext(project_id=requested, user_id=principal.user_id)
+        owned = db.query(Project.id).filter(Project.id == requested, Project.owner_id == principal.user_id).first()
+        if not owned:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Project not accessible for this user")
+        return TenantContext(project_id=requested, user_id=principal.user_id)
+
+    if principal.project_id:
+        return TenantContext(project_id=principal.project_id, user_id=principal.user_id)
+
+    first = db.query(Project.id).filter(Project.owner_id == principal.user_id).order_by(Project.id).first()
+    if not first:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No project associated with this user")
+    return TenantContext(project_id=first[0], user_id=principal.user_id)
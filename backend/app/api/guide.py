@@ -1,17 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.guide import GuideNextRequest, GuideNextResponse
+from app.api.deps import get_tenant_context
+from app.schemas.auth import TenantContext
+from app.schemas.guide import GuideNextRequest, GuideNextResponse, GuideSessionResponse
 from app.services.guide_orchestrator import GuideOrchestratorService
+from app.services.guide_session_store import guide_session_store
 
 router = APIRouter()
 orchestrator = GuideOrchestratorService()
 
 @router.post("/next", response_model=GuideNextResponse)
-async def get_next_guide_step(request: GuideNextRequest, db: Session = Depends(get_db)):
+async def get_next_guide_step(
+    request: GuideNextRequest,
+    db: Session = Depends(get_db),
+    tenant: TenantContext = Depends(get_tenant_context)
+):
     """
     Endpoint principal para la orquestación de la guía conversacional.
     Recibe el estado actual y devuelve el siguiente paso (contenido + opciones)
     generado por IA o por lógica determinística de fallback.
+    Con `guide_session_id` el estado puede omitirse: se carga server-side y el
+    `state_patch` se aplica en el servidor.
     """
-    return await orchestrator.process_next_step(request, db)
+    return await orchestrator.process_next_step(request, db, tenant=tenant)
+
+@router.get("/sessions/{guide_session_id}", response_model=GuideSessionResponse)
+def get_guide_session(
+    guide_session_id: str,
+    db: Session = Depends(get_db),
+    tenant: TenantContext = Depends(get_tenant_context)
+):
+    """
+    Devuelve el estado server-side de una sesión de la guía (retomar desde otro dispositivo).
+    """
+    entry = guide_session_store.load(db, guide_session_id, tenant.project_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Guide session not found")
+    return GuideSessionResponse(
+        guide_session_id=entry.guide_session_id,
+        mode=entry.mode,
+        current_step=entry.current_step,
+        state=entry.state,
+        version=entry.version
+    )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.services.ai_provider_service import ai_provider_service
+from app.services.ai_output_stats import ai_output_stats
 
 router = APIRouter()
 
@@ -10,3 +11,11 @@ async def check_ai_health():
     Retorna si está conectado, qué proveedor se está usando y si es IA real.
     """
     return await ai_provider_service.check_health()
+
+@router.get("/ai/output-stats")
+def get_ai_output_stats():
+    """
+    Métricas por proveedor/modelo: requests, salida estructurada nativa,
+    tasa de reintentos y tasa de fallos de parseo JSON (desde el arranque del proceso).
+    """
+    return ai_output_stats.snapshot()
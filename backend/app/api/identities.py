@@ -4,6 +4,9 @@ from typing import List, Optional
 from app.core.database import get_db
 from app.models.domain import FunctionalIdentity, Project
 from app.schemas.identity import IdentityCreate, IdentityResponse, IdentityUpdate
+from app.api.deps import get_tenant_context
+from app.schemas.auth import TenantContext
+from app.services.identity_catalog import identity_catalog
 import json
 
 router = APIRouter()
@@ -11,17 +14,17 @@ router = APIRouter()
 @router.get("/", response_model=List[IdentityResponse])
 def get_identities(
     db: Session = Depends(get_db),
-    project_id: int = 1 # Default MVP
+    tenant: TenantContext = Depends(get_tenant_context)
 ):
     return db.query(FunctionalIdentity).filter(
-        (FunctionalIdentity.project_id == project_id) | (FunctionalIdentity.project_id == None)
+        (FunctionalIdentity.project_id == tenant.project_id) | (FunctionalIdentity.project_id == None)
     ).order_by(FunctionalIdentity.created_at.desc()).all()
 
 @router.post("/", response_model=IdentityResponse)
 def create_identity(
     identity: IdentityCreate,
     db: Session = Depends(get_db),
-    project_id: int = 1
+    tenant: TenantContext = Depends(get_tenant_context)
 ):
     # Validate platforms is json serializable if list
     platforms_str = identity.preferred_platforms
@@ -29,7 +32,7 @@ def create_identity(
         platforms_str = json.dumps(identity.preferred_platforms)
     
     db_identity = FunctionalIdentity(
-        project_id=project_id,
+        project_id=tenant.project_id,
         name=identity.name,
         purpose=identity.purpose,
         tone=identity.tone,
@@ -47,17 +50,25 @@ def create_identity(
     db.add(db_identity)
     db.commit()
     db.refresh(db_identity)
+    identity_catalog.invalidate(tenant.project_id)
     return db_identity
 
 @router.put("/{identity_id}", response_model=IdentityResponse)
 def update_identity(
     identity_id: str,
     identity_update: IdentityUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    tenant: TenantContext = Depends(get_tenant_context)
 ):
-    db_identity = db.query(FunctionalIdentity).filter(FunctionalIdentity.id == identity_id).first()
+    db_identity = db.query(FunctionalIdentity).filter(
+        FunctionalIdentity.id == identity_id,
+        (FunctionalIdentity.project_id == tenant.project_id) | (FunctionalIdentity.project_id == None)
+    ).first()
     if not db_identity:
         raise HTTPException(status_code=404, detail="Identity not found")
+    if db_identity.project_id is None:
+        # Identidades globales: compartidas por todos los proyectos, solo lectura desde la API
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Global identities are read-only")
     
     update_data = identity_update.dict(exclude_unset=True)
     
@@ -69,4 +80,5 @@ def update_identity(
 
     db.commit()
     db.refresh(db_identity)
+    identity_catalog.invalidate(tenant.project_id)
     return db_identity
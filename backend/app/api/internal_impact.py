@@ -1,11 +1,52 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.impact_service import ImpactService
+from app.services.performance_analysis import PerformanceAnalysisService
 from app.schemas.common.base import StandardResponse
 
 router = APIRouter()
 
+@router.get("/projects/{project_id}/analysis", response_model=StandardResponse)
+def analyze_project_performance(
+    project_id: int,
+    top_n: int = 5,
+    limit: int = 200,
+    db: Session = Depends(get_db)
+):
+    """Análisis batch del proyecto: mejores/peores, regresiones y sugerencias"""
+    service = PerformanceAnalysisService(db)
+    return StandardResponse(data=service.suggest_improvements(project_id, top_n=top_n, limit=limit))
+
+@router.get("/{content_id}/versions", response_model=StandardResponse)
+def analyze_version_performance(
+    content_id: int,
+    db: Session = Depends(get_db)
+):
+    """Compara las versiones del linaje de un contenido"""
+    service = PerformanceAnalysisService(db)
+    data = service.analyze_version_performance(content_id)
+    if data.get("status") == "not_found":
+        raise HTTPException(status_code=404, detail="Content not found")
+    return StandardResponse(data=data)
+
+@router.get("/{content_id}/history", response_model=StandardResponse)
+def get_impact_history(
+    content_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = "auto",
+    db: Session = Depends(get_db)
+):
+    """Serie temporal de métricas (raw/hour/day; auto según el rango)"""
+    service = ImpactService(db)
+    try:
+        return StandardResponse(data=service.get_metric_history(content_id, start, end, resolution))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/{content_id}", response_model=StandardResponse)
 def record_impact_metrics(
     content_id: int,
@@ -0,0 +1,179 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from app.api.deps import get_current_principal, get_tenant_context
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.schemas.common.base import MediaRead, StandardResponse
+from app.models.domain import Media, MediaRendition, Post
+from app.schemas.auth import Principal, TenantContext
+from app.schemas.media import MediaJobCreate, MediaJobRead, MediaRenditionRead
+from app.services.media_job_service import MediaJobService
+from app.services.media_storage.base import storage_key
+from app.services.media_store import MediaStore, MediaTooLargeError, get_media_store, parse_range
+from app.services.rendition_service import rendition_pipeline
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=StandardResponse[MediaJobRead], status_code=status.HTTP_202_ACCEPTED)
+def create_media_job(payload: MediaJobCreate, db: Session = Depends(get_db),
+                     principal: Principal = Depends(get_current_principal)):
+    """
+    Encola la generación de una imagen/video y retorna el job de inmediato.
+    Usuario y plan (cuota, presupuesto) salen del token autenticado.
+    El estado se consulta en GET /media/jobs/{job_id} (o llega a webhook_url).
+    """
+    service = MediaJobService(db)
+    try:
+        job = service.enqueue(principal.user_id, principal.plan, payload.media_type,
+                              payload.provider_params(), webhook_url=payload.webhook_url)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StandardResponse(message="Media job queued", data=job)
+
+@router.get("/jobs/{job_id}", response_model=StandardResponse[MediaJobRead])
+def get_media_job(job_id: str, db: Session = Depends(get_db),
+                  principal: Principal = Depends(get_current_principal)):
+    """Estado de un job de medios (queued, running, succeeded, failed). Solo para su dueño."""
+    job = MediaJobService(db).get_job(job_id)
+    if not job or job.user_id != principal.user_id:
+        # Un job ajeno responde igual que uno inexistente (no se revela que el id existe)
+        raise HTTPException(status_code=404, detail="Media job not found")
+    return StandardResponse(data=job)
+
+@router.post("/files", response_model=StandardResponse[MediaRead], status_code=status.HTTP_201_CREATED)
+def upload_media_file(
+    file: UploadFile = File(...),
+    post_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+    store: MediaStore = Depends(get_media_store),
+    principal: Principal = Depends(get_current_principal),
+    tenant: TenantContext = Depends(get_tenant_context)
+):
+    """
+    Sube un archivo al media store (streaming por chunks; contenido idéntico se deduplica).
+    Requiere autenticación; post_id debe ser un post del proyecto del usuario.
+    """
+    if post_id is not None and not db.query(Post.id).filter(
+        Post.id == post_id, Post.project_id == tenant.project_id
+    ).first():
+        raise HTTPException(status_code=404, detail="Post not found")
+    try:
+        media = store.save_file(db, file.file, file.content_type or "application/octet-stream", post_id=post_id)
+    except MediaTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    db.commit()
+    return StandardResponse(data=media)
+
+@router.api_route("/files/{content_hash}", methods=["GET", "HEAD"])
+def get_media_file(content_hash: str, request: Request, db: Session = Depends(get_db),
+                   store: MediaStore = Depends(get_media_store)):
+    """Sirve un blob (original o rendition) por su sha256"""
+    media = store.describe(db, content_hash)
+    if media:
+        return _serve_blob(request, store, content_hash, media.content_type)
+    rendition = db.query(MediaRendition).filter(MediaRendition.content_hash == content_hash).first()
+    if not rendition:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return _serve_blob(request, store, content_hash, rendition.content_type)
+
+@router.get("/{media_id}/renditions", response_model=StandardResponse[List[MediaRenditionRead]])
+def list_media_renditions(media_id: int, db: Session = Depends(get_db)):
+    """Renditions ya generadas del medio (compartidas por todas las filas del mismo blob)"""
+    media = db.get(Media, media_id)
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return StandardResponse(data=[_rendition_read(r) for r in media.renditions])
+
+@router.api_route("/{media_id}/renditions/{platform}/{name}", methods=["GET", "HEAD"])
+def get_media_rendition(media_id: int, platform: str, name: str, request: Request,
+                        db: Session = Depends(get_db), store: MediaStore = Depends(get_media_store)):
+    """
+    Sirve la rendition de un medio para una plataforma (ej. /instagram/story).
+    Si no existe se genera en el pool de procesos y queda cacheada por hash + spec.
+    """
+    media = db.get(Media, media_id)
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    try:
+        rendition = rendition_pipeline.get_or_render(db, media, platform.lower(), name, store=store)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown rendition {platform}/{name}")
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except TimeoutError:
+        # El render sigue en el pool: un reintento inmediato se une al que está en curso
+        raise HTTPException(status_code=504, detail=f"Rendition {platform}/{name} is taking too long, retry later")
+    response = _serve_blob(request, store, rendition.content_hash, rendition.content_type)
+    # La URL depende de la spec (puede cambiar): se revalida con el ETag; /files/{hash} sí es inmutable
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def _rendition_read(rendition: MediaRendition) -> MediaRenditionRead:
+    return MediaRenditionRead(
+        platform=rendition.platform,
+        name=rendition.name,
+        spec_key=rendition.spec_key,
+        content_hash=rendition.content_hash,
+        content_type=rendition.content_type,
+        width=rendition.width,
+        height=rendition.height,
+        size_bytes=rendition.size_bytes,
+        url=f"{get_settings().API_V1_STR}/media/files/{rendition.content_hash}",
+        created_at=rendition.created_at
+    )
+
+def _serve_blob(request: Request, store: MediaStore, content_hash: str, content_type: Optional[str]) -> Response:
+    """
+    - ETag = hash y Cache-Control immutable: el contenido de una URL nunca cambia.
+    - Backend local: FileResponse (Range/If-Range, pathsend sin copia si el servidor ASGI lo soporta)
+      o X-Accel-Redirect para que nginx lo entregue con sendfile.
+    - Backend S3: streaming del rango pedido (GET con Range al bucket).
+    """
+    settings = get_settings()
+    key = storage_key(content_hash)
+    content_type = content_type or "application/octet-stream"
+    etag = f'"{content_hash}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable",
+        "Accept-Ranges": "bytes"
+    }
+    if etag in request.headers.get("if-none-match", "") or request.headers.get("if-none-match") == "*":
+        return Response(status_code=304, headers=headers)
+
+    path = store.backend.local_path(key)
+    if path and settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{key}"
+        return Response(headers=headers, media_type=content_type)
+    if path:
+        return FileResponse(path, media_type=content_type, headers=headers)
+
+    try:
+        size = store.backend.size(key)
+    except FileNotFoundError:
+        # La fila existe pero el blob no (borrado fuera de la app): 404 en lugar de 500
+        raise HTTPException(status_code=404, detail="Media blob not found")
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if byte_range and request.headers.get("if-range", etag) != etag:
+        byte_range = None # Validador distinto: se envía el recurso completo
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    status_code = 206 if byte_range else 200
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=content_type)
+    return StreamingResponse(
+        store.backend.iter_range(key, start, end, store.chunk_size),
+        status_code=status_code, headers=headers, media_type=content_type
+    )
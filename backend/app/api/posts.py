@@ -9,6 +9,10 @@ from app.schemas.posts.post import PostRead, PostUpdate
 from app.schemas.common.base import StandardResponse
 from app.core.logging import logger
 from app.services.publishers.linkedin import LinkedInPublisher
+from app.services.publisher_runtime import publisher_runtime
+from app.services.publishers.rate_limiter import publish_rate_limiter
+from app.services.rendition_service import rendition_pipeline
+from app.models.publishing import PublishRetry
 from app.core.config import get_settings
 
 router = APIRouter()
@@ -103,6 +107,7 @@ def mark_post_published(
     allowed_statuses = [
         ContentStatus.READY_MANUAL, 
         ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE,
+        ContentStatus.RETRY_PENDING,
         ContentStatus.APPROVED,
         ContentStatus.GENERATED,
         ContentStatus.DRAFT
@@ -114,6 +119,8 @@ def mark_post_published(
 
     post.status = ContentStatus.PUBLISHED
     post.published_at = datetime.utcnow()
+    # Si tenía reintentos pendientes, sale de la cola
+    db.query(PublishRetry).filter(PublishRetry.post_id == post.id).delete()
     
     db.commit()
     db.refresh(post)
@@ -194,12 +201,17 @@ def update_post(
         db.commit()
         db.refresh(db_post)
         logger.info(f"Post {post_id} actualizado. Status: {db_post.status}")
-        return StandardResponse(data=db_post)
     except Exception as e:
         db.rollback()
         logger.error(f"Error actualizando post {post_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error interno al actualizar post")
 
+    # Programado: las renditions de la plataforma se generan antes de la publicación
+    if settings.RENDITION_PREGENERATE and new_status != current_status and \
+            new_status in [ContentStatus.APPROVED, ContentStatus.SCHEDULED_AUTO]:
+        rendition_pipeline.pregenerate_post(post_id)
+    return StandardResponse(data=db_post)
+
 @router.post("/{post_id}/publish", response_model=StandardResponse[PostRead])
 async def publish_post_now(
     post_id: int,
@@ -213,8 +225,8 @@ async def publish_post_now(
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
         
-    if db_post.status not in [ContentStatus.APPROVED, ContentStatus.SCHEDULED_AUTO, ContentStatus.READY_MANUAL]:
-        raise HTTPException(status_code=400, detail="Solo se pueden publicar posts en estado APPROVED, SCHEDULED_AUTO o READY_MANUAL")
+    if db_post.status not in [ContentStatus.APPROVED, ContentStatus.SCHEDULED_AUTO, ContentStatus.READY_MANUAL, ContentStatus.RETRY_PENDING]:
+        raise HTTPException(status_code=400, detail="Solo se pueden publicar posts en estado APPROVED, SCHEDULED_AUTO, READY_MANUAL o RETRY_PENDING")
         
     # 1. Feature Flag Check
     if not settings.FEATURE_LINKEDIN_ENABLED:
@@ -236,11 +248,17 @@ async def publish_post_now(
     publisher = LinkedInPublisher()
     try:
         logger.info(f"Publishing Post {post_id} to {account.provider_name}...")
-        result = await publisher.publish(db_post, account)
+        async def _publish():
+            # Mismos token buckets que el scheduler (plataforma + cuenta)
+            await publish_rate_limiter.acquire("linkedin", account.id)
+            return await publisher.publish(db_post, account)
+
+        result = await publisher_runtime.run_async(_publish())
         
         # Actualizar post
         db_post.status = ContentStatus.PUBLISHED_AUTO
         db_post.published_at = datetime.utcnow()
+        db.query(PublishRetry).filter(PublishRetry.post_id == db_post.id).delete()
         # db_post.external_id = result.get("external_id") # Si tuviera ese campo en modelo
         
         db.commit()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import topics, jobs, posts, projects, auth, campaigns, guide, internal_usage, tracking, internal_impact, internal_versioning, internal_automation, internal_control, forums, forum_threads, health_ai, utils, identities
+from app.api import topics, jobs, posts, projects, auth, campaigns, guide, internal_usage, tracking, internal_impact, internal_versioning, internal_automation, internal_control, forums, forum_threads, health_ai, utils, identities, media
 
 api_router = APIRouter()
 
@@ -14,6 +14,7 @@ api_router.include_router(topics.router, prefix="/topics", tags=["Topics"])
 api_router.include_router(jobs.router, prefix="/jobs", tags=["Auto Publisher Jobs"])
 api_router.include_router(posts.router, prefix="/posts", tags=["Posts"])
 api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
+api_router.include_router(media.router, prefix="/media", tags=["Media Jobs"])
 api_router.include_router(guide.router, prefix="/guide", tags=["Guide AI"])
 api_router.include_router(internal_usage.router, prefix="/internal", tags=["Internal Ops"])
 api_router.include_router(tracking.router, prefix="/internal/tracking", tags=["Tracking"])
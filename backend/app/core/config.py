@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Ara Neuro Post Core"
@@ -13,7 +14,17 @@ class Settings(BaseSettings):
     # Supabase (Auth & Storage)
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = "" # Anon key
-    SUPABASE_JWT_SECRET: str = "" # Required for validating JWTs
+    SUPABASE_JWT_SECRET: str = "" # Required for validating JWTs (HS256)
+    SUPABASE_JWKS_URL: str = "" # Opcional: JWKS para tokens RS256/ES256 (ej: <SUPABASE_URL>/auth/v1/.well-known/jwks.json)
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 4096 # Tokens verificados cacheados hasta su exp
+    
+    # Multi-tenant: proyecto usado por requests anónimos (MVP single-tenant)
+    DEFAULT_PROJECT_ID: int = 1
+    IDENTITY_CATALOG_TTL_SECONDS: float = 60.0 # Cache del catálogo de identidades por proyecto (guía)
+    GUIDE_SUMMARY_MAX_CHARS: int = 2000 # Sobre esto, el resumen de conversación se compacta
+    GUIDE_SUMMARY_TARGET_CHARS: int = 800 # Tamaño objetivo de la compactación (background)
+    GUIDE_SESSION_CACHE_MAX_ENTRIES: int = 2048 # LRU de sesiones de guía (respaldo en tabla guide_sessions)
     
     # AI Engine Service URL
     AI_ENGINE_URL: str = "http://localhost:8001"
@@ -21,6 +32,11 @@ class Settings(BaseSettings):
     # AI Configuration (Multi-Provider)
     AI_PROVIDER_PRIORITY: str = "openai,openrouter,gemini,grok" # Orden de prioridad
     AI_HEALTH_STRICT: bool = True
+    AI_STRUCTURED_OUTPUT_ENABLED: bool = True # JSON mode / JSON Schema nativo en proveedores que lo soportan
+    # Presupuesto de tokens por prompt (secciones de baja prioridad se recortan al excederlo)
+    PROMPT_BUDGET_COLLABORATOR: int = 6000
+    PROMPT_BUDGET_EXPERT: int = 2000
+    PROMPT_BUDGET_GENERATOR: int = 1500
     
     # Provider Keys (Fallback Chain)
     OPENAI_API_KEY: str = ""
@@ -45,6 +61,75 @@ class Settings(BaseSettings):
     LINKEDIN_CLIENT_SECRET: str = ""
     LINKEDIN_REDIRECT_URI: str = "" # Must be set in .env
     ENCRYPTION_KEY: str = "" # Fernet key (32 url-safe base64-encoded bytes)
+    ENCRYPTION_KEYS_PREVIOUS: str = "" # Claves anteriores separadas por coma (solo descifrado, rotación)
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0 # Cache en memoria de access tokens descifrados
+    TOKEN_CACHE_MAX_ENTRIES: int = 1024
+    TOKEN_REFRESH_WINDOW_MINUTES: int = 60 * 24 # Refrescar cuentas que vencen dentro de esta ventana
+    TOKEN_REFRESH_INTERVAL_MINUTES: int = 15
+    TOKEN_REFRESH_CONCURRENCY: int = 8
+
+    # Publishing Pipeline
+    PUBLISH_BATCH_SIZE: int = 50 # Posts reclamados por UPDATE ... RETURNING
+    PUBLISH_CONCURRENCY_PER_PLATFORM: int = 4 # Publicaciones simultáneas por plataforma
+    PUBLISH_ACCOUNT_RATE_PER_MIN: float = 20.0 # Token bucket por cuenta conectada
+    PUBLISH_ACCOUNT_BURST: int = 3
+    PUBLISH_MAX_ATTEMPTS: int = 5 # Intentos totales antes de FAILED_AUTO_MANUAL_AVAILABLE
+    PUBLISH_RETRY_BASE_SECONDS: float = 30.0 # Backoff exponencial: base * 2^intento (+ jitter)
+    PUBLISH_RETRY_MAX_SECONDS: float = 3600.0
+    PUBLISH_CLAIM_LEASE_SECONDS: int = 900 # PROCESSING más viejo que esto vuelve a la cola (worker caído)
+
+    # Outbox (efectos secundarios: tracking, billing, decisiones autónomas)
+    OUTBOX_DISPATCH_SYNC: bool = False # True: sin dispatcher, cada efecto se escribe en línea en la transacción del caller
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10 # Luego el evento queda "dead" para revisión manual
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0 # Backoff exponencial: base * 2^(intento-1)
+    OUTBOX_CLAIM_LEASE_SECONDS: int = 300 # Un lote "dispatching" sin confirmar en este tiempo vuelve a reclamarse
+    OUTBOX_RETENTION_HOURS: int = 72 # Eventos entregados que se conservan antes de purgar
+
+    # Media Jobs (generación asíncrona de imagen/video)
+    MEDIA_JOB_WORKERS: int = 8 # Hilos del pool (las llamadas a providers son bloqueantes)
+    MEDIA_JOB_PROVIDER_CONCURRENCY: Dict[str, int] = {"openai": 2, "mock": 4} # Jobs "running" simultáneos por provider
+    MEDIA_JOB_DEFAULT_CONCURRENCY: int = 2 # Providers sin entrada en el mapa anterior
+    MEDIA_JOB_POLL_SECONDS: float = 1.0
+    MEDIA_JOB_TIMEOUT_SECONDS: int = 600 # Un job "running" más antiguo se considera huérfano (worker caído)
+    MEDIA_JOB_MAX_ATTEMPTS: int = 3 # Reencolados por huérfano antes de marcarlo failed
+    MEDIA_JOB_WEBHOOK_ATTEMPTS: int = 3
+    MEDIA_JOB_WEBHOOK_TIMEOUT_SECONDS: float = 5.0
+
+    MEDIA_JOB_STORE_ASSETS: bool = False # Descargar el resultado del provider al media store (content-addressed)
+
+    # Media Storage (blobs direccionados por sha256: contenido idéntico se guarda una vez)
+    MEDIA_STORAGE_BACKEND: str = "local" # local, s3, s3-local (stand-in en memoria para desarrollo)
+    MEDIA_STORAGE_ROOT: str = "./media_store"
+    MEDIA_STORAGE_CHUNK_SIZE: int = 1024 * 1024 # Escritura/lectura en streaming
+    MEDIA_MAX_UPLOAD_BYTES: int = 500 * 1024 * 1024
+    MEDIA_CACHE_MAX_AGE: int = 31536000 # Blobs inmutables (la URL cambia si cambia el contenido)
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = "" # Ej "/_media": nginx sirve el archivo (sendfile) vía X-Accel-Redirect
+    MEDIA_S3_BUCKET: str = ""
+    MEDIA_S3_PREFIX: str = "media"
+    MEDIA_S3_ENDPOINT_URL: str = "" # MinIO, R2, Supabase Storage (vacío: AWS)
+    MEDIA_S3_REGION: str = ""
+    MEDIA_S3_ACCESS_KEY: str = ""
+    MEDIA_S3_SECRET_KEY: str = ""
+    MEDIA_S3_PART_SIZE: int = 8 * 1024 * 1024 # Multipart por encima de este tamaño
+
+    # Renditions por plataforma (derivados de imágenes en un pool de procesos)
+    RENDITION_WORKERS: int = 2 # Procesos de Pillow (CPU-bound: no comparten el GIL)
+    RENDITION_TIMEOUT_SECONDS: int = 60
+    RENDITION_PREGENERATE: bool = True # Generar al aprobar/programar un post (si no, solo bajo demanda)
+
+    # Campaign Generation Jobs (borradores de campaña generados en background)
+    CAMPAIGN_JOB_WORKERS: int = 4 # Jobs de campaña simultáneos (cada uno hace sus llamadas a la IA en serie)
+    CAMPAIGN_JOB_POLL_SECONDS: float = 1.0
+    CAMPAIGN_JOB_TIMEOUT_SECONDS: int = 600 # Sin avance en este tiempo el job se considera huérfano
+    CAMPAIGN_JOB_MAX_ATTEMPTS: int = 3
+    CAMPAIGN_GENERATE_MAX_COUNT: int = 50 # Posts por job
+
+    # Retención de métricas de impacto (raw -> hour -> day)
+    IMPACT_RAW_RETENTION_DAYS: int = 7 # Snapshots crudos; luego se compactan a buckets horarios
+    IMPACT_HOURLY_RETENTION_WEEKS: int = 8 # Buckets horarios; luego se compactan a diarios (sin límite)
+    IMPACT_RETENTION_BATCH_SIZE: int = 5000 # Filas por transacción de compactación
 
     # Autonomy (Fase 10)
     AUTONOMY_ENABLED: bool = True  # Master Kill Switch
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import jwt
+from app.core.config import get_settings
+from app.schemas.auth import Principal
+
+settings = get_settings()
+
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+class TokenVerifier:
+    """
+    Verificación de JWT con cache de claims.
+    - HS256 con SUPABASE_JWT_SECRET.
+    - RS256/ES256 vía JWKS (PyJWKClient con claves cacheadas localmente).
+    - Tokens verificados se cachean por hash SHA-256 hasta su `exp` (LRU acotado),
+      así el polling del frontend no paga la verificación en cada request.
+    Sin secreto ni JWKS configurados: decode sin verificar firma (solo desarrollo).
+    """
+
+    def __init__(self, secret: str = "", jwks_url: str = "", audience: Optional[str] = "authenticated",
+                 max_entries: int = 4096, default_ttl_seconds: float = 300.0):
+        self.secret = secret
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self._jwks_client: Optional[jwt.PyJWKClient] = None
+        self._cache: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> Principal:
+        """Retorna el Principal o lanza jwt.InvalidTokenError"""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry:
+                principal, valid_until = entry
+                if valid_until > now:
+                    self._cache.move_to_end(key)
+                    return principal
+                del self._cache[key]
+
+        claims = self._decode(token)
+        if not claims.get("sub"):
+            raise jwt.InvalidTokenError("Invalid token payload: missing sub")
+        principal = Principal.from_claims(claims)
+
+        valid_until = float(claims["exp"]) if claims.get("exp") else now + self.default_ttl_seconds
+        with self._lock:
+            self._cache[key] = (principal, valid_until)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return principal
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _decode(self, token: str) -> dict:
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        options = {"verify_aud": bool(self.audience)}
+
+        if algorithm in ASYMMETRIC_ALGORITHMS and self.jwks_url:
+            signing_key = self._get_jwks_client().get_signing_key_from_jwt(token)
+            return jwt.decode(token, signing_key.key, algorithms=ASYMMETRIC_ALGORITHMS,
+                              audience=self.audience, options=options)
+
+        if self.secret:
+            return jwt.decode(token, self.secret, algorithms=["HS256"],
+                              audience=self.audience, options=options)
+
+        if self.jwks_url:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+
+        # Fallback for development if secret is not set (WARNING: INSECURE)
+        return jwt.decode(token, options={"verify_signature": False})
+
+    def _get_jwks_client(self) -> jwt.PyJWKClient:
+        if self._jwks_client is None:
+            # cache_keys: las claves por `kid` quedan en memoria; el JWK set se refresca cada 10 min
+            self._jwks_client = jwt.PyJWKClient(self.jwks_url, cache_keys=True, lifespan=600)
+        return self._jwks_client
+
+# Singleton instance
+token_verifier = TokenVerifier(
+    secret=settings.SUPABASE_JWT_SECRET,
+    jwks_url=settings.SUPABASE_JWKS_URL,
+    audience=settings.SUPABASE_JWT_AUDIENCE or None,
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,89 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # Opcional: backend JSON más rápido
+except ImportError:
+    orjson = None
+
+# Un solo patrón precompilado recorre la respuesta saltando de token estructural en token estructural:
+# - strings JSON completos (loop "unrolled", lineal, sin backtracking) -> sus llaves no cuentan
+# - llaves/corchetes -> profundidad
+# - coma seguida solo de espacios y un cierre -> trailing comma a eliminar
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|,\s*(?=[}\]])')
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+class ModelOutputParseError(ValueError):
+    """La respuesta del modelo no contiene un objeto JSON recuperable"""
+    pass
+
+def parse_model_json(text: Optional[str]) -> Dict[str, Any]:
+    """
+    Extrae el primer objeto JSON válido (de nivel superior) de la respuesta de un modelo.
+    Un candidato inválido se descarta entero: el escaneo sigue desde su cierre (lineal).
+    Tolera bloques ```json```, texto antes/después del objeto y trailing commas.
+    """
+    if not text:
+        raise ModelOutputParseError("Respuesta vacía")
+
+    stripped = text.strip()
+    # Camino rápido: respuesta bien formada (modo JSON de los proveedores)
+    if stripped.startswith("{") and stripped.endswith("}"):
+        data = _loads(stripped)
+        if isinstance(data, dict):
+            return data
+
+    start = text.find("{")
+    while start != -1:
+        scanned = _scan_object(text, start)
+        if scanned is None:
+            break # Objeto sin cerrar (respuesta truncada): no hay candidatos posteriores completos
+        end, cuts = scanned
+        data = _loads(_without_cuts(text, start, end, cuts))
+        if isinstance(data, dict):
+            return data
+        start = text.find("{", end) # Una sola pasada: se sigue desde el cierre del candidato fallido
+
+    raise ModelOutputParseError(f"No se encontró un objeto JSON válido en la respuesta ({len(text)} chars)")
+
+def _scan_object(text: str, start: int) -> Optional[Tuple[int, List[Tuple[int, int]]]]:
+    """Una pasada desde `start` ('{') hasta su cierre balanceado. Devuelve (fin, trailing commas)."""
+    depth = 0
+    cuts: List[Tuple[int, int]] = []
+    for match in _TOKEN_RE.finditer(text, start):
+        char = text[match.start()]
+        if char == '"':
+            continue
+        if char == "{" or char == "[":
+            depth += 1
+        elif char == "}" or char == "]":
+            depth -= 1
+            if depth == 0:
+                return match.end(), cuts
+        else:
+            cuts.append((match.start(), match.end()))
+    return None
+
+def _without_cuts(text: str, start: int, end: int, cuts: List[Tuple[int, int]]) -> str:
+    if not cuts:
+        return text[start:end]
+    parts = []
+    position = start
+    for cut_start, cut_end in cuts:
+        parts.append(text[position:cut_start])
+        position = cut_end
+    parts.append(text[position:end])
+    return "".join(parts)
+
+def _loads(candidate: str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            pass # p.ej. saltos de línea crudos dentro de strings: json con strict=False los acepta
+    try:
+        return json.loads(candidate, strict=False)
+    except (json.JSONDecodeError, RecursionError): # Anidamiento patológico: candidato inválido
+        return None
@@ -1,17 +1,49 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
 from app.core.config import get_settings
-import base64
+import ipaddress
+import socket
+import threading
+import time
 
 settings = get_settings()
 
-def get_fernet():
-    key = settings.ENCRYPTION_KEY
-    if not key:
-        raise ValueError("ENCRYPTION_KEY is missing in configuration.")
-    try:
-        return Fernet(key.encode())
-    except Exception as e:
-        raise ValueError(f"Invalid ENCRYPTION_KEY format: {str(e)}")
+# -----------------------------------------------------------------------------
+# Cipher (cacheado por configuración de claves)
+# -----------------------------------------------------------------------------
+
+_cipher_lock = threading.Lock()
+_cipher: Optional[MultiFernet] = None
+_cipher_keys: Optional[Tuple[str, ...]] = None
+
+def _configured_keys() -> Tuple[str, ...]:
+    """ENCRYPTION_KEY primero (cifra), luego claves anteriores (solo descifran)"""
+    previous = [k.strip() for k in settings.ENCRYPTION_KEYS_PREVIOUS.split(",") if k.strip()]
+    return tuple([settings.ENCRYPTION_KEY] + previous) if settings.ENCRYPTION_KEY else ()
+
+def get_fernet() -> MultiFernet:
+    """
+    Retorna el cipher del proceso. Se reconstruye solo si cambian las claves.
+    MultiFernet cifra con la clave primaria y descifra con cualquiera de la lista (rotación).
+    """
+    global _cipher, _cipher_keys
+    keys = _configured_keys()
+    if _cipher is not None and keys == _cipher_keys:
+        return _cipher
+
+    with _cipher_lock:
+        if _cipher is not None and keys == _cipher_keys:
+            return _cipher
+        if not keys:
+            raise ValueError("ENCRYPTION_KEY is missing in configuration.")
+        try:
+            cipher = MultiFernet([Fernet(k.encode()) for k in keys])
+        except Exception as e:
+            raise ValueError(f"Invalid ENCRYPTION_KEY format: {str(e)}")
+        _cipher, _cipher_keys = cipher, keys
+        return cipher
 
 def encrypt_token(token: str) -> str:
     """
@@ -31,3 +63,107 @@ def decrypt_token(token_enc: str) -> str:
         return None
     f = get_fernet()
     return f.decrypt(token_enc.encode()).decode()
+
+def rotate_token(token_enc: str) -> str:
+    """
+    Re-cifra un token con la clave primaria actual (para migrar tras rotar ENCRYPTION_KEY).
+    """
+    if not token_enc:
+        return None
+    return get_fernet().rotate(token_enc.encode()).decode()
+
+# -----------------------------------------------------------------------------
+# URLs salientes (webhooks): solo https hacia hosts públicos (anti-SSRF)
+# -----------------------------------------------------------------------------
+
+def ensure_public_https_url(url: str) -> str:
+    """
+    Retorna la URL si es https y todas las IPs de su host son públicas.
+    ValueError si no: otro esquema, host sin resolver, loopback, red privada,
+    link-local (metadata del cloud), multicast o reservada.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "https" or not parts.hostname:
+        raise ValueError("URL must be an absolute https URL")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 443, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Host cannot be resolved: {parts.hostname}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"Host resolves to a non-public address: {parts.hostname}")
+    return url
+
+# -----------------------------------------------------------------------------
+# Cache de tokens descifrados
+# -----------------------------------------------------------------------------
+
+class DecryptedTokenCache:
+    """
+    Cache LRU acotado + TTL de access tokens descifrados.
+    Clave: (account_id, updated_at) -> si la cuenta se actualiza (nuevo token), la entrada vieja
+    deja de coincidir sola. Los bytes se guardan en bytearray y se sobrescriben con ceros al
+    evictar/invalidar (best effort: el str entregado al llamador no se puede borrar en Python).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[bytearray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_access_token(self, account) -> Optional[str]:
+        """Access token en claro de un ConnectedAccount (descifra solo en miss)"""
+        if not account or not account.access_token_encrypted:
+            return None
+        key = (account.id, account.updated_at.isoformat() if account.updated_at else "")
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                secret, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return secret.decode()
+                self._drop(key)
+
+        token = decrypt_token(account.access_token_encrypted)
+
+        with self._lock:
+            # Cualquier versión anterior de la misma cuenta queda obsoleta
+            for stale in [k for k in self._entries if k[0] == account.id and k != key]:
+                self._drop(stale)
+            self._entries[key] = (bytearray(token.encode()), now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return token
+
+    def invalidate_account(self, account_id: int) -> int:
+        """Borra (y pone en cero) todas las entradas de una cuenta. Usar al desconectar/reconectar."""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == account_id]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        secret, _ = self._entries.pop(key)
+        for i in range(len(secret)):
+            secret[i] = 0
+
+# Singleton instance
+token_cache = DecryptedTokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS
+)
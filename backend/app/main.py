@@ -8,6 +8,11 @@ from app.models.domain import Base
 import sys
 from app.core.logging import setup_logging
 from app.services.scheduler_service import SchedulerService
+from app.services.publisher_runtime import publisher_runtime
+from app.services.outbox_dispatcher import outbox_dispatcher
+from app.services.media_job_worker import media_job_worker
+from app.services.rendition_service import rendition_pipeline
+from app.services.campaign_generation_worker import campaign_generation_worker
 
 # Setup Global Logging
 logger = setup_logging()
@@ -49,6 +54,11 @@ validate_security_config()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    publisher_runtime.start()
+    if not settings.OUTBOX_DISPATCH_SYNC:
+        outbox_dispatcher.start()
+    media_job_worker.start()
+    campaign_generation_worker.start()
     logger.info("🚀 Starting Scheduler Service...")
     scheduler = SchedulerService()
     scheduler.start()
@@ -56,6 +66,11 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Stopping Scheduler Service...")
     scheduler.shutdown()
+    publisher_runtime.stop()
+    media_job_worker.stop() # Espera los jobs en ejecución; los encolados quedan en la tabla
+    campaign_generation_worker.stop() # Los jobs interrumpidos se retoman desde su progreso
+    rendition_pipeline.shutdown() # Las renditions faltantes se generan bajo demanda
+    outbox_dispatcher.stop() # Entrega final de efectos pendientes
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -54,6 +54,7 @@ class AutonomousDecisionLog(Base):
     decision = Column(String, nullable=False) # ALLOW_EXECUTION, BLOCK_COOLDOWN, BLOCK_PERFORMANCE, PAUSE_CAMPAIGN, etc.
     reason = Column(String, nullable=False)
     metrics_snapshot = Column(JSON, nullable=True) # Métricas usadas para decidir
+    outbox_key = Column(String, unique=True, nullable=True) # Clave del evento de outbox (entrega idempotente)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -34,3 +34,19 @@ class BillingEvent(Base):
     
     # Metadatos técnicos (Opcional, para debug)
     pricing_version = Column(String, nullable=False) # Versión de la tabla de precios usada
+
+class MonthlySpendRollup(Base):
+    """
+    Acumulado de gasto por usuario y mes (Fase 7.3).
+    Se mantiene en la misma transacción que BillingEvent.
+    Derivado: puede reconstruirse siempre desde billing_events.
+    """
+    __tablename__ = "billing_monthly_rollups"
+
+    # Clave primaria compuesta: lookup directo desde BudgetGuardService
+    user_id = Column(String, primary_key=True)
+    period = Column(String, primary_key=True) # "YYYY-MM"
+
+    total_cost = Column(Float, default=0.0, nullable=False)
+    event_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, UniqueConstraint
+from datetime import datetime
+from app.models.domain import Base
+
+class CampaignGenerationJob(Base):
+    """
+    Generación de borradores de una campaña en background.
+    El request solo inserta el job (status=queued); CampaignGenerationWorker genera
+    los posts de a uno y confirma cada borrador junto con el contador de progreso,
+    así los resultados parciales son visibles y un reintento retoma donde quedó.
+    idempotency_key: un reintento del cliente con la misma clave reutiliza el job.
+    """
+    __tablename__ = "campaign_generation_jobs"
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "idempotency_key", name="uq_campaign_generation_jobs_idempotency"),
+    )
+
+    id = Column(String, primary_key=True, index=True) # uuid4, devuelto al cliente
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
+    platform = Column(String, nullable=False, default="linkedin")
+    idempotency_key = Column(String, nullable=True)
+
+    # Progreso
+    requested = Column(Integer, nullable=False) # Posts pedidos
+    completed = Column(Integer, default=0, nullable=False) # Borradores creados
+    failed = Column(Integer, default=0, nullable=False) # Intentos de la IA sin post válido
+    post_ids = Column(JSON, default=list, nullable=False)
+
+    # Ejecución
+    status = Column(String, default="queued", nullable=False, index=True) # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True) # Último avance (heartbeat para detectar huérfanos)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum, Numeric, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
@@ -46,7 +46,7 @@ class FunctionalIdentity(Base):
     __tablename__ = "functional_identities"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True) # Vinculación a tenant
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True) # Vinculación a tenant
     
     name = Column(String, nullable=False)
     role = Column(String, nullable=True) # Deprecated/Optional in MVP 2.0
@@ -117,6 +117,7 @@ class ContentStatus(str, enum.Enum):
     SCHEDULED_AUTO = "scheduled_auto"
     PUBLISHED_AUTO = "published_auto"
     FAILED_AUTO_MANUAL_AVAILABLE = "failed_auto_manual_available"
+    RETRY_PENDING = "retry_pending" # Fallo transitorio, reintento programado (publish_retries)
 
 class MediaType(str, enum.Enum):
     IMAGE = "image"
@@ -168,7 +169,7 @@ class Campaign(Base):
     __tablename__ = "campaigns"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     
     name = Column(String, index=True)
     objective = Column(String) # educar, vender, posicionar
@@ -214,7 +215,7 @@ class Post(Base):
     __tablename__ = "posts"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=True)
     identity_id = Column(UUID(as_uuid=True), ForeignKey("functional_identities.id"), nullable=True)
     # topic_id = Column(Integer, ForeignKey("topics.id"), nullable=True) # Removed to match Supabase schema
@@ -234,6 +235,7 @@ class Post(Base):
 
     scheduled_for = Column(DateTime, nullable=True)
     published_at = Column(DateTime, nullable=True)
+    claimed_at = Column(DateTime, nullable=True) # Lease del scheduler mientras está PROCESSING
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relaciones
@@ -264,7 +266,11 @@ class Post(Base):
 
 
 class Media(Base):
-    """Archivos multimedia asociados"""
+    """
+    Archivos multimedia asociados.
+    El contenido vive en el media store bajo su sha256: varias filas (posts) pueden
+    referenciar el mismo blob, que se guarda una sola vez.
+    """
     __tablename__ = "media"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -272,8 +278,42 @@ class Media(Base):
     media_type = Column(String, default=MediaType.IMAGE)
     local_path = Column(String) # Path en storage local
     public_url = Column(String, nullable=True) # URL si se sube a S3
+
+    # Media store (content-addressed)
+    content_hash = Column(String(64), nullable=True, index=True) # sha256 hex
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    storage_backend = Column(String, nullable=True) # local, s3
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
     
     post = relationship("Post", back_populates="media")
+    # Derivados por plataforma: se comparten entre filas que referencian el mismo blob
+    renditions = relationship(
+        "MediaRendition",
+        primaryjoin="foreign(MediaRendition.source_hash) == Media.content_hash",
+        viewonly=True,
+        uselist=True
+    )
+
+class MediaRendition(Base):
+    """
+    Derivado de un medio para una plataforma (resize/crop/re-encode).
+    Cacheado por hash de origen + spec: el mismo blob y la misma spec se generan una vez.
+    """
+    __tablename__ = "media_renditions"
+    __table_args__ = (UniqueConstraint("source_hash", "spec_key", name="uq_media_renditions_source_spec"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_hash = Column(String(64), nullable=False, index=True) # sha256 del original
+    spec_key = Column(String, nullable=False) # Ej "1200x627-crop-jpeg-q85"
+    platform = Column(String, nullable=False)
+    name = Column(String, nullable=False) # feed, square, story...
+    content_hash = Column(String(64), nullable=False) # Blob del derivado en el media store
+    content_type = Column(String, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 class AutoPublisherJob(Base):
     """Configuración del publicador automático"""
@@ -297,7 +337,7 @@ class ConnectedAccount(Base):
     __tablename__ = "connected_accounts"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     provider = Column(String, default="linkedin")
     external_account_id = Column(String) # ID único en la plataforma
     provider_name = Column(String, nullable=True) # Nombre para mostrar
@@ -323,6 +363,6 @@ class MediaUsage(Base):
     date = Column(DateTime, index=True) # Fecha truncada al día
     count = Column(Integer, default=0)
     
-    # Índice único compuesto para evitar duplicados por día
-    # En SQLite se puede manejar a nivel de aplicación o con UniqueConstraint explícito
-    # __table_args__ = (UniqueConstraint('user_id', 'media_type', 'date', name='_user_media_date_uc'),)
+    # Una fila por usuario/tipo/día: la primera reserva concurrente del día choca aquí
+    # y se reintenta como UPDATE (ver UsageRepository.reserve_usage)
+    __table_args__ = (UniqueConstraint("user_id", "media_type", "date", name="uq_media_usage_user_type_date"),)
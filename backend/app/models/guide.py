@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from datetime import datetime
+from app.models.domain import Base
+
+class GuideSummaryHistory(Base):
+    """
+    Historial completo de resúmenes de conversación de la guía, por guide_session_id.
+    El cliente solo recibe la forma compacta; aquí queda el texto íntegro
+    (source="model") y cada compactación generada en background (source="compaction").
+    """
+    __tablename__ = "guide_summary_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    guide_session_id = Column(String, index=True, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True, nullable=True)
+
+    source = Column(String, nullable=False) # model, compaction
+    summary_text = Column(Text, nullable=False)
+    char_count = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class GuideSession(Base):
+    """
+    Estado server-side de una sesión de la guía (respaldo del LRU en memoria).
+    Permite que el cliente envíe solo deltas (user_input / user_value) y retomar
+    la sesión desde otro dispositivo.
+    """
+    __tablename__ = "guide_sessions"
+
+    guide_session_id = Column(String, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True, nullable=True)
+
+    mode = Column(String, nullable=True)
+    current_step = Column(Integer, default=1, nullable=False)
+    state_json = Column(Text, nullable=False) # GuideState serializado
+    version = Column(Integer, default=1, nullable=False) # Se incrementa en cada turno
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, JSON
+from datetime import datetime
+from app.models.domain import Base
+
+class MediaJob(Base):
+    """
+    Cola persistente de generación de medios (imagen, video).
+    El request solo valida, reserva cuota/presupuesto e inserta el job (status=queued);
+    MediaJobWorker lo ejecuta con límite de concurrencia por provider.
+    La reserva se libera si el job falla; al terminar se factura vía outbox.
+    """
+    __tablename__ = "media_jobs"
+
+    id = Column(String, primary_key=True, index=True) # uuid4, devuelto al cliente
+    user_id = Column(String, nullable=False, index=True)
+    plan = Column(String, nullable=False)
+    media_type = Column(String, nullable=False) # image, video
+    provider = Column(String, nullable=False, index=True) # Clave de concurrencia (mock, openai, ...)
+    params = Column(JSON, nullable=False) # {"prompt": ..., "resolution"/"duration": ...}
+
+    # Ejecución
+    status = Column(String, default="queued", nullable=False, index=True) # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    result = Column(JSON, nullable=True) # Respuesta del provider (url, job_id externo, ...)
+    error = Column(Text, nullable=True)
+
+    # Reserva tomada al encolar (se libera si el job falla)
+    usage_reserved = Column(Boolean, default=True, nullable=False)
+    reserved_cost = Column(Float, default=0.0, nullable=False) # USD estimados, cuentan contra el presupuesto mientras el job está en curso
+
+    # Notificación
+    webhook_url = Column(String, nullable=True)
+    webhook_status = Column(String, nullable=True) # delivered, failed
+    webhook_attempts = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
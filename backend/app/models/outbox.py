@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from datetime import datetime
+from app.models.domain import Base
+
+class OutboxEvent(Base):
+    """
+    Transactional outbox para efectos secundarios (tracking, billing, decisiones).
+    La fila se inserta en la MISMA transacción que el cambio principal;
+    el OutboxDispatcher la entrega después (at-least-once) a su tabla destino.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String, nullable=False, index=True) # tracking.generation, billing.usage, autonomy.decision
+    payload = Column(JSON, nullable=False)
+
+    # Deduplicación: el mismo efecto no se encola ni se entrega dos veces
+    idempotency_key = Column(String, unique=True, nullable=False)
+
+    # Entrega
+    status = Column(String, default="pending", nullable=False, index=True) # pending, dispatched, dead
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True) # Backoff entre reintentos
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    dispatched_at = Column(DateTime, nullable=True)
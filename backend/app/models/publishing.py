@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from datetime import datetime
+from app.models.domain import Base
+
+class PublishRetry(Base):
+    """
+    Cola persistente de reintentos de publicación.
+    Una fila por post con fallo transitorio; sobrevive reinicios del proceso.
+    El post queda en RETRY_PENDING con scheduled_for = next_attempt_at,
+    así el claim del scheduler lo vuelve a tomar sin queries adicionales.
+    """
+    __tablename__ = "publish_retries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), unique=True, nullable=False)
+    platform = Column(String, nullable=False)
+    account_id = Column(Integer, ForeignKey("connected_accounts.id"), nullable=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, index=True, nullable=False)
+    original_scheduled_for = Column(DateTime, nullable=True)
+
+    last_error = Column(Text, nullable=True)
+    last_error_kind = Column(String, nullable=True) # transient, rate_limited
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.domain import Base
@@ -36,11 +36,13 @@ class ContentTracking(Base):
     
     # Trazabilidad
     correlation_id = Column(String, index=True, nullable=True)
+    outbox_key = Column(String, unique=True, nullable=True) # Clave del evento de outbox que creó la fila (entrega idempotente)
 
     # --- VERSIONADO (FASE 8.2) ---
     parent_content_id = Column(Integer, ForeignKey("content_tracking.tracking_id"), nullable=True, index=True)
     version_number = Column(Integer, default=1)
     change_reason = Column(String, nullable=True)
+    is_latest = Column(Boolean, default=True, nullable=False, index=True) # Mantenido por VersioningService en la misma transacción
     
     # Relaciones
     parent = relationship("ContentTracking", remote_side=[tracking_id], backref="versions")
@@ -51,12 +53,27 @@ class ContentTracking(Base):
     owner = Column(String, nullable=True) # Responsable humano
     notes = Column(Text, nullable=True)
 
+class ContentVersionCounter(Base):
+    """
+    Contador de versiones por linaje (una fila por contenido raíz).
+    Se incrementa con UPDATE ... RETURNING: la fila queda bloqueada hasta el commit,
+    así ediciones concurrentes del mismo linaje nunca repiten version_number.
+    """
+    __tablename__ = "content_version_counters"
+
+    root_content_id = Column(Integer, ForeignKey("content_tracking.tracking_id"), primary_key=True)
+    last_version = Column(Integer, nullable=False)
+
 class ImpactMetric(Base):
     """
     Métricas de Impacto (Append-Only).
     Registra snapshots de rendimiento de un contenido.
+    Retención: pasados IMPACT_RAW_RETENTION_DAYS se compactan en ImpactMetricRollup.
     """
     __tablename__ = "impact_metrics"
+    __table_args__ = (
+        Index("ix_impact_metrics_tracking_captured", "tracking_id", "captured_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tracking_id = Column(Integer, ForeignKey("content_tracking.tracking_id"), nullable=False, index=True)
@@ -74,3 +91,25 @@ class ImpactMetric(Base):
     
     # Relaciones
     content = relationship("ContentTracking", backref="metrics")
+
+class ImpactMetricRollup(Base):
+    """
+    Snapshots de impacto compactados por resolución (hour, day).
+    Las métricas son acumuladas: cada bucket guarda el ÚLTIMO snapshot que cayó en él.
+    Mantenido por ImpactRetentionService (raw -> hour -> day).
+    """
+    __tablename__ = "impact_metric_rollups"
+
+    tracking_id = Column(Integer, ForeignKey("content_tracking.tracking_id"), primary_key=True)
+    resolution = Column(String, primary_key=True) # hour, day
+    bucket_start = Column(DateTime, primary_key=True)
+
+    impressions = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    reactions = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    shares = Column(Integer, default=0)
+
+    last_captured_at = Column(DateTime, nullable=False) # Snapshot que representa el bucket
+    sample_count = Column(Integer, default=1, nullable=False) # Snapshots compactados en el bucket
+
@@ -49,15 +49,33 @@ class MockVideoProvider(VideoProvider):
             "duration": duration
         }
 
+# (media_type, nombre) -> clase; el nombre es también la clave de concurrencia de MediaJobWorker
+PROVIDERS = {
+    ("image", "mock"): MockImageProvider,
+    ("image", "openai"): OpenAIImageProvider,
+    ("video", "mock"): MockVideoProvider,
+}
+
 class ProviderFactory:
     @staticmethod
     def get_image_provider() -> ImageProvider:
-        provider_type = os.getenv("MEDIA_PROVIDER", "mock")
-        if provider_type == "openai":
-            return OpenAIImageProvider()
-        return MockImageProvider()
+        return ProviderFactory.get_provider("image", ProviderFactory.resolve_name("image"))
 
     @staticmethod
     def get_video_provider() -> VideoProvider:
+        return ProviderFactory.get_provider("video", ProviderFactory.resolve_name("video"))
+
+    @staticmethod
+    def resolve_name(media_type: str) -> str:
+        """Provider configurado para el tipo de medio"""
+        if media_type == "image" and os.getenv("MEDIA_PROVIDER", "mock") == "openai":
+            return "openai"
         # Por ahora solo tenemos Mock para video
-        return MockVideoProvider()
+        return "mock"
+
+    @staticmethod
+    def get_provider(media_type: str, name: str):
+        provider_cls = PROVIDERS.get((media_type, name))
+        if provider_cls is None:
+            raise ValueError(f"Unknown {media_type} provider: {name}")
+        return provider_cls()
@@ -1,7 +1,22 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import and_, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
-from app.models.billing import BillingEvent
+from typing import Optional
+from app.models.billing import BillingEvent, MonthlySpendRollup
+
+def month_period(target_date) -> str:
+    """Clave de periodo del rollup mensual ("YYYY-MM")"""
+    return f"{target_date.year:04d}-{target_date.month:02d}"
+
+def _month_bounds(target_date) -> tuple:
+    start_of_month = datetime(target_date.year, target_date.month, 1)
+    # Fin de mes es inicio del siguiente mes
+    if target_date.month == 12:
+        end_of_month = datetime(target_date.year + 1, 1, 1)
+    else:
+        end_of_month = datetime(target_date.year, target_date.month + 1, 1)
+    return start_of_month, end_of_month
 
 class BillingRepository:
     def __init__(self, db: Session):
@@ -11,15 +26,38 @@ class BillingRepository:
         """
         Persiste un evento de facturación.
         Append-only: No hay updates ni deletes.
+        El rollup mensual se actualiza en la MISMA transacción.
+        """
+        if not event.timestamp:
+            event.timestamp = datetime.utcnow()
+
+        # Dos intentos: si otra transacción creó el rollup del mes en paralelo,
+        # el INSERT choca con la PK y el reintento cae en el UPDATE atómico.
+        for attempt in range(2):
+            self.db.add(event)
+            try:
+                self._apply_to_rollup(event.user_id, month_period(event.timestamp), event.cost_estimated or 0.0)
+                self.db.commit()
+                self.db.refresh(event)
+                return event
+            except IntegrityError as e:
+                self.db.rollback()
+                if attempt == 1 or not self._rollup_exists(event.user_id, month_period(event.timestamp)):
+                    raise e
+            except Exception as e:
+                self.db.rollback()
+                raise e
+
+    def stage_event(self, event: BillingEvent) -> BillingEvent:
         """
+        Agrega el evento y su rollup a la transacción en curso SIN commit.
+        Usado por la entrega del outbox: el dispatcher confirma todo el lote junto.
+        """
+        if not event.timestamp:
+            event.timestamp = datetime.utcnow()
         self.db.add(event)
-        try:
-            self.db.commit()
-            self.db.refresh(event)
-            return event
-        except Exception as e:
-            self.db.rollback()
-            raise e
+        self._apply_to_rollup(event.user_id, month_period(event.timestamp), event.cost_estimated or 0.0)
+        return event
 
     def get_user_events(self, user_id: str, limit: int = 100):
         """Retorna historial reciente (para debugging/soporte)"""
@@ -58,13 +96,17 @@ class BillingRepository:
     def get_monthly_cost(self, user_id: str, target_date: datetime.date) -> float:
         """
         Retorna el costo total acumulado del mes hasta la fecha.
+        Lookup por clave primaria sobre el rollup (no escanea eventos).
         """
-        start_of_month = datetime(target_date.year, target_date.month, 1)
-        # Fin de mes es inicio del siguiente mes
-        if target_date.month == 12:
-            end_of_month = datetime(target_date.year + 1, 1, 1)
-        else:
-            end_of_month = datetime(target_date.year, target_date.month + 1, 1)
+        rollup = self.db.get(MonthlySpendRollup, (user_id, month_period(target_date)))
+        return rollup.total_cost if rollup else 0.0
+
+    def get_monthly_cost_from_events(self, user_id: str, target_date: datetime.date) -> float:
+        """
+        Recalcula el costo del mes sumando los eventos crudos.
+        Source of truth; usado por la reconciliación y para auditoría.
+        """
+        start_of_month, end_of_month = _month_bounds(target_date)
 
         result = self.db.query(
             func.sum(BillingEvent.cost_estimated).label("total_cost")
@@ -75,3 +117,83 @@ class BillingRepository:
         ).scalar()
 
         return result or 0.0
+
+    def _apply_to_rollup(self, user_id: str, period: str, cost: float) -> None:
+        """
+        Incrementa el rollup de forma atómica (UPDATE total = total + x).
+        No hace commit: participa en la transacción del evento.
+        """
+        updated = self.db.query(MonthlySpendRollup).filter(
+            MonthlySpendRollup.user_id == user_id,
+            MonthlySpendRollup.period == period
+        ).update({
+            MonthlySpendRollup.total_cost: MonthlySpendRollup.total_cost + cost,
+            MonthlySpendRollup.event_count: MonthlySpendRollup.event_count + 1,
+            MonthlySpendRollup.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+
+        if not updated:
+            self.db.add(MonthlySpendRollup(
+                user_id=user_id,
+                period=period,
+                total_cost=cost,
+                event_count=1,
+                updated_at=datetime.utcnow()
+            ))
+
+    def _rollup_exists(self, user_id: str, period: str) -> bool:
+        return self.db.get(MonthlySpendRollup, (user_id, period)) is not None
+
+    def rebuild_monthly_rollups(self, target_date: datetime.date, user_id: Optional[str] = None) -> int:
+        """
+        Reconciliación: recalcula los rollups del mes desde billing_events.
+        Corrige cualquier deriva (escrituras fallidas, ajustes manuales, etc).
+        Cada rollup se calcula y escribe en el mismo statement (UPDATE ... SET total = (SELECT SUM ...)
+        e INSERT ... SELECT para los que faltan): un create_event concurrente suma sobre el valor
+        recalculado en vez de perderse. Retorna el número de rollups escritos.
+        """
+        period = month_period(target_date)
+        start_of_month, end_of_month = _month_bounds(target_date)
+        in_month = (BillingEvent.timestamp >= start_of_month, BillingEvent.timestamp < end_of_month)
+
+        # Mismo patrón que create_event: si otra transacción crea un rollup entre medio, reintento
+        for attempt in range(2):
+            now = datetime.utcnow()
+            try:
+                own_events = and_(BillingEvent.user_id == MonthlySpendRollup.user_id, *in_month)
+                refresh = update(MonthlySpendRollup).where(MonthlySpendRollup.period == period).values(
+                    total_cost=select(func.coalesce(func.sum(BillingEvent.cost_estimated), 0.0))
+                    .where(own_events).scalar_subquery(),
+                    event_count=select(func.count(BillingEvent.id)).where(own_events).scalar_subquery(),
+                    updated_at=now
+                )
+                if user_id:
+                    refresh = refresh.where(MonthlySpendRollup.user_id == user_id)
+                updated = self.db.execute(refresh.execution_options(synchronize_session=False)).rowcount or 0
+
+                missing = select(
+                    BillingEvent.user_id,
+                    literal(period),
+                    func.coalesce(func.sum(BillingEvent.cost_estimated), 0.0),
+                    func.count(BillingEvent.id),
+                    literal(now)
+                ).where(
+                    *in_month,
+                    ~exists().where(MonthlySpendRollup.user_id == BillingEvent.user_id,
+                                    MonthlySpendRollup.period == period)
+                ).group_by(BillingEvent.user_id)
+                if user_id:
+                    missing = missing.where(BillingEvent.user_id == user_id)
+                inserted = self.db.execute(insert(MonthlySpendRollup).from_select(
+                    ["user_id", "period", "total_cost", "event_count", "updated_at"], missing
+                )).rowcount or 0
+
+                self.db.commit()
+                return updated + inserted
+            except IntegrityError:
+                self.db.rollback()
+                if attempt == 1:
+                    raise
+            except Exception:
+                self.db.rollback()
+                raise
@@ -1,8 +1,8 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, select
 from typing import List, Optional
 from datetime import datetime
-from app.models.tracking import ImpactMetric, ContentTracking
+from app.models.tracking import ImpactMetric, ImpactMetricRollup, ContentTracking
 
 class ImpactRepository:
     def __init__(self, db: Session):
@@ -19,12 +19,41 @@ class ImpactRepository:
             self.db.rollback()
             raise
 
-    def get_by_content(self, content_id: int) -> List[ImpactMetric]:
-        """Obtiene historial de métricas para un contenido"""
-        return self.db.query(ImpactMetric)\
+    def get_by_content(self, content_id: int, limit: Optional[int] = None) -> List[ImpactMetric]:
+        """Obtiene snapshots crudos de un contenido (más reciente primero)"""
+        query = self.db.query(ImpactMetric)\
             .filter(ImpactMetric.tracking_id == content_id)\
-            .order_by(desc(ImpactMetric.captured_at))\
-            .all()
+            .order_by(desc(ImpactMetric.captured_at))
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def count_by_content(self, content_id: int) -> int:
+        """Snapshots registrados del contenido: crudos + los ya compactados en buckets (sample_count)"""
+        raw = self.db.query(func.count(ImpactMetric.id)).filter(ImpactMetric.tracking_id == content_id).scalar()
+        compacted = self.db.query(func.coalesce(func.sum(ImpactMetricRollup.sample_count), 0))\
+            .filter(ImpactMetricRollup.tracking_id == content_id).scalar()
+        return raw + compacted
+
+    def get_raw_range(self, content_id: int, start: datetime, end: datetime) -> List[ImpactMetric]:
+        """Snapshots crudos en [start, end], en orden cronológico"""
+        return self.db.query(ImpactMetric).filter(
+            ImpactMetric.tracking_id == content_id,
+            ImpactMetric.captured_at >= start,
+            ImpactMetric.captured_at <= end
+        ).order_by(ImpactMetric.captured_at).all()
+
+    def get_rollups_range(self, content_id: int, resolution: str, start: datetime, end: datetime) -> List[ImpactMetricRollup]:
+        """
+        Buckets compactados (hour/day) que se solapan con [start, end], en orden cronológico.
+        Un bucket que empieza antes de start pero cuyo último snapshot cae en el rango se incluye.
+        """
+        return self.db.query(ImpactMetricRollup).filter(
+            ImpactMetricRollup.tracking_id == content_id,
+            ImpactMetricRollup.resolution == resolution,
+            ImpactMetricRollup.last_captured_at >= start,
+            ImpactMetricRollup.bucket_start <= end
+        ).order_by(ImpactMetricRollup.bucket_start).all()
 
     def get_metrics_report(
         self,
@@ -46,3 +75,48 @@ class ImpactRepository:
             query = query.filter(ImpactMetric.captured_at <= end_date)
 
         return query.order_by(desc(ImpactMetric.captured_at)).limit(limit).all()
+
+    def get_latest_metrics(self, project_id: Optional[int] = None, content_ids: Optional[List[int]] = None) -> list:
+        """
+        Una fila por contenido (del proyecto y/o de la lista) con su último snapshot (ceros si no tiene):
+        (tracking_id, parent_content_id, version_number, is_latest,
+         impressions, clicks, reactions, comments, shares). Ordenado por tracking_id.
+        Una sola query (window function), pensada para análisis vectorizado.
+        """
+        ranked = select(
+            ImpactMetric.tracking_id,
+            ImpactMetric.impressions,
+            ImpactMetric.clicks,
+            ImpactMetric.reactions,
+            ImpactMetric.comments,
+            ImpactMetric.shares,
+            func.row_number().over(
+                partition_by=ImpactMetric.tracking_id,
+                order_by=(desc(ImpactMetric.captured_at), desc(ImpactMetric.id))
+            ).label("rn")
+        ).join(ContentTracking).where(*self._content_filters(project_id, content_ids)).subquery()
+
+        stmt = select(
+            ContentTracking.tracking_id,
+            func.coalesce(ContentTracking.parent_content_id, 0),
+            func.coalesce(ContentTracking.version_number, 1),
+            ContentTracking.is_latest,
+            func.coalesce(ranked.c.impressions, 0),
+            func.coalesce(ranked.c.clicks, 0),
+            func.coalesce(ranked.c.reactions, 0),
+            func.coalesce(ranked.c.comments, 0),
+            func.coalesce(ranked.c.shares, 0)
+        ).outerjoin(
+            ranked, and_(ranked.c.tracking_id == ContentTracking.tracking_id, ranked.c.rn == 1)
+        ).where(*self._content_filters(project_id, content_ids)).order_by(ContentTracking.tracking_id)
+
+        return self.db.execute(stmt).all()
+
+    @staticmethod
+    def _content_filters(project_id: Optional[int], content_ids: Optional[List[int]]) -> list:
+        filters = []
+        if project_id is not None:
+            filters.append(ContentTracking.project_id == project_id)
+        if content_ids is not None:
+            filters.append(ContentTracking.tracking_id.in_(content_ids))
+        return filters
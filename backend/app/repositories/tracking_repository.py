@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime
-from app.models.tracking import ContentTracking
+from app.models.tracking import ContentTracking, ContentVersionCounter
 
 class TrackingRepository:
     def __init__(self, db: Session):
@@ -44,38 +45,76 @@ class TrackingRepository:
         return self.db.query(ContentTracking).filter(ContentTracking.tracking_id == tracking_id).first()
 
     def get_version_history(self, content_id: int) -> List[ContentTracking]:
-        """Obtiene historial completo de versiones de un contenido"""
-        # Primero encontramos la raíz
-        content = self.get_by_id(content_id)
-        if not content:
-            return []
-        
-        root_id = content.parent_content_id if content.parent_content_id else content.tracking_id
-        
-        # Si es un hijo, buscamos el padre para confirmar raíz (simplificación: asumimos 1 nivel o buscamos recursivo si fuera necesario)
-        # La regla dice: parent_content_id apunta al padre.
-        # Si queremos TODA la cadena, buscamos todos los que tengan mismo parent_content_id O sean el parent.
-        
-        # Implementación recursiva simple (asumiendo profundidad baja) o búsqueda por correlation_id si se usara para agrupar.
-        # Pero aquí usaremos parent_content_id. 
-        # Si asumimos estructura de árbol donde cada versión apunta a la anterior:
-        # v3 -> v2 -> v1
-        # Para obtener toda la lista, necesitamos recorrer.
-        
-        # O podemos buscar por correlation_id si es constante en versiones? 
-        # El prompt dice "Correlation ID reusar si existe".
-        # Si todas las versiones comparten correlation_id, es trivial.
-        # Si no, tenemos que navegar los parents.
-        
-        # Asumiremos que el correlation_id SE MANTIENE a través de versiones (es lo lógico).
-        if content.correlation_id:
-             return self.db.query(ContentTracking)\
-                 .filter(ContentTracking.correlation_id == content.correlation_id)\
-                 .order_by(ContentTracking.version_number)\
-                 .all()
-        
-        # Fallback: Solo devolver este item si no hay correlation_id
-        return [content]
+        """Obtiene historial completo de versiones de un contenido (todo el árbol, por versión)"""
+        return self.get_lineage(content_id)
+
+    # -------------------------------------------------------------------------
+    # Linaje (CTE recursivo sobre parent_content_id, una sola query)
+    # -------------------------------------------------------------------------
+
+    def _lineage_ctes(self, content_id: int):
+        """
+        ancestors: sube por parent_content_id desde content_id hasta la raíz.
+        lineage: baja desde esa raíz por todas las ramas (árbol completo).
+        No depende de correlation_id: sirve para cadenas v3 -> v2 -> v1 de cualquier profundidad.
+        """
+        ancestors = select(ContentTracking.tracking_id, ContentTracking.parent_content_id)\
+            .where(ContentTracking.tracking_id == content_id)\
+            .cte("ancestors", recursive=True)
+        parent = aliased(ContentTracking)
+        ancestors = ancestors.union_all(
+            select(parent.tracking_id, parent.parent_content_id)
+            .join(ancestors, parent.tracking_id == ancestors.c.parent_content_id)
+        )
+
+        lineage = select(ancestors.c.tracking_id)\
+            .where(ancestors.c.parent_content_id.is_(None))\
+            .cte("lineage", recursive=True)
+        child = aliased(ContentTracking)
+        lineage = lineage.union_all(
+            select(child.tracking_id).join(lineage, child.parent_content_id == lineage.c.tracking_id)
+        )
+        return ancestors, lineage
+
+    def _descendants_cte(self, content_id: int):
+        descendants = select(ContentTracking.tracking_id)\
+            .where(ContentTracking.parent_content_id == content_id)\
+            .cte("descendants", recursive=True)
+        child = aliased(ContentTracking)
+        return descendants.union_all(
+            select(child.tracking_id).join(descendants, child.parent_content_id == descendants.c.tracking_id)
+        )
+
+    def _versions_in(self, cte) -> List[ContentTracking]:
+        return self.db.execute(
+            select(ContentTracking)
+            .join(cte, ContentTracking.tracking_id == cte.c.tracking_id)
+            .order_by(ContentTracking.version_number, ContentTracking.tracking_id)
+        ).scalars().all()
+
+    def get_lineage(self, content_id: int) -> List[ContentTracking]:
+        """Árbol completo de versiones al que pertenece content_id, ordenado por versión"""
+        _, lineage = self._lineage_ctes(content_id)
+        return self._versions_in(lineage)
+
+    def get_ancestors(self, content_id: int) -> List[ContentTracking]:
+        """Cadena de versiones previas (raíz primero), sin incluir content_id"""
+        ancestors, _ = self._lineage_ctes(content_id)
+        return [v for v in self._versions_in(ancestors) if v.tracking_id != content_id]
+
+    def get_descendants(self, content_id: int) -> List[ContentTracking]:
+        """Todas las versiones derivadas de content_id (cualquier profundidad y rama)"""
+        return self._versions_in(self._descendants_cte(content_id))
+
+    def get_latest_version(self, content_id: int) -> Optional[ContentTracking]:
+        """Versión más reciente del linaje de content_id (None si no existe)"""
+        _, lineage = self._lineage_ctes(content_id)
+        return self.db.execute(
+            select(ContentTracking)
+            .join(lineage, ContentTracking.tracking_id == lineage.c.tracking_id)
+            .order_by(desc(ContentTracking.version_number), desc(ContentTracking.tracking_id))
+            .limit(1)
+        ).scalars().first()
 
     def update_status(self, tracking_id: int, status: str, notes: str = None) -> Optional[ContentTracking]:
         """Actualiza campos humanos (estado, notas)"""
@@ -94,23 +133,52 @@ class TrackingRepository:
         self.db.refresh(entry)
         return entry
 
+    def get_root_id(self, content_id: int) -> Optional[int]:
+        """Raíz del linaje de content_id (None si no existe)"""
+        ancestors, _ = self._lineage_ctes(content_id)
+        return self.db.execute(
+            select(ancestors.c.tracking_id).where(ancestors.c.parent_content_id.is_(None))
+        ).scalar()
+
+    def allocate_version(self, root_id: int) -> int:
+        """
+        Reserva el siguiente version_number del linaje de forma atómica (no hace commit).
+        Linajes sin contador (previos a la tabla) se siembran con el max actual;
+        si otra transacción lo sembró en paralelo, el INSERT choca con la PK y se reintenta el UPDATE.
+        """
+        for attempt in range(2):
+            allocated = self.db.execute(
+                update(ContentVersionCounter)
+                .where(ContentVersionCounter.root_content_id == root_id)
+                .values(last_version=ContentVersionCounter.last_version + 1)
+                .returning(ContentVersionCounter.last_version)
+            ).scalar()
+            if allocated is not None:
+                return allocated
+
+            _, lineage = self._lineage_ctes(root_id)
+            current_max = self.db.execute(
+                select(func.max(ContentTracking.version_number))
+                .join(lineage, ContentTracking.tracking_id == lineage.c.tracking_id)
+            ).scalar() or 1
+            try:
+                with self.db.begin_nested():
+                    self.db.add(ContentVersionCounter(root_content_id=root_id, last_version=current_max + 1))
+                return current_max + 1
+            except IntegrityError:
+                if attempt == 1:
+                    raise
+
+    def clear_latest(self, root_id: int) -> None:
+        """Quita is_latest a la versión vigente del linaje (no hace commit)"""
+        _, lineage = self._lineage_ctes(root_id)
+        self.db.execute(
+            update(ContentTracking)
+            .where(ContentTracking.tracking_id.in_(select(lineage.c.tracking_id)), ContentTracking.is_latest.is_(True))
+            .values(is_latest=False),
+            execution_options={"synchronize_session": False}
+        )
+
     def is_latest_version(self, content_id: int) -> bool:
-        """Verifica si el contenido es la última versión de su linaje"""
-        content = self.get_by_id(content_id)
-        if not content:
-            return False
-            
-        # Si no tiene correlation_id, es único (latest)
-        if not content.correlation_id:
-            return True
-            
-        # Buscar el max version_number para este correlation_id
-        max_ver = self.db.query(ContentTracking.version_number)\
-            .filter(ContentTracking.correlation_id == content.correlation_id)\
-            .order_by(desc(ContentTracking.version_number))\
-            .first()
-            
-        if not max_ver:
-            return True
-            
-        return content.version_number == max_ver[0]
+        """Verifica si el contenido es la última versión de su linaje (lectura de columna)"""
+        return bool(self.db.query(ContentTracking.is_latest).filter(ContentTracking.tracking_id == content_id).scalar())
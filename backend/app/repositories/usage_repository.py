@@ -1,6 +1,8 @@
 from datetime import datetime, date
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from app.models.domain import MediaUsage
 
 class UsageRepository:
@@ -39,30 +41,74 @@ class UsageRepository:
 
     def increment_usage(self, user_id: str, media_type: str) -> int:
         """Incrementa el consumo y retorna el nuevo valor"""
-        today = datetime.utcnow().date()
-        today_dt = datetime(today.year, today.month, today.day)
-        
-        usage = self.db.query(MediaUsage).filter(
-            MediaUsage.user_id == user_id,
-            MediaUsage.media_type == media_type,
-            MediaUsage.date == today_dt
-        ).first()
-        
-        if usage:
-            usage.count += 1
-        else:
-            usage = MediaUsage(
-                user_id=user_id,
-                media_type=media_type,
-                date=today_dt,
-                count=1
-            )
-            self.db.add(usage)
-        
+        today_dt = self._today()
         try:
+            if not self._increment(user_id, media_type, today_dt) and not self._insert_first(user_id, media_type, today_dt):
+                self._increment(user_id, media_type, today_dt) # Otro request creó la fila del día
             self.db.commit()
-            self.db.refresh(usage)
-            return usage.count
         except Exception:
             self.db.rollback()
             raise
+        return self.db.scalar(select(MediaUsage.count).where(
+            MediaUsage.user_id == user_id,
+            MediaUsage.media_type == media_type,
+            MediaUsage.date == today_dt
+        ))
+
+    def reserve_usage(self, user_id: str, media_type: str, limit: int) -> bool:
+        """
+        Reserva una unidad de la cuota diaria si queda cupo (sin commit).
+        UPDATE condicional: dos requests concurrentes no pueden pasar ambos el último cupo.
+        La primera reserva del día inserta la fila; si otro request la insertó antes
+        (restricción única), se reintenta como UPDATE.
+        """
+        today_dt = self._today()
+        if self._increment(user_id, media_type, today_dt, limit):
+            return True
+        if limit < 1 or self.get_daily_usage(user_id, media_type) > 0:
+            return False
+        if self._insert_first(user_id, media_type, today_dt):
+            return True
+        return self._increment(user_id, media_type, today_dt, limit)
+
+    def _increment(self, user_id: str, media_type: str, day: datetime, limit: Optional[int] = None) -> bool:
+        """+1 a la fila del día (si count < limit). False si no hay fila o no queda cupo."""
+        conditions = [MediaUsage.user_id == user_id, MediaUsage.media_type == media_type, MediaUsage.date == day]
+        if limit is not None:
+            conditions.append(MediaUsage.count < limit)
+        result = self.db.execute(
+            update(MediaUsage)
+            .where(*conditions)
+            .values(count=MediaUsage.count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def _insert_first(self, user_id: str, media_type: str, day: datetime) -> bool:
+        """Crea la fila del día con count=1 en un savepoint. False si ya existía (IntegrityError)."""
+        try:
+            with self.db.begin_nested():
+                self.db.add(MediaUsage(user_id=user_id, media_type=media_type, date=day, count=1))
+            return True
+        except IntegrityError:
+            return False
+
+    def release_usage(self, user_id: str, media_type: str, reserved_at: datetime) -> None:
+        """Devuelve una unidad reservada el día de reserved_at (sin commit)"""
+        day = datetime(reserved_at.year, reserved_at.month, reserved_at.day)
+        self.db.execute(
+            update(MediaUsage)
+            .where(
+                MediaUsage.user_id == user_id,
+                MediaUsage.media_type == media_type,
+                MediaUsage.date == day,
+                MediaUsage.count > 0
+            )
+            .values(count=MediaUsage.count - 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _today() -> datetime:
+        today = datetime.utcnow().date()
+        return datetime(today.year, today.month, today.day)
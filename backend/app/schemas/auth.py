@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+class Principal(BaseModel):
+    """Identidad autenticada extraída de un JWT verificado (Supabase)"""
+    user_id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    project_id: Optional[int] = None # app_metadata.project_id si el token lo trae
+    plan: str = "strict" # app_metadata.plan (solo editable server-side); sin plan -> el más restrictivo
+    expires_at: Optional[int] = None # exp (epoch seconds)
+    claims: Dict[str, Any] = {}
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "Principal":
+        app_metadata = claims.get("app_metadata") or {}
+        project_id = app_metadata.get("project_id")
+        try:
+            project_id = int(project_id) if project_id is not None else None
+        except (TypeError, ValueError):
+            project_id = None
+        return cls(
+            user_id=claims["sub"],
+            email=claims.get("email"),
+            role=claims.get("role"),
+            project_id=project_id,
+            plan=app_metadata.get("plan") or "strict",
+            expires_at=claims.get("exp"),
+            claims=claims
+        )
+
+class TenantContext(BaseModel):
+    """Proyecto (tenant) sobre el que opera el request"""
+    project_id: int
+    user_id: Optional[str] = None # None: modo anónimo / single-tenant legacy
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class CampaignGenerateRequest(BaseModel):
+    count: int = 1 # El rango válido lo valida CampaignGenerationService (400)
+    platform: str = "linkedin"
+
+class CampaignGenerationJobRead(BaseModel):
+    id: str
+    campaign_id: int
+    platform: str
+    status: str # queued, running, succeeded, failed
+    requested: int
+    completed: int # Borradores ya creados (visibles en la campaña)
+    failed: int
+    post_ids: List[int] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -13,6 +13,10 @@ class MediaCreate(MediaBase):
 
 class MediaRead(MediaBase):
     id: int
+    post_id: Optional[int] = None
+    content_hash: Optional[str] = None
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
     
     class Config:
         from_attributes = True
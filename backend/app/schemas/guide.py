@@ -59,10 +59,11 @@ class GuideState(BaseModel):
 class GuideNextRequest(BaseModel):
     current_step: int
     mode: GuideMode = GuideMode.GUIDED
-    state: GuideState
+    state: Optional[GuideState] = None # Opcional: con guide_session_id el estado vive server-side
     user_input: Optional[str] = None
     user_value: Optional[str] = None
-    guide_session_id: Optional[str] = None # Correlation ID for logging
+    guide_session_id: Optional[str] = None # Correlation ID for logging + clave del session store
+    identity_id: Optional[str] = None # Identidad elegida en la UI; se aplica al estado server-side
 
 class GuideNextResponse(BaseModel):
     assistant_message: str
@@ -70,3 +71,23 @@ class GuideNextResponse(BaseModel):
     next_step: int
     state_patch: Dict[str, Any]
     status: str = "success" # success, blocked, error
+    guide_session_id: Optional[str] = None # Asignado por el servidor si el cliente no envió uno
+
+class GuideModelOutput(BaseModel):
+    """
+    Salida esperada del modelo en los modos de la guía (no es la respuesta de la API).
+    Su JSON Schema se envía como salida estructurada a los proveedores que la soportan.
+    """
+    message: str
+    options: List[GuideOption] = []
+    state_patch: Dict[str, Any] = {}
+    updated_summary: Optional[str] = None
+    user_level_detected: Optional[str] = None
+
+class GuideSessionResponse(BaseModel):
+    """Estado server-side de una sesión (para retomarla desde otro dispositivo)"""
+    guide_session_id: str
+    mode: Optional[GuideMode] = None
+    current_step: int
+    state: GuideState
+    version: int
@@ -0,0 +1,2 @@
+from .job import MediaJobCreate, MediaJobRead
+from .rendition import MediaRenditionRead
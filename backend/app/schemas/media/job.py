@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, Literal, Optional
+from datetime import datetime
+from app.core.security import ensure_public_https_url
+
+class MediaJobCreate(BaseModel):
+    """Usuario y plan salen del token (Principal), nunca del body"""
+    media_type: Literal["image", "video"]
+    prompt: str = Field(..., min_length=1)
+    resolution: str = "standard" # Solo imagen
+    duration: int = Field(default=10, ge=1) # Segundos, solo video
+    webhook_url: Optional[str] = None # POST con el estado final del job (https, host público)
+
+    @field_validator("webhook_url")
+    @classmethod
+    def _public_webhook(cls, value: Optional[str]) -> Optional[str]:
+        return ensure_public_https_url(value) if value else value
+
+    def provider_params(self) -> Dict[str, Any]:
+        if self.media_type == "video":
+            return {"prompt": self.prompt, "duration": self.duration}
+        return {"prompt": self.prompt, "resolution": self.resolution}
+
+class MediaJobRead(BaseModel):
+    id: str
+    user_id: str
+    media_type: str
+    provider: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    webhook_status: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class MediaRenditionRead(BaseModel):
+    platform: str
+    name: str
+    spec_key: str
+    content_hash: str
+    content_type: str
+    width: int
+    height: int
+    size_bytes: int
+    url: str # Servida con los mismos headers inmutables que el original
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
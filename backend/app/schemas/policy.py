@@ -22,3 +22,21 @@ class AgentMode(BaseModel):
     tone: str
     actions: List[str]
     capabilities: AgentCapabilities
+
+class UnitPrice(BaseModel):
+    unit_price: float = 0.0
+    unit: Optional[str] = None
+
+class PricingTable(BaseModel):
+    """Tabla de precios versionada (app/policies/pricing/<version>.json)"""
+    version: str
+    currency: str = "USD"
+    effective_date: Optional[str] = None
+    plans: Dict[str, Dict[str, UnitPrice]] = {}
+
+class BudgetLimit(BaseModel):
+    monthly_usd: float = 0.0
+
+class BudgetPolicy(BaseModel):
+    """Política de presupuestos (app/policies/budget/<version>.json)"""
+    plans: Dict[str, BudgetLimit] = {}
@@ -1 +1 @@
-from .post import PostCreate, PostRead, PostUpdate, TopicCreate, TopicRead
+from .post import GeneratedPostOutput, PostCreate, PostRead, PostUpdate, TopicCreate, TopicRead
@@ -3,6 +3,14 @@ from typing import Optional, List
 from datetime import datetime
 from app.schemas.common.base import MediaRead
 
+class GeneratedPostOutput(BaseModel):
+    """Salida esperada del modelo al generar un post (salida estructurada del generador)"""
+    title: str
+    content: str
+    hashtags: List[str] = []
+    cta: Optional[str] = None
+    platform: Optional[str] = None
+
 class PostBase(BaseModel):
     title: Optional[str] = None
     content_text: str
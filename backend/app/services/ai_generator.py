@@ -1,9 +1,48 @@
 import json
-import re
-from typing import List, Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.models.domain import Campaign
 from app.services.ai_provider_service import ai_provider_service
 from app.core.logging import logger
+from app.core.config import get_settings
+from app.core.model_output import ModelOutputParseError
+from app.schemas.posts.post import GeneratedPostOutput
+from app.services.ai_output_stats import parse_provider_json
+from app.services.prompt_templates import PromptSection, PromptTemplate, TRIM_KEEP_HEAD
+
+# Prompt Maestro del generador: instrucciones y formato precompilados, persona/campaña por render
+GENERATOR_PROMPT = PromptTemplate(
+    name="post_generator",
+    budget=get_settings().PROMPT_BUDGET_GENERATOR,
+    sections=[
+        # La persona (identidad + límites) es texto libre del usuario: se trunca si no cabe
+        PromptSection("system", """
+            Sistema
+            {persona_instructions}
+        """, priority=50, trim=TRIM_KEEP_HEAD),
+        PromptSection("system_task", """
+            Tu tarea es generar publicaciones alineadas a un objetivo y temática.
+            Responde EXCLUSIVAMENTE en JSON válido.
+        """),
+        PromptSection("campaign", """
+            Usuario
+            Objetivo de la campaña: {objective}
+            Tono (Override campaña): {tone}
+            Plataforma: {platform}
+        """),
+        PromptSection("instructions", """
+            Instrucciones
+            - Mantén el texto claro, útil y humano
+            - Devuelve solo JSON válido con la siguiente estructura:
+            {{
+              "title": "string",
+              "content": "string",
+              "hashtags": ["string", "string"],
+              "cta": "string",
+              "platform": "{platform}"
+            }}
+        """),
+    ],
+)
 
 class AIGeneratorService:
     def __init__(self):
@@ -35,67 +74,47 @@ LÍMITES (Lo que NO debes hacer):
 {id_limits}
 """
         
-        return f"""
-Sistema
-{persona_instructions}
-Tu tarea es generar publicaciones alineadas a un objetivo y temática.
-Responde EXCLUSIVAMENTE en JSON válido.
-
-Usuario
-Objetivo de la campaña: {campaign.objective}
-Tono (Override campaña): {campaign.tone}
-Plataforma: {platform}
-
-Instrucciones
-- Mantén el texto claro, útil y humano
-- Devuelve solo JSON válido con la siguiente estructura:
-{{
-  "title": "string",
-  "content": "string",
-  "hashtags": ["string", "string"],
-  "cta": "string",
-  "platform": "{platform}"
-}}
-"""
+        rendered = GENERATOR_PROMPT.render(
+            persona_instructions=persona_instructions.strip(),
+            objective=campaign.objective,
+            tone=campaign.tone,
+            platform=platform
+        )
+        logger.info(json.dumps({"event": "prompt_rendered", "campaign_id": campaign.id, **rendered.log_fields()}, default=str))
+        return rendered.text
 
     async def generate_posts(self, campaign: Campaign, count: int = 1, platform: str = "linkedin") -> List[Dict[str, Any]]:
         """
         Genera X borradores de posts para una campaña usando el servicio Multi-IA.
         """
-        generated_posts = []
+        return [post async for post in self.iter_posts(campaign, count, platform) if post is not None]
+
+    async def iter_posts(self, campaign: Campaign, count: int = 1,
+                         platform: str = "linkedin") -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Genera los posts de a uno (progreso incremental en jobs de campaña).
+        Produce un item por intento: el post normalizado, o None si ese intento falló.
+        """
         prompt = self._build_prompt(campaign, platform)
         
         for i in range(count):
+            raw_response = ""
             try:
                 # Llamada al orquestador Multi-IA
-                raw_response = await ai_provider_service.generate(prompt)
-                
-                # Intentar limpiar bloques de código markdown
-                clean_json = raw_response.replace("```json", "").replace("```", "").strip()
+                raw_response = await ai_provider_service.generate(prompt, response_schema=GeneratedPostOutput)
                 
-                # Extracción robusta de JSON usando Regex si la limpieza simple falla
-                try:
-                    post_data = json.loads(clean_json)
-                except json.JSONDecodeError:
-                    # Buscar el primer '{' y el último '}'
-                    match = re.search(r'\{.*\}', clean_json, re.DOTALL)
-                    if match:
-                        clean_json = match.group(0)
-                        post_data = json.loads(clean_json)
-                    else:
-                        raise ValueError("No se encontró un objeto JSON válido en la respuesta")
+                # Extracción robusta (fences, texto alrededor, trailing commas)
+                post_data = parse_provider_json(raw_response)
 
                 # Normalizar hashtags si vienen como lista
                 if isinstance(post_data.get("hashtags"), list):
                     post_data["hashtags"] = json.dumps(post_data["hashtags"]) # Guardar como string para DB simple o procesar luego
                     
-                generated_posts.append(post_data)
-                
-            except json.JSONDecodeError:
+            except ModelOutputParseError:
                 logger.error(f"❌ La IA devolvió un JSON inválido: {raw_response[:200]}...")
-                continue
+                post_data = None
             except Exception as e:
                 logger.error(f"❌ Error generando post {i+1}: {str(e)} | Respuesta raw: {raw_response[:200]}...")
-                continue
-            
-        return generated_posts
+                post_data = None
+
+            yield post_data
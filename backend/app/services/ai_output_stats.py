@@ -0,0 +1,68 @@
+import threading
+from typing import Dict, List, Tuple
+from app.core.logging import logger
+from app.core.model_output import parse_model_json, ModelOutputParseError
+
+class AIOutputStats:
+    """
+    Contadores en memoria por (proveedor, modelo): requests, requests con salida
+    estructurada nativa, reintentos y fallos de parseo JSON.
+    Permiten comparar la tasa de fallos antes/después de habilitar JSON mode por modelo.
+    """
+    def __init__(self):
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, provider: str, model: str, output_mode: str = None, retry: bool = False):
+        with self._lock:
+            counters = self._bucket(provider, model)
+            counters["requests"] += 1
+            if output_mode:
+                counters["structured_requests"] += 1
+            if retry:
+                counters["retries"] += 1
+
+    def record_parse_failure(self, provider: str, model: str):
+        with self._lock:
+            self._bucket(provider, model)["parse_failures"] += 1
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            rows = []
+            for (provider, model), counters in sorted(self._counters.items()):
+                requests = counters["requests"] or 1
+                rows.append({
+                    "provider": provider,
+                    "model": model,
+                    **counters,
+                    "retry_rate": round(counters["retries"] / requests, 4),
+                    "parse_failure_rate": round(counters["parse_failures"] / requests, 4)
+                })
+            return rows
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    def _bucket(self, provider: str, model: str) -> Dict[str, int]:
+        key = (provider or "unknown", model or "unknown")
+        if key not in self._counters:
+            self._counters[key] = {"requests": 0, "structured_requests": 0, "retries": 0, "parse_failures": 0}
+        return self._counters[key]
+
+def parse_provider_json(text: str) -> dict:
+    """
+    parse_model_json + registro del fallo contra el proveedor/modelo que respondió
+    (si `text` es un ProviderResponse; con mocks/str plano solo se parsea).
+    """
+    try:
+        return parse_model_json(text)
+    except ModelOutputParseError:
+        provider = getattr(text, "provider", None)
+        if provider:
+            ai_output_stats.record_parse_failure(provider, getattr(text, "model", None))
+            logger.warning(f"⚠️ JSON inválido de {provider}/{getattr(text, 'model', None)} (modo: {getattr(text, 'output_mode', None)})")
+        raise
+
+# Singleton instance
+ai_output_stats = AIOutputStats()
@@ -1,11 +1,12 @@
 from typing import List, Optional, Dict
-from app.services.ai_providers.base import AIProviderAdapter
+from app.services.ai_providers.base import AIProviderAdapter, ProviderCapabilities, ProviderResponse
 from app.services.ai_providers.openrouter import OpenRouterProvider
 from app.services.ai_providers.openai_compatible import OpenAICompatibleProvider
 from app.services.ai_providers.gemini import GeminiProvider
 from app.services.ai_providers.local import LocalFallbackProvider
 from app.core.config import get_settings
 from app.core.logging import logger
+from app.services.ai_output_stats import ai_output_stats
 
 class AIProviderService:
     """
@@ -28,7 +29,8 @@ class AIProviderService:
                         name="openai",
                         api_key=self.settings.OPENAI_API_KEY,
                         base_url="https://api.openai.com/v1",
-                        model="gpt-4o-mini" # Cost effective standard
+                        model="gpt-4o-mini", # Cost effective standard
+                        capabilities=ProviderCapabilities(json_mode=True, json_schema=True)
                     ))
             
             elif p_name == "openrouter":
@@ -49,7 +51,8 @@ class AIProviderService:
                         name="grok",
                         api_key=self.settings.GROK_API_KEY,
                         base_url="https://api.x.ai/v1",
-                        model="grok-beta"
+                        model="grok-beta",
+                        capabilities=ProviderCapabilities(json_mode=True)
                     ))
         
         # SIEMPRE al final: Fallback Local
@@ -96,11 +99,15 @@ class AIProviderService:
             "is_real_ai": False
         }
 
-    async def generate(self, prompt: str, skip_fallback: bool = False, **kwargs) -> str:
+    async def generate(self, prompt: str, skip_fallback: bool = False, attempt: int = 1, **kwargs) -> str:
         """
         Intenta generar contenido rotando proveedores en caso de fallo.
+        `response_schema` (kwarg) activa salida estructurada nativa en proveedores que la soportan.
+        `attempt` > 1 marca el request como reintento en las métricas por proveedor/modelo.
+        Devuelve un ProviderResponse (str con el proveedor/modelo que respondió).
         """
         last_error = None
+        response_schema = kwargs.get("response_schema")
         
         for provider in self.providers:
             if skip_fallback and isinstance(provider, LocalFallbackProvider):
@@ -111,7 +118,10 @@ class AIProviderService:
                 # Confiamos en try/except para failover rápido.
                 
                 result = await provider.generate(prompt, **kwargs)
-                return result
+                model = kwargs.get("model", provider.model)
+                output_mode = provider.output_mode(response_schema)
+                ai_output_stats.record_request(provider.name, model, output_mode, retry=attempt > 1)
+                return ProviderResponse(result, provider=provider.name, model=model, output_mode=output_mode)
                 
             except Exception as e:
                 logger.warning(f"⚠️ Falló proveedor {provider.name}: {str(e)}")
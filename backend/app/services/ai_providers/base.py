@@ -1,4 +1,39 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Optional, Type
+from pydantic import BaseModel
+from app.core.config import get_settings
+
+# Modos de salida estructurada nativa
+OUTPUT_JSON_SCHEMA = "json_schema"   # El proveedor valida contra un JSON Schema
+OUTPUT_JSON_OBJECT = "json_object"   # El proveedor garantiza JSON sintácticamente válido
+
+class ProviderCapabilities:
+    """Qué soporta el modelo configurado de un proveedor"""
+    def __init__(self, json_mode: bool = False, json_schema: bool = False):
+        self.json_mode = json_mode
+        self.json_schema = json_schema
+
+class ProviderResponse(str):
+    """
+    Texto generado + metadatos del proveedor que respondió.
+    Es un `str`: los callers existentes no cambian; las métricas leen `.provider`/`.model`.
+    """
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    output_mode: Optional[str] = None
+
+    def __new__(cls, text: str, provider: str = None, model: str = None, output_mode: str = None):
+        obj = super().__new__(cls, text)
+        obj.provider = provider
+        obj.model = model
+        obj.output_mode = output_mode
+        return obj
+
+@lru_cache(maxsize=32)
+def json_schema_for(model: Type[BaseModel]) -> dict:
+    """JSON Schema (cacheado) de un modelo pydantic para salida estructurada"""
+    return model.model_json_schema()
 
 class AIProviderAdapter(ABC):
     """
@@ -6,6 +41,33 @@ class AIProviderAdapter(ABC):
     Define el contrato común que deben cumplir OpenRouter, Groq, LocalFallback, etc.
     """
     name: str = "base"
+    model: Optional[str] = None
+    capabilities: ProviderCapabilities = ProviderCapabilities()
+
+    def output_mode(self, response_schema: Optional[Type[BaseModel]]) -> Optional[str]:
+        """
+        Modo de salida estructurada a usar para `response_schema` (kwarg de generate).
+        None => se mantiene el prompt engineering (sin parámetros nativos).
+        """
+        if response_schema is None or not get_settings().AI_STRUCTURED_OUTPUT_ENABLED:
+            return None
+        if self.capabilities.json_schema:
+            return OUTPUT_JSON_SCHEMA
+        if self.capabilities.json_mode:
+            return OUTPUT_JSON_OBJECT
+        return None
+
+    def openai_response_format(self, response_schema: Optional[Type[BaseModel]]) -> Optional[dict]:
+        """`response_format` estilo OpenAI (también OpenRouter, Grok...) o None"""
+        mode = self.output_mode(response_schema)
+        if mode == OUTPUT_JSON_SCHEMA:
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": response_schema.__name__, "schema": json_schema_for(response_schema)}
+            }
+        if mode == OUTPUT_JSON_OBJECT:
+            return {"type": "json_object"}
+        return None
     
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
@@ -15,7 +77,8 @@ class AIProviderAdapter(ABC):
         
         Args:
             prompt (str): El texto de entrada para el modelo.
-            **kwargs: Parámetros adicionales (ej: temperature, max_tokens, model_name).
+            **kwargs: Parámetros adicionales (ej: temperature, max_tokens, model_name,
+                response_schema: modelo pydantic para salida estructurada nativa).
             
         Returns:
             str: El texto generado por el modelo.
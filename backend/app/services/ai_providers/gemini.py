@@ -1,11 +1,13 @@
 import httpx
-from app.services.ai_providers.base import AIProviderAdapter
+from app.services.ai_providers.base import AIProviderAdapter, ProviderCapabilities
 
 class GeminiProvider(AIProviderAdapter):
     """
     Adaptador nativo para Google Gemini API.
     """
     name: str = "gemini"
+    # responseSchema de Gemini es un subconjunto OpenAPI (sin $defs): usamos solo responseMimeType
+    capabilities = ProviderCapabilities(json_mode=True)
     
     def __init__(self, api_key: str, model: str = "gemini-pro"):
         self.api_key = api_key
@@ -44,6 +46,8 @@ class GeminiProvider(AIProviderAdapter):
                 "maxOutputTokens": kwargs.get("max_tokens", 2000)
             }
         }
+        if self.output_mode(kwargs.get("response_schema")):
+            payload["generationConfig"]["responseMimeType"] = "application/json"
         
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(
@@ -8,6 +8,7 @@ class LocalFallbackProvider(AIProviderAdapter):
     Útil para desarrollo offline o cuando se acaban los créditos.
     """
     name: str = "local_fallback"
+    model: str = "local"
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """
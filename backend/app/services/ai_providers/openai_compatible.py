@@ -1,5 +1,5 @@
 import httpx
-from app.services.ai_providers.base import AIProviderAdapter
+from app.services.ai_providers.base import AIProviderAdapter, ProviderCapabilities
 from app.core.config import get_settings
 
 class OpenAICompatibleProvider(AIProviderAdapter):
@@ -7,12 +7,14 @@ class OpenAICompatibleProvider(AIProviderAdapter):
     Adaptador genérico para cualquier proveedor compatible con la API de OpenAI.
     (OpenAI, Grok, DeepSeek, etc.)
     """
-    def __init__(self, name: str, api_key: str, base_url: str, model: str, headers: dict = None):
+    def __init__(self, name: str, api_key: str, base_url: str, model: str, headers: dict = None,
+                 capabilities: ProviderCapabilities = None):
         self.name = name
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.custom_headers = headers or {}
+        self.capabilities = capabilities or ProviderCapabilities()
 
     async def check_health(self) -> bool:
         if not self.api_key:
@@ -60,6 +62,9 @@ class OpenAICompatibleProvider(AIProviderAdapter):
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 2000)
         }
+        response_format = self.openai_response_format(kwargs.get("response_schema"))
+        if response_format:
+            payload["response_format"] = response_format
         
         async with httpx.AsyncClient(timeout=30.0) as client:
             try:
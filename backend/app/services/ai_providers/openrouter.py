@@ -1,6 +1,6 @@
 import httpx
 import os
-from app.services.ai_providers.base import AIProviderAdapter
+from app.services.ai_providers.base import AIProviderAdapter, ProviderCapabilities
 from app.core.config import get_settings
 
 class OpenRouterProvider(AIProviderAdapter):
@@ -10,7 +10,7 @@ class OpenRouterProvider(AIProviderAdapter):
     """
     name: str = "openrouter"
     
-    def __init__(self, model: str = "mistralai/mistral-7b-instruct"):
+    def __init__(self, model: str = "mistralai/mistral-7b-instruct", capabilities: ProviderCapabilities = None):
         self.api_key = os.getenv("AI_API_KEY") # Use standard AI_API_KEY from .env
         if not self.api_key:
              # Fallback to settings
@@ -19,6 +19,8 @@ class OpenRouterProvider(AIProviderAdapter):
              
         self.model = model
         self.base_url = "https://openrouter.ai/api/v1"
+        # response_format solo lo respetan algunos modelos de OpenRouter: se declara por modelo
+        self.capabilities = capabilities or ProviderCapabilities()
         
     async def check_health(self) -> bool:
         if not self.api_key:
@@ -69,10 +71,11 @@ class OpenRouterProvider(AIProviderAdapter):
             ],
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 2000),
-            # Force JSON mode if requested via kwargs or implied by prompt? 
-            # OpenRouter supports response_format={"type": "json_object"} for some models.
-            # For now, we stick to prompt engineering for JSON.
         }
+        # JSON mode nativo si el modelo lo soporta; si no, seguimos con prompt engineering
+        response_format = self.openai_response_format(kwargs.get("response_schema"))
+        if response_format:
+            payload["response_format"] = response_format
         
         async with httpx.AsyncClient(timeout=30.0) as client:
             try:
@@ -87,13 +87,12 @@ class AutoPublisherService:
         )
         
         db.add(new_post)
-        db.commit()
-        db.refresh(new_post)
+        db.flush()
         
-        # 7. Tracking (Audit Log)
+        # 7. Tracking (Audit Log vía outbox, en la misma transacción que el post)
         try:
             tracker = TrackingService(db)
-            tracker.record_generation({
+            tracker.enqueue_generation({
                 "user_id": "auto-publisher-job", # System user
                 "project_id": project.id,
                 "project_name": project.name,
@@ -110,6 +109,8 @@ class AutoPublisherService:
             # Non-blocking error
             print(f"Tracking Error: {e}")
 
+        db.commit()
+        db.refresh(new_post)
         return new_post
 
     def _build_prompt(self, topic: str, keywords: str, rules: list[EditorialRule]) -> str:
@@ -4,10 +4,11 @@ from datetime import datetime
 from typing import Dict, Any
 
 from app.core.config import get_settings
-from app.models.automation import CampaignAutomation, AutonomousDecisionLog
+from app.models.automation import CampaignAutomation
 from app.services.autonomy_policy import AutonomyPolicy, DecisionType, AutonomyState
 from app.services.performance_feedback_service import PerformanceFeedbackService
 from app.models.optimization import RecommendationType
+from app.services.outbox_dispatcher import outbox_dispatcher, EVENT_AUTONOMY_DECISION
 
 logger = logging.getLogger(__name__)
 
@@ -91,8 +92,8 @@ class AutonomousDecisionService:
                     )
                 else:
                     # Auto-pausar la campaña si detectamos regresión grave
+                    # Se confirma junto con el log de la decisión (_record_decision)
                     automation.autonomy_status = AutonomyState.PAUSED
-                    self.db.commit()
                     
                     return self._record_decision(
                         automation_id,
@@ -115,8 +116,8 @@ class AutonomousDecisionService:
                 logger.warning(f"⚠️ [Override] Ignoring historical performance pause for #{automation_id}")
             else:
                 # Auto-pausar la campaña
+                # Se confirma junto con el log de la decisión (_record_decision)
                 automation.autonomy_status = AutonomyState.PAUSED
-                self.db.commit()
                 
                 return self._record_decision(
                     automation_id,
@@ -134,15 +135,15 @@ class AutonomousDecisionService:
         )
 
     def _record_decision(self, automation_id: int, decision: DecisionType, reason: str, metrics: Dict = None) -> Dict[str, Any]:
-        """Registra la decisión en la base de datos y loggea"""
+        """Registra la decisión (outbox, misma transacción que el cambio de estado) y loggea"""
         try:
-            log_entry = AutonomousDecisionLog(
-                automation_id=automation_id,
-                decision=decision.value,
-                reason=reason,
-                metrics_snapshot=metrics
-            )
-            self.db.add(log_entry)
+            outbox_dispatcher.emit(self.db, EVENT_AUTONOMY_DECISION, {
+                "automation_id": automation_id,
+                "decision": decision.value,
+                "reason": reason,
+                "metrics_snapshot": metrics,
+                "created_at": datetime.utcnow()
+            })
             self.db.commit()
             
             log_msg = f"🤖 [Autonomy] Decision for #{automation_id}: {decision.value} | {reason}"
@@ -1,11 +1,13 @@
 import json
-import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from app.core.logging import logger
 from app.models.billing import BillingEvent
 from app.repositories.billing_repository import BillingRepository
+from app.schemas.policy import PricingTable
+from app.services.outbox_dispatcher import outbox_dispatcher, EVENT_BILLING_USAGE
+from app.services.policy_registry import policy_registry
 from sqlalchemy.orm import Session
 
 class BillingService:
@@ -13,25 +15,25 @@ class BillingService:
         self.db = db
         self.repo = BillingRepository(db)
         self.policy_version = policy_version
-        self.pricing_table = self._load_pricing()
+        # Fail-fast: la versión por defecto debe existir (parseo cacheado en el registry)
+        self._load_pricing()
 
-    def _load_pricing(self) -> dict:
-        """Carga la tabla de precios versionada"""
-        path = os.path.join(
-            os.path.dirname(__file__), 
-            f"../policies/pricing/{self.policy_version}.json"
-        )
+    @property
+    def pricing_table(self) -> PricingTable:
+        return self._load_pricing()
+
+    def _load_pricing(self, pricing_version: Optional[str] = None) -> PricingTable:
+        """Obtiene la tabla de precios versionada desde el registry de proceso"""
+        version = pricing_version or self.policy_version
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return policy_registry.get_pricing(version)
         except Exception as e:
-            logger.error(f"CRITICAL: Failed to load pricing table {path}: {e}")
+            logger.error(f"CRITICAL: Failed to load pricing table {version}: {e}")
             raise RuntimeError("Billing System Failure: Pricing table not found")
 
-    def _calculate_cost(self, plan: str, media_type: str, units: float) -> float:
-        """Calcula costo basado en el plan y tipo de medio"""
-        plans = self.pricing_table.get("plans", {})
-        plan_config = plans.get(plan)
+    def _calculate_cost(self, plan: str, media_type: str, units: float, pricing_version: Optional[str] = None) -> float:
+        """Calcula costo basado en el plan, tipo de medio y versión de pricing"""
+        plan_config = self._load_pricing(pricing_version).plans.get(plan)
         
         if not plan_config:
             logger.warning(f"Billing: Unknown plan '{plan}', defaulting to 0 cost")
@@ -42,8 +44,11 @@ class BillingService:
             logger.warning(f"Billing: Unknown media_type '{media_type}' for plan '{plan}'")
             return 0.0
             
-        unit_price = media_config.get("unit_price", 0.0)
-        return round(unit_price * units, 6)
+        return round(media_config.unit_price * units, 6)
+
+    def estimate_cost(self, plan: str, media_type: str, units: float) -> float:
+        """Costo esperado con el pricing vigente (reservas de presupuesto antes de ejecutar)"""
+        return self._calculate_cost(plan, media_type, units)
 
     def record_usage_event(self, 
                           user_id: str, 
@@ -52,31 +57,15 @@ class BillingService:
                           provider: str, 
                           units: float,
                           unit_type: str,
-                          correlation_id: Optional[str] = None) -> BillingEvent:
+                          correlation_id: Optional[str] = None,
+                          pricing_version: Optional[str] = None) -> BillingEvent:
         """
         Registra un evento facturable.
         Traduce uso técnico -> impacto financiero.
         """
-        # 1. Calcular Costo
-        cost = self._calculate_cost(plan, media_type, units)
-        
-        # 2. Generar Correlation ID si no existe
-        cid = correlation_id or str(uuid.uuid4())
-        
-        # 3. Crear Entidad
-        event = BillingEvent(
-            user_id=user_id,
-            plan=plan,
-            media_type=media_type,
-            provider=provider,
-            units=units,
-            unit_type=unit_type,
-            cost_estimated=cost,
-            currency=self.pricing_table.get("currency", "USD"),
-            correlation_id=cid,
-            timestamp=datetime.utcnow(),
-            pricing_version=self.policy_version
-        )
+        # 1-3. Calcular costo y crear entidad
+        event = BillingEvent(**self._build_event(user_id, plan, media_type, provider, units, unit_type,
+                                                 correlation_id, pricing_version))
         
         # 4. Persistir
         saved_event = self.repo.create_event(event)
@@ -85,12 +74,74 @@ class BillingService:
         logger.info(json.dumps({
             "event": "billing_event_created",
             "billing_id": saved_event.id,
-            "correlation_id": cid,
+            "correlation_id": saved_event.correlation_id,
             "user_id": user_id,
-            "cost": cost,
+            "cost": saved_event.cost_estimated,
             "currency": saved_event.currency,
             "plan": plan,
             "provider": provider
         }))
         
         return saved_event
+
+    def enqueue_usage_event(self,
+                            user_id: str,
+                            plan: str,
+                            media_type: str,
+                            provider: str,
+                            units: float,
+                            unit_type: str,
+                            correlation_id: Optional[str] = None,
+                            pricing_version: Optional[str] = None) -> str:
+        """
+        Variante vía outbox de record_usage_event: el costo se calcula ahora (pricing vigente)
+        y el evento se entrega en background. No hace commit: viaja en la transacción del caller.
+        Retorna el correlation_id (clave de idempotencia del evento).
+        """
+        data = self._build_event(user_id, plan, media_type, provider, units, unit_type,
+                                 correlation_id, pricing_version)
+        outbox_dispatcher.emit(self.db, EVENT_BILLING_USAGE, data, idempotency_key=data["correlation_id"])
+        return data["correlation_id"]
+
+    def _build_event(self, user_id: str, plan: str, media_type: str, provider: str, units: float,
+                     unit_type: str, correlation_id: Optional[str], pricing_version: Optional[str]) -> dict:
+        # 1. Calcular Costo (versión explícita o la del servicio)
+        version = pricing_version or self.policy_version
+        pricing = self._load_pricing(version)
+        cost = self._calculate_cost(plan, media_type, units, version)
+
+        # 2. Generar Correlation ID si no existe
+        return {
+            "user_id": user_id,
+            "plan": plan,
+            "media_type": media_type,
+            "provider": provider,
+            "units": units,
+            "unit_type": unit_type,
+            "cost_estimated": cost,
+            "currency": pricing.currency,
+            "correlation_id": correlation_id or str(uuid.uuid4()),
+            "timestamp": datetime.utcnow(),
+            "pricing_version": version
+        }
+
+    def reconcile_monthly_rollups(self, target_date=None) -> int:
+        """
+        Job de reconciliación: reconstruye el rollup mensual desde los eventos crudos.
+        El primer día del mes también cierra el mes anterior.
+        """
+        target_date = target_date or datetime.utcnow().date()
+        periods = [target_date]
+        if target_date.day == 1:
+            periods.append(target_date - timedelta(days=1))
+
+        rebuilt = 0
+        for period_date in periods:
+            rebuilt += self.repo.rebuild_monthly_rollups(period_date)
+
+        logger.info(json.dumps({
+            "event": "billing_rollups_reconciled",
+            "periods": [f"{d.year:04d}-{d.month:02d}" for d in periods],
+            "rollups": rebuilt
+        }))
+        return rebuilt
@@ -1,11 +1,12 @@
 import json
-import os
 import logging
 import uuid
 from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.repositories.billing_repository import BillingRepository
+from app.schemas.policy import BudgetLimit, BudgetPolicy
+from app.services.policy_registry import policy_registry
 
 logger = logging.getLogger(__name__)
 
@@ -14,46 +15,47 @@ class BudgetGuardService:
         self.db = db
         self.repo = BillingRepository(db)
         self.policy_version = policy_version
-        self.policy = self._load_policy()
+        # Fail-fast: valida la política al construir (parseo cacheado en el registry)
+        self._load_policy()
 
-    def _load_policy(self) -> dict:
-        """Carga la política de presupuestos"""
-        path = os.path.join(
-            os.path.dirname(__file__), 
-            f"../policies/budget/{self.policy_version}.json"
-        )
+    @property
+    def policy(self) -> BudgetPolicy:
+        return self._load_policy()
+
+    def _load_policy(self) -> BudgetPolicy:
+        """Obtiene la política de presupuestos desde el registry de proceso (sin I/O por request)"""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return policy_registry.get_budget(self.policy_version)
         except Exception as e:
-            logger.error(f"CRITICAL: Failed to load budget policy {path}: {e}")
+            logger.error(f"CRITICAL: Failed to load budget policy {self.policy_version}: {e}")
             # Fallback seguro: bloquear todo si no hay policy (o permitir free? mejor fail-safe)
             # En este caso, retornamos un default mínimo para no romper todo el sistema
-            return {"free": {"monthly_usd": 0.0}}
+            return BudgetPolicy(plans={"free": BudgetLimit(monthly_usd=0.0)})
 
-    def check_limits(self, user_id: str, plan: str, correlation_id: str = None) -> None:
+    def check_limits(self, user_id: str, plan: str, correlation_id: str = None, reserved_usd: float = 0.0) -> None:
         """
         Verifica si el usuario ha excedido su presupuesto mensual.
         - Hard Limit (100%): Lanza excepción y bloquea.
         - Soft Limit (80%): Loguea advertencia.
+        reserved_usd: costo estimado de trabajos en curso aún no facturados (cuenta como gastado).
         """
         if not correlation_id:
             correlation_id = str(uuid.uuid4())
 
         # 1. Obtener límite del plan
-        plan_config = self.policy.get(plan)
+        plan_config = self.policy.plans.get(plan)
         if not plan_config:
             logger.warning(f"Plan {plan} not found in budget policy. Defaulting to 0 limit.")
             limit_usd = 0.0
         else:
-            limit_usd = plan_config.get("monthly_usd", 0.0)
+            limit_usd = plan_config.monthly_usd
 
         # Si el límite es 0 o negativo, asumimos que no hay budget (o es free tier estricto)
         # Si es free tier (0), cualquier costo > 0 bloquea.
         
         # 2. Consultar gasto actual del mes
         today = datetime.utcnow().date()
-        current_usd = self.repo.get_monthly_cost(user_id, today)
+        current_usd = self.repo.get_monthly_cost(user_id, today) + reserved_usd
 
         # 3. Validar Hard Limit (100%)
         # Para free tier (limit=0), si current > 0 ya se pasó.
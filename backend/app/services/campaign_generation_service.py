@@ -0,0 +1,82 @@
+import json
+import uuid
+from typing import Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models.campaign_job import CampaignGenerationJob
+from app.models.domain import Campaign
+from app.services.campaign_generation_worker import campaign_generation_worker
+
+class IdempotencyConflictError(ValueError):
+    """La clave ya se usó para un job con otros parámetros"""
+    pass
+
+class CampaignGenerationService:
+    """
+    Entrada de la generación de campañas: el request inserta el job y retorna;
+    CampaignGenerationWorker genera los borradores en background.
+    Con idempotency_key, un reintento del cliente recibe el job existente
+    (en curso o terminado) en vez de lanzar otra generación.
+    """
+
+    def __init__(self, db: Session, worker=campaign_generation_worker):
+        self.db = db
+        self.worker = worker
+
+    def enqueue(self, campaign: Campaign, count: int, platform: str = "linkedin",
+                idempotency_key: Optional[str] = None) -> Tuple[CampaignGenerationJob, bool]:
+        """Retorna (job, creado). ValueError si count está fuera de rango."""
+        max_count = get_settings().CAMPAIGN_GENERATE_MAX_COUNT
+        if not 1 <= count <= max_count:
+            raise ValueError(f"count must be between 1 and {max_count}")
+
+        if idempotency_key:
+            existing = self._find_by_key(campaign.id, idempotency_key)
+            if existing is not None:
+                return self._reuse(existing, count, platform), False
+
+        job = CampaignGenerationJob(
+            id=str(uuid.uuid4()),
+            campaign_id=campaign.id,
+            platform=platform,
+            idempotency_key=idempotency_key,
+            requested=count,
+            post_ids=[],
+            status="queued"
+        )
+        self.db.add(job)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Reintento concurrente con la misma clave: ganó el otro request
+            self.db.rollback()
+            return self._reuse(self._find_by_key(campaign.id, idempotency_key), count, platform), False
+
+        logger.info(json.dumps({
+            "event": "campaign_generation_job_created",
+            "job_id": job.id,
+            "campaign_id": campaign.id,
+            "platform": platform,
+            "requested": count,
+            "idempotency_key": idempotency_key
+        }))
+        self.worker.notify()
+        return job, True
+
+    def get_job(self, campaign_id: int, job_id: str) -> Optional[CampaignGenerationJob]:
+        job = self.db.get(CampaignGenerationJob, job_id)
+        return job if job is not None and job.campaign_id == campaign_id else None
+
+    def _find_by_key(self, campaign_id: int, idempotency_key: str) -> Optional[CampaignGenerationJob]:
+        return self.db.query(CampaignGenerationJob).filter(
+            CampaignGenerationJob.campaign_id == campaign_id,
+            CampaignGenerationJob.idempotency_key == idempotency_key
+        ).first()
+
+    def _reuse(self, job: CampaignGenerationJob, count: int, platform: str) -> CampaignGenerationJob:
+        if job.requested != count or job.platform != platform:
+            raise IdempotencyConflictError("Idempotency-Key already used with different parameters")
+        logger.info(f"♻️ Job de campaña {job.id} reutilizado por Idempotency-Key ({job.status})")
+        return job
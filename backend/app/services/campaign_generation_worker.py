@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.models.campaign_job import CampaignGenerationJob
+from app.models.domain import Campaign, ContentStatus, Post
+from app.services.ai_generator import AIGeneratorService
+from app.services.job_worker import JobWorker
+from app.services.tracking_service import TrackingService
+
+settings = get_settings()
+
+IN_FLIGHT_STATUSES = ("queued", "running")
+
+def build_draft(campaign: Campaign, item: Dict[str, Any], platform: str) -> Post:
+    """Post PENDING a partir de un item del generador"""
+    # El generador devuelve hashtags como string JSON si lo normalizó, o lista si no.
+    # Aseguramos que sea string para la DB.
+    hashtags_val = item.get("hashtags")
+    if isinstance(hashtags_val, list):
+        hashtags_str = " ".join(hashtags_val)
+    else:
+        hashtags_str = str(hashtags_val)
+
+    return Post(
+        project_id=campaign.project_id,
+        campaign_id=campaign.id,
+        title=item.get("title"),
+        content_text=item.get("content"),
+        hashtags=hashtags_str,
+        cta=item.get("cta"),
+        platform=item.get("platform", platform),
+        status=ContentStatus.PENDING,
+        ai_model="multi-provider-v1", # En el futuro vendrá del servicio
+        tokens_used=0
+    )
+
+class CampaignGenerationWorker(JobWorker):
+    """
+    Ejecuta CampaignGenerationJobs encolados (claim, pool y huérfanos en JobWorker).
+    - Cada job corre su propio event loop (las llamadas a la IA son async) y genera de a un post:
+      borrador + tracking (outbox) + contadores se confirman juntos, así el progreso es visible
+      y nunca cuenta un post que no existe.
+    - Un job sin avance (updated_at) en timeout_seconds se reencola y retoma desde su progreso;
+      al agotar max_attempts falla (los borradores ya creados se conservan).
+    """
+    model = CampaignGenerationJob
+    name = "campaign-generation"
+    heartbeat = "updated_at"
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = 4, poll_interval: float = 1.0,
+                 timeout_seconds: int = 600, max_attempts: int = 3, generator: Optional[AIGeneratorService] = None):
+        super().__init__(session_factory=session_factory, max_workers=max_workers, poll_interval=poll_interval,
+                         timeout_seconds=timeout_seconds, max_attempts=max_attempts)
+        self.generator = generator or AIGeneratorService()
+
+    def _task_args(self, job: CampaignGenerationJob) -> tuple:
+        return job.id, job.attempts
+
+    def _execute(self, job_id: str, attempt: int):
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            asyncio.run(self._generate(db, job_id, attempt))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Job de campaña {job_id} falló: {e}")
+            job = self._owned(db, job_id, attempt)
+            if job is not None:
+                self._finish(job, error=str(e))
+                db.commit()
+        finally:
+            job = db.get(CampaignGenerationJob, job_id)
+            if job is not None:
+                logger.info(json.dumps({
+                    "event": "campaign_generation_job_finished",
+                    "job_id": job_id,
+                    "campaign_id": job.campaign_id,
+                    "status": job.status,
+                    "requested": job.requested,
+                    "completed": job.completed,
+                    "failed": job.failed,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+                }))
+            db.close()
+
+    async def _generate(self, db: Session, job_id: str, attempt: int):
+        job = self._owned(db, job_id, attempt)
+        if job is None:
+            return
+        campaign = db.get(Campaign, job.campaign_id)
+        if campaign is None:
+            self._finish(job, error="Campaign not found")
+            db.commit()
+            return
+
+        remaining = job.requested - job.completed - job.failed # Reintento: retoma desde el progreso confirmado
+        async for item in self.generator.iter_posts(campaign, count=remaining, platform=job.platform):
+            job = self._owned(db, job_id, attempt)
+            if job is None:
+                # Reencolado por timeout mientras corría: otro intento es dueño del job
+                logger.warning(f"⚠️ Job de campaña {job_id} ya no está running; se detiene el intento {attempt}")
+                return
+            if item is None:
+                job.failed += 1
+            else:
+                post = self._save_draft(db, campaign, item, job.platform)
+                job.completed += 1
+                job.post_ids = [*job.post_ids, post.id]
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+        job = self._owned(db, job_id, attempt)
+        if job is not None:
+            self._finish(job, error=None if job.completed else "AI generation produced no drafts")
+            db.commit()
+
+    def _save_draft(self, db: Session, campaign: Campaign, item: Dict[str, Any], platform: str) -> Post:
+        """Borrador + tracking (outbox) en la transacción del avance del job"""
+        post = build_draft(campaign, item, platform)
+        db.add(post)
+        db.flush() # Asigna el id para el tracking
+        TrackingService(db).enqueue_generation({
+            "user_id": "campaign-generator",
+            "project_id": campaign.project_id,
+            "project_name": "Campaign Run",
+            "objective": campaign.objective,
+            "topic": "Campaign Content",
+            "platform": post.platform,
+            "content_type": "text",
+            "ai_agent": post.ai_model,
+            "generated_url": f"/posts/{post.id}",
+            "status": "generated",
+            "correlation_id": f"campaign-{campaign.id}-post-{post.id}"
+        })
+        return post
+
+    def _owned(self, db: Session, job_id: str, attempt: int) -> Optional[CampaignGenerationJob]:
+        """El job si este intento sigue siendo su dueño (running con el mismo número de intento)"""
+        job = db.get(CampaignGenerationJob, job_id, populate_existing=True)
+        if job is None or job.status != "running" or job.attempts != attempt:
+            return None
+        return job
+
+    def _finish(self, job: CampaignGenerationJob, error: Optional[str] = None):
+        job.status = "failed" if error else "succeeded"
+        job.error = error[:1000] if error else None
+        job.finished_at = job.updated_at = datetime.utcnow()
+
+    def _fail_stale(self, db: Session, job: CampaignGenerationJob, error: str):
+        self._finish(job, error=error)
+
+# Singleton instance
+campaign_generation_worker = CampaignGenerationWorker(
+    max_workers=settings.CAMPAIGN_JOB_WORKERS,
+    poll_interval=settings.CAMPAIGN_JOB_POLL_SECONDS,
+    timeout_seconds=settings.CAMPAIGN_JOB_TIMEOUT_SECONDS,
+    max_attempts=settings.CAMPAIGN_JOB_MAX_ATTEMPTS
+)
@@ -1,29 +1,27 @@
 import json
-import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
 from app.schemas.policy import AgentMode, AgentCapabilities
 from app.core.logging import logger
+from app.services.policy_registry import policy_registry
 from app.core.database import SessionLocal
 from app.repositories.usage_repository import UsageRepository
 
 class CapabilityResolverService:
     def __init__(self, policy_version: str = "v1.1"):
-        self.policy_path = os.path.join(
-            os.path.dirname(__file__), 
-            f"../policies/{policy_version}/agent_modes.json"
-        )
-        self.agent_modes = self._load_policies()
+        self.policy_version = policy_version
+        # Fail-fast: valida la política al construir (parseo cacheado en el registry)
+        self._load_policies()
+
+    @property
+    def agent_modes(self) -> Dict[str, AgentMode]:
+        return self._load_policies()
 
     def _load_policies(self) -> Dict[str, AgentMode]:
         try:
-            with open(self.policy_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                modes = {}
-                for name, config in data["agent_modes"].items():
-                    modes[name] = AgentMode(**config)
-                return modes
+            return policy_registry.get_agent_modes(self.policy_version)
         except Exception as e:
-            logger.error(f"Failed to load policies from {self.policy_path}: {e}")
+            logger.error(f"Failed to load policies {self.policy_version}: {e}")
             raise RuntimeError("Critical: Could not load agent policies")
 
     def resolve_capabilities(self, plan: str) -> AgentCapabilities:
@@ -38,13 +36,21 @@ class CapabilityResolverService:
             return self.agent_modes["strict"].capabilities
         return mode.capabilities
 
-    def validate_request(self, user_id: str, plan: str, media_type: str, params: dict = None) -> bool:
+    def daily_quota(self, plan: str, media_type: str) -> Optional[int]:
+        """Máximo diario del plan para image/video (None: sin cuota)"""
+        capabilities = self.resolve_capabilities(plan)
+        cap = {"image": capabilities.images, "video": capabilities.video}.get(media_type)
+        return cap.max_per_day if cap else None
+
+    def validate_request(self, user_id: str, plan: str, media_type: str, params: dict = None,
+                         db: Optional[Session] = None) -> bool:
         """
         Valida si una solicitud de generación de medios está permitida.
         Verifica:
         1. Si el tipo de medio está habilitado para el plan.
         2. Si no se ha excedido la cuota diaria.
         3. Restricciones específicas (ej. duración video).
+        db: sesión del caller para leer el uso (por defecto abre una propia).
         """
         capabilities = self.resolve_capabilities(plan)
         
@@ -62,7 +68,7 @@ class CapabilityResolverService:
                 return False
             
             # 2. Validación de Cuota
-            current_usage = self._get_usage(user_id, "image")
+            current_usage = self._get_usage(user_id, "image", db)
             if current_usage >= cap.max_per_day:
                 self._log_quota_exceeded(user_id, plan, media_type, cap.max_per_day)
                 return False
@@ -76,7 +82,7 @@ class CapabilityResolverService:
                 return False
             
             # 2. Validación de Cuota
-            current_usage = self._get_usage(user_id, "video")
+            current_usage = self._get_usage(user_id, "video", db)
             if current_usage >= cap.max_per_day:
                 self._log_quota_exceeded(user_id, plan, media_type, cap.max_per_day)
                 return False
@@ -102,17 +108,18 @@ class CapabilityResolverService:
         finally:
             db.close()
 
-    def _get_usage(self, user_id: str, media_type: str) -> int:
+    def _get_usage(self, user_id: str, media_type: str, db: Optional[Session] = None) -> int:
         """Obtiene el uso actual desde DB"""
-        db = SessionLocal()
+        session = db or SessionLocal()
         try:
-            repo = UsageRepository(db)
+            repo = UsageRepository(session)
             return repo.get_daily_usage(user_id, media_type)
         except Exception as e:
             logger.error(f"Failed to get usage for {user_id}: {e}")
             return 0 # Fail open in case of DB error to avoid blocking user
         finally:
-            db.close()
+            if db is None:
+                session.close()
 
     def _log_denial(self, user_id: str, plan: str, media_type: str, reason: str):
         logger.warning(json.dumps({
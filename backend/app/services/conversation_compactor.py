@@ -0,0 +1,143 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.models.guide import GuideSummaryHistory
+
+settings = get_settings()
+
+COMPACTION_SEPARATOR = "\n[...] "
+MAX_TRACKED_SESSIONS = 1024
+
+class ConversationCompactor:
+    """
+    Mantiene acotado `GuideState.conversation_summary` en sesiones largas.
+    - Si el resumen supera `max_chars`, el turno usa de inmediato una forma acotada
+      (última compactación conocida + cola reciente) y NUNCA espera a la IA.
+    - En background se resume el texto completo con la IA y se archiva el original
+      en guide_summary_history (keyed por guide_session_id).
+    - Sin guide_session_id no hay dónde archivar: solo se acota por la cola.
+    """
+    def __init__(self, ai_service=None, session_factory=SessionLocal,
+                 max_chars: Optional[int] = None, target_chars: Optional[int] = None):
+        self._ai_service = ai_service
+        self.session_factory = session_factory
+        self.max_chars = max_chars or settings.GUIDE_SUMMARY_MAX_CHARS
+        self.target_chars = target_chars or settings.GUIDE_SUMMARY_TARGET_CHARS
+        self._compacted: "OrderedDict[str, str]" = OrderedDict() # LRU: sesión -> última compactación IA
+        self._pending: Dict[str, Tuple[Optional[int], str]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @property
+    def ai_service(self):
+        if self._ai_service is None:
+            from app.services.ai_provider_service import ai_provider_service
+            self._ai_service = ai_provider_service
+        return self._ai_service
+
+    def compact(self, guide_session_id: Optional[str], project_id: Optional[int], summary: Optional[str]) -> Tuple[str, bool]:
+        """
+        Devuelve (resumen_acotado, compactado). No bloquea: la compactación con IA
+        se agenda en el event loop actual y se aprovecha en los turnos siguientes.
+        """
+        if not summary or len(summary) <= self.max_chars:
+            return summary or "", False
+
+        if guide_session_id:
+            self._schedule(guide_session_id, project_id, summary)
+            base = self._compacted.get(guide_session_id)
+            if base:
+                self._compacted.move_to_end(guide_session_id)
+                tail = summary[-(self.target_chars // 2):]
+                return f"{base}{COMPACTION_SEPARATOR}{tail}", True
+
+        return f"{COMPACTION_SEPARATOR.lstrip()}{summary[-self.target_chars:]}", True
+
+    async def drain(self):
+        """Espera las compactaciones en curso (tests / apagado ordenado)"""
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight.values()), return_exceptions=True)
+
+    def clear(self):
+        self._compacted.clear()
+        self._pending.clear()
+
+    # ------------------------------------------------------------------
+    # Background
+    # ------------------------------------------------------------------
+    def _schedule(self, guide_session_id: str, project_id: Optional[int], summary: str):
+        # Solo el resumen más reciente por sesión; una tarea por sesión a la vez
+        self._pending[guide_session_id] = (project_id, summary)
+        if guide_session_id in self._inflight:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return # Contexto síncrono: queda pendiente para el próximo turno async
+        task = loop.create_task(self._run(guide_session_id))
+        self._inflight[guide_session_id] = task
+
+    async def _run(self, guide_session_id: str):
+        try:
+            while guide_session_id in self._pending:
+                project_id, summary = self._pending.pop(guide_session_id)
+                compacted = await self._summarize(summary)
+                self._remember(guide_session_id, compacted)
+                await asyncio.to_thread(self._archive, guide_session_id, project_id, summary, compacted)
+                logger.info(json.dumps({
+                    "event": "guide_summary_compacted",
+                    "guide_session_id": guide_session_id,
+                    "project_id": project_id,
+                    "original_chars": len(summary),
+                    "compacted_chars": len(compacted)
+                }))
+        except Exception as e:
+            logger.error(f"❌ Error compactando resumen de la sesión {guide_session_id}: {e}")
+        finally:
+            self._inflight.pop(guide_session_id, None)
+
+    async def _summarize(self, summary: str) -> str:
+        prompt = (
+            "Condensa el siguiente resumen de conversación en español, "
+            f"en un máximo de {self.target_chars} caracteres. Conserva decisiones, datos declarados "
+            "por el usuario (perfil, objetivo, audiencia, plataforma, tono, identidad) y dudas pendientes. "
+            "Devuelve SOLO el texto condensado, sin JSON ni comentarios.\n\n"
+            f"RESUMEN:\n{summary}"
+        )
+        try:
+            text = (await self.ai_service.generate(prompt)).strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Compactación con IA falló, se usa la cola del resumen: {e}")
+            text = ""
+        # Los proveedores de respaldo responden JSON: no es un resumen utilizable
+        if not text or text.startswith("{"):
+            text = summary[-self.target_chars:]
+        return text[:self.target_chars]
+
+    def _remember(self, guide_session_id: str, compacted: str):
+        self._compacted[guide_session_id] = compacted
+        self._compacted.move_to_end(guide_session_id)
+        while len(self._compacted) > MAX_TRACKED_SESSIONS:
+            self._compacted.popitem(last=False)
+
+    def _archive(self, guide_session_id: str, project_id: Optional[int], summary: str, compacted: str):
+        db = self.session_factory()
+        try:
+            db.add_all([
+                GuideSummaryHistory(guide_session_id=guide_session_id, project_id=project_id,
+                                    source="model", summary_text=summary, char_count=len(summary)),
+                GuideSummaryHistory(guide_session_id=guide_session_id, project_id=project_id,
+                                    source="compaction", summary_text=compacted, char_count=len(compacted)),
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+# Singleton instance
+conversation_compactor = ConversationCompactor()
@@ -1,25 +1,38 @@
 import json
 import asyncio
+import textwrap
 from datetime import datetime, timedelta
 import uuid
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.domain import UserProfile as DBUserProfile, Campaign, Post, ContentStatus, FunctionalIdentity
 from app.schemas.guide import UserProfile as SchemaUserProfile
-from app.schemas.guide import GuideNextRequest, GuideNextResponse, GuideOption, GuideMode, IdentityDraft
+from app.schemas.guide import GuideNextRequest, GuideNextResponse, GuideOption, GuideMode, GuideState, GuideModelOutput, IdentityDraft
 from app.services.ai_provider_service import ai_provider_service
 from app.services.ai_generator import AIGeneratorService
+from app.services.identity_catalog import IdentityCatalog, identity_catalog
+from app.services.guide_prompts import COLLABORATOR_PROMPT, EXPERT_PROMPT
+from app.services.conversation_compactor import conversation_compactor
+from app.services.guide_session_store import guide_session_store
 from app.core.logging import logger
+from app.core.model_output import ModelOutputParseError
+from app.services.ai_output_stats import parse_provider_json
+from app.core.config import get_settings
+from app.schemas.auth import TenantContext
 
 class GuideOrchestratorService:
     def __init__(self):
         self.ai_service = ai_provider_service
 
-    async def process_next_step(self, request: GuideNextRequest, db: Session = None) -> GuideNextResponse:
+    async def process_next_step(self, request: GuideNextRequest, db: Session = None, tenant: TenantContext = None) -> GuideNextResponse:
         """
         Orquesta el siguiente paso de la guía conversacional.
         Ahora soporta 3 modos: GUIDED (secuencial), COLLABORATOR (inferencia), EXPERT (directo).
+        Todas las lecturas/escrituras se acotan al proyecto del tenant (principal autenticado
+        o DEFAULT_PROJECT_ID en modo anónimo).
         """
         current_step = request.current_step
+        project_id = tenant.project_id if tenant else get_settings().DEFAULT_PROJECT_ID
         
         # 0. Cargar Perfil Persistente (si existe y no está en state)
         # ⚠️ FIX CRÍTICO DE PRIVACIDAD (ANTI-CHISME):
@@ -42,35 +55,62 @@ class GuideOrchestratorService:
         #     except Exception as e:
         #         logger.error(f"Error loading user profile: {e}")
 
+        # 🗂️ Estado de la sesión: el enviado por el cliente (legacy) o el server-side por guide_session_id
+        state_source = "client"
+        if request.state is None:
+            state_source = "new"
+            entry = None
+            if request.guide_session_id:
+                try:
+                    entry = guide_session_store.load(db, request.guide_session_id, project_id)
+                except Exception as e:
+                    logger.error(f"Error loading guide session {request.guide_session_id}: {e}")
+            else:
+                request.guide_session_id = str(uuid.uuid4())
+            if entry:
+                request.state = entry.state
+                state_source = "server"
+            else:
+                request.state = GuideState(step=current_step)
+
+        # Identidad elegida en la UI: el cliente envía solo el id, no el estado
+        if request.identity_id is not None:
+            request.state.identity_id = request.identity_id or None # "" = volver a Ara (default)
+            # Editar una identidad existente: el borrador parte de sus valores actuales
+            editing = request.mode == GuideMode.IDENTITY_CREATION and not request.state.identity_draft
+            if request.identity_id and editing and db:
+                request.state.identity_draft = self._identity_draft(db, request.identity_id, project_id)
+
+        # 🗜️ Compactación: el resumen que viaja al proveedor (y al log) queda acotado
+        original_summary_chars = len(request.state.conversation_summary or "")
+        request.state.conversation_summary, summary_compacted = conversation_compactor.compact(
+            request.guide_session_id, project_id, request.state.conversation_summary
+        )
+
         # Contexto de Logging
         log_context = {
             "event": "guide_step",
             "mode": request.mode,
             "guide_session_id": request.guide_session_id,
+            "project_id": project_id,
             "step": request.current_step,
             "user_input": request.user_input,
-            "guide_state_snapshot": request.state.model_dump(),
+            "guide_state_source": state_source,
+            # Con estado server-side no se vuelca el snapshot completo en cada turno
+            "guide_state_snapshot": request.state.model_dump() if state_source == "client" else None,
             "timestamp": datetime.utcnow().isoformat(),
             "ai_used": False,
             "fallback_used": False,
-            "ai_model": None
+            "ai_model": None,
+            "summary_compacted": summary_compacted,
+            "summary_original_chars": original_summary_chars
         }
 
-        # Fetch Identities for Context
-        identities_list = []
+        # Fetch Identities for Context (catálogo cacheado por proyecto)
+        catalog = IdentityCatalog(project_id, -1, [])
         if db:
             try:
-                # Asumimos Project ID 1
-                identities = db.query(FunctionalIdentity).filter_by(project_id=1).all()
-                identities_list = [{
-                    "id": str(i.id), 
-                    "name": i.name, 
-                    "role": i.role,
-                    "purpose": i.purpose,
-                    "tone": i.tone,
-                    "communication_style": i.communication_style,
-                    "content_limits": i.content_limits
-                } for i in identities]
+                catalog = identity_catalog.get(db, project_id)
             except Exception as e:
                 logger.error(f"Error fetching identities for guide: {e}")
 
@@ -78,16 +118,33 @@ class GuideOrchestratorService:
             response: GuideNextResponse = None
 
             if request.mode == GuideMode.COLLABORATOR:
-                response = await self._process_collaborator_mode(request, log_context, identities_list, db)
+                response = await self._process_collaborator_mode(request, log_context, catalog, db, project_id=project_id)
             elif request.mode == GuideMode.EXPERT:
-                response = await self._process_expert_mode(request, log_context, db)
+                response = await self._process_expert_mode(request, log_context, db, project_id=project_id)
             elif request.mode == GuideMode.IDENTITY_CREATION:
-                response = await self._process_identity_creation_mode(request, log_context, db)
+                response = await self._process_identity_creation_mode(request, log_context, db, project_id=project_id)
             else:
                 # Default to Guided (Legacy/Standard)
                 response = await self._process_guided_mode(request, log_context)
 
 
+            # El resumen devuelto al cliente también sale acotado
+            if response.state_patch.get("conversation_summary"):
+                response.state_patch["conversation_summary"], _ = conversation_compactor.compact(
+                    request.guide_session_id, project_id, response.state_patch["conversation_summary"]
+                )
+
+            # Persistir el estado resultante (el patch se aplica server-side)
+            if request.guide_session_id:
+                try:
+                    new_state = guide_session_store.apply_patch(request.state, response.state_patch, response.next_step)
+                    log_context["guide_state_version"] = guide_session_store.save(
+                        db, request.guide_session_id, project_id, new_state, response.next_step, request.mode
+                    )
+                except Exception as e:
+                    logger.error(f"Error saving guide session {request.guide_session_id}: {e}")
+                response.guide_session_id = request.guide_session_id
+
             # Enriquecer log con resultado
             log_context["assistant_message"] = response.assistant_message
             log_context["options_returned"] = [opt.model_dump() for opt in response.options]
@@ -113,6 +170,40 @@ class GuideOrchestratorService:
             # Fallback seguro
             return self._fallback_response(request.current_step)
 
+    def _identity_draft(self, db: Session, identity_id: str, project_id: int) -> Optional[IdentityDraft]:
+        """Borrador inicial para editar una identidad existente del tenant (None si no es suya)"""
+        try:
+            identity = db.query(FunctionalIdentity).filter(
+                FunctionalIdentity.id == uuid.UUID(identity_id),
+                FunctionalIdentity.project_id == project_id
+            ).first()
+        except ValueError:
+            return None
+        if not identity:
+            logger.warning(f"⚠️ Identity {identity_id} no pertenece al proyecto {project_id}; se ignora.")
+            return None
+
+        platforms = identity.preferred_platforms
+        if isinstance(platforms, str):
+            try:
+                platforms = json.loads(platforms)
+            except ValueError:
+                platforms = [p.strip() for p in platforms.split(",") if p.strip()]
+        return IdentityDraft(
+            name=identity.name,
+            purpose=identity.purpose,
+            tone=identity.tone,
+            platforms=platforms if isinstance(platforms, list) else None,
+            communication_style=identity.communication_style,
+            content_limits=identity.content_limits,
+            identity_type=identity.identity_type,
+            campaign_objective=identity.campaign_objective,
+            target_audience=identity.target_audience,
+            language=identity.language,
+            preferred_cta=identity.preferred_cta,
+            frequency=identity.frequency
+        )
+
     # -------------------------------------------------------------------------
     # 🟢 MODO 1: GUIDED (Secuencial, Seguro, Step-by-Step)
     # -------------------------------------------------------------------------
@@ -146,7 +237,7 @@ class GuideOrchestratorService:
     # -------------------------------------------------------------------------
     # 🔵 MODO 2: COLLABORATOR (Conversacional, Inferencia, Flexible)
     # -------------------------------------------------------------------------
-    async def _process_collaborator_mode(self, request: GuideNextRequest, log_ctx: dict, identities: list, db: Session = None) -> GuideNextResponse:
+    async def _process_collaborator_mode(self, request: GuideNextRequest, log_ctx: dict, catalog: IdentityCatalog, db: Session = None, project_id: int = None) -> GuideNextResponse:
         """
         El corazón del producto (Modo Colaborador Adaptativo).
         Implementa la arquitectura de "Reglas Suaves" e Identidad como Capa.
@@ -171,125 +262,37 @@ class GuideOrchestratorService:
         active_identity_instruction = ""
         identity_context = ""
         if state.identity_id:
-            found_id = next((i for i in identities if i["id"] == state.identity_id), None)
+            found_id = catalog.get(state.identity_id)
             if found_id:
-                active_identity_instruction = f"""
+                active_identity_instruction = textwrap.dedent(f"""
                 ⚠️ CAPA DE IDENTIDAD ACTIVA:
                 No hables como "ARA" genérico. ADOPTA LA PERSPECTIVA DE: {found_id['name']}
                 Rol: {found_id['role']}
                 Tono: {found_id['tone']}
                 Estilo: {found_id['communication_style']}
-                
+
                 NOTA: Esta identidad es un LENTE para enfocar la solución, no una restricción para tu inteligencia.
                 Usa el vocabulario y prioridades de este rol.
-                """
+                """).strip()
                 identity_context = f"Identidad Activa: {found_id['name']} ({found_id['role']})"
 
-        # 🧠 PROMPT MAESTRO ADAPTATIVO (REFACTORIZADO V2)
-        # Enfoque: Inicio Limpio, Escucha Activa, Cero Asunciones.
-        
-        identities_str = json.dumps(identities, indent=2)
-        
         # Validación de perfil para el prompt
         has_profile_data = state.user_profile and (state.user_profile.profession or state.user_profile.bio_summary)
         profile_str = f"{state.user_profile.profession} | {state.user_profile.specialty}" if has_profile_data else "DESCONOCIDO (Usuario Nuevo/No Autenticado)"
 
-        prompt = f"""
-        Eres ARA, una IA Colaborativa diseñada para interactuar como un humano, no como un sistema ni un formulario.
-        
-        {active_identity_instruction}
-
-        🛡️ REGLA DE SEGURIDAD CRÍTICA (OBLIGATORIA):
-        Nunca infieras, recuerdes o reutilices datos personales del usuario (profesión, experiencia, proyectos, identidad, historial) de conversaciones previas, otros usuarios o contexto implícito.
-        
-        Si un dato no fue:
-        1. Declarado explícitamente por el usuario en esta sesión, o
-        2. Cargado desde un perfil autenticado (Ver "Perfil Usuario" abajo)
-        
-        ENTONCES debes tratarlo como DESCONOCIDO.
-        Esto es hard rule, no sugerencia.
-
-        🛡️ REGLA DE GESTIÓN DE ESTADO (ANTI-AMNESIA) - PRIORIDAD 1:
-        Si el usuario entrega un mensaje DENSO con múltiples definiciones estratégicas (Ej: Tono + Audiencia + Plataforma + Identidad + Objetivos):
-        1. DETENTE. NO avances a crear contenido ni des consejos genéricos.
-        2. CONDENSA toda la información en un bloque de texto explícito.
-        3. Genera un Resumen de Estado Confirmado con formato fijo:
-        
-           ESTADO DE CAMPAÑA (BORRADOR)
-           - Identidad / Rol: [Detectado]
-           - Tonos definidos: [Detectado]
-           - Plataformas: [Detectado]
-           - Audiencias: [Detectado]
-           - Objetivo principal: [Detectado]
-        
-        4. Pregunta SOLO una cosa: "¿Confirmamos este estado como base?"
-        5. Opciones OBLIGATORIAS: [{{"label": "✅ Confirmar", "value": "confirm_state"}}, {{"label": "✏️ Ajustar", "value": "adjust_state"}}]
-        
-        OBJETIVO: Congelar la definición antes de avanzar para no perder contexto.
-
-        CONTEXTO GLOBAL (AISLADO):
-        - Perfil Usuario: {profile_str}
-        - Estado Actual: {state.model_dump_json(exclude={'conversation_summary'})}
-        - Identidades Disponibles: {identities_str}
-        - Resumen Conversación Actual: "{summary}"
-        
-        INPUT ACTUAL:
-        - Texto: "{user_input}"
-        - Selección Técnica: "{user_value}"
-
-        📜 REGLAS DE COMPORTAMIENTO (ESTRICTAS):
-
-        1. INICIO LIMPIO (TABULA RASA):
-           - No asumas nada. No conoces al usuario.
-           - Si el resumen de conversación está vacío o es el inicio: Tu única misión es ESCUCHAR.
-           - Pregunta base: "¿Qué necesitas ahora?" (o variante natural según contexto).
-
-        2. ESCUCHA ACTIVA + REFLEJO:
-           - Cuando el usuario te dé información suficiente (pero no DENSA/ESTRATÉGICA), responde con este esquema:
-             a) "Esto es lo que dijiste..." (Hechos puros).
-             b) "Esto es lo que interpreto..." (Tus inferencias).
-             c) "Esto es lo que falta por aclarar..." (Dudas para avanzar).
-           - Si falta información, solo pregunta o aclara.
-
-        3. PROPUESTA SIN JERGA:
-           - Propón hasta 3 caminos concretos si corresponde.
-           - Lenguaje simple, cero marketing, cero tecnicismos innecesarios.
-           - Ningún camino es obligatorio.
-
-        4. GESTIÓN DE DUDA:
-           - Si el usuario duda: Explica corto y vuelve a proponer.
-           - Nunca fuerces decisiones.
-           - Nunca reinicies la conversación bruscamente.
-
-        5. 🚫 LENGUAJE PROHIBIDO (HARD RULES):
-           - JAMÁS digas: "Te voy a ayudar", "Estoy aquí para asistirte", "Recuerdo que...", "Como ya sabes...", "Hola [Nombre]".
-           - PREFIERE: "Dime y vemos", "Vamos por partes", "Si quieres, probamos esto".
-           - La Identidad Funcional (si hay activa) es solo un LENTE de tono, no un historial de vida.
-
-        TU TAREA AHORA:
-        1. Analiza el input. ¿Es DENSO/ESTRATÉGICO? -> Aplica REGLA ANTI-AMNESIA (PRIORIDAD 1).
-        2. ¿Es un input normal? -> Aplica Reglas de Comportamiento estándar.
-        3. Define si hay cambios en el estado (state_patch). Captura TODO lo que el usuario definió.
-        4. Actualiza el resumen de la conversación.
-
-        FORMATO DE RESPUESTA (JSON PURO):
-        {{
-            "message": "Tu respuesta conversacional (o el Bloque de Estado)...",
-            "options": [
-                {{"label": "✅ Confirmar", "value": "confirm_state"}},
-                {{"label": "✏️ Ajustar", "value": "adjust_state"}}
-            ],
-            "state_patch": {{
-                "user_profile": {{ "profession": "...", "bio_summary": "..." }},
-                "objective": "...",
-                "audience": "...",
-                "platform": "...",
-                "identity_id": "uuid..."
-            }},
-            "updated_summary": "Resumen actualizado...",
-            "user_level_detected": "principiante|intermedio|experto"
-        }}
-        """
+        # 🧠 PROMPT MAESTRO ADAPTATIVO: secciones fijas precompiladas en guide_prompts
+        rendered = COLLABORATOR_PROMPT.render(
+            active_identity_instruction=active_identity_instruction,
+            profile_str=profile_str,
+            state_json=state.model_dump_json(exclude={'conversation_summary'}),
+            identities_str=catalog.prompt_fragment,
+            identities_compact=catalog.compact_fragment,
+            summary=summary,
+            user_input=user_input,
+            user_value=user_value
+        )
+        log_ctx.update(rendered.log_fields())
+        prompt = rendered.text
 
         # 🚀 LÓGICA DE EJECUCIÓN (CREACIÓN DE CAMPAÑA)
         # Se activa si el usuario confirma explícitamente
@@ -312,9 +315,16 @@ class GuideOrchestratorService:
                         identity_uuid = uuid.UUID(state.identity_id)
                     except:
                         pass 
+                # Solo identidades del propio tenant
+                if identity_uuid and not db.query(FunctionalIdentity.id).filter(
+                    FunctionalIdentity.id == identity_uuid,
+                    FunctionalIdentity.project_id == project_id
+                ).first():
+                    logger.warning(f"⚠️ Identity {identity_uuid} no pertenece al proyecto {project_id}; se ignora.")
+                    identity_uuid = None
 
                 new_campaign = Campaign(
-                    project_id=1,
+                    project_id=project_id,
                     name=f"Campaña: {state.objective[:40]}",
                     objective=state.objective,
                     tone=state.tone or "Professional",
@@ -326,7 +336,10 @@ class GuideOrchestratorService:
                 db.refresh(new_campaign)
                 
                 if new_campaign.identity_id:
-                    identity_chk = db.query(FunctionalIdentity).get(new_campaign.identity_id)
+                    identity_chk = db.query(FunctionalIdentity).filter(
+                        FunctionalIdentity.id == new_campaign.identity_id,
+                        FunctionalIdentity.project_id == project_id
+                    ).first()
                     new_campaign.identity = identity_chk
 
                 # 2. Generar Contenido
@@ -337,7 +350,7 @@ class GuideOrchestratorService:
                 created_posts_count = 0
                 for post_data in generated_posts:
                     new_post = Post(
-                        project_id=1,
+                        project_id=project_id,
                         campaign_id=new_campaign.id,
                         identity_id=new_campaign.identity_id,
                         title=post_data.get("title", "Untitled Post"),
@@ -388,10 +401,9 @@ class GuideOrchestratorService:
                 profile_data = response.state_patch["user_profile"]
                 if profile_data and isinstance(profile_data, dict):
                     try:
-                        # Asumimos Project ID 1
-                        db_profile = db.query(DBUserProfile).filter_by(project_id=1).first()
+                        db_profile = db.query(DBUserProfile).filter_by(project_id=project_id).first()
                         if not db_profile:
-                            db_profile = DBUserProfile(project_id=1)
+                            db_profile = DBUserProfile(project_id=project_id)
                             db.add(db_profile)
                         
                         if "profession" in profile_data: db_profile.profession = profile_data["profession"]
@@ -400,7 +412,7 @@ class GuideOrchestratorService:
                         if "target_audience_profile" in profile_data: db_profile.target_audience = profile_data["target_audience_profile"]
                         
                         db.commit()
-                        logger.info(f"✅ User Profile persisted to DB for Project 1: {profile_data.get('profession')}")
+                        logger.info(f"✅ User Profile persisted to DB for Project {project_id}: {profile_data.get('profession')}")
                     except Exception as e:
                         db.rollback()
                         logger.error(f"Failed to persist User Profile: {e}")
@@ -412,7 +424,7 @@ class GuideOrchestratorService:
             try:
                 # Reintento único por si fue un error estocástico (hallucination, JSON malformado)
                 # También permitimos fallback en el reintento
-                return await self._execute_ai_step_flexible(prompt, log_ctx, request.current_step, fallback, skip_ai_fallback=False)
+                return await self._execute_ai_step_flexible(prompt, log_ctx, request.current_step, fallback, skip_ai_fallback=False, attempt=2)
             except Exception as e2:
                 # Si llegamos aquí, es porque la IA Real falló dos veces
                 logger.warning(f"🚫 MODO COLABORADOR BLOQUEADO: Error en ejecución de IA Real (Reintento fallido): {e2}")
@@ -443,7 +455,7 @@ class GuideOrchestratorService:
     # -------------------------------------------------------------------------
     # ⚫ MODO 3: EXPERT (Directo, Eficiente, Sin Charla)
     # -------------------------------------------------------------------------
-    async def _process_expert_mode(self, request: GuideNextRequest, log_ctx: dict, db: Session = None) -> GuideNextResponse:
+    async def _process_expert_mode(self, request: GuideNextRequest, log_ctx: dict, db: Session = None, project_id: int = None) -> GuideNextResponse:
         """
         Modo interrogatorio eficiente.
         Usa IA para extraer datos y preguntar lo siguiente de forma directa.
@@ -481,7 +493,7 @@ class GuideOrchestratorService:
             }}
             """
             try:
-                ai_response = await self.ai_service.generate(prompt)
+                ai_response = await self.ai_service.generate(prompt, response_schema=GuideModelOutput)
                 data = self._parse_json(ai_response)
                 patch = data.get("state_patch", {})
                 message = data.get("message", "¿Profesión y especialidad?")
@@ -491,9 +503,9 @@ class GuideOrchestratorService:
                     profile_data = patch["user_profile"]
                     if profile_data:
                         try:
-                            db_profile = db.query(DBUserProfile).filter_by(project_id=1).first()
+                            db_profile = db.query(DBUserProfile).filter_by(project_id=project_id).first()
                             if not db_profile:
-                                db_profile = DBUserProfile(project_id=1)
+                                db_profile = DBUserProfile(project_id=project_id)
                                 db.add(db_profile)
                             
                             if "profession" in profile_data: db_profile.profession = profile_data["profession"]
@@ -527,36 +539,17 @@ class GuideOrchestratorService:
             )
 
         # Prompt enfocado en extracción y brevedad
-        prompt = f"""
-        Eres un asistente experto (Modo EXPERTO). Eficiente, directo, sin saludos.
-        
-        PERFIL USUARIO:
-        {state.user_profile.profession} | {state.user_profile.specialty}
-        
-        ESTADO ACTUAL:
-        {state.model_dump_json(exclude={'conversation_summary'})}
-        
-        INPUT USUARIO:
-        "{user_input}"
-        
-        CAMPOS REQUERIDOS: objective, audience, platform (linkedin/twitter/instagram/facebook), tone, topics (lista).
-        
-        TAREA:
-        1. Extrae datos del INPUT para llenar los campos vacíos.
-        2. Identifica el SIGUIENTE campo vacío prioritario.
-        3. Genera una pregunta de 2-4 palabras para pedir ese campo.
-        4. Si TODOS los campos están llenos (incluyendo los extraídos), tu mensaje debe ser "CONFIRMAR".
-        
-        RESPUESTA JSON:
-        {{
-            "message": "Pregunta corta o CONFIRMAR",
-            "state_patch": {{ "campo": "valor" }}
-        }}
-        """
+        rendered = EXPERT_PROMPT.render(
+            profile_str=f"{state.user_profile.profession} | {state.user_profile.specialty}",
+            state_json=state.model_dump_json(exclude={'conversation_summary'}),
+            user_input=user_input
+        )
+        log_ctx.update(rendered.log_fields())
+        prompt = rendered.text
 
         try:
             # Ejecutar IA
-            ai_response = await self.ai_service.generate(prompt)
+            ai_response = await self.ai_service.generate(prompt, response_schema=GuideModelOutput)
             data = self._parse_json(ai_response)
             
             patch = data.get("state_patch", {})
@@ -616,7 +609,7 @@ class GuideOrchestratorService:
     # -------------------------------------------------------------------------
     # 🆕 MODO 4: IDENTITY CREATION (Chat Wizard)
     # -------------------------------------------------------------------------
-    async def _process_identity_creation_mode(self, request: GuideNextRequest, log_ctx: dict, db: Session = None) -> GuideNextResponse:
+    async def _process_identity_creation_mode(self, request: GuideNextRequest, log_ctx: dict, db: Session = None, project_id: int = None) -> GuideNextResponse:
         step = request.current_step
         state = request.state
         draft = state.identity_draft or IdentityDraft()
@@ -750,7 +743,7 @@ class GuideOrchestratorService:
                         platforms_json = json.dumps(draft.platforms)
 
                         if state.identity_id:
-                            existing = db.query(FunctionalIdentity).filter_by(id=state.identity_id).first()
+                            existing = db.query(FunctionalIdentity).filter_by(id=state.identity_id, project_id=project_id).first()
                             if existing:
                                 existing.name = draft.name
                                 existing.purpose = draft.purpose
@@ -767,6 +760,7 @@ class GuideOrchestratorService:
                                 if not existing.status:
                                     existing.status = "active"
                                 db.commit()
+                                identity_catalog.invalidate(project_id)
 
                                 return GuideNextResponse(
                                     assistant_message=f"Identidad **{draft.name}** actualizada exitosamente. ✅\n\nTus futuros contenidos usarán esta configuración.",
@@ -777,7 +771,7 @@ class GuideOrchestratorService:
                                 )
 
                         new_identity = FunctionalIdentity(
-                            project_id=1,
+                            project_id=project_id,
                             name=draft.name,
                             role="custom", # Legacy field requirement
                             purpose=draft.purpose,
@@ -794,6 +788,7 @@ class GuideOrchestratorService:
                         )
                         db.add(new_identity)
                         db.commit()
+                        identity_catalog.invalidate(project_id)
                         
                         return GuideNextResponse(
                             assistant_message=f"¡Identidad **{draft.name}** creada exitosamente! 🚀\n\nYa puedes seleccionarla cuando crees nuevas campañas o posts.",
@@ -898,11 +893,13 @@ class GuideOrchestratorService:
         """Wrapper legacy para Guided Mode"""
         return await self._execute_ai_general(prompt, log_ctx, next_step, state_patch, fallback_func)
 
-    async def _execute_ai_step_flexible(self, prompt: str, log_ctx: dict, current_step: int, fallback_func, skip_ai_fallback: bool = False) -> GuideNextResponse:
+    async def _execute_ai_step_flexible(self, prompt: str, log_ctx: dict, current_step: int, fallback_func, skip_ai_fallback: bool = False, attempt: int = 1) -> GuideNextResponse:
         """Wrapper para Collaborator Mode (maneja updated_summary y patch flexible)"""
         
         async def logic():
-            response_text = await self.ai_service.generate(prompt, skip_fallback=skip_ai_fallback)
+            response_text = await self.ai_service.generate(
+                prompt, skip_fallback=skip_ai_fallback, response_schema=GuideModelOutput, attempt=attempt
+            )
             data = self._parse_json(response_text)
             
             # Extraer summary y patch
@@ -957,7 +954,7 @@ class GuideOrchestratorService:
         log_ctx["ai_used"] = True
         
         try:
-            ai_response = await asyncio.wait_for(self.ai_service.generate(prompt), timeout=10.0)
+            ai_response = await asyncio.wait_for(self.ai_service.generate(prompt, response_schema=GuideModelOutput), timeout=10.0)
             data = self._parse_json(ai_response)
             
             # Robust options parsing
@@ -987,22 +984,10 @@ class GuideOrchestratorService:
             return fallback_func()
 
     def _parse_json(self, text: str) -> dict:
-        original_text = text
         try:
-            text = text.strip()
-            # Regex robusto para encontrar el primer bloque JSON válido { ... }
-            import re
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                text = json_match.group(0)
-            
-            # Limpieza de Trailing Commas (comas al final de arrays/objetos) que rompen json.loads
-            # Reemplaza ", ]" por "]" y ", }" por "}"
-            text = re.sub(r',\s*([\]}])', r'\1', text)
-
-            return json.loads(text, strict=False)
-        except Exception as e:
-            logger.error(f"JSON Parse Error. Raw text: '{original_text}'. Error: {e}")
+            return parse_provider_json(text)
+        except ModelOutputParseError as e:
+            logger.error(f"JSON Parse Error. Raw text: '{text}'. Error: {e}")
             raise e
 
     def _fallback_response(self, current_step: int) -> GuideNextResponse:
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models.guide import GuideSession
+from app.schemas.guide import GuideMode, GuideState
+
+settings = get_settings()
+
+class GuideSessionEntry:
+    """Snapshot de una sesión. `state` es una copia propia del llamador (se puede mutar)."""
+    def __init__(self, guide_session_id: str, project_id: Optional[int], state: GuideState,
+                 current_step: int, mode: Optional[str], version: int):
+        self.guide_session_id = guide_session_id
+        self.project_id = project_id
+        self.state = state
+        self.current_step = current_step
+        self.mode = mode
+        self.version = version
+
+    def copy(self) -> "GuideSessionEntry":
+        return GuideSessionEntry(self.guide_session_id, self.project_id, self.state.model_copy(deep=True),
+                                 self.current_step, self.mode, self.version)
+
+class GuideSessionStore:
+    """
+    Estado de la guía por guide_session_id: LRU en memoria + tabla guide_sessions.
+    - Lectura: hit del LRU validado contra `version` en DB (query de una columna, sin
+      parsear ni re-validar el JSON); solo si otro worker/dispositivo avanzó la sesión
+      se recarga y valida el estado completo.
+    - Escritura: write-through en cada turno (last-write-wins, version += 1).
+    - Una sesión de otro proyecto se trata como inexistente.
+    """
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, GuideSessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, db: Optional[Session], guide_session_id: str, project_id: Optional[int]) -> Optional[GuideSessionEntry]:
+        with self._lock:
+            entry = self._entries.get(guide_session_id)
+            if entry:
+                self._entries.move_to_end(guide_session_id)
+
+        if db is not None:
+            current = db.query(GuideSession.version).filter(GuideSession.guide_session_id == guide_session_id).scalar()
+            if current is not None and (entry is None or entry.version != current):
+                row = db.query(GuideSession).filter(GuideSession.guide_session_id == guide_session_id).first()
+                entry = GuideSessionEntry(
+                    guide_session_id=row.guide_session_id,
+                    project_id=row.project_id,
+                    state=GuideState.model_validate_json(row.state_json),
+                    current_step=row.current_step,
+                    mode=row.mode,
+                    version=row.version
+                )
+                self._remember(entry)
+
+        if entry is None or entry.project_id != project_id:
+            return None
+        return entry.copy()
+
+    def save(self, db: Optional[Session], guide_session_id: str, project_id: Optional[int], state: GuideState,
+             current_step: int, mode: Optional[GuideMode] = None) -> int:
+        """Persiste el estado del turno. Devuelve la nueva versión."""
+        mode_value = mode.value if isinstance(mode, GuideMode) else mode
+        with self._lock:
+            cached = self._entries.get(guide_session_id)
+        version = (cached.version if cached else 0) + 1
+
+        if db is not None:
+            try:
+                row = db.query(GuideSession).filter(GuideSession.guide_session_id == guide_session_id).first()
+                if row and row.project_id != project_id:
+                    logger.warning(f"⚠️ Sesión de guía {guide_session_id} pertenece a otro proyecto; no se sobrescribe.")
+                    return row.version
+                if row is None:
+                    row = GuideSession(guide_session_id=guide_session_id, project_id=project_id, version=0)
+                    db.add(row)
+                row.mode = mode_value
+                row.current_step = current_step
+                row.state_json = state.model_dump_json(exclude_none=True)
+                row.version = (row.version or 0) + 1
+                db.commit()
+                version = row.version
+            except Exception as e:
+                db.rollback()
+                logger.error(f"❌ Error persistiendo sesión de guía {guide_session_id}: {e}")
+
+        self._remember(GuideSessionEntry(guide_session_id, project_id, state.model_copy(deep=True),
+                                         current_step, mode_value, version))
+        return version
+
+    @staticmethod
+    def apply_patch(state: GuideState, patch: Dict[str, Any], next_step: int) -> GuideState:
+        """Merge superficial, igual que el frontend: {...state, ...state_patch, step: next_step}"""
+        merged = state.model_dump()
+        merged.update(patch or {})
+        merged["step"] = next_step
+        return GuideState.model_validate(merged)
+
+    def invalidate(self, guide_session_id: str):
+        with self._lock:
+            self._entries.pop(guide_session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, entry: GuideSessionEntry):
+        with self._lock:
+            self._entries[entry.guide_session_id] = entry
+            self._entries.move_to_end(entry.guide_session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+# Singleton instance
+guide_session_store = GuideSessionStore(max_entries=settings.GUIDE_SESSION_CACHE_MAX_ENTRIES)
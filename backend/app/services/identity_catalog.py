@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.models.domain import FunctionalIdentity
+
+settings = get_settings()
+
+class IdentityCatalog:
+    """
+    Snapshot inmutable de las identidades de un proyecto, listo para el prompt.
+    No modificar `identities` (se comparte entre requests).
+    """
+    def __init__(self, project_id: int, version: int, identities: List[dict]):
+        self.project_id = project_id
+        self.version = version
+        self.identities = identities
+        self.by_id: Dict[str, dict] = {i["id"]: i for i in identities}
+        # Fragmento pre-renderizado para el prompt del modo colaborador
+        self.prompt_fragment = json.dumps(identities, indent=2)
+        # Versión compacta (id | nombre | rol) para cuando el prompt excede su presupuesto
+        self.compact_fragment = "; ".join(f"{i['id']} | {i['name']} | {i['role'] or '-'}" for i in identities) or "[]"
+        self.loaded_at = time.monotonic()
+
+    def get(self, identity_id: Optional[str]) -> Optional[dict]:
+        return self.by_id.get(identity_id) if identity_id else None
+
+class IdentityCatalogCache:
+    """
+    Cache por proyecto del catálogo de identidades.
+    - Version stamp por proyecto: create/update de identidades llaman a invalidate(project_id).
+    - TTL como red de seguridad para cambios hechos desde otros procesos/workers.
+    """
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[int, int] = {}
+        self._entries: Dict[int, IdentityCatalog] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, project_id: int) -> IdentityCatalog:
+        version = self._versions.get(project_id, 0)
+        entry = self._entries.get(project_id)
+        if entry and entry.version == version and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+            return entry
+
+        # La versión se captura ANTES de leer: si alguien invalida durante la query,
+        # la entrada nace obsoleta y se recarga en el próximo turno.
+        identities = db.query(FunctionalIdentity).filter(FunctionalIdentity.project_id == project_id).all()
+        catalog = IdentityCatalog(project_id, version, [self._serialize(i) for i in identities])
+        with self._lock:
+            if self._versions.get(project_id, 0) == version:
+                self._entries[project_id] = catalog
+        return catalog
+
+    def invalidate(self, project_id: Optional[int]):
+        """Llamar tras crear/actualizar/archivar una identidad del proyecto"""
+        if project_id is None:
+            return
+        with self._lock:
+            self._versions[project_id] = self._versions.get(project_id, 0) + 1
+            self._entries.pop(project_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _serialize(identity: FunctionalIdentity) -> dict:
+        return {
+            "id": str(identity.id),
+            "name": identity.name,
+            "role": identity.role,
+            "purpose": identity.purpose,
+            "tone": identity.tone,
+            "communication_style": identity.communication_style,
+            "content_limits": identity.content_limits
+        }
+
+# Singleton instance
+identity_catalog = IdentityCatalogCache(ttl_seconds=settings.IDENTITY_CATALOG_TTL_SECONDS)
@@ -0,0 +1,160 @@
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from sqlalchemy import delete, func, insert, tuple_, update
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models.tracking import ImpactMetric, ImpactMetricRollup
+
+METRIC_FIELDS = ("impressions", "clicks", "reactions", "comments", "shares")
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    """Inicio del bucket (hour/day) que contiene `moment`"""
+    if resolution == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+class ImpactRetentionService:
+    """
+    Downsampling de snapshots de impacto por antigüedad:
+    - raw: snapshots crudos de los últimos IMPACT_RAW_RETENTION_DAYS días.
+    - hour: buckets horarios hasta IMPACT_HOURLY_RETENTION_WEEKS semanas.
+    - day: buckets diarios, sin límite.
+    Las métricas son acumuladas, así que cada bucket conserva el último snapshot (no sumas).
+    El snapshot crudo más reciente de cada contenido nunca se compacta: es el que leen
+    los KPIs actuales y el análisis de rendimiento.
+    """
+
+    def __init__(self, db: Session, raw_retention_days: Optional[int] = None,
+                 hourly_retention_weeks: Optional[int] = None, batch_size: Optional[int] = None):
+        settings = get_settings()
+        self.db = db
+        self.raw_retention = timedelta(days=raw_retention_days or settings.IMPACT_RAW_RETENTION_DAYS)
+        self.hourly_retention = timedelta(weeks=hourly_retention_weeks or settings.IMPACT_HOURLY_RETENTION_WEEKS)
+        self.batch_size = batch_size or settings.IMPACT_RETENTION_BATCH_SIZE
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Ejecuta ambas etapas de compactación. Cada lote se confirma por separado."""
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        result = {
+            **self.compact_raw(bucket_start(now - self.raw_retention, "hour")),
+            **self.compact_hourly(bucket_start(now - self.hourly_retention, "day"))
+        }
+        logger.info(json.dumps({
+            "event": "impact_retention_completed",
+            **result,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }))
+        return result
+
+    def compact_raw(self, cutoff: datetime) -> Dict[str, int]:
+        """Snapshots crudos anteriores a cutoff -> buckets horarios"""
+        compacted = 0
+        last_id = 0
+        while True:
+            rows: List[ImpactMetric] = self.db.query(ImpactMetric).filter(
+                ImpactMetric.captured_at < cutoff,
+                ImpactMetric.id > last_id
+            ).order_by(ImpactMetric.id).limit(self.batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            newest = dict(self.db.query(ImpactMetric.tracking_id, func.max(ImpactMetric.captured_at))
+                          .filter(ImpactMetric.tracking_id.in_({r.tracking_id for r in rows}))
+                          .group_by(ImpactMetric.tracking_id).all())
+            rows = [r for r in rows if r.captured_at != newest.get(r.tracking_id)]
+            if rows:
+                self._merge("hour", [
+                    {"tracking_id": r.tracking_id, "captured_at": r.captured_at, "samples": 1,
+                     **{f: getattr(r, f) or 0 for f in METRIC_FIELDS}}
+                    for r in rows
+                ])
+                self.db.execute(delete(ImpactMetric).where(ImpactMetric.id.in_([r.id for r in rows])))
+                compacted += len(rows)
+            self.db.commit()
+            self.db.expunge_all()
+        return {"raw_compacted": compacted}
+
+    def compact_hourly(self, cutoff: datetime) -> Dict[str, int]:
+        """Buckets horarios anteriores a cutoff -> buckets diarios"""
+        compacted = 0
+        while True:
+            rows: List[ImpactMetricRollup] = self.db.query(ImpactMetricRollup).filter(
+                ImpactMetricRollup.resolution == "hour",
+                ImpactMetricRollup.bucket_start < cutoff
+            ).order_by(ImpactMetricRollup.tracking_id, ImpactMetricRollup.bucket_start).limit(self.batch_size).all()
+            if not rows:
+                break
+
+            self._merge("day", [
+                {"tracking_id": r.tracking_id, "captured_at": r.last_captured_at, "samples": r.sample_count,
+                 **{f: getattr(r, f) or 0 for f in METRIC_FIELDS}}
+                for r in rows
+            ])
+            self.db.execute(delete(ImpactMetricRollup).where(
+                ImpactMetricRollup.resolution == "hour",
+                tuple_(ImpactMetricRollup.tracking_id, ImpactMetricRollup.bucket_start).in_(
+                    [(r.tracking_id, r.bucket_start) for r in rows]
+                )
+            ))
+            compacted += len(rows)
+            self.db.commit()
+            self.db.expunge_all()
+        return {"hourly_compacted": compacted}
+
+    def _merge(self, resolution: str, samples: List[Dict[str, Any]]):
+        """
+        Funde muestras en buckets de `resolution` (sin commit).
+        Por bucket gana la muestra con captured_at más reciente; sample_count se acumula.
+        """
+        buckets: Dict[tuple, Dict[str, Any]] = {}
+        for sample in samples:
+            key = (sample["tracking_id"], bucket_start(sample["captured_at"], resolution))
+            current = buckets.get(key)
+            if current is None:
+                buckets[key] = {**sample}
+                continue
+            samples_total = current["samples"] + sample["samples"]
+            if sample["captured_at"] > current["captured_at"]:
+                current.update(sample)
+            current["samples"] = samples_total
+
+        existing = {
+            (r.tracking_id, r.bucket_start): r
+            for r in self.db.query(ImpactMetricRollup).filter(
+                ImpactMetricRollup.resolution == resolution,
+                tuple_(ImpactMetricRollup.tracking_id, ImpactMetricRollup.bucket_start).in_(list(buckets))
+            )
+        }
+
+        inserts, updates = [], []
+        for (tracking_id, start), sample in buckets.items():
+            row = {
+                "tracking_id": tracking_id,
+                "resolution": resolution,
+                "bucket_start": start,
+                "last_captured_at": sample["captured_at"],
+                "sample_count": sample["samples"],
+                **{f: sample[f] for f in METRIC_FIELDS}
+            }
+            stored = existing.get((tracking_id, start))
+            if stored is None:
+                inserts.append(row)
+                continue
+            row["sample_count"] += stored.sample_count
+            if stored.last_captured_at > sample["captured_at"]:
+                # El bucket ya tiene un snapshot posterior: solo se suma el conteo
+                row.update({"last_captured_at": stored.last_captured_at,
+                            **{f: getattr(stored, f) for f in METRIC_FIELDS}})
+            updates.append(row)
+
+        if inserts:
+            self.db.execute(insert(ImpactMetricRollup), inserts)
+        if updates:
+            self.db.execute(update(ImpactMetricRollup), updates)
@@ -1,8 +1,14 @@
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.models.tracking import ImpactMetric
 from app.repositories.impact_repository import ImpactRepository
+from app.services.impact_retention_service import METRIC_FIELDS, bucket_start
+
+RESOLUTIONS = ("raw", "hour", "day")
+# Resolución automática según el rango pedido (puntos acotados en cualquier rango)
+AUTO_RAW_MAX_SPAN = timedelta(days=2)
+AUTO_HOURLY_MAX_SPAN = timedelta(weeks=8)
 
 class ImpactService:
     def __init__(self, db: Session):
@@ -32,7 +38,7 @@ class ImpactService:
 
     def get_content_performance(self, content_id: int) -> Dict[str, Any]:
         """Calcula rendimiento actual (último snapshot + calculados)"""
-        metrics = self.repo.get_by_content(content_id)
+        metrics = self.repo.get_by_content(content_id, limit=1)
         if not metrics:
             return {"status": "no_data"}
         
@@ -55,7 +61,62 @@ class ImpactService:
                 "ctr_percent": round(ctr, 2),
                 "engagement_rate_percent": round(engagement_rate, 2)
             },
-            "history_count": len(metrics)
+            "history_count": self.repo.count_by_content(content_id)
+        }
+
+    def get_metric_history(self, content_id: int, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None, resolution: str = "auto") -> Dict[str, Any]:
+        """
+        Serie temporal de métricas en [start, end] (por defecto últimos 7 días).
+        resolution: raw, hour, day o auto (según el rango).
+        Lee los tres niveles de retención y reduce los más finos al bucket pedido
+        (último snapshot por bucket); cada punto indica la resolución de origen.
+        """
+        end = end or datetime.utcnow()
+        start = start or end - timedelta(days=7)
+        if resolution == "auto":
+            span = end - start
+            resolution = "raw" if span <= AUTO_RAW_MAX_SPAN else "hour" if span <= AUTO_HOURLY_MAX_SPAN else "day"
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        points = [
+            self._point(r.captured_at, r.captured_at, "raw", 1, r)
+            for r in self.repo.get_raw_range(content_id, start, end)
+        ]
+        for level in ("hour", "day"):
+            points.extend(
+                self._point(r.bucket_start, r.last_captured_at, level, r.sample_count, r)
+                for r in self.repo.get_rollups_range(content_id, level, start, end)
+            )
+        points.sort(key=lambda p: p["captured_at"])
+
+        if resolution != "raw":
+            buckets: Dict[datetime, Dict[str, Any]] = {}
+            for point in points:
+                key = bucket_start(point["timestamp"], resolution)
+                previous = buckets.get(key)
+                samples = point["samples"] + (previous["samples"] if previous else 0)
+                # Orden cronológico: el último punto del bucket representa su valor acumulado
+                buckets[key] = {**point, "timestamp": key, "samples": samples}
+            points = list(buckets.values())
+
+        return {
+            "content_id": content_id,
+            "resolution": resolution,
+            "start": start,
+            "end": end,
+            "points": points
+        }
+
+    @staticmethod
+    def _point(timestamp: datetime, captured_at: datetime, resolution: str, samples: int, row) -> Dict[str, Any]:
+        return {
+            "timestamp": timestamp,
+            "captured_at": captured_at,
+            "resolution": resolution,
+            "samples": samples,
+            **{f: getattr(row, f) or 0 for f in METRIC_FIELDS}
         }
 
     def get_aggregated_metrics(self, content_id: int) -> Dict[str, float]:
@@ -0,0 +1,186 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Set
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.logging import logger
+
+class JobWorker(ABC):
+    """
+    Base de las colas de jobs en DB (claim-and-run) ejecutadas en un pool de hilos.
+    - Un hilo de control reclama jobs "queued" con UPDATE ... RETURNING hasta llenar los
+      slots libres (jobs "running" contados en DB: vale entre procesos).
+    - Jobs "running" sin avance en timeout_seconds (proceso caído) se reencolan hasta
+      max_attempts; luego fallan vía _fail_stale.
+    Las subclases definen el modelo, los argumentos del job (_task_args) y su ejecución (_execute).
+    El modelo necesita id, status, attempts, created_at, started_at y la columna `heartbeat`.
+    """
+    model: Any = None
+    name: str = "job" # Prefijo de hilos y logs
+    heartbeat: str = "started_at" # Columna cuya antigüedad marca un job huérfano
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = 4, poll_interval: float = 1.0,
+                 timeout_seconds: int = 600, max_attempts: int = 3):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._ensure_pool()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"🧵 Worker {self.name} iniciado (workers={self.max_workers}, poll={self.poll_interval}s)")
+
+    def stop(self, timeout: float = 30.0):
+        """Deja de reclamar y espera los jobs en ejecución (los encolados siguen en la tabla)"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        logger.info(f"🛑 Worker {self.name} detenido")
+
+    def notify(self):
+        """Despierta al hilo de control (job recién encolado o slot liberado)"""
+        self._wakeup.set()
+
+    def dispatch(self) -> int:
+        """Recupera huérfanos y lanza jobs encolados hasta llenar los slots libres. Devuelve jobs lanzados."""
+        db = self.session_factory()
+        try:
+            self._recover_stale(db)
+            launched = 0
+            for criteria, slots in self._free_slots(db):
+                for job in self._claim(db, slots, *criteria):
+                    self._submit(job)
+                    launched += 1
+            return launched
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Error despachando jobs ({self.name}): {e}")
+            return 0
+        finally:
+            db.close()
+
+    def drain(self, timeout: float = 60.0) -> int:
+        """Ejecuta jobs hasta vaciar la cola (tests, scripts). Devuelve jobs lanzados."""
+        deadline = time.monotonic() + timeout
+        launched = 0
+        while time.monotonic() < deadline:
+            launched += self.dispatch()
+            with self._lock:
+                pending = list(self._futures)
+            if not pending:
+                return launched
+            pending[0].result(max(0.0, deadline - time.monotonic()))
+        raise TimeoutError(f"Job queue ({self.name}) not drained in time")
+
+    # -------------------------------------------------------------------------
+    # Hooks de las subclases
+    # -------------------------------------------------------------------------
+
+    def _free_slots(self, db: Session) -> List[tuple]:
+        """[(criterios extra del claim, slots)]. Por defecto: un único límite global de max_workers."""
+        running = db.execute(
+            select(func.count()).select_from(self.model).where(self.model.status == "running")
+        ).scalar()
+        slots = self.max_workers - running
+        return [((), slots)] if slots > 0 else []
+
+    @abstractmethod
+    def _task_args(self, job) -> tuple:
+        """Argumentos de _execute (valores planos: el job se ejecuta con otra sesión)"""
+
+    @abstractmethod
+    def _execute(self, *args):
+        """Corre un job en el pool; debe confirmar su estado final"""
+
+    @abstractmethod
+    def _fail_stale(self, db: Session, job, error: str):
+        """Estado terminal de un huérfano que agotó sus intentos (sin commit)"""
+
+    # -------------------------------------------------------------------------
+    # Claim + pool
+    # -------------------------------------------------------------------------
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._pool
+
+    def _claim(self, db: Session, slots: int, *criteria) -> List[Any]:
+        """Pasa hasta `slots` jobs encolados a running en un statement (FIFO)"""
+        model = self.model
+        due_ids = (
+            select(model.id)
+            .where(model.status == "queued", *criteria)
+            .order_by(model.created_at, model.id)
+            .limit(slots)
+            .with_for_update(skip_locked=True)
+        )
+        now = datetime.utcnow()
+        jobs = list(db.scalars(
+            update(model)
+            .where(model.id.in_(due_ids.scalar_subquery()), model.status == "queued")
+            .values({"status": "running", "started_at": now, self.heartbeat: now, "attempts": model.attempts + 1})
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        ).all())
+        db.commit()
+        return jobs
+
+    def _submit(self, job):
+        future = self._ensure_pool().submit(self._execute, *self._task_args(job))
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+        self._wakeup.set()
+
+    def _recover_stale(self, db: Session):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout_seconds)
+        stale = db.query(self.model).filter(
+            self.model.status == "running",
+            getattr(self.model, self.heartbeat) < cutoff
+        ).all()
+        for job in stale:
+            if job.attempts >= self.max_attempts:
+                self._fail_stale(db, job, f"Timed out after {job.attempts} attempts")
+            else:
+                job.status = "queued"
+            logger.warning(f"⚠️ Job {job.id} ({self.name}) huérfano (intento {job.attempts}) -> {job.status}")
+        if stale:
+            db.commit()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.dispatch()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
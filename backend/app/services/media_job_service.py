@@ -0,0 +1,93 @@
+import json
+import uuid
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.logging import logger
+from app.models.media_job import MediaJob
+from app.providers.media_providers import ProviderFactory
+from app.repositories.usage_repository import UsageRepository
+from app.services.billing_service import BillingService
+from app.services.budget_guard_service import BudgetGuardService
+from app.services.capability_resolver import CapabilityResolverService
+from app.services.media_job_worker import IN_FLIGHT_STATUSES, media_job_worker, media_units
+
+class MediaJobService:
+    """
+    Entrada de la cola de medios: valida y reserva en el request, ejecuta en background.
+    1. Capacidad del plan (tipo habilitado, cuota diaria, duración).
+    2. Presupuesto mensual, contando el costo reservado de los jobs en curso y el del nuevo job.
+    3. Reserva atómica de cuota + insert del job en una transacción; cualquier fallo
+       hace rollback de ambos. La reserva se libera si el job falla (MediaJobWorker).
+    """
+
+    def __init__(self, db: Session, capability_service: Optional[CapabilityResolverService] = None,
+                 policy_version: str = "v1.0", worker=media_job_worker):
+        self.db = db
+        self.cap_service = capability_service or CapabilityResolverService()
+        self.billing = BillingService(db, policy_version=policy_version)
+        self.budget_guard = BudgetGuardService(db, policy_version=policy_version)
+        self.usage_repo = UsageRepository(db)
+        self.worker = worker
+
+    def enqueue(self, user_id: str, plan: str, media_type: str, params: dict,
+                webhook_url: Optional[str] = None) -> MediaJob:
+        """Encola un job y retorna de inmediato (status=queued). PermissionError si la política lo niega."""
+        if media_type not in ("image", "video"):
+            raise ValueError(f"Unsupported media type: {media_type}")
+
+        job_id = str(uuid.uuid4())
+        try:
+            # 1. Validar Capacidad
+            if not self.cap_service.validate_request(user_id, plan, media_type, params, db=self.db):
+                raise PermissionError(f"{media_type.capitalize()} generation denied by policy")
+
+            # 2. Validar Presupuesto (jobs en curso + el costo estimado de este job cuentan como gastado)
+            units, _ = media_units(media_type, params)
+            cost = self.billing.estimate_cost(plan, media_type, units)
+            self.budget_guard.check_limits(user_id, plan, correlation_id=job_id,
+                                           reserved_usd=self._reserved_cost(user_id) + cost)
+
+            # 3. Reservar cuota (UPDATE condicional: cierra la carrera entre validar y consumir)
+            if not self.usage_repo.reserve_usage(user_id, media_type, self.cap_service.daily_quota(plan, media_type)):
+                raise PermissionError(f"{media_type.capitalize()} daily quota exceeded")
+
+            job = MediaJob(
+                id=job_id,
+                user_id=user_id,
+                plan=plan,
+                media_type=media_type,
+                provider=ProviderFactory.resolve_name(media_type),
+                params=params,
+                status="queued",
+                reserved_cost=cost,
+                webhook_url=webhook_url
+            )
+            self.db.add(job)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.info(json.dumps({
+            "event": "media_job_created",
+            "job_id": job.id,
+            "user_id": user_id,
+            "media_type": media_type,
+            "provider": job.provider,
+            "params": params,
+            "reserved_cost": cost,
+            "status": "queued"
+        }))
+        self.worker.notify()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[MediaJob]:
+        return self.db.get(MediaJob, job_id)
+
+    def _reserved_cost(self, user_id: str) -> float:
+        """Costo estimado de los jobs del usuario aún no facturados"""
+        return self.db.query(func.coalesce(func.sum(MediaJob.reserved_cost), 0.0)).filter(
+            MediaJob.user_id == user_id,
+            MediaJob.status.in_(IN_FLIGHT_STATUSES)
+        ).scalar()
@@ -0,0 +1,220 @@
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.core.security import ensure_public_https_url
+from app.models.media_job import MediaJob
+from app.providers.media_providers import ProviderFactory
+from app.repositories.usage_repository import UsageRepository
+from app.services.billing_service import BillingService
+from app.services.job_worker import JobWorker
+from app.services.media_store import get_media_store
+from app.services.tracking_service import TrackingService
+
+settings = get_settings()
+
+IN_FLIGHT_STATUSES = ("queued", "running")
+
+def media_units(media_type: str, params: dict) -> tuple:
+    """Unidades facturables del job: (units, unit_type) según la tabla de pricing"""
+    if media_type == "video":
+        return float(params.get("duration", 0)), "second"
+    return 1.0, "image"
+
+def job_payload(job: MediaJob) -> Dict[str, Any]:
+    """Cuerpo del webhook (mismo contenido que el polling de estado)"""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "media_type": job.media_type,
+        "provider": job.provider,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+def _post_webhook(url: str, payload: dict, timeout: float):
+    ensure_public_https_url(url) # Se revalida al enviar: el DNS pudo cambiar desde que se encoló
+    response = httpx.post(url, json=payload, timeout=timeout)
+    response.raise_for_status()
+
+class MediaJobWorker(JobWorker):
+    """
+    Ejecuta MediaJobs encolados (claim, pool y huérfanos en JobWorker).
+    - El claim respeta un límite de jobs "running" por provider (contado en DB: vale entre procesos).
+    - Cada job corre en el pool (las llamadas a providers bloquean); el resultado,
+      la facturación (outbox) y la liberación de la reserva se confirman juntos.
+    - Los huérfanos que agotan max_attempts fallan y liberan su reserva.
+    - Con webhook_url, el estado final se notifica por POST (best effort, con reintentos).
+    - Con store_assets, el archivo del provider se copia al media store (dedup por hash).
+    """
+    model = MediaJob
+    name = "media-job"
+    heartbeat = "started_at"
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = 8,
+                 provider_concurrency: Optional[Dict[str, int]] = None, default_concurrency: int = 2,
+                 poll_interval: float = 1.0, timeout_seconds: int = 600, max_attempts: int = 3,
+                 webhook_attempts: int = 3, webhook_timeout: float = 5.0, store_assets: bool = False,
+                 provider_factory: Callable[[str, str], Any] = ProviderFactory.get_provider,
+                 webhook_sender: Callable[[str, dict, float], None] = _post_webhook):
+        super().__init__(session_factory=session_factory, max_workers=max_workers, poll_interval=poll_interval,
+                         timeout_seconds=timeout_seconds, max_attempts=max_attempts)
+        self.provider_concurrency = provider_concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.webhook_attempts = webhook_attempts
+        self.webhook_timeout = webhook_timeout
+        self.store_assets = store_assets
+        self.provider_factory = provider_factory
+        self.webhook_sender = webhook_sender
+
+    def _free_slots(self, db: Session) -> List[tuple]:
+        """Slots libres por provider con jobs encolados"""
+        queued = db.execute(select(MediaJob.provider).where(MediaJob.status == "queued").distinct()).scalars().all()
+        if not queued:
+            return []
+        running = dict(db.execute(
+            select(MediaJob.provider, func.count())
+            .where(MediaJob.status == "running", MediaJob.provider.in_(queued))
+            .group_by(MediaJob.provider)
+        ).all())
+        slots = []
+        for provider in queued:
+            free = self.provider_concurrency.get(provider, self.default_concurrency) - running.get(provider, 0)
+            if free > 0:
+                slots.append(((MediaJob.provider == provider,), free))
+        return slots
+
+    def _task_args(self, job: MediaJob) -> tuple:
+        return job.id, job.media_type, job.provider, dict(job.params)
+
+    def _execute(self, job_id: str, media_type: str, provider: str, params: dict):
+        started = time.perf_counter()
+        try:
+            result, error = self.provider_factory(media_type, provider).generate(**params), None
+            if self.store_assets and result.get("url"):
+                result = self._store_asset(result)
+        except Exception as e:
+            result, error = None, e
+
+        db = self.session_factory()
+        try:
+            job = db.get(MediaJob, job_id)
+            if job is None or job.status != "running":
+                # Reencolado por timeout mientras corría: otro intento es dueño del job
+                logger.warning(f"⚠️ Media job {job_id} ya no está running; resultado descartado")
+                return
+            if error is None:
+                self._complete(db, job, result)
+            else:
+                logger.error(f"❌ Provider {provider} falló en media job {job_id}: {error}")
+                self._fail(db, job, str(error))
+            db.commit()
+            payload = job_payload(job)
+            webhook_url = job.webhook_url
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Error finalizando media job {job_id}: {e}")
+            return
+        finally:
+            db.close()
+
+        logger.info(json.dumps({
+            "event": "media_job_finished",
+            "job_id": job_id,
+            "media_type": media_type,
+            "provider": provider,
+            "status": payload["status"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }))
+        if webhook_url:
+            self._deliver_webhook(job_id, webhook_url, payload)
+
+    def _store_asset(self, result: dict) -> dict:
+        """Descarga el resultado al media store; el job expone la URL servida por la API"""
+        db = self.session_factory()
+        try:
+            media = get_media_store().save_from_url(db, result["url"])
+            db.commit()
+            return {**result, "provider_url": result["url"], "url": media.public_url,
+                    "media_id": media.id, "content_hash": media.content_hash}
+        finally:
+            db.close()
+
+    def _complete(self, db: Session, job: MediaJob, result: dict):
+        """Resultado + facturación (outbox) en la misma transacción; la reserva de cuota pasa a consumo"""
+        job.status = "succeeded"
+        job.result = result
+        job.finished_at = datetime.utcnow()
+        units, unit_type = media_units(job.media_type, job.params)
+        BillingService(db).enqueue_usage_event(
+            job.user_id, job.plan, job.media_type, result.get("provider", job.provider),
+            units, unit_type, correlation_id=f"media-job-{job.id}"
+        )
+        if job.media_type == "video":
+            TrackingService(db).enqueue_generation({
+                "user_id": job.user_id,
+                "project_id": 0, # Placeholder, needs context passing in future
+                "project_name": "Unknown",
+                "platform": "unknown",
+                "content_type": job.media_type,
+                "generated_url": result.get("url", ""),
+                "status": "generated",
+                "notes": str({"prompt": job.params.get("prompt")}),
+                "correlation_id": f"media-job-{job.id}"
+            })
+
+    def _fail(self, db: Session, job: MediaJob, error: str):
+        """Estado terminal fallido: devuelve la cuota reservada (el costo reservado deja de contar)"""
+        job.status = "failed"
+        job.error = error[:1000]
+        job.finished_at = datetime.utcnow()
+        if job.usage_reserved:
+            UsageRepository(db).release_usage(job.user_id, job.media_type, job.created_at)
+            job.usage_reserved = False
+
+    def _fail_stale(self, db: Session, job: MediaJob, error: str):
+        self._fail(db, job, error)
+
+    def _deliver_webhook(self, job_id: str, url: str, payload: dict):
+        delivered = False
+        attempts = 0
+        for attempts in range(1, self.webhook_attempts + 1):
+            try:
+                self.webhook_sender(url, payload, self.webhook_timeout)
+                delivered = True
+                break
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook de media job {job_id} falló (intento {attempts}): {e}")
+                if attempts < self.webhook_attempts:
+                    time.sleep(0.5 * (2 ** (attempts - 1)))
+
+        db = self.session_factory()
+        try:
+            db.execute(update(MediaJob).where(MediaJob.id == job_id).values(
+                webhook_status="delivered" if delivered else "failed",
+                webhook_attempts=attempts
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+# Singleton instance
+media_job_worker = MediaJobWorker(
+    max_workers=settings.MEDIA_JOB_WORKERS,
+    provider_concurrency=settings.MEDIA_JOB_PROVIDER_CONCURRENCY,
+    default_concurrency=settings.MEDIA_JOB_DEFAULT_CONCURRENCY,
+    poll_interval=settings.MEDIA_JOB_POLL_SECONDS,
+    timeout_seconds=settings.MEDIA_JOB_TIMEOUT_SECONDS,
+    max_attempts=settings.MEDIA_JOB_MAX_ATTEMPTS,
+    webhook_attempts=settings.MEDIA_JOB_WEBHOOK_ATTEMPTS,
+    webhook_timeout=settings.MEDIA_JOB_WEBHOOK_TIMEOUT_SECONDS,
+    store_assets=settings.MEDIA_JOB_STORE_ASSETS
+)
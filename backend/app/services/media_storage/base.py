@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+def storage_key(content_hash: str) -> str:
+    """Clave direccionada por contenido: ab/cd/abcd... (fan-out para no saturar un directorio)"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+class MediaStorageBackend(ABC):
+    """
+    Interface base para almacenamiento de blobs inmutables (clave = hash del contenido).
+    Como la clave deriva del contenido, escribir una clave existente es un no-op (dedup).
+    """
+    name = "base"
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def put_file(self, key: str, path: str, content_type: str) -> bool:
+        """
+        Sube el archivo temporal `path` bajo `key`. El backend puede mover o borrar `path`.
+        Retorna False si la clave ya existía (nada se escribió).
+        """
+        pass
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        pass
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        """Bytes [start, end] (inclusive) en chunks"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Ruta en disco si el backend es local (habilita sendfile/FileResponse)"""
+        return None
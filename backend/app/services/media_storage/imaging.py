@@ -0,0 +1,35 @@
+from io import BytesIO
+from typing import Tuple, Union
+from PIL import Image, ImageOps
+
+# Módulo liviano a propósito: corre en los procesos del pool de renditions (spawn),
+# que importan solo esto y Pillow.
+
+def render_image(source: Union[str, bytes], width: int, height: int, fit: str,
+                 image_format: str, quality: int) -> Tuple[bytes, int, int]:
+    """
+    Genera un derivado de la imagen `source` (ruta o bytes).
+    fit: crop (llena el cuadro y recorta centrado) o contain (entra completa, sin agrandar).
+    Retorna (bytes codificados, ancho, alto).
+    """
+    with Image.open(source if isinstance(source, str) else BytesIO(source)) as original:
+        image = ImageOps.exif_transpose(original) # Respeta la orientación de cámaras/móviles
+        if fit == "crop":
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image = image.copy()
+            image.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            # JPEG no tiene alfa: se aplana sobre blanco
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background
+
+        buffer = BytesIO()
+        options = {"quality": quality, "optimize": True}
+        if image_format == "JPEG":
+            options["progressive"] = True
+        image.save(buffer, image_format, **options)
+        return buffer.getvalue(), image.width, image.height
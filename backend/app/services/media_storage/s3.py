@@ -0,0 +1,200 @@
+import os
+import threading
+import uuid
+from typing import Dict, Iterator, Optional
+from app.services.media_storage.base import MediaStorageBackend
+
+try:
+    import boto3  # Opcional: solo requerido con MEDIA_STORAGE_BACKEND=s3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+    ClientError = None
+
+MIN_PART_SIZE = 5 * 1024 * 1024 # Mínimo de S3 para partes de multipart (salvo la última)
+
+class ObjectNotFound(Exception):
+    pass
+
+class S3MediaStorage(MediaStorageBackend):
+    """
+    Blobs en un bucket S3-compatible (AWS, MinIO, R2, Supabase Storage).
+    `client` es un cliente boto3 (o LocalS3Client en tests/desarrollo).
+    Archivos sobre part_size se suben por multipart, una parte en memoria a la vez.
+    """
+    name = "s3"
+
+    def __init__(self, client, bucket: str, prefix: str = "", part_size: int = 8 * 1024 * 1024):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = max(part_size, MIN_PART_SIZE)
+
+    @classmethod
+    def from_settings(cls, settings) -> "S3MediaStorage":
+        if boto3 is None:
+            raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requires boto3")
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.MEDIA_S3_ENDPOINT_URL or None,
+            region_name=settings.MEDIA_S3_REGION or None,
+            aws_access_key_id=settings.MEDIA_S3_ACCESS_KEY or None,
+            aws_secret_access_key=settings.MEDIA_S3_SECRET_KEY or None
+        )
+        return cls(client, settings.MEDIA_S3_BUCKET, settings.MEDIA_S3_PREFIX, settings.MEDIA_S3_PART_SIZE)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def put_file(self, key: str, path: str, content_type: str) -> bool:
+        try:
+            if self.exists(key):
+                return False
+            if os.path.getsize(path) <= self.part_size:
+                with open(path, "rb") as f:
+                    self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=f, ContentType=content_type)
+            else:
+                self._put_multipart(key, path, content_type)
+            return True
+        finally:
+            os.remove(path)
+
+    def _put_multipart(self, key: str, path: str, content_type: str):
+        upload = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key), ContentType=content_type)
+        upload_id = upload["UploadId"]
+        parts = []
+        try:
+            with open(path, "rb") as f:
+                part_number = 1
+                while True:
+                    data = f.read(self.part_size)
+                    if not data:
+                        break
+                    response = self.client.upload_part(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                                       PartNumber=part_number, Body=data)
+                    parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+                    part_number += 1
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                                  MultipartUpload={"Parts": parts})
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def size(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head["ContentLength"]
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+def _is_not_found(exc: Exception) -> bool:
+    if isinstance(exc, ObjectNotFound):
+        return True
+    if ClientError is not None and isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+    return False
+
+class _Body:
+    """Equivalente mínimo de StreamingBody de botocore"""
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size < 0 else self._offset + size
+        chunk = self._data[self._offset:end]
+        self._offset += len(chunk)
+        return chunk
+
+    def close(self):
+        pass
+
+class LocalS3Client:
+    """
+    Stand-in en memoria del subconjunto de la API de S3 que usa S3MediaStorage
+    (tests y desarrollo sin bucket). Registra las llamadas en `calls`.
+    """
+    def __init__(self):
+        self.objects: Dict[tuple, dict] = {}
+        self.uploads: Dict[str, dict] = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        self.calls.append("head_object")
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise ObjectNotFound(Key)
+        return {"ContentLength": len(obj["data"]), "ContentType": obj["content_type"]}
+
+    def put_object(self, Bucket: str, Key: str, Body, ContentType: str = "application/octet-stream") -> dict:
+        self.calls.append("put_object")
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        with self._lock:
+            self.objects[(Bucket, Key)] = {"data": data, "content_type": ContentType}
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None) -> dict:
+        self.calls.append("get_object")
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise ObjectNotFound(Key)
+        data = obj["data"]
+        if Range:
+            start, end = Range.replace("bytes=", "").split("-")
+            data = data[int(start):int(end) + 1]
+        return {"Body": _Body(data), "ContentLength": len(data), "ContentType": obj["content_type"]}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        self.calls.append("delete_object")
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, ContentType: str = "application/octet-stream") -> dict:
+        self.calls.append("create_multipart_upload")
+        upload_id = str(uuid.uuid4())
+        self.uploads[upload_id] = {"parts": {}, "content_type": ContentType}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> dict:
+        self.calls.append("upload_part")
+        self.uploads[UploadId]["parts"][PartNumber] = bytes(Body)
+        return {"ETag": f'"{UploadId}-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict) -> dict:
+        self.calls.append("complete_multipart_upload")
+        upload = self.uploads.pop(UploadId)
+        data = b"".join(upload["parts"][p["PartNumber"]] for p in MultipartUpload["Parts"])
+        with self._lock:
+            self.objects[(Bucket, Key)] = {"data": data, "content_type": upload["content_type"]}
+        return {}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> dict:
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId, None)
+        return {}
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Optional, Tuple
+import httpx
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models.domain import Media
+from app.services.media_storage.base import MediaStorageBackend, storage_key
+from app.services.media_storage.local import LocalMediaStorage
+from app.services.media_storage.s3 import LocalS3Client, S3MediaStorage
+
+class MediaTooLargeError(ValueError):
+    pass
+
+def media_type_for(content_type: str) -> str:
+    """image/* -> image, video/* -> video (MediaType); el resto se guarda como file"""
+    major = (content_type or "").split("/", 1)[0]
+    return major if major in ("image", "video") else "file"
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Rango único "bytes=a-b" / "bytes=a-" / "bytes=-n" -> (start, end) inclusivo.
+    None: sin rango o multi-rango (se responde el archivo completo).
+    ValueError: rango no satisfacible (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            suffix = int(end_text)
+            if suffix <= 0:
+                raise ValueError("Empty suffix range")
+            return max(0, size - suffix), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start >= size or end < start:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+class MediaStore:
+    """
+    Almacenamiento direccionado por contenido para medios generados o subidos.
+    - Escritura en streaming: los chunks van a un temporal mientras se calcula el sha256
+      (memoria acotada por chunk_size); el blob se publica bajo su hash.
+    - Dedup: si el hash ya existe el temporal se descarta; la fila Media nueva
+      referencia el blob existente (y se reutiliza si es el mismo post).
+    - No hace commit: las filas Media viajan en la transacción del caller.
+    """
+
+    def __init__(self, backend: MediaStorageBackend, chunk_size: int = 1024 * 1024,
+                 max_bytes: int = 500 * 1024 * 1024):
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
+    def put_stream(self, chunks: Iterable[bytes], content_type: str) -> Tuple[str, int, bool]:
+        """Guarda solo el blob. Retorna (sha256, bytes, creado) — creado=False si ya existía."""
+        temp_dir = self.backend.temp_dir() if isinstance(self.backend, LocalMediaStorage) else None
+        fd, temp_path = tempfile.mkstemp(prefix="upload-", dir=temp_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise MediaTooLargeError(f"Media exceeds {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            content_hash = digest.hexdigest()
+            created = self.backend.put_file(storage_key(content_hash), temp_path, content_type)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return content_hash, size, created
+
+    def save_stream(self, db: Session, chunks: Iterable[bytes], content_type: str,
+                    post_id: Optional[int] = None) -> Media:
+        content_hash, size, created = self.put_stream(chunks, content_type)
+        media = self.find(db, content_hash, post_id=post_id)
+        if media is None:
+            media = Media(
+                post_id=post_id,
+                media_type=media_type_for(content_type),
+                content_hash=content_hash,
+                content_type=content_type,
+                size_bytes=size,
+                storage_backend=self.backend.name,
+                local_path=self.backend.local_path(storage_key(content_hash)),
+                public_url=f"{get_settings().API_V1_STR}/media/files/{content_hash}"
+            )
+            db.add(media)
+            db.flush()
+
+        logger.info(json.dumps({
+            "event": "media_stored",
+            "content_hash": content_hash,
+            "size_bytes": size,
+            "backend": self.backend.name,
+            "deduplicated": not created,
+            "media_id": media.id
+        }))
+        return media
+
+    def save_file(self, db: Session, file: BinaryIO, content_type: str, post_id: Optional[int] = None) -> Media:
+        """Archivo abierto (UploadFile.file, open()) leído por chunks"""
+        return self.save_stream(db, iter(lambda: file.read(self.chunk_size), b""), content_type, post_id=post_id)
+
+    def save_bytes(self, db: Session, data: bytes, content_type: str, post_id: Optional[int] = None) -> Media:
+        return self.save_stream(db, [data], content_type, post_id=post_id)
+
+    def save_from_url(self, db: Session, url: str, post_id: Optional[int] = None, timeout: float = 60.0) -> Media:
+        """Descarga en streaming (resultado de un provider) y guarda en el store"""
+        with httpx.stream("GET", url, timeout=timeout, follow_redirects=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "application/octet-stream").split(";")[0]
+            return self.save_stream(db, response.iter_bytes(self.chunk_size), content_type, post_id=post_id)
+
+    def local_path(self, content_hash: str) -> Optional[str]:
+        return self.backend.local_path(storage_key(content_hash))
+
+    def read_bytes(self, content_hash: str) -> bytes:
+        """Blob completo en memoria (fuente de renditions en backends remotos)"""
+        key = storage_key(content_hash)
+        return b"".join(self.backend.iter_range(key, 0, self.backend.size(key) - 1, self.chunk_size))
+
+    def find(self, db: Session, content_hash: str, post_id: Optional[int] = None) -> Optional[Media]:
+        query = db.query(Media).filter(Media.content_hash == content_hash)
+        if post_id is not None:
+            query = query.filter(Media.post_id == post_id)
+        else:
+            query = query.filter(Media.post_id.is_(None))
+        return query.order_by(Media.id).first()
+
+    def describe(self, db: Session, content_hash: str) -> Optional[Media]:
+        """Cualquier fila que referencie el blob (metadatos para servirlo)"""
+        return db.query(Media).filter(Media.content_hash == content_hash).order_by(Media.id).first()
+
+def build_backend(settings) -> MediaStorageBackend:
+    if settings.MEDIA_STORAGE_BACKEND == "s3":
+        return S3MediaStorage.from_settings(settings)
+    if settings.MEDIA_STORAGE_BACKEND == "s3-local":
+        return S3MediaStorage(LocalS3Client(), settings.MEDIA_S3_BUCKET or "local", settings.MEDIA_S3_PREFIX,
+                              settings.MEDIA_S3_PART_SIZE)
+    return LocalMediaStorage(settings.MEDIA_STORAGE_ROOT)
+
+@lru_cache()
+def get_media_store() -> MediaStore:
+    settings = get_settings()
+    return MediaStore(build_backend(settings), chunk_size=settings.MEDIA_STORAGE_CHUNK_SIZE,
+                      max_bytes=settings.MEDIA_MAX_UPLOAD_BYTES)
@@ -8,6 +8,10 @@ from app.services.tracking_service import TrackingService
 from app.core.database import SessionLocal
 
 class MediaStubBase:
+    """
+    Camino síncrono (scripts y QA): ejecuta el provider en el hilo del caller.
+    La API usa la cola asíncrona (MediaJobService + MediaJobWorker).
+    """
     def __init__(self, capability_service: CapabilityResolverService):
         self.cap_service = capability_service
 
@@ -25,7 +29,7 @@ class MediaStubBase:
         db = SessionLocal()
         try:
             service = TrackingService(db)
-            service.record_generation({
+            service.enqueue_generation({
                 "user_id": user_id,
                 "project_id": 0, # Placeholder, needs context passing in future
                 "project_name": "Unknown", # Needs context
@@ -35,6 +39,7 @@ class MediaStubBase:
                 "status": "generated",
                 "notes": str(params)
             })
+            db.commit()
         except Exception as e:
             logger.error(f"Failed to record tracking: {e}")
         finally:
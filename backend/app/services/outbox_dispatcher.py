@@ -0,0 +1,305 @@
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.models.automation import AutonomousDecisionLog
+from app.models.billing import BillingEvent
+from app.models.outbox import OutboxEvent
+from app.models.tracking import ContentTracking
+from app.repositories.billing_repository import BillingRepository
+
+settings = get_settings()
+
+EVENT_TRACKING_GENERATION = "tracking.generation"
+EVENT_BILLING_USAGE = "billing.usage"
+EVENT_AUTONOMY_DECISION = "autonomy.decision"
+
+# Campos datetime que viajan como ISO en el payload JSON
+_DATETIME_FIELDS = ("created_at", "timestamp")
+
+def _to_payload(data: dict) -> dict:
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in data.items()}
+
+def _from_payload(payload: dict) -> dict:
+    row = dict(payload)
+    for field in _DATETIME_FIELDS:
+        if isinstance(row.get(field), str):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+# -----------------------------------------------------------------------------
+# Handlers de entrega: escriben en la sesión recibida SIN commit.
+# Idempotentes por la clave del evento: una redelivery no duplica filas.
+# -----------------------------------------------------------------------------
+
+def _deliver_rows(db: Session, model, key_column, items: List[Tuple[dict, str]]):
+    """Entrega agrupada: una query por las claves ya entregadas + un INSERT multi-fila"""
+    seen = set(db.scalars(select(key_column).where(key_column.in_([key for _, key in items]))))
+    rows = []
+    for payload, key in items:
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({**_from_payload(payload), "outbox_key": key})
+    if rows:
+        db.execute(insert(model), rows)
+
+def _deliver_tracking_batch(db: Session, items: List[Tuple[dict, str]]):
+    _deliver_rows(db, ContentTracking, ContentTracking.outbox_key, items)
+
+def _deliver_decision_batch(db: Session, items: List[Tuple[dict, str]]):
+    _deliver_rows(db, AutonomousDecisionLog, AutonomousDecisionLog.outbox_key, items)
+
+def _deliver_tracking(db: Session, payload: dict, key: str):
+    _deliver_tracking_batch(db, [(payload, key)])
+
+def _deliver_billing(db: Session, payload: dict, key: str):
+    row = _from_payload(payload)
+    # Idempotente: correlation_id es único en billing_events
+    if db.query(BillingEvent.id).filter(BillingEvent.correlation_id == row["correlation_id"]).first():
+        return
+    BillingRepository(db).stage_event(BillingEvent(**row))
+
+def _deliver_decision(db: Session, payload: dict, key: str):
+    _deliver_decision_batch(db, [(payload, key)])
+
+class OutboxDispatcher:
+    """
+    Transactional outbox + dispatcher de fondo para efectos secundarios.
+    - emit() agrega el evento a la transacción del caller: se confirma (o se pierde)
+      junto con el cambio principal, sin escrituras de auditoría en el request.
+    - Un hilo de fondo reclama eventos pendientes por lotes con un UPDATE condicional
+      (pending -> dispatching, con lease) y los entrega a su tabla destino; la entrega y la
+      marca "dispatched" (solo si el lease sigue siendo nuestro) se confirman juntas.
+      Varios workers/procesos no entregan el mismo evento; un lease vencido (proceso caído)
+      vuelve a reclamarse.
+    - At-least-once: un lote fallido se reintenta evento a evento (savepoints) con
+      backoff exponencial; tras max_attempts el evento queda "dead" para revisión.
+    - Sin hilo corriendo (tests, scripts, OUTBOX_DISPATCH_SYNC) emit() entrega en línea.
+    """
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 100, poll_interval: float = 1.0,
+                 max_attempts: int = 10, retry_base_seconds: float = 5.0, lease_seconds: int = 300):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.handlers: Dict[str, Callable[[Session, dict, str], None]] = {
+            EVENT_TRACKING_GENERATION: _deliver_tracking,
+            EVENT_BILLING_USAGE: _deliver_billing,
+            EVENT_AUTONOMY_DECISION: _deliver_decision,
+        }
+        # Tipos que se entregan por grupo en el camino rápido (bulk insert por lote)
+        self.batch_handlers: Dict[str, Callable[[Session, List[Tuple[dict, str]]], None]] = {
+            EVENT_TRACKING_GENERATION: _deliver_tracking_batch,
+            EVENT_AUTONOMY_DECISION: _deliver_decision_batch,
+        }
+        self._dispatch_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"🧵 Outbox dispatcher iniciado (batch={self.batch_size}, poll={self.poll_interval}s)")
+
+    def stop(self, timeout: float = 10.0):
+        """Detiene el hilo y entrega lo pendiente (lo no entregado sigue en la tabla)"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+        delivered = self.dispatch_pending()
+        logger.info(f"🛑 Outbox dispatcher detenido ({delivered} eventos en la entrega final)")
+
+    def emit(self, db: Session, event_type: str, data: dict, idempotency_key: Optional[str] = None):
+        """
+        Registra un efecto secundario en la transacción de `db` (no hace commit).
+        idempotency_key: clave de negocio (correlation_id, job_id); por defecto un uuid.
+        """
+        if event_type not in self.handlers:
+            raise ValueError(f"Unknown outbox event type: {event_type}")
+        payload = _to_payload(data)
+        key = f"{event_type}:{idempotency_key or uuid.uuid4()}"
+        if not self.is_running:
+            self.handlers[event_type](db, payload, key)
+            return
+        db.add(OutboxEvent(
+            event_type=event_type,
+            payload=payload,
+            idempotency_key=key,
+            available_at=datetime.utcnow()
+        ))
+
+    def dispatch_pending(self) -> int:
+        """Entrega todos los eventos vencidos, por lotes. Devuelve eventos entregados."""
+        delivered = 0
+        with self._dispatch_lock:
+            while True:
+                batch_delivered, claimed = self._dispatch_batch()
+                delivered += batch_delivered
+                if claimed < self.batch_size:
+                    return delivered
+
+    def purge_dispatched(self, retention_hours: int) -> int:
+        """Elimina eventos ya entregados más antiguos que la retención"""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+            result = db.execute(delete(OutboxEvent).where(
+                OutboxEvent.status == "dispatched",
+                OutboxEvent.dispatched_at < cutoff
+            ))
+            db.commit()
+            return result.rowcount or 0
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Eventos por estado (pending, dispatching, dispatched, dead)"""
+        db = self.session_factory()
+        try:
+            rows = db.execute(select(OutboxEvent.status, func.count()).group_by(OutboxEvent.status)).all()
+            return {status: count for status, count in rows}
+        finally:
+            db.close()
+
+    def _dispatch_batch(self) -> Tuple[int, int]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            events = self._claim(db, now, lease_until)
+            if not events:
+                return 0, 0
+
+            try:
+                # Camino rápido: todo el lote en una transacción (un INSERT multi-fila por tipo)
+                self._deliver_grouped(db, events)
+                if self._mark_dispatched(db, [event.id for event in events], lease_until, now) != len(events):
+                    raise RuntimeError("Outbox lease lost before commit")
+                db.commit()
+                delivered = len(events)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"❌ Lote de outbox fallido, reintentando evento a evento: {e}")
+                delivered = self._dispatch_individually(db, events, lease_until, now)
+
+            logger.info(json.dumps({
+                "event": "outbox_batch_dispatched",
+                "claimed": len(events),
+                "delivered": delivered
+            }))
+            return delivered, len(events)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Error despachando outbox: {e}")
+            return 0, 0
+        finally:
+            db.close()
+
+    def _deliver_grouped(self, db: Session, events: List[OutboxEvent]):
+        by_type: Dict[str, List[OutboxEvent]] = {}
+        for event in events:
+            by_type.setdefault(event.event_type, []).append(event)
+        for event_type, group in by_type.items():
+            batch_handler = self.batch_handlers.get(event_type)
+            if batch_handler:
+                batch_handler(db, [(event.payload, event.idempotency_key) for event in group])
+                continue
+            for event in group:
+                self.handlers[event_type](db, event.payload, event.idempotency_key)
+
+    def _claim(self, db: Session, now: datetime, lease_until: datetime) -> List[OutboxEvent]:
+        """
+        pending (o dispatching con lease vencido) -> dispatching en un solo statement.
+        El WHERE status/available_at del UPDATE garantiza un único dueño también en SQLite,
+        donde FOR UPDATE SKIP LOCKED se ignora.
+        """
+        claimable = (OutboxEvent.status.in_(("pending", "dispatching")), OutboxEvent.available_at <= now)
+        due_ids = (
+            select(OutboxEvent.id)
+            .where(*claimable)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = list(db.scalars(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(due_ids.scalar_subquery()), *claimable)
+            .values(status="dispatching", available_at=lease_until)
+            .returning(OutboxEvent)
+            .execution_options(synchronize_session=False)
+        ).all())
+        db.commit()
+        return sorted(events, key=lambda event: event.id)
+
+    def _dispatch_individually(self, db: Session, events: List[OutboxEvent], lease_until: datetime,
+                               now: datetime) -> int:
+        delivered = 0
+        for event in events:
+            try:
+                with db.begin_nested():
+                    self.handlers[event.event_type](db, event.payload, event.idempotency_key)
+                    if not self._mark_dispatched(db, [event.id], lease_until, now):
+                        raise RuntimeError("Outbox lease lost before commit")
+                delivered += 1
+            except Exception as e:
+                attempts = event.attempts + 1
+                retry_at = now + timedelta(seconds=self.retry_base_seconds * (2 ** (attempts - 1)))
+                dead = attempts >= self.max_attempts
+                db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == event.id, OutboxEvent.status == "dispatching",
+                           OutboxEvent.available_at == lease_until)
+                    .values(status="dead" if dead else "pending", attempts=attempts,
+                            last_error=str(e)[:1000], available_at=now if dead else retry_at)
+                    .execution_options(synchronize_session=False)
+                )
+                if dead:
+                    logger.error(f"☠️ Evento de outbox {event.idempotency_key} agotó {attempts} intentos: {e}")
+        db.commit()
+        return delivered
+
+    @staticmethod
+    def _mark_dispatched(db: Session, event_ids: List[int], lease_until: datetime, now: datetime) -> int:
+        """Marca solo los eventos cuyo lease sigue siendo este (otro worker pudo reclamarlos al vencer)"""
+        result = db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(event_ids), OutboxEvent.status == "dispatching",
+                   OutboxEvent.available_at == lease_until)
+            .values(status="dispatched", attempts=OutboxEvent.attempts + 1, dispatched_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            self.dispatch_pending()
+
+# Singleton instance
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_base_seconds=settings.OUTBOX_RETRY_BASE_SECONDS,
+    lease_seconds=settings.OUTBOX_CLAIM_LEASE_SECONDS
+)
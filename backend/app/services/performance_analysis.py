@@ -1,30 +1,90 @@
+import json
+import time
+from itertools import chain
+import numpy as np
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
-# from app.models.tracking import ContentTracking, ImpactMetric
+from typing import Dict, Any
+from app.core.logging import logger
+from app.repositories.impact_repository import ImpactRepository
+from app.repositories.tracking_repository import TrackingRepository
+
+# Score = (CTR * 0.4) + (EngagementRate * 0.6)
+CTR_WEIGHT = 0.4
+ENGAGEMENT_WEIGHT = 0.6
+
+MIN_IMPRESSIONS = 1000 # Por debajo no se sugieren cambios (muestra insuficiente)
+LOW_CTR_PERCENT = 1.0
+LOW_ENGAGEMENT_PERCENT = 0.5
+REGRESSION_RATIO = 0.8 # Versión N rinde 20% menos que su versión padre
+IMPROVEMENT_RATIO = 1.2
+
+# Orden de columnas de ImpactRepository.get_latest_metrics
+FRAME_COLUMNS = (
+    "tracking_id", "parent_id", "version", "is_latest",
+    "impressions", "clicks", "reactions", "comments", "shares"
+)
+
+def load_frame(rows: list) -> Dict[str, np.ndarray]:
+    """Filas de get_latest_metrics -> un array int64 por columna (alineados por índice)"""
+    # fromiter sobre las filas aplanadas: evita crear un objeto por celda (np.array(rows) es mucho más lento)
+    flat = chain.from_iterable(rows)
+    data = np.fromiter(flat, dtype=np.int64, count=len(rows) * len(FRAME_COLUMNS)).reshape(-1, len(FRAME_COLUMNS))
+    return {name: data[:, i] for i, name in enumerate(FRAME_COLUMNS)}
+
+def compute_kpis(frame: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    KPIs y flags de todos los contenidos/versiones a la vez (sin loops Python).
+    Requiere frame ordenado por tracking_id (la versión padre se ubica con searchsorted).
+    """
+    ids = frame["tracking_id"]
+    impressions = frame["impressions"].astype(np.float64)
+    engagement = (frame["reactions"] + frame["comments"] + frame["shares"]).astype(np.float64)
+    has_data = impressions > 0
+    safe_impressions = np.where(has_data, impressions, 1.0)
+
+    ctr = np.where(has_data, frame["clicks"] / safe_impressions * 100, 0.0)
+    engagement_rate = np.where(has_data, engagement / safe_impressions * 100, 0.0)
+    score = ctr * CTR_WEIGHT + engagement_rate * ENGAGEMENT_WEIGHT
+
+    # Score de la versión padre (si está en el frame)
+    parent_ids = frame["parent_id"]
+    parent_idx = np.clip(np.searchsorted(ids, parent_ids), 0, max(len(ids) - 1, 0))
+    has_parent = (parent_ids > 0) & (ids[parent_idx] == parent_ids)
+    parent_score = np.where(has_parent, score[parent_idx], 0.0)
+    parent_ratio = np.divide(score, parent_score, out=np.ones_like(score), where=parent_score > 0)
+
+    measured = impressions >= MIN_IMPRESSIONS
+    return {
+        "ctr": ctr,
+        "engagement_rate": engagement_rate,
+        "clicks_per_1000": ctr * 10,
+        "engagement_per_1000": engagement_rate * 10,
+        "score": score,
+        "has_data": has_data,
+        "measured": measured,
+        "parent_idx": parent_idx,
+        "parent_ratio": parent_ratio,
+        "low_ctr": measured & (ctr < LOW_CTR_PERCENT),
+        "low_engagement": measured & (engagement_rate < LOW_ENGAGEMENT_PERCENT),
+        "regression": measured & (parent_score > 0) & (parent_ratio < REGRESSION_RATIO)
+    }
 
 class PerformanceAnalysisService:
     """
-    [FASE 9.2 - DESIGN ONLY]
-    Servicio para análisis de rendimiento y feedback loop.
-    
-    OBJETIVO:
-    Comparar versiones de contenido y sugerir acciones (iterar, promocionar, archivar).
+    [FASE 9.2] Análisis de rendimiento y feedback loop, en batch.
+    Carga el último snapshot de todos los contenidos en arrays NumPy (una query)
+    y calcula KPIs, scores y flags vectorialmente para todo el proyecto.
     """
-    
+
     def __init__(self, db: Session):
         self.db = db
+        self.impact_repo = ImpactRepository(db)
+        self.tracking_repo = TrackingRepository(db)
 
     def analyze_version_performance(self, content_id: int) -> Dict[str, Any]:
         """
-        TODO: Implementar lógica de comparación.
-        
-        Pasos propuestos:
-        1. Obtener linaje completo de versiones (v1, v2, v3...).
-        2. Para cada versión, agregar métricas de impacto (Impressions, CTR, Engagement).
-        3. Normalizar métricas (ej: Engagement por 1000 impresiones).
-        4. Identificar 'Best Performer' y 'Underperformer'.
-        
-        Retorno esperado:
+        Compara todas las versiones del linaje de content_id.
+        Retorno:
         {
             "best_version": 2,
             "current_version": 3,
@@ -32,22 +92,110 @@ class PerformanceAnalysisService:
             "recommendation": "revert_to_v2" # iterate, keep
         }
         """
-        pass
+        lineage_ids = [v.tracking_id for v in self.tracking_repo.get_lineage(content_id)]
+        if not lineage_ids:
+            return {"status": "not_found"}
 
-    def suggest_improvements(self, project_id: int):
-        """
-        TODO: Scanear todo el proyecto buscando contenido con bajo rendimiento.
-        
-        Reglas propuestas:
-        - Si CTR < 1.0% tras 1000 impresiones -> Sugerir cambio de Titular/Hook.
-        - Si Engagement < 0.5% -> Sugerir cambio de Cuerpo/Call to Action.
-        - Si Version N rinde 20% menos que Version N-1 -> Alerta de regresión.
-        """
-        pass
+        frame = load_frame(self.impact_repo.get_latest_metrics(content_ids=lineage_ids))
+        kpis = compute_kpis(frame)
+        versions = frame["version"]
 
-    def _calculate_score(self, metrics) -> float:
+        latest = np.flatnonzero(frame["is_latest"])
+        current = int(latest[0]) if len(latest) else int(np.argmax(versions))
+        best = int(np.argmax(np.where(kpis["has_data"], kpis["score"], -np.inf)))
+
+        ratio = kpis["parent_ratio"][current]
+        trend = "declining" if ratio < REGRESSION_RATIO else "improving" if ratio > IMPROVEMENT_RATIO else "stable"
+
+        if trend == "declining" and best != current and kpis["has_data"][best]:
+            recommendation = f"revert_to_v{int(versions[best])}"
+        elif kpis["low_ctr"][current] or kpis["low_engagement"][current]:
+            recommendation = "iterate"
+        else:
+            recommendation = "keep"
+
+        return {
+            "content_id": content_id,
+            "best_version": int(versions[best]) if kpis["has_data"][best] else None,
+            "current_version": int(versions[current]),
+            "trend": trend,
+            "recommendation": recommendation,
+            "versions": [self._row(frame, kpis, i) for i in np.argsort(versions, kind="stable")]
+        }
+
+    def suggest_improvements(self, project_id: int, top_n: int = 5, limit: int = 200) -> Dict[str, Any]:
         """
-        TODO: Definir fórmula de scoring ponderado.
-        Score = (CTR * 0.4) + (EngagementRate * 0.6)
+        Escanea todo el proyecto en una pasada:
+        - CTR < 1.0% tras 1000 impresiones -> cambio de Titular/Hook.
+        - Engagement < 0.5% tras 1000 impresiones -> cambio de Cuerpo/Call to Action.
+        - Versión N rinde 20% menos que su versión padre -> alerta de regresión.
+        Incluye los mejores y peores contenidos vigentes (is_latest) con muestra suficiente.
+        Sugerencias y regresiones se listan por impresiones (mayor impacto primero), hasta `limit`.
         """
-        return 0.0
+        started = time.perf_counter()
+        frame = load_frame(self.impact_repo.get_latest_metrics(project_id=project_id))
+        kpis = compute_kpis(frame)
+        by_reach = np.argsort(-frame["impressions"], kind="stable")
+
+        suggestions = []
+        suggestions_total = 0
+        for flag, action, reason in (
+            ("low_ctr", "change_hook", "CTR below {:.1f}% after {} impressions".format(LOW_CTR_PERCENT, MIN_IMPRESSIONS)),
+            ("low_engagement", "change_body_cta", "Engagement below {:.1f}% after {} impressions".format(LOW_ENGAGEMENT_PERCENT, MIN_IMPRESSIONS)),
+        ):
+            flagged = by_reach[kpis[flag][by_reach]]
+            suggestions_total += len(flagged)
+            suggestions.extend(
+                {**self._row(frame, kpis, i), "action": action, "reasoning": reason} for i in flagged[:limit]
+            )
+
+        flagged = by_reach[kpis["regression"][by_reach]]
+        regressions = []
+        for i in flagged[:limit]:
+            parent = kpis["parent_idx"][i]
+            regressions.append({
+                **self._row(frame, kpis, i),
+                "parent_content_id": int(frame["tracking_id"][parent]),
+                "parent_version": int(frame["version"][parent]),
+                "drop_percent": round(float((1 - kpis["parent_ratio"][i]) * 100), 1)
+            })
+
+        # Ranking solo entre versiones vigentes con muestra suficiente
+        candidates = np.flatnonzero(kpis["measured"] & (frame["is_latest"] == 1))
+        order = candidates[np.argsort(kpis["score"][candidates], kind="stable")]
+        result = {
+            "project_id": project_id,
+            "analyzed": int(len(frame["tracking_id"])),
+            "best_performers": [self._row(frame, kpis, i) for i in order[::-1][:top_n]],
+            "worst_performers": [self._row(frame, kpis, i) for i in order[:top_n]],
+            "regressions_total": int(len(flagged)),
+            "regressions": regressions,
+            "suggestions_total": suggestions_total,
+            "suggestions": suggestions
+        }
+
+        logger.info(json.dumps({
+            "event": "performance_analysis_completed",
+            "project_id": project_id,
+            "analyzed": result["analyzed"],
+            "regressions": result["regressions_total"],
+            "suggestions": suggestions_total,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }))
+        return result
+
+    def _calculate_score(self, metrics: Dict[str, float]) -> float:
+        """Score ponderado de un solo contenido (misma fórmula que compute_kpis)"""
+        return metrics.get("ctr", 0.0) * CTR_WEIGHT + metrics.get("engagement_rate", 0.0) * ENGAGEMENT_WEIGHT
+
+    @staticmethod
+    def _row(frame: Dict[str, np.ndarray], kpis: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        return {
+            "content_id": int(frame["tracking_id"][i]),
+            "version": int(frame["version"][i]),
+            "impressions": int(frame["impressions"][i]),
+            "ctr": round(float(kpis["ctr"][i]), 2),
+            "engagement_rate": round(float(kpis["engagement_rate"][i]), 2),
+            "engagement_per_1000": round(float(kpis["engagement_per_1000"][i]), 2),
+            "score": round(float(kpis["score"][i]), 3)
+        }
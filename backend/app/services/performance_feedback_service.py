@@ -7,6 +7,7 @@ from datetime import datetime
 from app.models.optimization import OptimizationRecommendation, RecommendationType, RecommendationStatus
 from app.models.tracking import ContentTracking, ImpactMetric
 from app.models.automation import CampaignAutomation
+from app.repositories.tracking_repository import TrackingRepository
 from app.services.impact_service import ImpactService
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,7 @@ class PerformanceFeedbackService:
     def __init__(self, db: Session):
         self.db = db
         self.impact_service = ImpactService(db)
+        self.tracking_repo = TrackingRepository(db)
 
     def analyze_automation_performance(self, automation_id: int) -> List[OptimizationRecommendation]:
         """
@@ -66,19 +68,18 @@ class PerformanceFeedbackService:
 
     def _analyze_content_lineage(self, root_content_id: int) -> List[Dict]:
         """Analiza la evolución de métricas entre versiones de un mismo contenido"""
-        # Obtener todas las versiones ordenadas
-        versions = self.db.query(ContentTracking).filter(
-            (ContentTracking.tracking_id == root_content_id) | (ContentTracking.parent_content_id == root_content_id)
-        ).order_by(ContentTracking.version_number.asc()).all()
+        # Obtener todas las versiones ordenadas (árbol completo, cualquier profundidad)
+        versions = self.tracking_repo.get_lineage(root_content_id)
 
         if len(versions) < 2:
             return [] # Nada que comparar
 
         recommendations = []
         
-        # Comparar V_last con V_prev
+        # Comparar V_last con la versión de la que deriva (o la anterior si no está en el árbol)
         last_ver = versions[-1]
-        prev_ver = versions[-2]
+        by_id = {v.tracking_id: v for v in versions}
+        prev_ver = by_id.get(last_ver.parent_content_id) or versions[-2]
         
         # Obtener métricas agregadas
         metrics_last = self.impact_service.get_aggregated_metrics(last_ver.tracking_id)
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+from app.schemas.policy import AgentMode, BudgetPolicy, PricingTable
+from app.core.logging import logger
+
+POLICIES_DIR = os.path.join(os.path.dirname(__file__), "../policies")
+
+class PolicyRegistry:
+    """
+    Registro de políticas a nivel de proceso.
+    Parsea cada política versionada UNA vez a objetos tipados y la mantiene en memoria.
+    Hot reload: revisa el mtime del archivo como máximo cada `check_interval` segundos,
+    así el camino de request no toca disco.
+    Varias versiones conviven (ej: pricing v1.0 y v1.1) para facturar por pricing_version.
+    Si una recarga falla (JSON o esquema inválido) se loguea y se mantiene la versión en memoria.
+    """
+
+    def __init__(self, base_dir: str = POLICIES_DIR, check_interval: float = 5.0):
+        self.base_dir = base_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # (kind, version) -> {"value", "path", "mtime", "checked_at"}
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    # -------------------------------------------------------------------------
+    # API pública (tipada)
+    # -------------------------------------------------------------------------
+
+    def get_pricing(self, version: str) -> PricingTable:
+        return self._get("pricing", version, f"pricing/{version}.json", self._parse_pricing)
+
+    def get_budget(self, version: str) -> BudgetPolicy:
+        return self._get("budget", version, f"budget/{version}.json", self._parse_budget)
+
+    def get_agent_modes(self, version: str) -> Dict[str, AgentMode]:
+        return self._get("agent_modes", version, f"{version}/agent_modes.json", self._parse_agent_modes)
+
+    def loaded_versions(self) -> Dict[str, list]:
+        """Versiones actualmente en memoria, por tipo de política"""
+        versions: Dict[str, list] = {}
+        with self._lock:
+            keys = list(self._entries.keys())
+        for kind, version in keys:
+            versions.setdefault(kind, []).append(version)
+        return versions
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+
+    def _get(self, kind: str, version: str, relative_path: str, parser: Callable[[dict, str], Any]):
+        key = (kind, version)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        # Camino rápido: entrada vigente y dentro de la ventana de chequeo
+        if entry and now - entry["checked_at"] < self.check_interval:
+            return entry["value"]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry["checked_at"] < self.check_interval:
+                return entry["value"]
+
+            path = os.path.normpath(os.path.join(self.base_dir, relative_path))
+            mtime = None
+            try:
+                mtime = os.stat(path).st_mtime
+                if entry and entry["mtime"] == mtime:
+                    entry["checked_at"] = now
+                    return entry["value"]
+
+                with open(path, "r", encoding="utf-8") as f:
+                    value = parser(json.load(f), version)
+            except Exception as e:
+                if not entry:
+                    raise # Primera carga: fail-fast
+                # Edición inválida (o archivo a medio escribir): se sigue sirviendo la última versión buena.
+                # Se recuerda el mtime malo para no reintentar hasta el próximo cambio del archivo.
+                logger.error(json.dumps({
+                    "event": "policy_reload_failed",
+                    "kind": kind,
+                    "version": version,
+                    "path": path,
+                    "error": str(e)
+                }))
+                entry["checked_at"] = now
+                if mtime is not None:
+                    entry["mtime"] = mtime
+                return entry["value"]
+
+            if entry:
+                logger.info(json.dumps({
+                    "event": "policy_reloaded",
+                    "kind": kind,
+                    "version": version,
+                    "path": path
+                }))
+
+            self._entries[key] = {"value": value, "path": path, "mtime": mtime, "checked_at": now}
+            return value
+
+    @staticmethod
+    def _parse_pricing(data: dict, version: str) -> PricingTable:
+        # La clave del registro (ej. "v1.0") manda sobre el "version" del archivo (ej. "1.0")
+        return PricingTable(**{**data, "version": version})
+
+    @staticmethod
+    def _parse_budget(data: dict, version: str) -> BudgetPolicy:
+        return BudgetPolicy(plans=data)
+
+    @staticmethod
+    def _parse_agent_modes(data: dict, version: str) -> Dict[str, AgentMode]:
+        return {name: AgentMode(**config) for name, config in data["agent_modes"].items()}
+
+# Singleton instance
+policy_registry = PolicyRegistry()
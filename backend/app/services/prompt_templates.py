@@ -0,0 +1,214 @@
+import math
+import string
+import textwrap
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken  # Opcional: conteo exacto de tokens (mismo BPE que los modelos OpenAI)
+except ImportError:
+    tiktoken = None
+
+# Estrategias de recorte cuando el prompt excede el presupuesto
+TRIM_NONE = "none"          # Sección obligatoria, nunca se recorta
+TRIM_DROP = "drop"          # Se elimina completa
+TRIM_KEEP_HEAD = "keep_head"  # Se conserva el inicio (se corta el final)
+TRIM_KEEP_TAIL = "keep_tail"  # Se conserva el final (lo más reciente de un resumen)
+
+TRUNCATION_MARKER = "[...]"
+MIN_SECTION_TOKENS = 16 # Por debajo de esto una sección truncada no aporta; se elimina
+
+class TokenCounter:
+    """
+    Tokenizer local para presupuestar prompts sin llamar al proveedor.
+    Usa tiktoken (cl100k_base) si está instalado; si no, la heurística ~4 caracteres/token,
+    que sobreestima levemente en español y por tanto es conservadora.
+    El BPE se carga en el primer uso, no al importar: con la cache fría tiktoken lo descarga
+    por red, y eso no debe ocurrir al arrancar la app ni en cada script.
+    """
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """Encoding de tiktoken (None -> heurística). Se resuelve una sola vez."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if tiktoken is not None:
+                        try:
+                            self._encoding = tiktoken.get_encoding(self.encoding_name)
+                        except Exception:
+                            self._encoding = None # Sin red/cache de BPE: caemos a la heurística
+                    self._loaded = True
+        return self._encoding
+
+    @property
+    def backend(self) -> str:
+        return "tiktoken" if self.encoding is not None else "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / 4)
+
+    def truncate(self, text: str, max_tokens: int, keep: str = TRIM_KEEP_HEAD) -> str:
+        """Recorta `text` a `max_tokens` conservando el inicio o el final"""
+        if max_tokens <= 0:
+            return ""
+        encoding = self.encoding
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            kept = tokens[:max_tokens] if keep == TRIM_KEEP_HEAD else tokens[-max_tokens:]
+            return encoding.decode(kept)
+        max_chars = max_tokens * 4
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars] if keep == TRIM_KEEP_HEAD else text[-max_chars:]
+
+class PromptSection:
+    """
+    Fragmento de un prompt con prioridad y estrategia de recorte.
+    - Las secciones sin placeholders son estáticas: se renderizan UNA vez al construirse y se
+      cuentan UNA vez, en el primer render de su plantilla.
+    - `priority`: menor = se recorta antes.
+    - `fallback`: plantilla alternativa más compacta que se prueba antes de truncar/eliminar.
+    """
+    def __init__(
+        self,
+        name: str,
+        template: str,
+        priority: int = 100,
+        trim: str = TRIM_NONE,
+        fallback: Optional[str] = None
+    ):
+        self.name = name
+        self.priority = priority
+        self.trim = trim
+        self.template = textwrap.dedent(template).strip("\n")
+        self.fields = {field for _, field, _, _ in string.Formatter().parse(self.template) if field}
+        self.is_static = not self.fields
+        self.fallback = PromptSection(f"{name}:fallback", fallback, priority) if fallback else None
+        # Precompilado: texto final y tokens de las partes fijas
+        self.static_text = self.template.format() if self.is_static else None
+        self.static_tokens: Optional[int] = None
+
+    def render(self, values: dict) -> str:
+        if self.is_static:
+            return self.static_text
+        return self.template.format_map(values)
+
+class RenderedPrompt:
+    """Resultado de renderizar una plantilla: texto final + contabilidad de tokens"""
+    def __init__(self, template: str, text: str, tokens: int, budget: int, trimmed: List[str], sections: Dict[str, int], tokenizer: str):
+        self.template = template
+        self.text = text
+        self.tokens = tokens
+        self.budget = budget
+        self.trimmed = trimmed
+        self.sections = sections
+        self.tokenizer = tokenizer
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens > self.budget
+
+    def log_fields(self) -> dict:
+        """Campos para el log estructurado del turno"""
+        return {
+            "prompt_template": self.template,
+            "prompt_tokens": self.tokens,
+            "prompt_budget": self.budget,
+            "prompt_trimmed_sections": self.trimmed,
+            "prompt_tokenizer": self.tokenizer
+        }
+
+class PromptTemplate:
+    """
+    Plantilla de prompt compuesta por secciones, con presupuesto de tokens.
+    Si el render excede `budget`, recorta secciones de menor prioridad primero
+    (fallback compacto -> truncado -> eliminación). Las secciones TRIM_NONE nunca se tocan.
+    """
+    def __init__(self, name: str, sections: List[PromptSection], budget: int, counter: Optional["TokenCounter"] = None, separator: str = "\n\n"):
+        self.name = name
+        self.sections = sections
+        self.budget = budget
+        self.counter = counter or token_counter
+        self.separator = separator
+        self._separator_tokens: Optional[int] = None
+
+    def _count_static(self):
+        """Tokens de las partes fijas, en el primer render (las plantillas se construyen al importar)"""
+        for section in self.sections:
+            if section.is_static:
+                section.static_tokens = self.counter.count(section.static_text)
+        self._separator_tokens = self.counter.count(self.separator)
+
+    def render(self, budget: Optional[int] = None, **values) -> RenderedPrompt:
+        if self._separator_tokens is None:
+            self._count_static()
+        budget = budget if budget is not None else self.budget
+        texts: Dict[str, str] = {}
+        tokens: Dict[str, int] = {}
+        for section in self.sections:
+            texts[section.name] = section.render(values)
+            tokens[section.name] = section.static_tokens if section.is_static else self.counter.count(texts[section.name])
+
+        trimmed: List[str] = []
+        total = self._total(texts, tokens)
+        if total > budget:
+            candidates = sorted(self.sections, key=lambda s: s.priority)
+            # 1ª pasada: versiones compactas (no pierden información estructural)
+            for section in candidates:
+                if total <= budget:
+                    break
+                if section.fallback:
+                    alt = section.fallback.render(values)
+                    alt_tokens = self.counter.count(alt)
+                    if alt_tokens < tokens[section.name]:
+                        texts[section.name], tokens[section.name] = alt, alt_tokens
+                        trimmed.append(f"{section.name}:fallback")
+                        total = self._total(texts, tokens)
+            # 2ª pasada: truncar o eliminar, de menor a mayor prioridad
+            for section in candidates:
+                if total <= budget:
+                    break
+                name = section.name
+                if section.trim == TRIM_NONE or not texts[name]:
+                    continue
+                target = tokens[name] - (total - budget)
+                if section.trim == TRIM_DROP or target < MIN_SECTION_TOKENS:
+                    texts[name], tokens[name] = "", 0
+                    trimmed.append(f"{name}:drop")
+                else:
+                    text = self.counter.truncate(texts[name], target - self.counter.count(TRUNCATION_MARKER), keep=section.trim)
+                    text = f"{TRUNCATION_MARKER}{text}" if section.trim == TRIM_KEEP_TAIL else f"{text}{TRUNCATION_MARKER}"
+                    texts[name], tokens[name] = text, self.counter.count(text)
+                    trimmed.append(f"{name}:truncate")
+                total = self._total(texts, tokens)
+
+        text = self.separator.join(texts[s.name] for s in self.sections if texts[s.name])
+        return RenderedPrompt(
+            template=self.name,
+            text=text,
+            tokens=self.counter.count(text),
+            budget=budget,
+            trimmed=trimmed,
+            sections=tokens,
+            tokenizer=self.counter.backend
+        )
+
+    def _total(self, texts: Dict[str, str], tokens: Dict[str, int]) -> int:
+        present = [name for name, text in texts.items() if text]
+        return sum(tokens[name] for name in present) + self._separator_tokens * max(len(present) - 1, 0)
+
+# Singleton instance
+token_counter = TokenCounter()
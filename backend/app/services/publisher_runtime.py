@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+from app.core.logging import logger
+
+class PublisherRuntime:
+    """
+    Event loop de larga vida para publicar (un hilo dedicado por proceso).
+    El código síncrono (scheduler, jobs de APScheduler) envía corutinas con
+    run_coroutine_threadsafe en lugar de crear un loop por post.
+    También es dueño del httpx.AsyncClient compartido por los publishers,
+    así las conexiones (keep-alive / TLS) se reutilizan entre posts.
+    """
+
+    def __init__(self, name: str = "publisher-runtime", http_timeout: float = 30.0):
+        self.name = name
+        self.http_timeout = http_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.is_running:
+                return
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+
+            def _run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=_run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(f"🧵 Publisher runtime iniciado ({self.name})")
+
+    def stop(self, timeout: float = 10.0):
+        with self._lock:
+            if not self.is_running:
+                return
+            loop, thread = self._loop, self._thread
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_http_client(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Error cerrando cliente HTTP del publisher runtime: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            self._loop, self._thread = None, None
+            logger.info(f"🛑 Publisher runtime detenido ({self.name})")
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Ejecuta una corutina en el runtime y bloquea el hilo llamador hasta el resultado.
+        Seguro desde cualquier hilo excepto el propio runtime (ahí sería un deadlock).
+        """
+        return self.submit(coro).result(timeout)
+
+    def submit(self, coro: Awaitable) -> Future:
+        if not self.is_running:
+            self.start()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("PublisherRuntime.run() llamado desde su propio loop (deadlock). Usar 'await' directamente.")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def run_async(self, coro: Awaitable) -> Any:
+        """Versión awaitable para endpoints async (no bloquea el loop de FastAPI)"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido. Debe usarse desde corutinas que corren en el runtime."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(timeout=self.http_timeout)
+        return self._http_client
+
+    async def _close_http_client(self):
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+
+# Singleton instance
+publisher_runtime = PublisherRuntime()
@@ -1,16 +1,81 @@
 from abc import ABC, abstractmethod
+from typing import Optional
+import httpx
 from app.models.domain import Post, ConnectedAccount
+from app.services.publisher_runtime import publisher_runtime
+from app.core.security import token_cache
+
+class PublishError(Exception):
+    """Error de publicación clasificado"""
+    kind = "unknown"
+
+class TransientPublishError(PublishError):
+    """Fallo recuperable (timeout, 5xx, 429): se reintenta con backoff"""
+    kind = "transient"
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class RateLimitedPublishError(TransientPublishError):
+    """La plataforma respondió 429"""
+    kind = "rate_limited"
+
+class PermanentPublishError(PublishError):
+    """Fallo no recuperable (credenciales, contenido rechazado, 4xx): no se reintenta"""
+    kind = "permanent"
+
+def classify_publish_error(exc: Exception) -> PublishError:
+    """Traduce cualquier excepción de un adaptador a Transient/Permanent"""
+    if isinstance(exc, PublishError):
+        return exc
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+        retry_after = _parse_retry_after(exc.response.headers.get("Retry-After"))
+        if status_code == 429:
+            return RateLimitedPublishError(str(exc), retry_after=retry_after)
+        if status_code >= 500 or status_code == 408:
+            return TransientPublishError(str(exc), retry_after=retry_after)
+        return PermanentPublishError(str(exc))
+    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, ConnectionError, TimeoutError)):
+        return TransientPublishError(str(exc))
+    if isinstance(exc, (ValueError, PermissionError, NotImplementedError)):
+        return PermanentPublishError(str(exc))
+    # Desconocido: se trata como transitorio (acotado por PUBLISH_MAX_ATTEMPTS)
+    return TransientPublishError(str(exc))
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
 
 class PublisherAdapter(ABC):
     """
     Interface base para adaptadores de publicación (LinkedIn, TikTok, etc.)
+    Las corutinas corren en el publisher runtime, que comparte el cliente HTTP.
     """
+
+    @property
+    def http_client(self):
+        return publisher_runtime.get_http_client()
+
+    def get_access_token(self, account: ConnectedAccount) -> str:
+        """Access token descifrado (cacheado por cuenta + updated_at)"""
+        try:
+            token = token_cache.get_access_token(account)
+        except Exception as e:
+            raise PermanentPublishError(f"No se pudo descifrar el token de la cuenta {account.id}: {e}")
+        if not token:
+            raise PermanentPublishError(f"La cuenta {account.id} no tiene access token")
+        return token
     
     @abstractmethod
     async def publish(self, post: Post, account: ConnectedAccount) -> dict:
         """
         Publica el post en la plataforma correspondiente.
         Debe retornar un dict con metadatos de la publicación (ej: external_id, url).
-        Si falla, debe lanzar una excepción.
+        Si falla, debe lanzar TransientPublishError / PermanentPublishError
+        (otras excepciones se clasifican con classify_publish_error).
         """
         pass
@@ -1,6 +1,7 @@
-from app.services.publishers.base import PublisherAdapter
+from app.services.publishers.base import PublisherAdapter, PermanentPublishError
 from app.models.domain import Post, ConnectedAccount
 from app.core.logging import logger
+from app.core.config import get_settings
 import uuid
 
 class LinkedInPublisher(PublisherAdapter):
@@ -12,7 +13,12 @@ class LinkedInPublisher(PublisherAdapter):
     async def publish(self, post: Post, account: ConnectedAccount) -> dict:
         # Simulación de validación
         if not account or not account.access_token_encrypted:
-            raise ValueError("Cuenta de LinkedIn no conectada o inválida")
+            raise PermanentPublishError("Cuenta de LinkedIn no conectada o inválida")
+
+        # Con cifrado configurado, validamos el token como lo haría el adaptador real
+        # (descifrado cacheado: publicar en lote a la misma cuenta descifra una sola vez)
+        if get_settings().ENCRYPTION_KEY:
+            self.get_access_token(account)
             
         logger.info(f"🚀 [MOCK] Publicando en LinkedIn | Post ID: {post.id} | Account: {account.provider_name}")
         logger.info(f"📄 Contenido: {post.content_text[:50]}...")
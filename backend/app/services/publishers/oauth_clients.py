@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from typing import Optional
+import httpx
+from app.core.config import get_settings
+from app.services.publisher_runtime import publisher_runtime
+
+settings = get_settings()
+
+class TokenRefreshError(Exception):
+    """
+    Fallo al refrescar un token.
+    permanent=True: el refresh token ya no sirve (invalid_grant, revocado) -> requiere reconectar.
+    """
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+class OAuthRefreshClient(ABC):
+    """Cliente del endpoint OAuth de refresh de una plataforma"""
+
+    @abstractmethod
+    async def refresh(self, refresh_token: str) -> dict:
+        """
+        Intercambia un refresh token por un access token nuevo.
+        Retorna {"access_token", "expires_in", "refresh_token"?}.
+        """
+        pass
+
+class LinkedInOAuthClient(OAuthRefreshClient):
+    TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
+
+    async def refresh(self, refresh_token: str) -> dict:
+        try:
+            response = await publisher_runtime.get_http_client().post(self.TOKEN_URL, data={
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id": settings.LINKEDIN_CLIENT_ID,
+                "client_secret": settings.LINKEDIN_CLIENT_SECRET
+            })
+        except httpx.RequestError as e:
+            raise TokenRefreshError(f"Network error refreshing LinkedIn token: {e}")
+
+        if response.status_code == 400 or response.status_code == 401:
+            raise TokenRefreshError(f"LinkedIn rejected refresh token: {response.text}", permanent=True)
+        if response.status_code != 200:
+            raise TokenRefreshError(f"LinkedIn refresh failed: {response.status_code}")
+
+        data = response.json()
+        if not data.get("access_token"):
+            raise TokenRefreshError("LinkedIn did not return an access token")
+        return data
+
+class StubOAuthClient(OAuthRefreshClient):
+    """
+    Cliente local para tests y desarrollo: no sale a la red.
+    Tokens en `revoked` fallan de forma permanente.
+    """
+    def __init__(self, expires_in: int = 3600 * 24 * 60, delay: float = 0.0, revoked: Optional[set] = None):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.revoked = revoked or set()
+        self.calls = 0
+
+    async def refresh(self, refresh_token: str) -> dict:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if refresh_token in self.revoked:
+            raise TokenRefreshError("invalid_grant", permanent=True)
+        return {
+            "access_token": f"stub_access_{uuid.uuid4().hex}",
+            "expires_in": self.expires_in,
+            "refresh_token": f"stub_refresh_{uuid.uuid4().hex}"
+        }
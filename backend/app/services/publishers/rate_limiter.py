@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Límites por plataforma (requests/minuto, ráfaga). Conservadores respecto a los límites publicados.
+PLATFORM_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "linkedin": (100.0, 10),
+    "facebook": (200.0, 20),
+    "instagram": (25.0, 5),
+    "tiktok": (30.0, 5),
+}
+DEFAULT_PLATFORM_RATE_LIMIT: Tuple[float, int] = (60.0, 5)
+
+class TokenBucket:
+    """
+    Token bucket independiente del event loop: el cálculo se protege con un threading.Lock
+    y la espera se hace fuera del lock (el token queda reservado).
+    """
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(1, capacity))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserva un token y retorna cuántos segundos hay que esperar para usarlo"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate if self.rate > 0 else float("inf")
+
+    def penalize(self, seconds: float):
+        """Vacía el bucket durante `seconds` (ej: la plataforma respondió 429 con Retry-After)"""
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.updated_at = time.monotonic()
+
+class PublishRateLimiter:
+    """
+    Rate limiting de publicaciones a nivel de proceso:
+    un bucket por plataforma y uno por (plataforma, cuenta).
+    """
+    def __init__(self, account_rate_per_minute: float = 20.0, account_burst: int = 3):
+        self.account_rate_per_minute = account_rate_per_minute
+        self.account_burst = account_burst
+        self._buckets: Dict[Tuple[str, Optional[int]], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, platform: str, account_id: Optional[int] = None) -> TokenBucket:
+        key = (platform, account_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    if account_id is None:
+                        rate, burst = PLATFORM_RATE_LIMITS.get(platform, DEFAULT_PLATFORM_RATE_LIMIT)
+                    else:
+                        rate, burst = self.account_rate_per_minute, self.account_burst
+                    bucket = TokenBucket(rate, burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, platform: str, account_id: Optional[int] = None):
+        """Espera hasta tener token en el bucket de la plataforma y en el de la cuenta"""
+        wait = self._bucket(platform).reserve()
+        if account_id is not None:
+            wait = max(wait, self._bucket(platform, account_id).reserve())
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, platform: str, account_id: Optional[int], seconds: float):
+        self._bucket(platform, account_id).penalize(seconds)
+
+# Singleton instance (compartido por scheduler y publicación manual)
+publish_rate_limiter = PublishRateLimiter(
+    account_rate_per_minute=settings.PUBLISH_ACCOUNT_RATE_PER_MIN,
+    account_burst=settings.PUBLISH_ACCOUNT_BURST
+)
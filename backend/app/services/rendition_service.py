@@ -0,0 +1,227 @@
+import json
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.models.domain import Media, MediaRendition, Post
+from app.services.media_storage.imaging import render_image
+from app.services.media_store import MediaStore, get_media_store
+from app.services.scheduler import FEATURE_FLAGS
+
+class RenditionSpec(NamedTuple):
+    width: int
+    height: int
+    fit: str = "crop" # crop: llena y recorta centrado; contain: entra completa sin agrandar
+    format: str = "JPEG"
+    quality: int = 85
+
+    def key(self) -> str:
+        return f"{self.width}x{self.height}-{self.fit}-{self.format.lower()}-q{self.quality}"
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+# Tamaños recomendados por plataforma (la plataforma se habilita con su FEATURE_*_ENABLED)
+RENDITION_SPECS: Dict[str, Dict[str, RenditionSpec]] = {
+    "linkedin": {
+        "feed": RenditionSpec(1200, 627),
+        "square": RenditionSpec(1200, 1200),
+    },
+    "facebook": {
+        "feed": RenditionSpec(1200, 630),
+    },
+    "instagram": {
+        "square": RenditionSpec(1080, 1080),
+        "portrait": RenditionSpec(1080, 1350),
+        "story": RenditionSpec(1080, 1920),
+    },
+    "tiktok": {
+        "cover": RenditionSpec(1080, 1920),
+    },
+}
+
+def platform_enabled(platform: str) -> bool:
+    flag = FEATURE_FLAGS.get(platform)
+    return bool(getattr(get_settings(), flag, False)) if flag else True
+
+def resolve_spec(platform: str, name: str) -> RenditionSpec:
+    """KeyError si la plataforma o el nombre no existen; PermissionError si la plataforma está apagada"""
+    spec = RENDITION_SPECS[platform][name]
+    if not platform_enabled(platform):
+        raise PermissionError(f"Platform {platform} is disabled")
+    return spec
+
+class RenditionPipeline:
+    """
+    Derivados por plataforma de los medios del store.
+    - Lazy: get_or_render genera en el primer request y cachea por (hash origen, spec).
+    - Eager: pregenerate_post genera en background todas las specs de la plataforma
+      del post al aprobarlo/programarlo.
+    - Resize/encode corre en un pool de procesos (Pillow es CPU-bound); renders iguales
+      en curso se comparten dentro del proceso y la restricción única resuelve el resto.
+    - Hace commit de las filas MediaRendition que crea.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 store_factory: Callable[[], MediaStore] = get_media_store,
+                 max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.store_factory = store_factory
+        self.max_workers = max(1, max_workers or settings.RENDITION_WORKERS)
+        self.timeout = timeout or settings.RENDITION_TIMEOUT_SECONDS
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._background: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+
+    def get_or_render(self, db: Session, media: Media, platform: str, name: str,
+                      store: Optional[MediaStore] = None) -> MediaRendition:
+        return self.ensure(db, media, platform, [name], store=store)[name]
+
+    def ensure(self, db: Session, media: Media, platform: str, names: Optional[List[str]] = None,
+               store: Optional[MediaStore] = None) -> Dict[str, MediaRendition]:
+        """
+        Renditions de `media` para la plataforma (todas sus specs si names es None).
+        Las faltantes se envían juntas al pool y se esperan en paralelo.
+        """
+        self._check_source(media)
+        specs = {name: resolve_spec(platform, name) for name in (names or RENDITION_SPECS[platform])}
+        existing = {
+            r.spec_key: r for r in db.query(MediaRendition).filter(
+                MediaRendition.source_hash == media.content_hash,
+                MediaRendition.spec_key.in_([spec.key() for spec in specs.values()])
+            )
+        }
+        store = store or self.store_factory()
+        missing = {name: spec for name, spec in specs.items() if spec.key() not in existing}
+        # Se lee una vez y fuera del lock del pool (en S3 es una descarga completa)
+        source = (store.local_path(media.content_hash) or store.read_bytes(media.content_hash)) if missing else None
+        pending = {name: self._submit(source, media.content_hash, spec) for name, spec in missing.items()}
+
+        result = {}
+        for name, spec in specs.items():
+            rendition = existing.get(spec.key())
+            if rendition is None:
+                try:
+                    rendered = pending[name].result(timeout=self.timeout)
+                except TimeoutError:
+                    # TimeoutError es subclase de OSError: se propaga tal cual (la API responde 504)
+                    raise
+                except OSError as e: # Pillow: archivo corrupto o formato no soportado
+                    raise ValueError(f"Cannot render media {media.id}: {e}")
+                rendition = self._persist(db, store, media.content_hash, platform, name, spec, rendered)
+            result[name] = rendition
+        return result
+
+    def pregenerate_post(self, post_id: int) -> Future:
+        """Encola la generación de las renditions de un post (no bloquea el request)"""
+        with self._lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="renditions")
+            return self._background.submit(self._pregenerate, post_id)
+
+    def _pregenerate(self, post_id: int) -> int:
+        db = self.session_factory()
+        created = 0
+        try:
+            post = db.get(Post, post_id)
+            platform = (post.platform or "").lower() if post else ""
+            if platform not in RENDITION_SPECS or not platform_enabled(platform):
+                return 0
+            for media in post.media:
+                if not self._is_renderable(media):
+                    continue
+                try:
+                    created += len(self.ensure(db, media, platform))
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ Rendition pregeneration failed for media {media.id}: {e}")
+            logger.info(json.dumps({
+                "event": "renditions_pregenerated",
+                "post_id": post_id,
+                "platform": platform,
+                "renditions": created
+            }))
+            return created
+        finally:
+            db.close()
+
+    def _submit(self, source, source_hash: str, spec: RenditionSpec) -> Future:
+        """source: ruta local o bytes del original, ya leídos por el caller"""
+        key = (source_hash, spec.key())
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if self._pool is None:
+                # spawn: los workers no heredan conexiones ni threads del proceso web
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            future = self._pool.submit(render_image, source, *spec)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key: Tuple[str, str]):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _persist(self, db: Session, store: MediaStore, source_hash: str, platform: str, name: str,
+                 spec: RenditionSpec, rendered: Tuple[bytes, int, int]) -> MediaRendition:
+        data, width, height = rendered
+        content_hash, size, _ = store.put_stream([data], spec.content_type)
+        rendition = MediaRendition(
+            source_hash=source_hash,
+            spec_key=spec.key(),
+            platform=platform,
+            name=name,
+            content_hash=content_hash,
+            content_type=spec.content_type,
+            width=width,
+            height=height,
+            size_bytes=size
+        )
+        db.add(rendition)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Otro proceso ganó la carrera: su fila apunta al mismo blob
+            db.rollback()
+            return db.query(MediaRendition).filter_by(source_hash=source_hash, spec_key=spec.key()).one()
+
+        logger.info(json.dumps({
+            "event": "media_rendition_created",
+            "source_hash": source_hash,
+            "platform": platform,
+            "name": name,
+            "spec": spec.key(),
+            "size_bytes": size
+        }))
+        return rendition
+
+    @staticmethod
+    def _is_renderable(media: Media) -> bool:
+        return bool(media.content_hash) and (media.content_type or "").startswith("image/")
+
+    def _check_source(self, media: Media):
+        if not self._is_renderable(media):
+            raise ValueError(f"Media {media.id} is not an image in the media store")
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            background, pool = self._background, self._pool
+            self._background = self._pool = None
+        if background:
+            background.shutdown(wait=wait)
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+# Singleton instance
+rendition_pipeline = RenditionPipeline()
@@ -1,18 +1,49 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import random
+from datetime import timedelta
 
 from app.core.database import SessionLocal
 from app.models.domain import Post, ContentStatus, ConnectedAccount
 from app.core.logging import logger
+from app.models.publishing import PublishRetry
 from app.services.publishers.linkedin import LinkedInPublisher
+from app.services.publishers.base import PermanentPublishError, RateLimitedPublishError, classify_publish_error
+from app.services.publishers.rate_limiter import publish_rate_limiter
+from app.services.publisher_runtime import publisher_runtime
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# RETRY_PENDING: scheduled_for apunta al próximo intento (ver PublishRetry)
+DUE_STATUSES = [ContentStatus.APPROVED, ContentStatus.SCHEDULED_AUTO, ContentStatus.RETRY_PENDING]
+
+FEATURE_FLAGS = {
+    "linkedin": "FEATURE_LINKEDIN_ENABLED",
+    "facebook": "FEATURE_FACEBOOK_ENABLED",
+    "instagram": "FEATURE_INSTAGRAM_ENABLED",
+    "tiktok": "FEATURE_TIKTOK_ENABLED",
+}
+
 class SchedulerService:
-    def __init__(self):
+    """
+    Pipeline de publicación en 3 etapas:
+    1. Claim: reclama posts vencidos por lotes con un único UPDATE ... RETURNING (-> PROCESSING + claimed_at).
+       Un claim vale PUBLISH_CLAIM_LEASE_SECONDS: si el proceso muere a mitad del lote,
+       el ciclo siguiente devuelve esos posts a la cola (cuenta como intento fallido).
+    2. Prefetch: carga todas las cuentas conectadas del lote en una sola query.
+    3. Publish: publica en paralelo por plataforma (token buckets por plataforma y cuenta)
+       y persiste los estados en bulk.
+    Fallos transitorios -> RETRY_PENDING con backoff exponencial + jitter (cola persistente);
+    fallos permanentes o intentos agotados -> FAILED_AUTO_MANUAL_AVAILABLE.
+    """
+    def __init__(self, session_factory=SessionLocal, batch_size: int = None, rate_limiter=None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.PUBLISH_BATCH_SIZE
+        self.rate_limiter = rate_limiter or publish_rate_limiter
         self.publishers = {
             "linkedin": LinkedInPublisher()
         }
@@ -20,94 +51,267 @@ class SchedulerService:
     def run_cycle(self):
         """
         Ejecuta un ciclo del scheduler:
-        1. Busca posts APPROVED con fecha vencida.
+        1. Reclama posts APPROVED/SCHEDULED_AUTO con fecha vencida (por lotes).
         2. Intenta publicarlos.
         3. Actualiza estados.
         """
-        db = SessionLocal()
+        # expire_on_commit=False: los posts reclamados siguen legibles tras el commit del claim
+        db = self.session_factory(expire_on_commit=False)
         try:
-            posts_to_publish = self._get_pending_posts(db)
-            if posts_to_publish:
-                logger.info(f"🔄 Ciclo Scheduler: {len(posts_to_publish)} posts encontrados para publicar.")
-            
-            for post in posts_to_publish:
-                self._process_post(db, post)
+            self._recover_stale_claims(db)
+            while True:
+                posts = self._claim_due_posts(db)
+                if not posts:
+                    break
+
+                logger.info(f"🔄 Ciclo Scheduler: {len(posts)} posts reclamados para publicar.")
+                self._process_batch(db, posts)
+
+                if len(posts) < self.batch_size:
+                    break
                 
         except Exception as e:
             logger.error(f"❌ Error crítico en ciclo del scheduler: {str(e)}")
         finally:
             db.close()
-            
-    def _get_pending_posts(self, db: Session) -> List[Post]:
+
+    # -------------------------------------------------------------------------
+    # Etapa 1: Claim
+    # -------------------------------------------------------------------------
+
+    def _claim_due_posts(self, db: Session) -> List[Post]:
+        """
+        Reclama hasta batch_size posts vencidos pasándolos a PROCESSING en un solo statement.
+        En Postgres, FOR UPDATE SKIP LOCKED evita que dos workers reclamen el mismo post
+        (SQLite ignora la cláusula; ahí el writer lock serializa el UPDATE).
+        """
         now = datetime.utcnow()
-        return db.query(Post).filter(
-            Post.status.in_([ContentStatus.APPROVED, ContentStatus.SCHEDULED_AUTO]),
-            Post.scheduled_for <= now
+        due_ids = (
+            select(Post.id)
+            .where(Post.status.in_(DUE_STATUSES), Post.scheduled_for <= now)
+            .order_by(Post.scheduled_for, Post.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Post)
+            .where(Post.id.in_(due_ids.scalar_subquery()))
+            .values(status=ContentStatus.PROCESSING, claimed_at=now)
+            .returning(Post)
+            .execution_options(synchronize_session=False)
+        )
+        posts = list(db.scalars(stmt).all())
+        db.commit()
+        return posts
+
+    def _recover_stale_claims(self, db: Session) -> int:
+        """
+        Devuelve a la cola los posts PROCESSING cuyo lease venció (proceso caído o lote abortado).
+        Cuenta como intento fallido: RETRY_PENDING inmediato, o FAILED_AUTO_MANUAL_AVAILABLE
+        si ya agotó PUBLISH_MAX_ATTEMPTS (un post que tumba al worker no se reintenta para siempre).
+        El UPDATE es condicional al claim leído: si el dueño terminó entretanto, no se pisa.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=settings.PUBLISH_CLAIM_LEASE_SECONDS)
+        stale = db.query(Post).filter(
+            Post.status == ContentStatus.PROCESSING,
+            # claimed_at NULL: reclamados antes de existir el lease
+            (Post.claimed_at < cutoff) | Post.claimed_at.is_(None)
         ).all()
-        
-    def _process_post(self, db: Session, post: Post):
-        logger.info(f"⚙️ Procesando Post {post.id} | Proyecto {post.project_id} | Plataforma {post.platform}")
-        
-        # 0. Verificar Feature Flags
-        platform = post.platform.lower()
-        if platform == "linkedin" and not settings.FEATURE_LINKEDIN_ENABLED:
-            logger.warning(f"⚠️  Post {post.id} omitido: LinkedIn desactivado por Feature Flag.")
-            # Marcamos como FAILED para evitar bucle infinito, pero con log claro
-            post.status = ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE
-            # Idealmente agregaríamos una nota de "Razón: Feature Flag disabled"
-            db.commit()
-            return
-            
-        # 1. Cambiar a PROCESSING
-        post.status = ContentStatus.PROCESSING
+        if not stale:
+            return 0
+
+        retries = self._prefetch_retries(db, stale)
+        recovered = 0
+        for post in stale:
+            retry = retries.get(post.id)
+            attempts = (retry.attempts if retry else 0) + 1
+            exhausted = attempts >= settings.PUBLISH_MAX_ATTEMPTS
+            values = {"status": ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE} if exhausted else \
+                {"status": ContentStatus.RETRY_PENDING, "scheduled_for": now}
+            result = db.execute(
+                update(Post)
+                .where(Post.id == post.id, Post.status == ContentStatus.PROCESSING,
+                       Post.claimed_at.is_not_distinct_from(post.claimed_at))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                continue
+
+            if exhausted:
+                if retry:
+                    db.delete(retry)
+            else:
+                if not retry:
+                    retry = PublishRetry(
+                        post_id=post.id,
+                        platform=(post.platform or "").lower(),
+                        original_scheduled_for=post.scheduled_for
+                    )
+                    db.add(retry)
+                retry.attempts = attempts
+                retry.next_attempt_at = now
+                retry.last_error = f"Claim lease expired (claimed at {post.claimed_at})"
+                retry.last_error_kind = "lease_expired"
+            recovered += 1
+            logger.warning(f"⚠️ Post {post.id} huérfano en PROCESSING (intento {attempts}) -> {values['status']}")
+
         db.commit()
-        
-        try:
-            # 2. Obtener adaptador
-            adapter = self.publishers.get(platform)
-            if not adapter:
-                raise ValueError(f"No hay adaptador para plataforma: {post.platform}")
-            
-            # 3. Obtener cuenta conectada
-            account = db.query(ConnectedAccount).filter(
-                ConnectedAccount.project_id == post.project_id,
-                ConnectedAccount.provider == platform,
-                ConnectedAccount.active == True
-            ).first()
-            
+        return recovered
+
+    # -------------------------------------------------------------------------
+    # Etapa 2: Prefetch
+    # -------------------------------------------------------------------------
+
+    def _prefetch_accounts(self, db: Session, posts: List[Post]) -> Dict[Tuple[int, str], ConnectedAccount]:
+        """Una sola query para todas las cuentas activas que necesita el lote"""
+        project_ids = {p.project_id for p in posts}
+        platforms = {(p.platform or "").lower() for p in posts}
+        accounts = db.query(ConnectedAccount).filter(
+            ConnectedAccount.project_id.in_(project_ids),
+            ConnectedAccount.provider.in_(platforms),
+            ConnectedAccount.active == True
+        ).order_by(ConnectedAccount.id).all()
+
+        by_key: Dict[Tuple[int, str], ConnectedAccount] = {}
+        for account in accounts:
+            # Misma semántica que .first(): gana la cuenta más antigua
+            by_key.setdefault((account.project_id, account.provider), account)
+        return by_key
+
+    def _prefetch_retries(self, db: Session, posts: List[Post]) -> Dict[int, PublishRetry]:
+        """Estado de reintentos del lote (una query)"""
+        rows = db.query(PublishRetry).filter(PublishRetry.post_id.in_([p.id for p in posts])).all()
+        return {row.post_id: row for row in rows}
+
+    # -------------------------------------------------------------------------
+    # Etapa 3: Publish + bulk write
+    # -------------------------------------------------------------------------
+
+    def _process_batch(self, db: Session, posts: List[Post]):
+        accounts = self._prefetch_accounts(db, posts)
+        retries = self._prefetch_retries(db, posts)
+        transitions: List[dict] = []
+        to_publish: List[Tuple[Post, ConnectedAccount]] = []
+
+        for post in posts:
+            platform = (post.platform or "").lower()
+            logger.info(f"⚙️ Procesando Post {post.id} | Proyecto {post.project_id} | Plataforma {post.platform}")
+
+            # 0. Verificar Feature Flags
+            if not self._platform_enabled(platform):
+                logger.warning(f"⚠️  Post {post.id} omitido: {platform} desactivado por Feature Flag.")
+                # Marcamos como FAILED para evitar bucle infinito, pero con log claro
+                transitions.append(self._finish(db, post, ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE, retries))
+                continue
+
+            if platform not in self.publishers:
+                logger.error(f"❌ Fallo al publicar Post {post.id}: No hay adaptador para plataforma: {post.platform}")
+                transitions.append(self._finish(db, post, ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE, retries))
+                continue
+
+            account = accounts.get((post.project_id, platform))
             if not account:
                 # Si no hay cuenta, pasamos a MODO MANUAL ASISTIDO
-                # En lugar de fallar, marcamos como listo para publicar manualmente
                 logger.info(f"ℹ️  Post {post.id}: No hay cuenta conectada. Cambiando a estado READY_MANUAL (Modo Manual Asistido).")
-                post.status = ContentStatus.READY_MANUAL
-                # Aquí se podría disparar una notificación (email/push) en el futuro
-                db.commit()
-                return
-
-            # 4. Publicar (Delegar al adaptador)
-            # Usamos el helper asyncio_run para ejecutar la corutina
-            result = asyncio_run(adapter.publish(post, account))
-            
-            # 5. Actualizar a PUBLISHED
-            post.status = ContentStatus.PUBLISHED_AUTO
-            post.published_at = datetime.utcnow()
+                transitions.append(self._finish(db, post, ContentStatus.READY_MANUAL, retries))
+                continue
+
+            to_publish.append((post, account))
+
+        if to_publish:
+            # Todas las publicaciones del lote corren concurrentes en el loop de larga vida
+            outcomes = publisher_runtime.run(self._publish_all(to_publish))
+            for (post, account), error in zip(to_publish, outcomes):
+                transitions.append(self._resolve_outcome(db, post, account, error, retries))
+
+        self._apply_transitions(db, transitions)
+
+    def _platform_enabled(self, platform: str) -> bool:
+        flag = FEATURE_FLAGS.get(platform)
+        return bool(getattr(settings, flag, False)) if flag else True
+
+    async def _publish_all(self, items: List[Tuple[Post, ConnectedAccount]]) -> List[Optional[Exception]]:
+        semaphores = {
+            platform: asyncio.Semaphore(max(1, settings.PUBLISH_CONCURRENCY_PER_PLATFORM))
+            for platform in {(post.platform or "").lower() for post, _ in items}
+        }
+        return await asyncio.gather(*[
+            self._publish_one(post, account, semaphores[(post.platform or "").lower()])
+            for post, account in items
+        ])
+
+    async def _publish_one(self, post: Post, account: ConnectedAccount, semaphore: asyncio.Semaphore) -> Optional[Exception]:
+        """Retorna None si se publicó, o la excepción del adaptador"""
+        platform = (post.platform or "").lower()
+        adapter = self.publishers[platform]
+        try:
+            async with semaphore:
+                await self.rate_limiter.acquire(platform, account.id)
+                result = await adapter.publish(post, account)
             # Si tuviéramos campo metadata, guardaríamos result['external_id']
-            
             logger.info(f"✅ Post {post.id} publicado correctamente.")
-            
+            return None
         except Exception as e:
-            logger.error(f"❌ Fallo al publicar Post {post.id}: {str(e)}")
-            post.status = ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE
-            # Podríamos guardar el error en una columna error_message si existiera
-            
-        finally:
-            db.commit()
-
-# Helper para ejecutar async en contexto sincrónico si es necesario
-def asyncio_run(coro):
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(coro)
+            return e
+
+    def _resolve_outcome(self, db: Session, post: Post, account: ConnectedAccount,
+                         error: Optional[Exception], retries: Dict[int, PublishRetry]) -> dict:
+        if error is None:
+            transition = self._finish(db, post, ContentStatus.PUBLISHED_AUTO, retries)
+            transition["published_at"] = datetime.utcnow()
+            return transition
+
+        platform = (post.platform or "").lower()
+        error = classify_publish_error(error)
+        retry = retries.get(post.id)
+        attempts = (retry.attempts if retry else 0) + 1
+
+        if isinstance(error, PermanentPublishError) or attempts >= settings.PUBLISH_MAX_ATTEMPTS:
+            logger.error(f"❌ Fallo {error.kind} al publicar Post {post.id} (intento {attempts}): {str(error)}")
+            return self._finish(db, post, ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE, retries)
+
+        if isinstance(error, RateLimitedPublishError) and error.retry_after:
+            self.rate_limiter.penalize(platform, None, error.retry_after)
+
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=self._backoff_seconds(attempts, error.retry_after))
+        if not retry:
+            retry = PublishRetry(
+                post_id=post.id,
+                platform=platform,
+                original_scheduled_for=post.scheduled_for
+            )
+            db.add(retry)
+        retry.account_id = account.id
+        retry.attempts = attempts
+        retry.next_attempt_at = next_attempt_at
+        retry.last_error = str(error)
+        retry.last_error_kind = error.kind
+
+        logger.warning(f"🔁 Post {post.id}: fallo {error.kind} (intento {attempts}/{settings.PUBLISH_MAX_ATTEMPTS}). Reintento a las {next_attempt_at.isoformat()}")
+        return {"id": post.id, "status": ContentStatus.RETRY_PENDING, "scheduled_for": next_attempt_at}
+
+    @staticmethod
+    def _backoff_seconds(attempts: int, retry_after: Optional[float] = None) -> float:
+        """Backoff exponencial con 'equal jitter'; respeta Retry-After si la plataforma lo envía"""
+        ceiling = min(settings.PUBLISH_RETRY_MAX_SECONDS, settings.PUBLISH_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        return max(delay, retry_after or 0.0)
+
+    def _finish(self, db: Session, post: Post, status: str, retries: Dict[int, PublishRetry]) -> dict:
+        """Estado terminal: el post sale de la cola de reintentos"""
+        retry = retries.pop(post.id, None)
+        if retry:
+            db.delete(retry)
+        return {"id": post.id, "status": status}
+
+    def _apply_transitions(self, db: Session, transitions: List[dict]):
+        """Bulk UPDATE por primary key: un executemany por forma de fila (+ cola de reintentos en la misma transacción)"""
+        if transitions:
+            by_shape: Dict[tuple, List[dict]] = {}
+            for t in transitions:
+                by_shape.setdefault(tuple(sorted(t.keys())), []).append(t)
+            for rows in by_shape.values():
+                db.execute(update(Post), rows)
+        db.commit()
@@ -8,6 +8,11 @@ from app.models.automation import CampaignAutomation
 from app.services.campaign_automation_service import CampaignAutomationService
 from app.services.autonomous_decision_service import AutonomousDecisionService
 from app.services.autonomy_policy import DecisionType
+from app.services.billing_service import BillingService
+from app.services.impact_retention_service import ImpactRetentionService
+from app.services.outbox_dispatcher import outbox_dispatcher
+from app.services.token_refresh_service import TokenRefreshService
+from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +37,38 @@ class SchedulerService:
                 name="Scan DB for due automation jobs",
                 replace_existing=True
             )
+            # Reconciliación del rollup mensual de gasto (Fase 7.3)
+            self._scheduler.add_job(
+                self._reconcile_billing_rollups,
+                trigger=IntervalTrigger(hours=6),
+                id="billing_rollup_reconciler",
+                name="Rebuild monthly spend rollups from billing events",
+                replace_existing=True
+            )
+            # Refresco proactivo de tokens OAuth (fuera del camino de publicación)
+            self._scheduler.add_job(
+                self._refresh_expiring_tokens,
+                trigger=IntervalTrigger(minutes=get_settings().TOKEN_REFRESH_INTERVAL_MINUTES),
+                id="token_refresh_manager",
+                name="Refresh OAuth tokens close to expiry",
+                replace_existing=True
+            )
+            # Limpieza de eventos del outbox ya entregados
+            self._scheduler.add_job(
+                self._purge_outbox,
+                trigger=IntervalTrigger(hours=1),
+                id="outbox_purger",
+                name="Purge dispatched outbox events past retention",
+                replace_existing=True
+            )
+            # Downsampling de snapshots de impacto (raw -> hour -> day)
+            self._scheduler.add_job(
+                self._compact_impact_metrics,
+                trigger=IntervalTrigger(hours=6),
+                id="impact_metric_compactor",
+                name="Downsample impact metric snapshots past retention",
+                replace_existing=True
+            )
             self._scheduler.start()
             logger.info("🚀 [Scheduler] Started background scheduler service")
 
@@ -41,6 +78,43 @@ class SchedulerService:
             self._scheduler.shutdown()
             logger.info("🛑 [Scheduler] Stopped background scheduler service")
 
+    def _reconcile_billing_rollups(self):
+        """Reconstruye los rollups de gasto mensual desde billing_events"""
+        db = SessionLocal()
+        try:
+            BillingService(db).reconcile_monthly_rollups()
+        except Exception as e:
+            logger.error(f"❌ [Scheduler] Billing rollup reconciliation failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _purge_outbox(self):
+        """Elimina eventos del outbox entregados hace más de OUTBOX_RETENTION_HOURS"""
+        try:
+            purged = outbox_dispatcher.purge_dispatched(get_settings().OUTBOX_RETENTION_HOURS)
+            if purged:
+                logger.info(f"🧹 [Scheduler] Purged {purged} dispatched outbox events")
+        except Exception as e:
+            logger.error(f"❌ [Scheduler] Outbox purge failed: {str(e)}")
+
+    def _compact_impact_metrics(self):
+        """Compacta snapshots de impacto antiguos en buckets horarios y diarios"""
+        db = SessionLocal()
+        try:
+            ImpactRetentionService(db).run()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ [Scheduler] Impact metric compaction failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _refresh_expiring_tokens(self):
+        """Refresca tokens de cuentas conectadas próximas a vencer"""
+        try:
+            TokenRefreshService().run_cycle()
+        except Exception as e:
+            logger.error(f"❌ [Scheduler] Token refresh failed: {str(e)}")
+
     def _scan_due_jobs(self):
         """Busca en DB automatizaciones vencidas y las ejecuta"""
         db = SessionLocal()
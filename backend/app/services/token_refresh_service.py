@@ -0,0 +1,130 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.core.security import decrypt_token, encrypt_token, token_cache
+from app.models.domain import ConnectedAccount
+from app.services.publisher_runtime import publisher_runtime
+from app.services.publishers.oauth_clients import LinkedInOAuthClient, OAuthRefreshClient, TokenRefreshError
+
+settings = get_settings()
+
+class TokenRefreshService:
+    """
+    Refresco proactivo de tokens OAuth.
+    Busca cuentas que vencen dentro de la ventana, refresca en paralelo contra el endpoint
+    OAuth de cada plataforma y re-cifra el resultado. Así el publish nunca paga un refresh.
+    """
+    def __init__(self, session_factory=SessionLocal, clients: Optional[Dict[str, OAuthRefreshClient]] = None,
+                 window_minutes: int = None, concurrency: int = None):
+        self.session_factory = session_factory
+        self.clients = clients if clients is not None else {"linkedin": LinkedInOAuthClient()}
+        self.window = timedelta(minutes=window_minutes or settings.TOKEN_REFRESH_WINDOW_MINUTES)
+        self.concurrency = concurrency or settings.TOKEN_REFRESH_CONCURRENCY
+
+    def run_cycle(self) -> dict:
+        """Ejecuta un escaneo + refresco. Retorna el resumen del ciclo."""
+        db = self.session_factory()
+        summary = {"due": 0, "refreshed": 0, "failed": 0, "revoked": 0, "skipped": 0}
+        try:
+            accounts = self._get_expiring_accounts(db)
+            summary["due"] = len(accounts)
+            if not accounts:
+                return summary
+
+            jobs: List[Tuple[ConnectedAccount, str]] = []
+            for account in accounts:
+                try:
+                    jobs.append((account, decrypt_token(account.refresh_token_encrypted)))
+                except Exception as e:
+                    logger.error(f"❌ [TokenRefresh] No se pudo descifrar refresh token de cuenta {account.id}: {e}")
+                    summary["failed"] += 1
+
+            results = publisher_runtime.run(self._refresh_all(jobs)) if jobs else []
+            changed_ids = []
+            for (account, _), result in zip(jobs, results):
+                outcome = self._apply_result(db, account, result)
+                summary[outcome] += 1
+                if outcome == "refreshed":
+                    changed_ids.append(account.id)
+            db.commit()
+
+            # Las entradas del token cache quedan obsoletas (cambió updated_at); se limpian ya
+            for account_id in changed_ids:
+                token_cache.invalidate_account(account_id)
+
+            logger.info(json.dumps({"event": "token_refresh_cycle", **summary}))
+            return summary
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ [TokenRefresh] Ciclo fallido: {str(e)}")
+            return summary
+        finally:
+            db.close()
+
+    def _get_expiring_accounts(self, db: Session) -> List[ConnectedAccount]:
+        threshold = datetime.utcnow() + self.window
+        return db.query(ConnectedAccount).filter(
+            ConnectedAccount.active == True,
+            ConnectedAccount.provider.in_(list(self.clients.keys())),
+            ConnectedAccount.refresh_token_encrypted.isnot(None),
+            ConnectedAccount.expires_at.isnot(None),
+            ConnectedAccount.expires_at <= threshold
+        ).all()
+
+    async def _refresh_all(self, jobs: List[Tuple[ConnectedAccount, str]]) -> list:
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _refresh(provider: str, refresh_token: str):
+            async with semaphore:
+                return await self.clients[provider].refresh(refresh_token)
+
+        return await asyncio.gather(
+            *[_refresh(account.provider, refresh_token) for account, refresh_token in jobs],
+            return_exceptions=True
+        )
+
+    def _apply_result(self, db: Session, account: ConnectedAccount, result) -> str:
+        now = datetime.utcnow()
+
+        if isinstance(result, TokenRefreshError) and result.permanent:
+            # Refresh token inválido: se descarta para no reintentar; el usuario debe reconectar
+            logger.warning(f"⚠️ [TokenRefresh] Cuenta {account.id} requiere reconexión: {result}")
+            db.execute(
+                update(ConnectedAccount)
+                .where(ConnectedAccount.id == account.id)
+                .values(refresh_token_encrypted=None, updated_at=now)
+            )
+            return "revoked"
+
+        if isinstance(result, Exception):
+            logger.error(f"❌ [TokenRefresh] Fallo al refrescar cuenta {account.id}: {result}")
+            return "failed"
+
+        values = {
+            "access_token_encrypted": encrypt_token(result["access_token"]),
+            "expires_at": now + timedelta(seconds=int(result.get("expires_in") or 3600 * 24 * 60)),
+            "updated_at": now
+        }
+        if result.get("refresh_token"):
+            values["refresh_token_encrypted"] = encrypt_token(result["refresh_token"])
+
+        # Optimistic concurrency: si otro proceso ya actualizó la cuenta, no pisamos su token
+        updated = db.execute(
+            update(ConnectedAccount)
+            .where(ConnectedAccount.id == account.id, ConnectedAccount.updated_at == account.updated_at)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            logger.info(f"ℹ️ [TokenRefresh] Cuenta {account.id} actualizada por otro proceso, se omite.")
+            return "skipped"
+
+        logger.info(f"🔑 [TokenRefresh] Cuenta {account.id} refrescada. Vence: {values['expires_at'].isoformat()}")
+        return "refreshed"
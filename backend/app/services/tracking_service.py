@@ -7,6 +7,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.repositories.tracking_repository import TrackingRepository
 from app.models.tracking import ContentTracking
+from app.services.outbox_dispatcher import outbox_dispatcher, EVENT_TRACKING_GENERATION
 
 class TrackingService:
     def __init__(self, db: Session):
@@ -21,6 +22,20 @@ class TrackingService:
         entry = ContentTracking(**data)
         return self.repo.create_entry(entry)
 
+    def enqueue_generation(self, data: dict) -> None:
+        """
+        Registra un contenido generado vía outbox, en la transacción en curso:
+        se persiste con el commit del caller (no hace commit).
+        Para callers que no necesitan el tracking_id.
+        """
+        outbox_dispatcher.emit(
+            self.db,
+            EVENT_TRACKING_GENERATION,
+            # El timestamp refleja el momento de la generación, no el de la entrega
+            {**data, "created_at": data.get("created_at") or datetime.utcnow()},
+            idempotency_key=data.get("correlation_id")
+        )
+
     def publish_content(self, content_id: int) -> ContentTracking:
         """
         Intenta publicar un contenido.
@@ -19,21 +19,19 @@ class VersioningService:
         if not original:
             raise HTTPException(status_code=404, detail="Content not found")
 
-        # Verificar si es la última versión para mantener secuencia limpia (opcional pero recomendado)
-        # En este diseño, permitimos ramificar desde cualquier punto, pero el version_number
-        # debería ser max(hermanos) + 1.
-        # Si usamos correlation_id para agrupar versiones, buscamos el max version_number de ese grupo.
-        
-        current_versions = self.repo.get_version_history(content_id)
-        max_version = max([v.version_number for v in current_versions]) if current_versions else original.version_number
-        next_version_num = max_version + 1
+        # Número de versión: contador por linaje (UPDATE atómico, bloqueado hasta el commit).
+        # Permite ramificar desde cualquier punto; el número siempre es único en el árbol.
+        root_id = self.repo.get_root_id(content_id)
+        next_version_num = self.repo.allocate_version(root_id)
+
+        # is_latest pasa a la nueva versión en la MISMA transacción
+        self.repo.clear_latest(root_id)
 
         # POLÍTICA FASE 8.3: Versiones previas quedan automáticamente archived.
         # Marcamos la original como archived si no lo está ya.
-        # Idealmente marcamos TODAS las previas, pero si seguimos el flujo lineal,
-        # basta con marcar la que estamos versionando (si era la activa).
         if original.status != "archived":
-            self.repo.update_status(original.tracking_id, "archived", notes="Archived due to new version creation")
+            original.status = "archived"
+            original.notes = "Archived due to new version creation"
 
         # Clonar objeto (manual copy para control explícito)
         new_version = ContentTracking(
@@ -55,6 +53,7 @@ class VersioningService:
             parent_content_id=content_id, # Apunta al que originó esta versión
             version_number=next_version_num,
             change_reason=change_reason,
+            is_latest=True,
             created_at=datetime.utcnow(),
 
             # Campos Modificables (Override con changes)
@@ -65,6 +64,7 @@ class VersioningService:
             owner=changes.get("owner", original.owner)
         )
 
+        # Commit único: contador, archivado, is_latest y nueva versión
         return self.repo.create_entry(new_version)
 
     def get_versions(self, content_id: int) -> List[ContentTracking]:
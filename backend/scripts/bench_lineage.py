@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base
+from app.models.tracking import ContentTracking
+from app.repositories.tracking_repository import TrackingRepository
+
+def _build_tree(db, shape: str, size: int) -> tuple:
+    """
+    deep: cadena v1 -> v2 -> ... -> v{size}
+    wide: raíz con size/10 hijos directos, cada uno con 9 versiones encadenadas
+    Devuelve (root_id, leaf_id).
+    """
+    base = {"user_id": "bench", "project_id": 1, "platform": "linkedin", "content_type": "text"}
+    root_id = db.execute(insert(ContentTracking).values(**base).returning(ContentTracking.tracking_id)).scalar_one()
+    version, leaf_id = 1, root_id
+    if shape == "deep":
+        for _ in range(size - 1):
+            version += 1
+            leaf_id = db.execute(insert(ContentTracking).values(
+                **base, parent_content_id=leaf_id, version_number=version
+            ).returning(ContentTracking.tracking_id)).scalar_one()
+    else:
+        for _ in range(size // 10):
+            parent_id = root_id
+            for _ in range(9):
+                version += 1
+                parent_id = leaf_id = db.execute(insert(ContentTracking).values(
+                    **base, parent_content_id=parent_id, version_number=version
+                ).returning(ContentTracking.tracking_id)).scalar_one()
+    db.commit()
+    return root_id, leaf_id
+
+def legacy_lineage(db, content_id: int) -> list:
+    """Recorrido previo a los CTE: una query por salto hacia arriba y por nivel hacia abajo"""
+    node = db.get(ContentTracking, content_id)
+    while node.parent_content_id:
+        node = db.get(ContentTracking, node.parent_content_id)
+    found, frontier = [node], [node.tracking_id]
+    while frontier:
+        children = db.query(ContentTracking).filter(ContentTracking.parent_content_id.in_(frontier)).all()
+        found.extend(children)
+        frontier = [c.tracking_id for c in children]
+    return found
+
+def legacy_direct_children(db, root_id: int) -> list:
+    """Consulta previa de PerformanceFeedbackService._analyze_content_lineage (solo 1 nivel)"""
+    return db.query(ContentTracking).filter(
+        (ContentTracking.tracking_id == root_id) | (ContentTracking.parent_content_id == root_id)
+    ).all()
+
+def _measure(engine, db, fn, repeat: int) -> tuple:
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", listener)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.expunge_all() # Sin identity map caliente: cada corrida va a la DB
+        rows = fn()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    event.remove(engine, "before_cursor_execute", listener)
+    return elapsed, len(statements) // repeat, len(rows)
+
+def bench_lineage(size: int = 500, repeat: int = 20):
+    """
+    Benchmark de consultas de linaje en árboles profundos y anchos (SQLite en memoria).
+    Uso: python scripts/bench_lineage.py [tamaño] [repeticiones]
+    """
+    print(f"🚀 Benchmark linaje de versiones (n={size}, repeticiones={repeat})\n")
+    print(f"{'árbol':<8}{'consulta':<26}{'ms':>10}{'queries':>10}{'filas':>8}")
+    for shape in ("deep", "wide"):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        root_id, leaf_id = _build_tree(db, shape, size)
+        repo = TrackingRepository(db)
+        cases = [
+            ("legacy 1 nivel (feedback)", lambda: legacy_direct_children(db, root_id)),
+            ("legacy recorrido N+1", lambda: legacy_lineage(db, leaf_id)),
+            ("CTE get_lineage", lambda: repo.get_lineage(leaf_id)),
+            ("CTE get_ancestors", lambda: repo.get_ancestors(leaf_id)),
+            ("CTE get_latest_version", lambda: [repo.get_latest_version(root_id)]),
+        ]
+        for name, fn in cases:
+            ms, queries, rows = _measure(engine, db, fn, repeat)
+            print(f"{shape:<8}{name:<26}{ms:>10.2f}{queries:>10}{rows:>8}")
+        db.close()
+
+if __name__ == "__main__":
+    bench_lineage(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    )
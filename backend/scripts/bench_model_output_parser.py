@@ -0,0 +1,49 @@
+import sys
+import os
+import re
+import json
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(__file__))
+
+from app.core.model_output import parse_model_json, JSON_BACKEND
+from model_output_corpus import CORPUS
+
+def legacy_parse(text: str) -> dict:
+    """Implementación previa de GuideOrchestratorService._parse_json (referencia)"""
+    import re
+    text = text.strip()
+    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    if json_match:
+        text = json_match.group(0)
+    text = re.sub(r',\s*([\]}])', r'\1', text)
+    return json.loads(text, strict=False)
+
+def _run(parser, raw):
+    try:
+        parser(raw)
+        return True
+    except Exception:
+        return False
+
+def bench_model_output_parser(number: int = 2000):
+    """
+    Micro-benchmark sobre el corpus: µs por parse y casos recuperados (legacy vs actual).
+    Uso: python scripts/bench_model_output_parser.py [iteraciones]
+    """
+    print(f"🚀 Benchmark parser JSON de salidas de modelo (backend: {JSON_BACKEND}, n={number})\n")
+    print(f"{'caso':<26}{'legacy µs':>12}{'nuevo µs':>12}{'legacy ok':>11}{'nuevo ok':>10}")
+    totals = [0.0, 0.0]
+    for name, raw, expected in CORPUS:
+        timings = []
+        for parser in (legacy_parse, parse_model_json):
+            seconds = timeit.timeit(lambda: _run(parser, raw), number=number)
+            timings.append(seconds / number * 1e6)
+        totals[0] += timings[0]
+        totals[1] += timings[1]
+        print(f"{name:<26}{timings[0]:>12.1f}{timings[1]:>12.1f}{str(_run(legacy_parse, raw)):>11}{str(_run(parse_model_json, raw)):>10}")
+    print(f"\n{'TOTAL':<26}{totals[0]:>12.1f}{totals[1]:>12.1f}")
+
+if __name__ == "__main__":
+    bench_model_output_parser(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
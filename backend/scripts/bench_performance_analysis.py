@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base
+from app.models.tracking import ContentTracking, ImpactMetric
+from app.repositories.impact_repository import ImpactRepository
+from app.services.impact_service import ImpactService
+from app.services.performance_analysis import PerformanceAnalysisService, compute_kpis, load_frame
+
+def _seed(db, contents: int, versions_every: int = 4):
+    """contents filas; cada `versions_every` una es versión de la anterior. 2 snapshots por contenido."""
+    rng = np.random.default_rng(7)
+    rows = []
+    for i in range(1, contents + 1):
+        is_version = i % versions_every == 0
+        rows.append({
+            "tracking_id": i, "user_id": "bench", "project_id": 1, "platform": "linkedin", "content_type": "text",
+            "parent_content_id": i - 1 if is_version else None, "version_number": 2 if is_version else 1,
+            "is_latest": not ((i + 1) % versions_every == 0)
+        })
+    db.execute(insert(ContentTracking), rows)
+    impressions = rng.integers(0, 20000, size=contents * 2)
+    clicks = (impressions * rng.uniform(0, 0.06, size=impressions.size)).astype(int)
+    reactions = (impressions * rng.uniform(0, 0.04, size=impressions.size)).astype(int)
+    db.execute(insert(ImpactMetric), [{
+        "tracking_id": (k % contents) + 1, "impressions": int(impressions[k]), "clicks": int(clicks[k]),
+        "reactions": int(reactions[k]), "comments": 0, "shares": 0
+    } for k in range(contents * 2)])
+    db.commit()
+
+def bench_performance_analysis(contents: int = 100_000, legacy_sample: int = 1000):
+    """
+    Benchmark del análisis de proyecto (SQLite en memoria).
+    Compara el loop por contenido (ImpactService.get_aggregated_metrics) con el motor vectorizado.
+    Uso: python scripts/bench_performance_analysis.py [contenidos] [muestra_legacy]
+    """
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    print(f"🚀 Benchmark análisis de rendimiento ({contents} contenidos, {contents * 2} snapshots)\n")
+    _seed(db, contents)
+
+    # Legacy: una query por contenido (medido sobre una muestra y extrapolado)
+    impact = ImpactService(db)
+    start = time.perf_counter()
+    for content_id in range(1, legacy_sample + 1):
+        impact.get_aggregated_metrics(content_id)
+    legacy_s = (time.perf_counter() - start) / legacy_sample * contents
+
+    start = time.perf_counter()
+    rows = ImpactRepository(db).get_latest_metrics(project_id=1)
+    query_s = time.perf_counter() - start
+    start = time.perf_counter()
+    frame = load_frame(rows)
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    kpis = compute_kpis(frame)
+    compute_s = time.perf_counter() - start
+    start = time.perf_counter()
+    report = PerformanceAnalysisService(db).suggest_improvements(1)
+    total_s = time.perf_counter() - start
+
+    print(f"{'etapa':<36}{'segundos':>10}")
+    print(f"{'legacy loop (extrapolado)':<36}{legacy_s:>10.2f}")
+    print(f"{'query (window function)':<36}{query_s:>10.3f}")
+    print(f"{'filas -> arrays NumPy':<36}{load_s:>10.3f}")
+    print(f"{'KPIs + flags vectorizados':<36}{compute_s:>10.4f}")
+    print(f"{'suggest_improvements (total)':<36}{total_s:>10.3f}")
+    print(f"\n📊 {report['regressions_total']} regresiones, {report['suggestions_total']} sugerencias")
+    db.close()
+
+if __name__ == "__main__":
+    bench_performance_analysis(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    )
@@ -0,0 +1,36 @@
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine, SessionLocal
+from app.models.billing import BillingEvent, MonthlySpendRollup
+from app.repositories.billing_repository import BillingRepository
+
+def migrate_billing_rollups():
+    """
+    Fase 7.3: Crea la tabla billing_monthly_rollups y la rellena
+    desde billing_events (todos los meses con actividad).
+    """
+    print("🚀 Iniciando migración Fase 7.3 (Monthly Spend Rollups)...")
+
+    MonthlySpendRollup.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'billing_monthly_rollups' disponible.")
+
+    db = SessionLocal()
+    try:
+        repo = BillingRepository(db)
+        timestamps = db.query(BillingEvent.timestamp).filter(BillingEvent.timestamp.isnot(None)).all()
+        months = sorted({(ts.year, ts.month) for (ts,) in timestamps})
+
+        for year, month in months:
+            written = repo.rebuild_monthly_rollups(datetime(year, month, 1).date())
+            print(f"   👉 {year:04d}-{month:02d}: {written} rollups reconstruidos")
+
+        print("✅ Migración Fase 7.3 completada con éxito.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_billing_rollups()
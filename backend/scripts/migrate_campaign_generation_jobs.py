@@ -0,0 +1,17 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.campaign_job import CampaignGenerationJob
+
+def migrate_campaign_generation_jobs():
+    """Crea campaign_generation_jobs (generación de borradores de campaña en background)"""
+    print("🚀 Iniciando migración (Campaign Generation Jobs)...")
+    CampaignGenerationJob.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'campaign_generation_jobs' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_campaign_generation_jobs()
@@ -0,0 +1,19 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.guide import GuideSession
+
+def migrate_guide_sessions():
+    """
+    Crea la tabla guide_sessions (estado server-side de la guía por guide_session_id).
+    """
+    print("🚀 Iniciando migración (Guide Session Store)...")
+    GuideSession.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'guide_sessions' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_guide_sessions()
@@ -0,0 +1,19 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.guide import GuideSummaryHistory
+
+def migrate_guide_summary_history():
+    """
+    Crea la tabla guide_summary_history (historial íntegro de resúmenes de la guía).
+    """
+    print("🚀 Iniciando migración (Guide Summary History)...")
+    GuideSummaryHistory.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'guide_summary_history' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_guide_summary_history()
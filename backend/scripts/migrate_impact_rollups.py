@@ -0,0 +1,30 @@
+import sys
+import os
+from sqlalchemy import text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.tracking import ImpactMetricRollup
+
+def migrate_impact_rollups():
+    """
+    1. Crea impact_metric_rollups (buckets hour/day de snapshots de impacto).
+    2. Índice (tracking_id, captured_at) en impact_metrics para historial y compactación.
+    La primera ejecución de ImpactRetentionService compacta el historial existente.
+    """
+    print("🚀 Iniciando migración (Impact Metric Rollups)...")
+
+    ImpactMetricRollup.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'impact_metric_rollups' disponible.")
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_impact_metrics_tracking_captured ON impact_metrics (tracking_id, captured_at)"
+        ))
+    print("   ✅ Índice 'ix_impact_metrics_tracking_captured' disponible.")
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_impact_rollups()
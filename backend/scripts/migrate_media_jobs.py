@@ -0,0 +1,17 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.media_job import MediaJob
+
+def migrate_media_jobs():
+    """Crea media_jobs (cola persistente de generación de imagen/video)"""
+    print("🚀 Iniciando migración (Media Jobs)...")
+    MediaJob.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'media_jobs' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_media_jobs()
@@ -0,0 +1,17 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.domain import MediaRendition
+
+def migrate_media_renditions():
+    """Crea media_renditions (derivados por plataforma, únicos por hash origen + spec)"""
+    print("🚀 Iniciando migración (Media Renditions)...")
+    MediaRendition.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'media_renditions' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_media_renditions()
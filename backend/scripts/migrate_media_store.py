@@ -0,0 +1,34 @@
+import sys
+import os
+from sqlalchemy import inspect, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+
+NEW_COLUMNS = {
+    "content_hash": "VARCHAR(64)",
+    "content_type": "VARCHAR",
+    "size_bytes": "INTEGER",
+    "storage_backend": "VARCHAR",
+    "created_at": "DATETIME"
+}
+
+def migrate_media_store():
+    """Agrega a media las columnas del media store (hash sha256, tipo, tamaño, backend) + índice por hash"""
+    print("🚀 Iniciando migración (Media Store)...")
+    columns = [c["name"] for c in inspect(engine).get_columns("media")]
+
+    with engine.begin() as conn:
+        for name, ddl in NEW_COLUMNS.items():
+            if name not in columns:
+                conn.execute(text(f"ALTER TABLE media ADD COLUMN {name} {ddl}"))
+                print(f"   ✅ Columna '{name}' añadida.")
+            else:
+                print(f"   ℹ️ '{name}' ya existe.")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_media_content_hash ON media (content_hash)"))
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_media_store()
@@ -0,0 +1,43 @@
+import sys
+import os
+from sqlalchemy import inspect, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+
+def migrate_media_usage_unique():
+    """
+    Restricción única (user_id, media_type, date) en media_usage.
+    Antes fusiona filas duplicadas del mismo día (suma los contadores en la fila más antigua).
+    """
+    print("🚀 Iniciando migración (Media Usage Unique)...")
+    if not inspect(engine).has_table("media_usage"):
+        print("   ℹ️ 'media_usage' no existe (se crea con la restricción).")
+        return
+
+    with engine.begin() as conn:
+        duplicates = conn.execute(text("""
+            SELECT user_id, media_type, date, MIN(id) AS keep_id, SUM(count) AS total
+            FROM media_usage
+            GROUP BY user_id, media_type, date
+            HAVING COUNT(*) > 1
+        """)).all()
+        for row in duplicates:
+            params = {"user_id": row.user_id, "media_type": row.media_type, "date": row.date, "keep_id": row.keep_id}
+            conn.execute(text("UPDATE media_usage SET count = :total WHERE id = :keep_id"),
+                         {"total": row.total, "keep_id": row.keep_id})
+            conn.execute(text("""
+                DELETE FROM media_usage
+                WHERE user_id = :user_id AND media_type = :media_type AND date = :date AND id <> :keep_id
+            """), params)
+        print(f"   ✅ {len(duplicates)} grupos duplicados fusionados.")
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_media_usage_user_type_date ON media_usage (user_id, media_type, date)"
+        ))
+        print("   ✅ Índice único 'uq_media_usage_user_type_date' creado.")
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_media_usage_unique()
@@ -0,0 +1,19 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.outbox import OutboxEvent
+
+def migrate_outbox():
+    """
+    Crea la tabla outbox_events (transactional outbox de tracking, billing y decisiones).
+    """
+    print("🚀 Iniciando migración (Transactional Outbox)...")
+    OutboxEvent.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'outbox_events' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_outbox()
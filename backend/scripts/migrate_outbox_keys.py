@@ -0,0 +1,32 @@
+import sys
+import os
+from sqlalchemy import inspect, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+
+# Tablas destino del outbox que guardan la clave del evento (entrega idempotente)
+TABLES = ("content_tracking", "autonomous_decision_logs")
+
+def migrate_outbox_keys():
+    """Agrega outbox_key (único) a las tablas destino de tracking y decisiones"""
+    print("🚀 Iniciando migración (Outbox Keys)...")
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for table in TABLES:
+            if not inspector.has_table(table):
+                print(f"   ℹ️ '{table}' no existe (se crea con la columna).")
+                continue
+            if "outbox_key" not in [c["name"] for c in inspector.get_columns(table)]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN outbox_key VARCHAR"))
+                print(f"   ✅ Columna '{table}.outbox_key' añadida.")
+            else:
+                print(f"   ℹ️ '{table}.outbox_key' ya existe.")
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_outbox_key ON {table} (outbox_key)"))
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_outbox_keys()
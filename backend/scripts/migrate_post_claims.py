@@ -0,0 +1,24 @@
+import sys
+import os
+from sqlalchemy import inspect, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+
+def migrate_post_claims():
+    """Agrega posts.claimed_at (lease del claim del scheduler)"""
+    print("🚀 Iniciando migración (Post Claims)...")
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        if "claimed_at" not in [c["name"] for c in inspector.get_columns("posts")]:
+            conn.execute(text("ALTER TABLE posts ADD COLUMN claimed_at DATETIME"))
+            print("   ✅ Columna 'posts.claimed_at' añadida.")
+        else:
+            print("   ℹ️ 'posts.claimed_at' ya existe.")
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_post_claims()
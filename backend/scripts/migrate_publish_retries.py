@@ -0,0 +1,20 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.publishing import PublishRetry
+
+def migrate_publish_retries():
+    """
+    Crea la tabla publish_retries (cola persistente de reintentos de publicación).
+    El estado RETRY_PENDING vive en posts.status (String), no requiere ALTER.
+    """
+    print("🚀 Iniciando migración (Publish Retry Queue)...")
+    PublishRetry.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'publish_retries' disponible.")
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_publish_retries()
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import inspect
+from app.core.database import engine
+from app.models.domain import FunctionalIdentity, Campaign, Post, ConnectedAccount
+
+def migrate_tenant_indexes():
+    """
+    Multi-tenant: índices por project_id para que las lecturas acotadas al tenant
+    (identidades, campañas, posts, cuentas) no escaneen la tabla completa.
+    """
+    print("🚀 Iniciando migración (Tenant Indexes)...")
+
+    inspector = inspect(engine)
+    for model in (FunctionalIdentity, Campaign, Post, ConnectedAccount):
+        table = model.__table__
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if "project_id" not in index.columns:
+                continue
+            if index.name in existing:
+                print(f"   ✅ Índice '{index.name}' ya existe.")
+                continue
+            print(f"   👉 Creando índice '{index.name}'...")
+            index.create(bind=engine)
+
+    print("✅ Migración Tenant Indexes completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_tenant_indexes()
@@ -0,0 +1,69 @@
+import sys
+import os
+from collections import defaultdict
+from sqlalchemy import bindparam, inspect, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import engine
+from app.models.tracking import ContentVersionCounter
+
+# Raíz de cada fila del árbol de versiones
+LINEAGE_SQL = """
+WITH RECURSIVE tree(tracking_id, root_id) AS (
+    SELECT tracking_id, tracking_id FROM content_tracking WHERE parent_content_id IS NULL
+    UNION ALL
+    SELECT c.tracking_id, t.root_id FROM content_tracking c JOIN tree t ON c.parent_content_id = t.tracking_id
+)
+SELECT t.root_id, c.tracking_id, c.version_number
+FROM tree t JOIN content_tracking c ON c.tracking_id = t.tracking_id
+"""
+
+def migrate_version_counters():
+    """
+    1. Agrega content_tracking.is_latest (+ índice).
+    2. Crea content_version_counters.
+    3. Backfill: is_latest solo en la versión más alta de cada linaje y contador = max(version_number).
+    """
+    print("🚀 Iniciando migración (Version Counters / is_latest)...")
+    columns = [c["name"] for c in inspect(engine).get_columns("content_tracking")]
+
+    with engine.begin() as conn:
+        if "is_latest" not in columns:
+            conn.execute(text("ALTER TABLE content_tracking ADD COLUMN is_latest BOOLEAN NOT NULL DEFAULT TRUE"))
+            print("   ✅ Columna 'is_latest' añadida.")
+        else:
+            print("   ℹ️ 'is_latest' ya existe.")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_content_tracking_is_latest ON content_tracking (is_latest)"))
+
+    ContentVersionCounter.__table__.create(bind=engine, checkfirst=True)
+    print("   ✅ Tabla 'content_version_counters' disponible.")
+
+    with engine.begin() as conn:
+        lineages = defaultdict(list)
+        for root_id, tracking_id, version_number in conn.execute(text(LINEAGE_SQL)):
+            lineages[root_id].append((version_number or 1, tracking_id))
+
+        superseded = []
+        counters = []
+        for root_id, versions in lineages.items():
+            latest = max(versions)
+            superseded.extend(tracking_id for _, tracking_id in versions if tracking_id != latest[1])
+            if len(versions) > 1:
+                counters.append({"root_content_id": root_id, "last_version": latest[0]})
+
+        for i in range(0, len(superseded), 500):
+            conn.execute(
+                text("UPDATE content_tracking SET is_latest = FALSE WHERE tracking_id IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+                {"ids": superseded[i:i + 500]}
+            )
+        conn.execute(text("DELETE FROM content_version_counters"))
+        if counters:
+            conn.execute(ContentVersionCounter.__table__.insert(), counters)
+        print(f"   ✅ Backfill: {len(lineages)} linajes, {len(superseded)} versiones no vigentes, {len(counters)} contadores.")
+
+    print("✅ Migración completada con éxito.")
+
+if __name__ == "__main__":
+    migrate_version_counters()
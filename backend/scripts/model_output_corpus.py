@@ -0,0 +1,25 @@
+"""
+Corpus de respuestas reales (anonimizadas) de proveedores para el parser de JSON.
+Cada caso: (nombre, respuesta_raw, claves esperadas | None si debe fallar).
+Usado por test_model_output_parser.py y bench_model_output_parser.py.
+"""
+
+GUIDE_REPLY = '{"message": "Vamos por partes. ¿Qué necesitas ahora?", "options": [{"label": "Ventas", "value": "ventas"}], "state_patch": {"objective": "ventas"}, "updated_summary": "Inicio"}'
+
+CORPUS = [
+    ("clean", GUIDE_REPLY, ["message", "options", "state_patch"]),
+    ("fenced", "```json\n" + GUIDE_REPLY + "\n```", ["message", "state_patch"]),
+    ("fenced_uppercase_prose", "Claro, aquí está:\n```JSON\n" + GUIDE_REPLY + "\n```\nAvísame si quieres ajustar algo.", ["message"]),
+    ("trailing_commas", '{"message": "Hola", "options": [{"label": "A", "value": "a"},], "state_patch": {"tone": "cercano",},}', ["message", "options", "state_patch"]),
+    ("braces_in_strings", '{"message": "Usa {nombre} y } sueltas en el copy", "state_patch": {}}', ["message", "state_patch"]),
+    ("commas_in_strings", '{"message": "Listas: a, ] b, } c", "state_patch": {}}', ["message"]),
+    ("escaped_quotes", '{"message": "Dijo \\"hola, }\\" y se fue", "state_patch": {}}', ["message"]),
+    ("raw_newlines", '{"title": "Post", "content": "Línea 1\nLínea 2\n\n#tag", "hashtags": ["#a"], "cta": "Ver más", "platform": "linkedin"}', ["title", "content"]),
+    ("prose_with_braces_first", "Según la plantilla {campo} te propongo:\n" + GUIDE_REPLY, ["message"]),
+    ("two_objects", GUIDE_REPLY + "\n\nAlternativa:\n" + '{"message": "Otra", "state_patch": {}}', ["message", "updated_summary"]),
+    ("nested_post", '```json\n{"title": "Hoja de ruta", "content": "Texto", "hashtags": ["#ia", "#salud"], "cta": "Comenta", "platform": "linkedin", "meta": {"score": [1, 2, {"x": 3}]}}\n```', ["title", "meta"]),
+    ("large_content", '{"title": "Largo", "content": "' + ("Párrafo con {llaves} y, comas. " * 800) + '", "hashtags": [], "cta": "", "platform": "x"}', ["title", "content"]),
+    ("truncated", '{"message": "Respuesta cortada por max_tokens", "options": [{"label": "A"', None),
+    ("no_json", "Lo siento, no puedo ayudar con eso.", None),
+    ("empty", "", None),
+]
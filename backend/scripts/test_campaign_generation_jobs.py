@@ -0,0 +1,178 @@
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.api import campaigns as campaigns_api
+from app.core.database import get_db
+from app.models.campaign_job import CampaignGenerationJob
+from app.models.domain import Base, Campaign, ContentStatus, Post, Project
+from app.models.tracking import ContentTracking
+from app.services.campaign_generation_worker import CampaignGenerationWorker
+
+class GatedGenerator:
+    """Generador de prueba: se detiene tras `pause_after` posts hasta abrir la compuerta; "x" falla"""
+    def __init__(self, pause_after: int = None, failing: set = ()):
+        self.pause_after = pause_after
+        self.failing = set(failing)
+        self.gate = threading.Event()
+        self.calls = 0
+
+    async def iter_posts(self, campaign, count: int = 1, platform: str = "linkedin"):
+        for i in range(count):
+            if self.pause_after is not None and self.calls >= self.pause_after:
+                while not self.gate.is_set():
+                    await asyncio.sleep(0.01)
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            if self.calls in self.failing:
+                yield None
+                continue
+            yield {"title": f"Post {self.calls}", "content": f"Body {self.calls}", "hashtags": ["#ia"],
+                   "cta": "Leer más", "platform": platform}
+
+def test_campaign_generation_jobs():
+    print("\n🚀 [QA Campaign Jobs] Starting Background Campaign Generation Verification...\n")
+    # Archivo temporal: el worker usa conexiones propias desde otros hilos
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    project = Project(name="QA Campaign Jobs")
+    db.add(project)
+    db.flush()
+    campaign = Campaign(project_id=project.id, name="Lanzamiento", objective="Vender", tone="Cercano")
+    db.add(campaign)
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(campaigns_api.router, prefix="/campaigns")
+
+    def override_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_db
+    client = TestClient(app)
+    generator = GatedGenerator(pause_after=2, failing={4})
+    worker = CampaignGenerationWorker(session_factory=TestingSessionLocal, max_workers=2, generator=generator)
+
+    def job(job_id: str) -> CampaignGenerationJob:
+        db.expire_all()
+        return db.get(CampaignGenerationJob, job_id)
+
+    try:
+        # TEST 1: El request solo encola
+        print("👉 TEST 1: Generate returns a queued job immediately...")
+        url = f"/campaigns/{campaign.id}/generate"
+        response = client.post(url, json={"count": 5, "platform": "linkedin"}, headers={"Idempotency-Key": "click-1"})
+        assert response.status_code == 202, response.text
+        data = response.json()
+        assert data["status"] == "queued" and data["requested"] == 5 and data["completed"] == 0
+        assert generator.calls == 0 and db.query(Post).count() == 0
+        print(f"   ✅ 202 with job {data['id'][:8]}..., no AI calls in the request")
+
+        # TEST 2: Idempotency-Key
+        print("\n👉 TEST 2: Retries with the same Idempotency-Key reuse the job...")
+        retry = client.post(url, json={"count": 5, "platform": "linkedin"}, headers={"Idempotency-Key": "click-1"})
+        assert retry.status_code == 200 and retry.json()["id"] == data["id"]
+        assert client.post(url, json={"count": 9}, headers={"Idempotency-Key": "click-1"}).status_code == 409
+        assert client.post(url, json={"count": 0}).status_code == 400
+        assert client.post(url, json={"count": None}).status_code == 422
+        assert client.post(url, json={"count": "many"}).status_code == 422
+        assert client.post("/campaigns/999999/generate", json={"count": 1}).status_code == 404
+        assert db.query(CampaignGenerationJob).count() == 1
+        print("   ✅ Same job (200), conflicting params 409, invalid count 400, malformed count 422")
+
+        # TEST 3: Progreso parcial visible
+        print("\n👉 TEST 3: Drafts and progress are visible while the job runs...")
+        assert worker.dispatch() == 1
+        status_url = f"/campaigns/{campaign.id}/generation-jobs/{data['id']}"
+        deadline = time.time() + 5
+        while time.time() < deadline and client.get(status_url).json()["completed"] < 2:
+            time.sleep(0.02)
+        partial = client.get(status_url).json()
+        assert partial["status"] == "running" and partial["completed"] == 2
+        drafts = db.query(Post).filter(Post.campaign_id == campaign.id).all()
+        assert len(drafts) == 2 and {p.status for p in drafts} == {ContentStatus.PENDING}
+        assert sorted(partial["post_ids"]) == sorted(p.id for p in drafts)
+        print("   ✅ 2/5 drafts committed while running")
+
+        # TEST 4: Finaliza con contadores y tracking
+        print("\n👉 TEST 4: Job completes with counters and tracking...")
+        generator.gate.set()
+        worker.drain()
+        final = client.get(status_url).json()
+        assert final["status"] == "succeeded" and final["completed"] == 4 and final["failed"] == 1
+        assert len(final["post_ids"]) == 4 and final["finished_at"]
+        assert db.query(Post).filter(Post.campaign_id == campaign.id).count() == 4
+        assert db.query(ContentTracking).count() == 4
+        assert client.get(f"/campaigns/{campaign.id}/generation-jobs/nope").status_code == 404
+        print("   ✅ succeeded: 4 drafts, 1 failed attempt, 4 tracking entries")
+
+        # TEST 5: Huérfano se retoma desde su progreso
+        print("\n👉 TEST 5: Stale running job resumes from its committed progress...")
+        old = datetime.utcnow() - timedelta(hours=1)
+        db.add(CampaignGenerationJob(id="orphan", campaign_id=campaign.id, platform="linkedin", requested=3,
+                                     completed=2, failed=0, post_ids=[1, 2], status="running", attempts=1,
+                                     started_at=old, updated_at=old))
+        db.add(CampaignGenerationJob(id="dead", campaign_id=campaign.id, platform="linkedin", requested=3,
+                                     status="running", attempts=3, post_ids=[], started_at=old, updated_at=old))
+        db.commit()
+        calls_before = generator.calls
+        worker.drain()
+        orphan, dead = job("orphan"), job("dead")
+        assert orphan.status == "succeeded" and orphan.completed == 3 and orphan.attempts == 2
+        assert generator.calls - calls_before == 1
+        assert dead.status == "failed" and "Timed out" in dead.error
+        print("   ✅ Requeued job generated only the missing post; exhausted job failed")
+
+        # TEST 6: Sin borradores -> failed
+        print("\n👉 TEST 6: A job with no drafts fails...")
+        failing = CampaignGenerationWorker(session_factory=TestingSessionLocal,
+                                           generator=GatedGenerator(failing={1, 2}))
+        response = client.post(url, json={"count": 2})
+        failing.drain()
+        failed = job(response.json()["id"])
+        assert failed.status == "failed" and failed.failed == 2 and "no drafts" in failed.error
+        print("   ✅ failed with error, nothing committed")
+
+        # TEST 7: Hilo de fondo
+        print("\n👉 TEST 7: Background worker picks up new jobs...")
+        worker.poll_interval = 0.05
+        worker.start()
+        job_id = client.post(url, json={"count": 1}).json()["id"]
+        deadline = time.time() + 5
+        while time.time() < deadline and job(job_id).status != "succeeded":
+            time.sleep(0.05)
+        assert job(job_id).status == "succeeded"
+        worker.stop()
+        assert not worker.is_running
+        print("   ✅ Job executed by the running worker")
+
+        print("\n🏁 [QA Campaign Jobs] All Tests Passed Successfully!")
+    finally:
+        generator.gate.set()
+        worker.stop()
+        db.close()
+        engine.dispose()
+        os.remove(path)
+
+if __name__ == "__main__":
+    test_campaign_generation_jobs()
@@ -14,7 +14,7 @@ class ConfigurableMockAI:
     def __init__(self):
         self.mode = "normal" # normal, invalid_json, missing_fields, timeout
 
-    async def generate(self, prompt):
+    async def generate(self, prompt, **kwargs):
         if self.mode == "normal":
             return json.dumps({
                 "message": "Valid response",
@@ -0,0 +1,140 @@
+import sys
+import os
+import json
+import asyncio
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base, FunctionalIdentity, Project
+from app.models.guide import GuideSession
+from app.schemas.auth import TenantContext
+from app.schemas.guide import GuideNextRequest, GuideMode, GuideState
+from app.services.guide_orchestrator import GuideOrchestratorService
+from app.services.guide_session_store import GuideSessionStore, guide_session_store
+from app.services.identity_catalog import identity_catalog
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class ScriptedAI:
+    """IA simulada para el modo colaborador: un patch distinto por turno"""
+    def __init__(self):
+        self.turn = 0
+        self.prompts = []
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.turn += 1
+        self.prompts.append(prompt)
+        patch = {1: {"objective": "Captar pacientes"}, 2: {"audience": "Adultos 40+"}}.get(self.turn, {})
+        return json.dumps({"message": f"Turno {self.turn}", "options": [], "state_patch": patch,
+                           "updated_summary": f"Resumen turno {self.turn}"})
+
+def test_guide_session_store():
+    print("\n🚀 [QA Guide Session Store] Starting Server-Side Session Verification...\n")
+
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    guide_session_store.clear()
+    identity_catalog.clear()
+
+    state_reads = []
+    def count_reads(conn, cursor, statement, *args):
+        if "guide_sessions.state_json" in statement:
+            state_reads.append(statement)
+    event.listen(engine, "before_cursor_execute", count_reads)
+
+    try:
+        project, other = Project(name="Session A"), Project(name="Session B")
+        db.add_all([project, other])
+        db.commit()
+
+        # TEST 1: Save/load con LRU validado por versión
+        print("👉 TEST 1: Write-through save and cached load...")
+        store = GuideSessionStore(max_entries=10)
+        state = GuideState(step=1, objective="Vender")
+        assert store.save(db, "s1", project.id, state, 2, GuideMode.EXPERT) == 1
+        state_reads.clear()
+        entry = store.load(db, "s1", project.id)
+        assert entry.state.objective == "Vender" and entry.current_step == 2 and entry.mode == "expert"
+        assert state_reads == [], "LRU hit only checks the version column"
+        entry.state.objective = "Mutado"
+        assert store.load(db, "s1", project.id).state.objective == "Vender", "Callers get private copies"
+        print("   ✅ Cached load without re-parsing state")
+
+        # TEST 2: Otro worker avanzó la sesión -> recarga desde DB
+        print("\n👉 TEST 2: Cross-device resume reloads newer versions...")
+        other_worker = GuideSessionStore(max_entries=10)
+        other_worker.save(db, "s1", project.id, GuideState(step=3, objective="Vender", audience="Pymes"), 3)
+        state_reads.clear()
+        entry = store.load(db, "s1", project.id)
+        assert entry.version == 2 and entry.state.audience == "Pymes" and len(state_reads) == 1
+        assert store.load(db, "s1", other.id) is None, "Sessions are scoped to their project"
+        assert other_worker.save(db, "s1", other.id, GuideState(step=1), 1) == 2, "Foreign project cannot overwrite"
+        print("   ✅ Stale cache refreshed, tenants isolated")
+
+        # TEST 3: apply_patch replica el merge del frontend
+        print("\n👉 TEST 3: Server-side patch merge...")
+        merged = GuideSessionStore.apply_patch(GuideState(step=1, tone="Formal"), {"platform": ["LinkedIn", "X"], "ignored": 1}, 4)
+        assert merged.step == 4 and merged.platform == "LinkedIn, X" and merged.tone == "Formal"
+        print("   ✅ {...state, ...patch, step}")
+
+        # TEST 4: El cliente envía solo deltas; el orquestador aplica los patches
+        print("\n👉 TEST 4: Delta-only requests through the orchestrator...")
+        service = GuideOrchestratorService()
+        service.ai_service = ScriptedAI()
+        tenant = TenantContext(project_id=project.id)
+        first = asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.COLLABORATOR, user_input="Soy médico"), db, tenant=tenant))
+        session_id = first.guide_session_id
+        assert session_id, "Server assigns a session id"
+        asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.COLLABORATOR, user_input="Adultos", guide_session_id=session_id),
+            db, tenant=tenant))
+        assert '"objective":"Captar pacientes"' in service.ai_service.prompts[1], "Turn 2 sees turn 1 patch"
+        resumed = guide_session_store.load(db, session_id, project.id)
+        assert resumed.state.objective == "Captar pacientes" and resumed.state.audience == "Adultos 40+"
+        assert resumed.state.conversation_summary == "Resumen turno 2" and resumed.version == 2
+        row = db.query(GuideSession).filter_by(guide_session_id=session_id).one()
+        assert row.project_id == project.id and row.mode == "collaborator"
+        print(f"   ✅ Session {session_id[:8]}… resumed at version {resumed.version}")
+
+        # TEST 5: La identidad elegida viaja como id; la edición arma el borrador server-side
+        print("\n👉 TEST 5: identity_id without client state...")
+        voice = FunctionalIdentity(project_id=project.id, name="Voz Clínica", tone="Cercano",
+                                   preferred_platforms='["linkedin"]', status="active")
+        foreign = FunctionalIdentity(project_id=other.id, name="Voz Ajena", status="active")
+        db.add_all([voice, foreign])
+        db.commit()
+        asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.COLLABORATOR, user_input="Sigo",
+                             guide_session_id=session_id, identity_id=str(voice.id)), db, tenant=tenant))
+        assert guide_session_store.load(db, session_id, project.id).state.identity_id == str(voice.id)
+        asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.COLLABORATOR, user_input="Sin identidad",
+                             guide_session_id=session_id, identity_id=""), db, tenant=tenant))
+        assert guide_session_store.load(db, session_id, project.id).state.identity_id is None
+
+        edit = asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.IDENTITY_CREATION, guide_session_id="edit-1",
+                             identity_id=str(voice.id)), db, tenant=tenant))
+        draft = guide_session_store.load(db, "edit-1", project.id).state.identity_draft
+        assert draft.name == "Voz Clínica" and draft.tone == "Cercano" and draft.platforms == ["linkedin"]
+        assert edit.state_patch["identity_draft"]["name"] == "Voz Clínica"
+        asyncio.run(service.process_next_step(
+            GuideNextRequest(current_step=1, mode=GuideMode.IDENTITY_CREATION, guide_session_id="edit-2",
+                             identity_id=str(foreign.id)), db, tenant=tenant))
+        assert guide_session_store.load(db, "edit-2", project.id).state.identity_draft.name is None
+        print("   ✅ Selector applied and cleared server-side, edit draft seeded only from own identities")
+
+        print("\n🏁 [QA Guide Session Store] All Tests Passed Successfully!")
+    finally:
+        event.remove(engine, "before_cursor_execute", count_reads)
+        guide_session_store.clear()
+        db.close()
+
+if __name__ == "__main__":
+    test_guide_session_store()
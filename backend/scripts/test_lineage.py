@@ -0,0 +1,72 @@
+import sys
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base
+from app.models.tracking import ContentTracking
+from app.repositories.tracking_repository import TrackingRepository
+from app.services.versioning_service import VersioningService
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def test_lineage():
+    print("\n🚀 [QA Lineage] Starting Recursive Lineage Verification...\n")
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    statements = []
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count_statements)
+
+    try:
+        # Árbol sin correlation_id compartido:
+        # v1 -> v2 -> v3 -> v5
+        #          \\-> v4 (rama desde v2)
+        root = ContentTracking(user_id="qa", project_id=1, platform="linkedin", content_type="text")
+        db.add(root)
+        db.commit()
+        versioner = VersioningService(db)
+        v2 = versioner.create_version(root.tracking_id, {}, "edit")
+        v3 = versioner.create_version(v2.tracking_id, {}, "edit")
+        v4 = versioner.create_version(v2.tracking_id, {}, "branch")
+        v5 = versioner.create_version(v3.tracking_id, {}, "edit")
+        assert [v.version_number for v in (v2, v3, v4, v5)] == [2, 3, 4, 5], "Numbering must follow the whole tree"
+        repo = TrackingRepository(db)
+
+        # TEST 1: Historial completo desde cualquier nodo, en una query
+        print("👉 TEST 1: Full lineage from any node...")
+        for node_id in (root.tracking_id, v3.tracking_id, v5.tracking_id):
+            statements.clear()
+            history = repo.get_version_history(node_id)
+            assert [v.version_number for v in history] == [1, 2, 3, 4, 5]
+            assert len(statements) == 1, f"Expected 1 statement, got {len(statements)}"
+        print("   ✅ 5 versions, 1 statement each")
+
+        # TEST 2: Ancestros y descendientes a cualquier profundidad
+        print("\n👉 TEST 2: Ancestors / descendants...")
+        assert [v.version_number for v in repo.get_ancestors(v5.tracking_id)] == [1, 2, 3]
+        assert [v.version_number for v in repo.get_descendants(v2.tracking_id)] == [3, 4, 5]
+        assert repo.get_descendants(v4.tracking_id) == []
+        print("   ✅ v5 ancestors [1,2,3], v2 descendants [3,4,5]")
+
+        # TEST 3: Última versión
+        print("\n👉 TEST 3: Latest version...")
+        assert repo.get_latest_version(v4.tracking_id).tracking_id == v5.tracking_id
+        assert repo.is_latest_version(v5.tracking_id) and not repo.is_latest_version(v3.tracking_id)
+        assert not repo.is_latest_version(999999) and repo.get_version_history(999999) == []
+        print("   ✅ Latest is V5 from any branch")
+
+        print("\n🏁 [QA Lineage] All Tests Passed Successfully!")
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statements)
+        db.close()
+
+if __name__ == "__main__":
+    test_lineage()
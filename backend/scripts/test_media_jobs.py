@@ -0,0 +1,255 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.api import media as media_api
+from app.api.deps import get_current_principal
+from app.core.database import get_db
+from app.models.domain import Base, MediaUsage
+from app.models.billing import BillingEvent
+from app.models.media_job import MediaJob
+from app.repositories.usage_repository import UsageRepository
+from app.schemas.auth import Principal
+from app.services.capability_resolver import CapabilityResolverService
+from app.services.media_job_service import MediaJobService
+from app.services.media_job_worker import MediaJobWorker
+
+class SlowProvider:
+    """Provider de prueba: mide concurrencia; el prompt "boom" falla"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, prompt: str, resolution: str = "standard", duration: int = 0) -> dict:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.1)
+            if prompt == "boom":
+                raise RuntimeError("provider exploded")
+            return {"job_id": prompt, "url": f"https://mock-storage/{prompt}.png", "provider": "mock"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def test_media_jobs():
+    print("\n🚀 [QA Media Jobs] Starting Async Media Queue Verification...\n")
+    # Archivo temporal: el pool de workers usa conexiones propias (concurrencia real en SQLite)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    provider = SlowProvider()
+    webhooks = []
+    flaky = {"failures": 1}
+
+    def webhook_sender(url: str, payload: dict, timeout: float):
+        if flaky["failures"]:
+            flaky["failures"] -= 1
+            raise ConnectionError("receiver down")
+        webhooks.append((url, payload))
+
+    worker = MediaJobWorker(
+        session_factory=TestingSessionLocal, max_workers=8, provider_concurrency={"mock": 2},
+        provider_factory=lambda media_type, name: provider, webhook_sender=webhook_sender
+    )
+    service = MediaJobService(db, capability_service=CapabilityResolverService(), worker=worker)
+
+    def usage(user_id: str) -> int:
+        db.expire_all()
+        row = db.query(MediaUsage).filter_by(user_id=user_id, media_type="image").first()
+        return row.count if row else 0
+
+    try:
+        # TEST 1: Encolar no ejecuta el provider
+        print("👉 TEST 1: Enqueue returns immediately with a reservation...")
+        started = time.perf_counter()
+        jobs = [service.enqueue("qa-edit", "editorial", "image", {"prompt": f"p{i}"}) for i in range(5)]
+        assert time.perf_counter() - started < 0.5 and provider.peak == 0
+        assert {j.status for j in jobs} == {"queued"} and usage("qa-edit") == 5
+        print("   ✅ 5 jobs queued, 5 quota units reserved, provider not called")
+
+        # TEST 2: Pool con límite por provider
+        print("\n👉 TEST 2: Worker pool respects per-provider concurrency...")
+        assert worker.drain() == 5
+        db.expire_all()
+        assert {db.get(MediaJob, j.id).status for j in jobs} == {"succeeded"}
+        assert provider.peak == 2
+        assert db.query(BillingEvent).filter(BillingEvent.user_id == "qa-edit").count() == 5
+        done = db.get(MediaJob, jobs[0].id)
+        assert done.result["url"].endswith("p0.png") and done.attempts == 1 and done.finished_at
+        print(f"   ✅ All succeeded, peak concurrency {provider.peak}, billed once each")
+
+        # TEST 3: Cuota agotada al encolar (sin job ni reserva)
+        print("\n👉 TEST 3: Quota checked and reserved at enqueue time...")
+        for i in range(3):
+            service.enqueue("qa-strict", "strict", "image", {"prompt": f"s{i}"})
+        try:
+            service.enqueue("qa-strict", "strict", "image", {"prompt": "s3"})
+            assert False, "Expected PermissionError"
+        except PermissionError:
+            pass
+        try:
+            service.enqueue("qa-strict", "strict", "video", {"prompt": "v", "duration": 5})
+            assert False, "Expected PermissionError"
+        except PermissionError:
+            pass
+        assert usage("qa-strict") == 3 and db.query(MediaJob).filter_by(user_id="qa-strict").count() == 3
+        worker.drain()
+        print("   ✅ 4th image and disabled video rejected before queueing")
+
+        # TEST 4: Fallo del provider -> rollback de la reserva + webhook
+        print("\n👉 TEST 4: Provider failure releases the reservation and notifies...")
+        failed = service.enqueue("qa-fail", "editorial", "image", {"prompt": "boom"},
+                                 webhook_url="https://hooks.example/media")
+        assert usage("qa-fail") == 1
+        worker.drain()
+        db.expire_all()
+        failed = db.get(MediaJob, failed.id)
+        assert failed.status == "failed" and "exploded" in failed.error and usage("qa-fail") == 0
+        assert failed.webhook_status == "delivered" and failed.webhook_attempts == 2
+        assert webhooks == [("https://hooks.example/media", webhooks[0][1])] and webhooks[0][1]["status"] == "failed"
+        assert db.query(BillingEvent).filter(BillingEvent.user_id == "qa-fail").count() == 0
+        print("   ✅ Quota unit returned, not billed, webhook delivered on retry")
+
+        # TEST 5: El costo reservado de jobs en curso cuenta contra el presupuesto
+        print("\n👉 TEST 5: Budget includes reserved cost of in-flight jobs...")
+        db.add(MediaJob(id="in-flight", user_id="qa-budget", plan="strict", media_type="image", provider="mock",
+                        params={"prompt": "x"}, status="queued", reserved_cost=0.04))
+        db.commit()
+        try:
+            service.enqueue("qa-budget", "strict", "image", {"prompt": "over"})
+            assert False, "Expected HTTPException 402"
+        except HTTPException as e:
+            assert e.status_code == 402
+        assert usage("qa-budget") == 0 and db.query(MediaJob).filter_by(user_id="qa-budget").count() == 1
+        db.delete(db.get(MediaJob, "in-flight"))
+        # El costo del propio job también cuenta: $19.97 en curso + $0.04 supera los $20 de "pro"
+        db.add(MediaJob(id="near-limit", user_id="qa-edge", plan="pro", media_type="image", provider="mock",
+                        params={"prompt": "x"}, status="queued", reserved_cost=19.97))
+        db.commit()
+        try:
+            service.enqueue("qa-edge", "pro", "image", {"prompt": "over"})
+            assert False, "Expected HTTPException 402"
+        except HTTPException as e:
+            assert e.status_code == 402
+        assert usage("qa-edge") == 0
+        db.delete(db.get(MediaJob, "near-limit"))
+        db.commit()
+        print("   ✅ Blocked with 402 (in-flight and own estimate), reservation rolled back")
+
+        # TEST 6: Jobs huérfanos (worker caído) se reencolan y luego fallan
+        print("\n👉 TEST 6: Stale running jobs are recovered...")
+        old = datetime.utcnow() - timedelta(hours=1)
+        db.add_all([
+            MediaJob(id="orphan-retry", user_id="qa-edit", plan="editorial", media_type="image", provider="mock",
+                     params={"prompt": "retry"}, status="running", attempts=1, started_at=old),
+            MediaJob(id="orphan-dead", user_id="qa-edit", plan="editorial", media_type="image", provider="mock",
+                     params={"prompt": "dead"}, status="running", attempts=3, started_at=old)
+        ])
+        db.commit()
+        worker.drain()
+        db.expire_all()
+        retried, dead = db.get(MediaJob, "orphan-retry"), db.get(MediaJob, "orphan-dead")
+        assert retried.status == "succeeded" and retried.attempts == 2
+        assert dead.status == "failed" and "Timed out" in dead.error and usage("qa-edit") == 4
+        print("   ✅ Requeued below max attempts, failed (and released) at max")
+
+        # TEST 7: Hilo de fondo
+        print("\n👉 TEST 7: Background worker picks up new jobs...")
+        worker.poll_interval = 0.05
+        worker.start()
+        job = service.enqueue("qa-bg", "editorial", "image", {"prompt": "bg"})
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            db.expire_all()
+            if db.get(MediaJob, job.id).status == "succeeded":
+                break
+            time.sleep(0.05)
+        assert db.get(MediaJob, job.id).status == "succeeded"
+        worker.stop()
+        assert not worker.is_running
+        print("   ✅ Job executed by the running worker")
+
+        # TEST 8: Endpoint autenticado (usuario/plan del token, webhook público)
+        print("\n👉 TEST 8: API takes user and plan from the principal and rejects internal webhooks...")
+        app = FastAPI()
+        app.include_router(media_api.router, prefix="/media")
+
+        def override_db():
+            session = TestingSessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_db
+        client = TestClient(app)
+        body = {"media_type": "image", "prompt": "api", "user_id": "someone-else", "plan": "editorial"}
+        assert client.post("/media/jobs", json=body).status_code == 401
+        principal = Principal.from_claims({"sub": "qa-api", "app_metadata": {"plan": "strict"}})
+        assert principal.plan == "strict" and Principal.from_claims({"sub": "x"}).plan == "strict"
+        app.dependency_overrides[get_current_principal] = lambda: principal
+        response = client.post("/media/jobs", json={**body, "webhook_url": "https://8.8.8.8/hook"})
+        assert response.status_code == 202, response.text
+        db.expire_all()
+        created = db.get(MediaJob, response.json()["data"]["id"])
+        assert created.user_id == "qa-api" and created.plan == "strict"
+        job_url = f"/media/jobs/{created.id}"
+        assert client.get(job_url).json()["data"]["user_id"] == "qa-api"
+        app.dependency_overrides[get_current_principal] = lambda: Principal.from_claims({"sub": "intruder"})
+        assert client.get(job_url).status_code == 404
+        del app.dependency_overrides[get_current_principal]
+        assert client.get(job_url).status_code == 401
+        app.dependency_overrides[get_current_principal] = lambda: principal
+        for url in ("http://8.8.8.8/hook", "https://127.0.0.1/hook", "https://169.254.169.254/latest",
+                    "https://10.0.0.5/hook", "https://[::1]/hook", "ftp://example.com/x"):
+            assert client.post("/media/jobs", json={**body, "webhook_url": url}).status_code == 422, url
+        worker.drain()
+        print("   ✅ 401 without token, job owned (and readable only) by the principal, private/non-https webhooks rejected")
+
+        # TEST 9: Carrera por la primera reserva del día
+        print("\n👉 TEST 9: Concurrent first reservation of the day keeps a single row...")
+        repo = UsageRepository(db)
+        read_usage = repo.get_daily_usage
+
+        def racing_read(user_id, media_type):
+            # Otro request inserta la fila del día justo después de nuestra lectura
+            count = read_usage(user_id, media_type)
+            db.execute(insert(MediaUsage).values(user_id=user_id, media_type=media_type,
+                                                 date=repo._today(), count=1))
+            return count
+
+        repo.get_daily_usage = racing_read
+        assert repo.reserve_usage("qa-race", "image", 5)
+        db.commit()
+        rows = db.query(MediaUsage).filter_by(user_id="qa-race", media_type="image").all()
+        assert len(rows) == 1 and rows[0].count == 2
+        repo.get_daily_usage = read_usage
+        assert repo.increment_usage("qa-race", "image") == 3
+        print("   ✅ Duplicate insert retried as UPDATE: one row, count 2")
+
+        print("\n🏁 [QA Media Jobs] All Tests Passed Successfully!")
+    finally:
+        worker.stop()
+        db.close()
+        engine.dispose()
+        os.remove(path)
+
+if __name__ == "__main__":
+    test_media_jobs()
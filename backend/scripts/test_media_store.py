@@ -0,0 +1,171 @@
+import sys
+import os
+import hashlib
+import shutil
+import tempfile
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.api import media as media_api
+from app.api.deps import get_current_principal
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.models.domain import Base, ContentStatus, Post, Project
+from app.schemas.auth import Principal
+from app.services.media_storage.base import storage_key
+from app.services.media_storage.local import LocalMediaStorage
+from app.services.media_storage.s3 import LocalS3Client, S3MediaStorage
+from app.services.media_store import MediaStore, MediaTooLargeError, get_media_store
+
+# Setup In-Memory DB for speed (StaticPool: TestClient atiende en otro thread)
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+MB = 1024 * 1024
+
+def _client(store: MediaStore) -> TestClient:
+    app = FastAPI()
+    app.include_router(media_api.router, prefix="/media")
+
+    def override_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_media_store] = lambda: store
+    return TestClient(app)
+
+def test_media_store():
+    print("\n🚀 [QA Media Store] Starting Content-Addressed Storage Verification...\n")
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    root = tempfile.mkdtemp(prefix="media-store-")
+    settings = get_settings()
+    try:
+        store = MediaStore(LocalMediaStorage(root), chunk_size=MB, max_bytes=16 * MB)
+        payload = os.urandom(3 * MB + 123)
+        content_hash = hashlib.sha256(payload).hexdigest()
+
+        # TEST 1: Escritura en streaming bajo el hash del contenido
+        print("👉 TEST 1: Streamed write keyed by sha256...")
+        chunks = (payload[i:i + MB] for i in range(0, len(payload), MB))
+        media = store.save_stream(db, chunks, "image/png")
+        db.commit()
+        path = os.path.join(root, *storage_key(content_hash).split("/"))
+        assert media.content_hash == content_hash and media.size_bytes == len(payload) and media.media_type == "image"
+        assert open(path, "rb").read() == payload and os.listdir(os.path.join(root, "tmp")) == []
+        print(f"   ✅ Stored at {storage_key(content_hash)[:10]}..., no temp files left")
+
+        # TEST 2: Dedup
+        print("\n👉 TEST 2: Identical content is stored once...")
+        again = store.save_bytes(db, payload, "image/png")
+        other_post = store.save_bytes(db, payload, "image/png", post_id=7)
+        db.commit()
+        assert again.id == media.id and other_post.id != media.id and other_post.content_hash == content_hash
+        blobs = [f for _, _, files in os.walk(root) for f in files]
+        assert blobs == [content_hash]
+        print("   ✅ One blob, same row reused, second post references the same blob")
+
+        # TEST 3: Límite de tamaño sin dejar temporales
+        print("\n👉 TEST 3: Oversized stream rejected...")
+        try:
+            store.save_stream(db, (b"x" * MB for _ in range(17)), "video/mp4")
+            assert False, "Expected MediaTooLargeError"
+        except MediaTooLargeError:
+            pass
+        assert os.listdir(os.path.join(root, "tmp")) == []
+        print("   ✅ MediaTooLargeError, temp file removed")
+
+        # TEST 4: Serving local: cache, rangos, 304
+        print("\n👉 TEST 4: Local serving with ranges and cache headers...")
+        client = _client(store)
+        url = f"/media/files/{content_hash}"
+        response = client.get(url)
+        assert response.status_code == 200 and response.content == payload
+        assert response.headers["etag"] == f'"{content_hash}"'
+        assert "immutable" in response.headers["cache-control"] and response.headers["accept-ranges"] == "bytes"
+        response = client.get(url, headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206 and response.content == payload[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(payload)}"
+        assert client.get(url, headers={"If-None-Match": f'"{content_hash}"'}).status_code == 304
+        assert client.get(url, headers={"Range": f"bytes={len(payload)}-"}).status_code == 416
+        assert client.get("/media/files/" + "0" * 64).status_code == 404
+        settings.MEDIA_ACCEL_REDIRECT_PREFIX = "/_media"
+        response = client.get(url)
+        assert response.headers["x-accel-redirect"] == f"/_media/{storage_key(content_hash)}" and response.content == b""
+        settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+        # Fila sin blob en disco (borrado externo): 404, no 500
+        orphan = store.save_bytes(db, b"orphan-bytes", "image/png")
+        db.commit()
+        os.remove(os.path.join(root, *storage_key(orphan.content_hash).split("/")))
+        assert store.local_path(orphan.content_hash) is None
+        assert client.get(f"/media/files/{orphan.content_hash}").status_code == 404
+        print("   ✅ 200/206/304/416/404 (unknown hash and missing blob) and X-Accel-Redirect handoff")
+
+        # TEST 5: Backend S3-compatible (stand-in local): multipart y rangos por streaming
+        print("\n👉 TEST 5: S3-compatible backend with multipart upload...")
+        s3 = LocalS3Client()
+        s3_store = MediaStore(S3MediaStorage(s3, "bucket", prefix="media", part_size=5 * MB), chunk_size=MB,
+                              max_bytes=64 * MB)
+        big = os.urandom(12 * MB)
+        big_media = s3_store.save_bytes(db, big, "video/mp4")
+        small_media = s3_store.save_bytes(db, b"tiny", "text/plain")
+        db.commit()
+        assert s3.calls.count("upload_part") == 3 and s3.calls.count("put_object") == 1
+        s3.calls.clear()
+        s3_store.save_bytes(db, big, "video/mp4")
+        assert "upload_part" not in s3.calls and "put_object" not in s3.calls
+        assert s3.objects[("bucket", "media/" + storage_key(big_media.content_hash))]["data"] == big
+        assert small_media.media_type == "file"
+
+        client = _client(s3_store)
+        url = f"/media/files/{big_media.content_hash}"
+        response = client.get(url, headers={"Range": "bytes=-100"})
+        assert response.status_code == 206 and response.content == big[-100:]
+        assert response.headers["content-range"] == f"bytes {len(big) - 100}-{len(big) - 1}/{len(big)}"
+        response = client.get(url)
+        assert response.status_code == 200 and response.content == big
+        assert client.get(url, headers={"Range": "bytes=99999999-"}).status_code == 416
+        response = client.head(url)
+        assert response.status_code == 200 and response.headers["content-length"] == str(len(big))
+        print("   ✅ 12MB in 3 parts, dedup skips upload, ranged reads streamed from the bucket")
+
+        # TEST 6: Upload por API (autenticado, solo a posts del propio proyecto)
+        print("\n👉 TEST 6: Upload endpoint...")
+        own, foreign = Project(name="Uploader", owner_id="qa-uploader"), Project(name="Other", owner_id="qa-other")
+        db.add_all([own, foreign])
+        db.flush()
+        own_post = Post(project_id=own.id, title="Mine", content_text="x", status=ContentStatus.PENDING)
+        foreign_post = Post(project_id=foreign.id, title="Theirs", content_text="x", status=ContentStatus.PENDING)
+        db.add_all([own_post, foreign_post])
+        db.commit()
+        client = _client(store)
+        upload = {"file": ("clip.mp4", b"video-bytes", "video/mp4")}
+        assert client.post("/media/files", files=upload, data={"post_id": str(own_post.id)}).status_code == 401
+        client.app.dependency_overrides[get_current_principal] = lambda: Principal.from_claims({"sub": "qa-uploader"})
+        assert client.post("/media/files", files=upload, data={"post_id": str(foreign_post.id)}).status_code == 404
+        response = client.post("/media/files", files=upload, data={"post_id": str(own_post.id)})
+        assert response.status_code == 201
+        data = response.json()["data"]
+        assert data["content_hash"] == hashlib.sha256(b"video-bytes").hexdigest() and data["post_id"] == own_post.id
+        assert data["media_type"] == "video" and data["public_url"].endswith(data["content_hash"])
+        assert client.get(f"/media/files/{data['content_hash']}").content == b"video-bytes"
+        print("   ✅ 401 without token, 404 for another project's post, uploaded, stored and served back")
+
+        print("\n🏁 [QA Media Store] All Tests Passed Successfully!")
+    finally:
+        settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+        db.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_media_store()
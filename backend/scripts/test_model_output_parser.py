@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(__file__))
+
+from app.core.model_output import parse_model_json, ModelOutputParseError, JSON_BACKEND
+from model_output_corpus import CORPUS
+
+def test_model_output_parser():
+    print("\n🚀 [QA Model Output Parser] Starting JSON Extraction Verification...\n")
+    print(f"   ℹ️ JSON backend: {JSON_BACKEND}")
+
+    # TEST 1: Todo el corpus se resuelve (o falla) como se espera
+    print("👉 TEST 1: Corpus of real provider outputs...")
+    for name, raw, expected_keys in CORPUS:
+        if expected_keys is None:
+            try:
+                parse_model_json(raw)
+                raise AssertionError(f"❌ {name}: expected ModelOutputParseError")
+            except ModelOutputParseError:
+                continue
+        data = parse_model_json(raw)
+        missing = [k for k in expected_keys if k not in data]
+        assert not missing, f"❌ {name}: missing keys {missing}"
+    print(f"   ✅ {len(CORPUS)} cases")
+
+    # TEST 2: Contenido de strings intacto (llaves, comas y escapes no se tocan)
+    print("\n👉 TEST 2: String contents preserved...")
+    corpus = {name: raw for name, raw, _ in CORPUS}
+    assert parse_model_json(corpus["braces_in_strings"])["message"] == "Usa {nombre} y } sueltas en el copy"
+    assert parse_model_json(corpus["commas_in_strings"])["message"] == "Listas: a, ] b, } c"
+    assert parse_model_json(corpus["escaped_quotes"])["message"] == 'Dijo "hola, }" y se fue'
+    assert parse_model_json(corpus["raw_newlines"])["content"].count("\n") == 3
+    assert parse_model_json(corpus["trailing_commas"])["state_patch"] == {"tone": "cercano"}
+    assert parse_model_json(corpus["two_objects"])["updated_summary"] == "Inicio", "First object wins"
+    print("   ✅ Only structural commas removed")
+
+    # TEST 3: ModelOutputParseError sigue siendo un ValueError (callers legacy)
+    print("\n👉 TEST 3: Error type compatibility...")
+    assert issubclass(ModelOutputParseError, ValueError)
+    print("   ✅ ValueError subclass")
+
+    # TEST 4: Candidatos fallidos no se re-escanean (una sola pasada)
+    print("\n👉 TEST 4: Failed candidates are skipped in a single pass...")
+    assert parse_model_json('Borrador: {"a": ,} y luego {"ok": 1}') == {"ok": 1}
+    nested = '{"a": ' * 20000 + "x" + "}" * 20000
+    started = time.perf_counter()
+    assert parse_model_json(nested + ' {"ok": 2}') == {"ok": 2}
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1.0, f"Nested invalid candidate took {elapsed:.2f}s"
+    print(f"   ✅ 20k nested invalid objects skipped in {elapsed * 1000:.0f} ms")
+
+    print("\n🏁 [QA Model Output Parser] All Tests Passed Successfully!")
+
+if __name__ == "__main__":
+    test_model_output_parser()
@@ -0,0 +1,181 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event as sa_event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base
+from app.models.automation import AutonomousDecisionLog
+from app.models.billing import BillingEvent, MonthlySpendRollup
+from app.models.outbox import OutboxEvent
+from app.models.tracking import ContentTracking
+from app.services.billing_service import BillingService
+from app.services.tracking_service import TrackingService
+from app.services.outbox_dispatcher import (
+    OutboxDispatcher, outbox_dispatcher, EVENT_TRACKING_GENERATION, EVENT_AUTONOMY_DECISION,
+    _deliver_decision, _deliver_tracking
+)
+
+# Setup In-Memory DB for speed (StaticPool: el dispatcher entrega desde otro thread)
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _entry(i: int) -> dict:
+    return {
+        "user_id": "qa",
+        "project_id": 1,
+        "platform": "linkedin",
+        "content_type": "text",
+        "generated_url": f"/posts/{i}",
+        "correlation_id": f"qa-{i}"
+    }
+
+def test_outbox():
+    print("\n🚀 [QA Outbox] Starting Transactional Outbox Verification...\n")
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    def count(model) -> int:
+        db.expire_all()
+        return db.query(model).count()
+
+    # El singleton usa la DB de test; start() con poll largo: solo entregas explícitas
+    original = (outbox_dispatcher.session_factory, outbox_dispatcher.poll_interval)
+    outbox_dispatcher.session_factory = TestingSessionLocal
+    outbox_dispatcher.poll_interval = 60
+    outbox_dispatcher.start()
+    try:
+        # TEST 1: El evento viaja en la transacción del caller
+        print("👉 TEST 1: Outbox row commits/rolls back with the primary change...")
+        tracker = TrackingService(db)
+        for i in range(3):
+            tracker.enqueue_generation(_entry(i))
+        db.commit()
+        tracker.enqueue_generation(_entry(99))
+        db.rollback()
+        assert count(OutboxEvent) == 3 and count(ContentTracking) == 0
+        print("   ✅ 3 pending events, rolled back one never enqueued")
+
+        # TEST 2: El dispatcher entrega y marca en la misma transacción
+        print("\n👉 TEST 2: Dispatch delivers to tracking, billing and decision logs...")
+        billing = BillingService(db, policy_version="v1.0")
+        cid = billing.enqueue_usage_event("qa", "pro", "image", "mock", 1, "image", correlation_id="job-1")
+        outbox_dispatcher.emit(db, EVENT_AUTONOMY_DECISION, {
+            "automation_id": 1, "decision": "ALLOW_EXECUTION", "reason": "qa", "created_at": datetime.utcnow()
+        })
+        db.commit()
+        assert outbox_dispatcher.dispatch_pending() == 5
+        assert count(ContentTracking) == 3 and count(BillingEvent) == 1 and count(AutonomousDecisionLog) == 1
+        event = db.query(BillingEvent).filter_by(correlation_id=cid).one()
+        assert event.cost_estimated > 0 and db.get(MonthlySpendRollup, ("qa", event.timestamp.strftime("%Y-%m"))).event_count == 1
+        assert outbox_dispatcher.stats() == {"dispatched": 5}
+        assert outbox_dispatcher.dispatch_pending() == 0
+        print("   ✅ 5 events delivered once, rollup updated")
+
+        # TEST 3: Redelivery idempotente (billing ya escrito por otra entrega)
+        print("\n👉 TEST 3: Idempotent redelivery...")
+        db.add(OutboxEvent(event_type="billing.usage", idempotency_key="billing.usage:job-1-again",
+                           payload={**{c: getattr(event, c) for c in ("user_id", "plan", "media_type", "provider",
+                                    "units", "unit_type", "cost_estimated", "currency", "pricing_version")},
+                                    "correlation_id": cid, "timestamp": event.timestamp.isoformat()}))
+        db.commit()
+        assert outbox_dispatcher.dispatch_pending() == 1 and count(BillingEvent) == 1
+        print("   ✅ Duplicate billing delivery skipped")
+
+        # TEST 4: Un evento inválido no bloquea el lote y se reintenta con backoff
+        print("\n👉 TEST 4: Poison event isolated with backoff, then dead...")
+        tracker.enqueue_generation({**_entry(50), "user_id": None}) # NOT NULL
+        tracker.enqueue_generation(_entry(51))
+        db.commit()
+        assert outbox_dispatcher.dispatch_pending() == 1 and count(ContentTracking) == 4
+        poison = db.query(OutboxEvent).filter_by(idempotency_key=f"{EVENT_TRACKING_GENERATION}:qa-50").one()
+        assert poison.status == "pending" and poison.attempts == 1 and poison.available_at > datetime.utcnow()
+        strict = OutboxDispatcher(session_factory=TestingSessionLocal, max_attempts=1)
+        poison.available_at = datetime.utcnow()
+        db.commit()
+        assert strict.dispatch_pending() == 0
+        db.refresh(poison)
+        assert poison.status == "dead" and "NOT NULL" in poison.last_error
+        print("   ✅ Good event delivered, poison event dead after max attempts")
+
+        # TEST 5: stop() entrega lo pendiente
+        print("\n👉 TEST 5: Graceful drain on stop...")
+        tracker.enqueue_generation(_entry(60))
+        db.commit()
+        outbox_dispatcher.stop()
+        assert not outbox_dispatcher.is_running and count(ContentTracking) == 5
+        print("   ✅ Pending event delivered on shutdown")
+
+        # TEST 6: Sin dispatcher, los efectos se escriben en línea (modo síncrono)
+        print("\n👉 TEST 6: Synchronous mode for tests/scripts...")
+        tracker.enqueue_generation(_entry(70))
+        db.commit()
+        assert count(ContentTracking) == 6 and count(OutboxEvent) == 9
+        print("   ✅ Inline write in the caller transaction")
+
+        # TEST 7: Un evento reclamado tiene un solo dueño; lease vencido se reclama sin duplicar
+        print("\n👉 TEST 7: Claimed events are not delivered twice...")
+        now = datetime.utcnow()
+        db.add_all([OutboxEvent(event_type=EVENT_TRACKING_GENERATION, idempotency_key=f"{EVENT_TRACKING_GENERATION}:qa-8{i}",
+                                payload=_entry(80 + i), available_at=now) for i in range(2)])
+        db.commit()
+        first, second = OutboxDispatcher(session_factory=TestingSessionLocal), OutboxDispatcher(session_factory=TestingSessionLocal)
+        claim_db = TestingSessionLocal()
+        lease = now + timedelta(seconds=300)
+        claimed = first._claim(claim_db, now, lease)
+        assert len(claimed) == 2 and second.dispatch_pending() == 0
+        # El lease vence (proceso caído): el segundo dispatcher entrega, el primero ya no puede confirmar
+        db.query(OutboxEvent).filter(OutboxEvent.status == "dispatching").update({"available_at": now})
+        db.commit()
+        assert second.dispatch_pending() == 2
+        for event in claimed:
+            _deliver_tracking(claim_db, event.payload, event.idempotency_key)
+        assert first._mark_dispatched(claim_db, [e.id for e in claimed], lease, now) == 0
+        claim_db.rollback()
+        claim_db.close()
+        assert count(ContentTracking) == 8 and db.query(OutboxEvent).filter_by(status="dispatching").count() == 0
+        print("   ✅ Second dispatcher skipped leased events, stale lease reclaimed once")
+
+        # TEST 8: Handlers idempotentes por clave (redelivery tras crash post-commit)
+        print("\n👉 TEST 8: Tracking and decision handlers dedupe on the event key...")
+        for _ in range(2):
+            _deliver_tracking(db, _entry(90), f"{EVENT_TRACKING_GENERATION}:qa-90")
+            db.flush()
+            _deliver_decision(db, {"automation_id": 1, "decision": "ALLOW_EXECUTION", "reason": "qa"}, "decision-1")
+            db.flush()
+        db.commit()
+        assert count(ContentTracking) == 9 and count(AutonomousDecisionLog) == 2
+        print("   ✅ One row per event key")
+
+        # TEST 9: El lote de tracking se escribe con un INSERT multi-fila (write-behind en bulk)
+        print("\n👉 TEST 9: Tracking events are written with one bulk insert per batch...")
+        bulk = OutboxDispatcher(session_factory=TestingSessionLocal, batch_size=50)
+        db.add_all([OutboxEvent(event_type=EVENT_TRACKING_GENERATION, idempotency_key=f"{EVENT_TRACKING_GENERATION}:bulk-{i}",
+                                payload=_entry(200 + i), available_at=datetime.utcnow()) for i in range(20)])
+        db.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "content_tracking" in statement:
+                statements.append(statement.split()[0])
+
+        sa_event.listen(engine, "before_cursor_execute", record)
+        try:
+            assert bulk.dispatch_pending() == 20
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", record)
+        assert count(ContentTracking) == 29 and statements.count("INSERT") == 1, statements
+        print(f"   ✅ 20 tracking rows in {len(statements)} statements ({statements})")
+
+        print("\n🏁 [QA Outbox] All Tests Passed Successfully!")
+    finally:
+        outbox_dispatcher.stop()
+        outbox_dispatcher.session_factory, outbox_dispatcher.poll_interval = original
+        db.close()
+
+if __name__ == "__main__":
+    test_outbox()
@@ -0,0 +1,106 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.policy_registry import PolicyRegistry, policy_registry
+from app.schemas.policy import PricingTable, BudgetPolicy
+
+def _write(base_dir, relative_path, data, mtime=None):
+    path = os.path.join(base_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def _pricing(version, price):
+    return {
+        "version": version,
+        "currency": "USD",
+        "plans": {"pro": {"image": {"unit_price": price, "unit": "image"}}}
+    }
+
+def test_policy_registry():
+    print("\n🚀 [QA Policy Registry] Starting Policy Cache Verification...\n")
+
+    base_dir = tempfile.mkdtemp()
+    try:
+        _write(base_dir, "pricing/v1.0.json", _pricing("v1.0", 0.04), mtime=1000)
+        _write(base_dir, "pricing/v1.1.json", _pricing("1.1", 0.05), mtime=1000) # "version" sin prefijo, como en app/policies
+        _write(base_dir, "budget/v1.0.json", {"pro": {"monthly_usd": 20.0}}, mtime=1000)
+
+        # check_interval=0 -> cada lectura revisa mtime (para poder testear hot reload)
+        registry = PolicyRegistry(base_dir=base_dir, check_interval=0)
+
+        # TEST 1: Parseo tipado y cache (misma instancia)
+        print("👉 TEST 1: Typed objects cached per version...")
+        pricing = registry.get_pricing("v1.0")
+        assert isinstance(pricing, PricingTable)
+        assert pricing.plans["pro"]["image"].unit_price == 0.04
+        assert registry.get_pricing("v1.0") is pricing, "Unchanged file should return cached object"
+        budget = registry.get_budget("v1.0")
+        assert isinstance(budget, BudgetPolicy)
+        assert budget.plans["pro"].monthly_usd == 20.0
+        print("   ✅ Parsed once, served from memory")
+
+        # TEST 2: Versiones conviven
+        print("\n👉 TEST 2: Multiple versions side by side...")
+        assert registry.get_pricing("v1.1").plans["pro"]["image"].unit_price == 0.05
+        assert registry.get_pricing("v1.1").version == "v1.1", "Registry key wins over the file's version"
+        assert registry.get_pricing("v1.0").plans["pro"]["image"].unit_price == 0.04
+        assert sorted(registry.loaded_versions()["pricing"]) == ["v1.0", "v1.1"]
+        print("   ✅ v1.0 and v1.1 loaded together, tagged with their registry key")
+
+        # TEST 3: Hot reload por mtime
+        print("\n👉 TEST 3: Hot reload on mtime change...")
+        _write(base_dir, "pricing/v1.0.json", _pricing("v1.0", 0.08), mtime=2000)
+        reloaded = registry.get_pricing("v1.0")
+        assert reloaded is not pricing
+        assert reloaded.plans["pro"]["image"].unit_price == 0.08
+        print("   ✅ Reloaded after file change")
+
+        # TEST 4: Una edición inválida no rompe a los callers
+        print("\n👉 TEST 4: Broken edit keeps serving the last good version...")
+        path = os.path.join(base_dir, "pricing/v1.0.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"version": "v1.0", "plans": ')
+        os.utime(path, (3000, 3000))
+        assert registry.get_pricing("v1.0") is reloaded
+        _write(base_dir, "pricing/v1.0.json", {"plans": "not-a-table"}, mtime=3500)
+        assert registry.get_pricing("v1.0") is reloaded
+        _write(base_dir, "pricing/v1.0.json", _pricing("v1.0", 0.09), mtime=4000)
+        assert registry.get_pricing("v1.0").plans["pro"]["image"].unit_price == 0.09
+        try:
+            registry.get_pricing("v9.9")
+            assert False, "Expected FileNotFoundError"
+        except FileNotFoundError:
+            pass
+        print("   ✅ Invalid JSON and schema ignored, fixed file reloaded, first load still fails fast")
+
+        # TEST 5: Dentro de la ventana de chequeo no se toca disco
+        print("\n👉 TEST 5: No disk check inside check_interval...")
+        throttled = PolicyRegistry(base_dir=base_dir, check_interval=3600)
+        cached = throttled.get_pricing("v1.1")
+        os.remove(os.path.join(base_dir, "pricing/v1.1.json"))
+        assert throttled.get_pricing("v1.1") is cached, "Should not stat the file inside the window"
+        print("   ✅ Request path served without I/O")
+
+        # TEST 6: Políticas reales del repo
+        print("\n👉 TEST 6: Repository policies load through the singleton...")
+        assert "pro" in policy_registry.get_budget("v1.0").plans
+        assert policy_registry.get_pricing("v1.0").currency
+        assert "strict" in policy_registry.get_agent_modes("v1.1")
+        print("   ✅ Shipped policies valid")
+
+        print("\n🏁 [QA Policy Registry] All Tests Passed Successfully!")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_policy_registry()
@@ -0,0 +1,141 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base, Project, Post, ContentStatus, ConnectedAccount
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import SchedulerService
+from app.services.publishers.base import PermanentPublishError
+from app.services.publishers.rate_limiter import PublishRateLimiter
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class CountingPublisher:
+    """Publisher falso que mide la concurrencia real"""
+    def __init__(self, fail_ids=()):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.fail_ids = set(fail_ids)
+
+    async def publish(self, post, account):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if post.id in self.fail_ids:
+                raise PermanentPublishError("simulated rejected content")
+            return {"external_id": f"urn:test:{post.id}"}
+        finally:
+            self.in_flight -= 1
+
+def _post(project_id, scheduled_for, title):
+    return Post(
+        project_id=project_id,
+        title=title,
+        content_text=f"Content for {title}",
+        status=ContentStatus.APPROVED,
+        scheduled_for=scheduled_for,
+        platform="linkedin"
+    )
+
+def test_publish_pipeline():
+    print("\n🚀 [QA Publish Pipeline] Starting Batched Publishing Verification...\n")
+
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    settings = scheduler_module.settings
+    original = (settings.FEATURE_LINKEDIN_ENABLED, settings.PUBLISH_CONCURRENCY_PER_PLATFORM)
+    settings.FEATURE_LINKEDIN_ENABLED = True
+    settings.PUBLISH_CONCURRENCY_PER_PLATFORM = 3
+
+    try:
+        connected = Project(name="Pipeline Connected")
+        orphan = Project(name="Pipeline Without Account")
+        db.add_all([connected, orphan])
+        db.commit()
+
+        db.add(ConnectedAccount(
+            project_id=connected.id,
+            provider="linkedin",
+            provider_name="Pipeline User",
+            external_account_id="urn:li:person:pipeline",
+            access_token_encrypted="fake_encrypted_token",
+            active=True
+        ))
+
+        past = datetime.utcnow() - timedelta(minutes=5)
+        due = [_post(connected.id, past, f"Due {i}") for i in range(10)]
+        future = _post(connected.id, datetime.utcnow() + timedelta(hours=1), "Future")
+        manual = _post(orphan.id, past, "No Account")
+        db.add_all(due + [future, manual])
+        db.commit()
+
+        failing_id = due[0].id
+        publisher = CountingPublisher(fail_ids=[failing_id])
+        service = SchedulerService(
+            session_factory=TestingSessionLocal,
+            batch_size=4,
+            rate_limiter=PublishRateLimiter(account_rate_per_minute=60000, account_burst=100)
+        )
+        service.publishers["linkedin"] = publisher
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            service.run_cycle()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        db.expire_all()
+
+        # TEST 1: Estados finales
+        print("👉 TEST 1: Status transitions...")
+        published = db.query(Post).filter(Post.status == ContentStatus.PUBLISHED_AUTO).count()
+        assert published == 9, f"Expected 9 published, got {published}"
+        assert db.get(Post, failing_id).status == ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE
+        assert db.get(Post, manual.id).status == ContentStatus.READY_MANUAL
+        assert db.get(Post, future.id).status == ContentStatus.APPROVED
+        assert db.query(Post).filter(Post.status == ContentStatus.PROCESSING).count() == 0
+        assert all(p.published_at for p in db.query(Post).filter(Post.status == ContentStatus.PUBLISHED_AUTO))
+        print("   ✅ Published / failed / manual / future handled")
+
+        # TEST 2: Round-trips por lote (no por post)
+        print("\n👉 TEST 2: Statements are per batch, not per post...")
+        claims = [s for s in statements if s.lstrip().upper().startswith("UPDATE") and "RETURNING" in s.upper()]
+        account_queries = [s for s in statements if "FROM connected_accounts" in s]
+        # 11 posts vencidos / batch 4 -> 3 lotes
+        assert len(claims) == 3, f"Expected 3 claim statements, got {len(claims)}"
+        assert len(account_queries) == 3, f"Expected one account query per batch, got {len(account_queries)}"
+        print(f"   ✅ {len(statements)} statements for 12 posts ({len(claims)} claims)")
+
+        # TEST 3: Concurrencia limitada por plataforma
+        print("\n👉 TEST 3: Concurrent publishing within platform limit...")
+        assert publisher.calls == 10
+        assert 1 < publisher.max_in_flight <= 3, f"max_in_flight={publisher.max_in_flight}"
+        print(f"   ✅ Max in flight: {publisher.max_in_flight}")
+
+        # TEST 4: Segundo ciclo no re-publica nada
+        print("\n👉 TEST 4: Idle cycle claims nothing...")
+        service.run_cycle()
+        assert publisher.calls == 10
+        print("   ✅ No double publishing")
+
+        print("\n🏁 [QA Publish Pipeline] All Tests Passed Successfully!")
+    finally:
+        settings.FEATURE_LINKEDIN_ENABLED, settings.PUBLISH_CONCURRENCY_PER_PLATFORM = original
+        db.close()
+
+if __name__ == "__main__":
+    test_publish_pipeline()
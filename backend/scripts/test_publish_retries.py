@@ -0,0 +1,195 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.domain import Base, Project, Post, ContentStatus, ConnectedAccount
+from app.models.publishing import PublishRetry
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import SchedulerService
+from app.services.publishers.base import (
+    TransientPublishError, PermanentPublishError, RateLimitedPublishError, classify_publish_error
+)
+from app.services.publishers.rate_limiter import TokenBucket, PublishRateLimiter
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class FlakyPublisher:
+    """Falla con error transitorio las primeras `failures` llamadas"""
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def publish(self, post, account):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise httpx.ConnectError("connection reset")
+        return {"external_id": f"urn:test:{post.id}"}
+
+def _http_error(status_code, headers=None):
+    request = httpx.Request("POST", "https://api.example.com/posts")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("platform error", request=request, response=response)
+
+def _make_due(db, post):
+    post.scheduled_for = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+def test_publish_retries():
+    print("\n🚀 [QA Publish Retries] Starting Rate Limit & Retry Queue Verification...\n")
+
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+
+    settings = scheduler_module.settings
+    original = (settings.FEATURE_LINKEDIN_ENABLED, settings.PUBLISH_MAX_ATTEMPTS)
+    settings.FEATURE_LINKEDIN_ENABLED = True
+    settings.PUBLISH_MAX_ATTEMPTS = 3
+
+    try:
+        # TEST 1: Clasificación de errores
+        print("👉 TEST 1: Error classification...")
+        assert isinstance(classify_publish_error(_http_error(503)), TransientPublishError)
+        rate_limited = classify_publish_error(_http_error(429, {"Retry-After": "120"}))
+        assert isinstance(rate_limited, RateLimitedPublishError) and rate_limited.retry_after == 120.0
+        assert isinstance(classify_publish_error(_http_error(401)), PermanentPublishError)
+        assert isinstance(classify_publish_error(httpx.ReadTimeout("slow")), TransientPublishError)
+        assert isinstance(classify_publish_error(ValueError("bad account")), PermanentPublishError)
+        print("   ✅ Transient vs permanent")
+
+        # TEST 2: Token bucket
+        print("\n👉 TEST 2: Token bucket...")
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        assert bucket.reserve() == 0.0 and bucket.reserve() == 0.0
+        wait = bucket.reserve()
+        assert 0.9 < wait <= 1.0, f"Third token should wait ~1s, got {wait}"
+        print(f"   ✅ Burst of 2, then {wait:.2f}s wait")
+
+        # TEST 3: Backoff exponencial con jitter y Retry-After
+        print("\n👉 TEST 3: Exponential backoff with jitter...")
+        base = settings.PUBLISH_RETRY_BASE_SECONDS
+        for attempt in range(1, 5):
+            delay = SchedulerService._backoff_seconds(attempt)
+            ceiling = min(settings.PUBLISH_RETRY_MAX_SECONDS, base * 2 ** (attempt - 1))
+            assert ceiling / 2 <= delay <= ceiling, f"attempt {attempt}: {delay}"
+        assert SchedulerService._backoff_seconds(1, retry_after=900) == 900
+        print("   ✅ Delays within [ceiling/2, ceiling]")
+
+        # Setup
+        project = Project(name="Retry Project")
+        db.add(project)
+        db.commit()
+        db.add(ConnectedAccount(
+            project_id=project.id, provider="linkedin", provider_name="Retry User",
+            external_account_id="urn:li:person:retry", access_token_encrypted="fake", active=True
+        ))
+        post = Post(project_id=project.id, title="Flaky", content_text="Flaky post",
+                    status=ContentStatus.APPROVED, platform="linkedin",
+                    scheduled_for=datetime.utcnow() - timedelta(minutes=1))
+        db.add(post)
+        db.commit()
+        original_schedule = post.scheduled_for
+
+        publisher = FlakyPublisher(failures=1)
+        service = SchedulerService(
+            session_factory=TestingSessionLocal,
+            rate_limiter=PublishRateLimiter(account_rate_per_minute=60000, account_burst=100)
+        )
+        service.publishers["linkedin"] = publisher
+
+        # TEST 4: Fallo transitorio -> RETRY_PENDING persistido
+        print("\n👉 TEST 4: Transient failure is queued for retry...")
+        service.run_cycle()
+        db.expire_all()
+        assert post.status == ContentStatus.RETRY_PENDING, post.status
+        retry = db.query(PublishRetry).filter(PublishRetry.post_id == post.id).one()
+        assert retry.attempts == 1 and retry.last_error_kind == "transient"
+        assert retry.original_scheduled_for == original_schedule
+        assert post.scheduled_for == retry.next_attempt_at > datetime.utcnow()
+        print(f"   ✅ Retry at {retry.next_attempt_at.isoformat()}")
+
+        # TEST 5: Antes de next_attempt_at no se reintenta (sobrevive reinicio: nuevo servicio)
+        print("\n👉 TEST 5: Not retried before next_attempt_at...")
+        restarted = SchedulerService(
+            session_factory=TestingSessionLocal,
+            rate_limiter=PublishRateLimiter(account_rate_per_minute=60000, account_burst=100)
+        )
+        restarted.publishers["linkedin"] = publisher
+        restarted.run_cycle()
+        assert publisher.calls == 1
+        print("   ✅ Waits for backoff")
+
+        # TEST 6: Reintento exitoso limpia la cola
+        print("\n👉 TEST 6: Successful retry clears the queue...")
+        _make_due(db, post)
+        restarted.run_cycle()
+        db.expire_all()
+        assert post.status == ContentStatus.PUBLISHED_AUTO and post.published_at
+        assert db.query(PublishRetry).count() == 0
+        print("   ✅ Published on retry")
+
+        # TEST 7: Intentos agotados -> FAILED_AUTO_MANUAL_AVAILABLE
+        print("\n👉 TEST 7: Attempts exhausted...")
+        doomed = Post(project_id=project.id, title="Doomed", content_text="Always fails",
+                      status=ContentStatus.APPROVED, platform="linkedin",
+                      scheduled_for=datetime.utcnow() - timedelta(minutes=1))
+        db.add(doomed)
+        db.commit()
+        restarted.publishers["linkedin"] = FlakyPublisher(failures=100)
+        for _ in range(settings.PUBLISH_MAX_ATTEMPTS):
+            restarted.run_cycle()
+            db.expire_all()
+            if doomed.status == ContentStatus.RETRY_PENDING:
+                _make_due(db, doomed)
+        assert doomed.status == ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE, doomed.status
+        assert db.query(PublishRetry).count() == 0
+        print(f"   ✅ Failed after {settings.PUBLISH_MAX_ATTEMPTS} attempts")
+
+        # TEST 8: Claim vencido (worker caído) -> vuelve a la cola
+        print("\n👉 TEST 8: Posts stuck in PROCESSING are requeued after the lease...")
+        expired = datetime.utcnow() - timedelta(seconds=settings.PUBLISH_CLAIM_LEASE_SECONDS + 60)
+        orphan = Post(project_id=project.id, title="Orphan", content_text="Worker died",
+                      status=ContentStatus.PROCESSING, platform="linkedin",
+                      scheduled_for=datetime.utcnow() - timedelta(hours=1), claimed_at=expired)
+        live = Post(project_id=project.id, title="Live", content_text="Still publishing",
+                    status=ContentStatus.PROCESSING, platform="linkedin",
+                    scheduled_for=datetime.utcnow() - timedelta(hours=1), claimed_at=datetime.utcnow())
+        exhausted = Post(project_id=project.id, title="Poison", content_text="Kills the worker",
+                         status=ContentStatus.PROCESSING, platform="linkedin",
+                         scheduled_for=datetime.utcnow() - timedelta(hours=1), claimed_at=expired)
+        db.add_all([orphan, live, exhausted])
+        db.flush()
+        db.add(PublishRetry(post_id=exhausted.id, platform="linkedin", attempts=settings.PUBLISH_MAX_ATTEMPTS - 1,
+                            next_attempt_at=expired))
+        db.commit()
+        reaper_db = TestingSessionLocal()
+        assert restarted._recover_stale_claims(reaper_db) == 2
+        reaper_db.close()
+        db.expire_all()
+        assert orphan.status == ContentStatus.RETRY_PENDING and live.status == ContentStatus.PROCESSING
+        assert exhausted.status == ContentStatus.FAILED_AUTO_MANUAL_AVAILABLE
+        retry = db.query(PublishRetry).filter(PublishRetry.post_id == orphan.id).one()
+        assert retry.attempts == 1 and retry.last_error_kind == "lease_expired"
+        assert db.query(PublishRetry).filter(PublishRetry.post_id == exhausted.id).count() == 0
+
+        restarted.publishers["linkedin"] = FlakyPublisher(failures=0)
+        restarted.run_cycle()
+        db.expire_all()
+        assert orphan.status == ContentStatus.PUBLISHED_AUTO and live.status == ContentStatus.PROCESSING
+        assert orphan.claimed_at > expired
+        print("   ✅ Expired claim requeued and published, live claim untouched, exhausted post failed")
+
+        print("\n🏁 [QA Publish Retries] All Tests Passed Successfully!")
+    finally:
+        settings.FEATURE_LINKEDIN_ENABLED, settings.PUBLISH_MAX_ATTEMPTS = original
+        db.close()
+
+if __name__ == "__main__":
+    test_publish_retries()
@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+import threading
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.publisher_runtime import PublisherRuntime
+
+def test_publisher_runtime():
+    print("\n🚀 [QA Publisher Runtime] Starting Long-Lived Loop Verification...\n")
+
+    runtime = PublisherRuntime(name="qa-publisher-runtime")
+    try:
+        # TEST 1: Mismo loop y mismo hilo para todas las corutinas
+        print("👉 TEST 1: Coroutines share one loop...")
+        async def whoami():
+            return id(asyncio.get_running_loop()), threading.current_thread().name
+
+        first = runtime.run(whoami())
+        second = runtime.run(whoami())
+        assert first == second, "Each call should reuse the same loop"
+        assert first[1] == "qa-publisher-runtime"
+        print("   ✅ Single long-lived loop")
+
+        # TEST 2: Cliente HTTP reutilizado entre posts
+        print("\n👉 TEST 2: Shared HTTP client...")
+        async def client_id():
+            return id(runtime.get_http_client())
+
+        assert runtime.run(client_id()) == runtime.run(client_id())
+        print("   ✅ httpx.AsyncClient reused")
+
+        # TEST 3: Desde un loop ya corriendo (ej: endpoint async) no hay deadlock
+        print("\n👉 TEST 3: Submit from an already-running loop...")
+        async def caller():
+            return await runtime.run_async(asyncio.sleep(0, result="ok"))
+
+        assert asyncio.run(caller()) == "ok"
+        print("   ✅ No deadlock from foreign loop")
+
+        # TEST 4: Llamada bloqueante desde el propio runtime -> error explícito
+        print("\n👉 TEST 4: Re-entrant blocking call is rejected...")
+        async def reentrant():
+            try:
+                runtime.run(asyncio.sleep(0))
+            except RuntimeError:
+                return "rejected"
+            return "deadlock-prone"
+
+        assert runtime.run(reentrant(), timeout=5) == "rejected"
+        print("   ✅ Deadlock guard works")
+
+        # TEST 5: Concurrencia real dentro del runtime
+        print("\n👉 TEST 5: Concurrent coroutines...")
+        async def batch():
+            await asyncio.gather(*[asyncio.sleep(0.05) for _ in range(20)])
+            return True
+
+        assert runtime.run(batch(), timeout=2)
+        print("   ✅ Batch completed concurrently")
+
+        print("\n🏁 [QA Publisher Runtime] All Tests Passed Successfully!")
+    finally:
+        runtime.stop()
+        assert not runtime.is_running
+
+if __name__ == "__main__":
+    test_publisher_runtime()
@@ -0,0 +1,176 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.api import media as media_api
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.models.domain import Base, ContentStatus, Media, MediaRendition, Post
+from app.services.media_storage.local import LocalMediaStorage
+from app.services.media_store import MediaStore, get_media_store
+from app.services.rendition_service import RenditionPipeline, rendition_pipeline
+
+def _png(width: int, height: int) -> bytes:
+    """Imagen con alfa (obliga a aplanar al pasar a JPEG)"""
+    buffer = BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 30, 128)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_renditions():
+    print("\n🚀 [QA Renditions] Starting Platform Rendition Pipeline Verification...\n")
+    # Archivo temporal: la pregeneración usa su propia sesión desde otro thread
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    root = tempfile.mkdtemp(prefix="renditions-")
+    store = MediaStore(LocalMediaStorage(root))
+    pipeline = RenditionPipeline(session_factory=TestingSessionLocal, store_factory=lambda: store, max_workers=2)
+    settings = get_settings()
+    flags = (settings.FEATURE_LINKEDIN_ENABLED, settings.FEATURE_INSTAGRAM_ENABLED, settings.FEATURE_TIKTOK_ENABLED)
+    settings.FEATURE_LINKEDIN_ENABLED, settings.FEATURE_INSTAGRAM_ENABLED, settings.FEATURE_TIKTOK_ENABLED = True, True, False
+
+    try:
+        media = store.save_bytes(db, _png(2400, 1600), "image/png")
+        db.commit()
+
+        # TEST 1: Lazy, en el pool de procesos
+        print("👉 TEST 1: First request renders in the process pool...")
+        story = pipeline.get_or_render(db, media, "instagram", "story")
+        assert (story.width, story.height, story.content_type) == (1080, 1920, "image/jpeg")
+        with Image.open(store.local_path(story.content_hash)) as img:
+            assert img.format == "JPEG" and img.size == (1080, 1920) and img.mode == "RGB"
+        print(f"   ✅ instagram/story {story.width}x{story.height}, {story.size_bytes} bytes")
+
+        # TEST 2: Cache por hash origen + spec (compartida entre filas del mismo blob)
+        print("\n👉 TEST 2: Cached by source hash and spec...")
+        twin = store.save_bytes(db, _png(2400, 1600), "image/png", post_id=99)
+        db.commit()
+        assert twin.id != media.id
+        assert pipeline.get_or_render(db, twin, "instagram", "story").id == story.id
+        assert pipeline._pool is not None and not pipeline._inflight
+        assert [r.spec_key for r in twin.renditions] == [story.spec_key]
+        print("   ✅ Second media row with the same blob reuses the rendition")
+
+        # TEST 3: Requests simultáneos de la misma rendition
+        print("\n👉 TEST 3: Concurrent requests render once...")
+        errors = []
+
+        def request_square():
+            session = TestingSessionLocal()
+            try:
+                pipeline.get_or_render(session, session.get(Media, media.id), "instagram", "square")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=request_square) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert db.query(MediaRendition).filter_by(source_hash=media.content_hash, name="square").count() == 1
+        print("   ✅ One row for 4 concurrent requests")
+
+        # TEST 4: Flags y validaciones
+        print("\n👉 TEST 4: Feature flags, unknown specs and non-images...")
+        for args, expected in [
+            (("tiktok", "cover"), PermissionError),
+            (("instagram", "banner"), KeyError),
+            (("myspace", "feed"), KeyError),
+        ]:
+            try:
+                pipeline.get_or_render(db, media, *args)
+                assert False, f"Expected {expected.__name__}"
+            except expected:
+                pass
+        video = store.save_bytes(db, b"not-an-image", "video/mp4")
+        broken = store.save_bytes(db, b"not-a-png", "image/png")
+        db.commit()
+        for bad in (video, broken):
+            try:
+                pipeline.get_or_render(db, bad, "instagram", "square")
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+        print("   ✅ Disabled platform, unknown spec, video and corrupt image rejected")
+
+        # TEST 5: Eager al programar un post
+        print("\n👉 TEST 5: Scheduled post pre-generates its platform renditions...")
+        post = Post(platform="linkedin", status=ContentStatus.APPROVED, content_text="x")
+        db.add(post)
+        db.commit()
+        store.save_bytes(db, _png(1600, 900), "image/png", post_id=post.id)
+        db.commit()
+        assert pipeline.pregenerate_post(post.id).result(timeout=60) == 2
+        db.expire_all()
+        sizes = {(r.name, r.width, r.height) for r in db.get(Post, post.id).media[0].renditions}
+        assert sizes == {("feed", 1200, 627), ("square", 1200, 1200)}
+        print(f"   ✅ linkedin renditions ready before publishing: {sorted(sizes)}")
+
+        # TEST 6: Endpoints
+        print("\n👉 TEST 6: Rendition endpoints...")
+        app = FastAPI()
+        app.include_router(media_api.router, prefix="/media")
+
+        def override_db():
+            session = TestingSessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_media_store] = lambda: store
+        client = TestClient(app)
+        response = client.get(f"/media/{media.id}/renditions/instagram/portrait")
+        assert response.status_code == 200 and response.headers["content-type"] == "image/jpeg"
+        assert Image.open(BytesIO(response.content)).size == (1080, 1350)
+        assert response.headers["cache-control"] == "no-cache"
+        etag = response.headers["etag"]
+        assert client.get(f"/media/{media.id}/renditions/instagram/portrait",
+                          headers={"If-None-Match": etag}).status_code == 304
+        listing = client.get(f"/media/{media.id}/renditions").json()["data"]
+        assert {r["name"] for r in listing} == {"story", "square", "portrait"}
+        portrait = next(r for r in listing if r["name"] == "portrait")
+        response = client.get(f"/media/files/{portrait['content_hash']}")
+        assert response.status_code == 200 and "immutable" in response.headers["cache-control"]
+        assert client.get(f"/media/{media.id}/renditions/tiktok/cover").status_code == 403
+        assert client.get(f"/media/{media.id}/renditions/instagram/banner").status_code == 404
+        assert client.get(f"/media/{video.id}/renditions/instagram/square").status_code == 422
+        assert client.get("/media/999999/renditions").status_code == 404
+        timeout = rendition_pipeline.timeout
+        rendition_pipeline.timeout = 1e-6 # Render lento: la API no espera más que el timeout
+        try:
+            assert client.get(f"/media/{media.id}/renditions/linkedin/feed").status_code == 504
+        finally:
+            rendition_pipeline.timeout = timeout
+        print("   ✅ Lazy serve, ETag revalidation, listing, immutable blob URL, 504 on render timeout")
+
+        print("\n🏁 [QA Renditions] All Tests Passed Successfully!")
+    finally:
+        settings.FEATURE_LINKEDIN_ENABLED, settings.FEATURE_INSTAGRAM_ENABLED, settings.FEATURE_TIKTOK_ENABLED = flags
+        pipeline.shutdown()
+        rendition_pipeline.shutdown()
+        db.close()
+        engine.dispose()
+        os.remove(path)
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_renditions()
@@ -0,0 +1,134 @@
+import sys
+import os
+import asyncio
+import uuid
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.api.deps import get_tenant_context
+from app.api.identities import update_identity
+from app.core.config import get_settings
+from app.models.domain import Base, Project, FunctionalIdentity, Campaign, Post, ConnectedAccount
+from app.schemas.auth import Principal, TenantContext
+from app.schemas.identity import IdentityUpdate
+from app.schemas.guide import GuideNextRequest, GuideNextResponse, GuideMode, GuideState
+from app.services.guide_orchestrator import GuideOrchestratorService
+from app.services.identity_catalog import identity_catalog
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _principal(user_id, project_id=None):
+    return Principal(user_id=user_id, project_id=project_id, claims={"sub": user_id})
+
+def _expect_403(**kwargs):
+    try:
+        get_tenant_context(**kwargs)
+        raise AssertionError("Expected 403")
+    except HTTPException as e:
+        assert e.status_code == 403
+
+def test_tenant_scoping():
+    print("\n🚀 [QA Tenant Scoping] Starting Multi-Tenant Verification...\n")
+
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        alice_project = Project(name="Alice Co", owner_id="alice")
+        bob_project = Project(name="Bob Co", owner_id="bob")
+        db.add_all([alice_project, bob_project])
+        db.commit()
+        db.add_all([
+            FunctionalIdentity(project_id=alice_project.id, name="Alice Voice", status="active"),
+            FunctionalIdentity(project_id=bob_project.id, name="Bob Voice", status="active"),
+            FunctionalIdentity(project_id=bob_project.id, name="Bob Second Voice", status="active"),
+        ])
+        db.commit()
+
+        # TEST 1: Resolución del tenant
+        print("👉 TEST 1: Tenant resolution from principal...")
+        ctx = get_tenant_context(project_id=None, x_project_id=None, principal=_principal("alice"), db=db)
+        assert ctx.project_id == alice_project.id and ctx.user_id == "alice"
+        ctx = get_tenant_context(project_id=None, x_project_id=bob_project.id, principal=_principal("bob"), db=db)
+        assert ctx.project_id == bob_project.id
+        ctx = get_tenant_context(project_id=None, x_project_id=None, principal=_principal("carol", project_id=42), db=db)
+        assert ctx.project_id == 42, "app_metadata.project_id claim should win"
+        print("   ✅ Owned project / header / claim")
+
+        # TEST 2: Cross-tenant bloqueado
+        print("\n👉 TEST 2: Cross-tenant access is forbidden...")
+        _expect_403(project_id=bob_project.id, x_project_id=None, principal=_principal("alice"), db=db)
+        _expect_403(project_id=None, x_project_id=None, principal=_principal("mallory"), db=db)
+        print("   ✅ 403 for foreign or missing project")
+
+        # TEST 3: Anónimo -> solo DEFAULT_PROJECT_ID
+        print("\n👉 TEST 3: Anonymous is pinned to the default project...")
+        default_id = get_settings().DEFAULT_PROJECT_ID
+        ctx = get_tenant_context(project_id=None, x_project_id=None, principal=None, db=db)
+        assert ctx.project_id == default_id and ctx.user_id is None
+        assert get_tenant_context(project_id=default_id, x_project_id=None, principal=None, db=db).project_id == default_id
+        _expect_403(project_id=bob_project.id, x_project_id=None, principal=None, db=db)
+        _expect_403(project_id=None, x_project_id=bob_project.id, principal=None, db=db)
+        print("   ✅ Legacy single-tenant mode preserved, other projects 403")
+
+        # TEST 4: El orquestador solo ve identidades del tenant
+        print("\n👉 TEST 4: Orchestrator identity context is tenant-scoped...")
+        service = GuideOrchestratorService()
+        identity_catalog.clear() # El singleton es por proceso; esta DB es in-memory
+        seen = {}
+
+        async def capture(request, log_ctx, catalog, db=None, project_id=None):
+            seen["identities"] = [i["name"] for i in catalog.identities]
+            seen["project_id"] = project_id
+            return GuideNextResponse(assistant_message="ok", options=[], next_step=1, state_patch={})
+
+        service._process_collaborator_mode = capture
+        request = GuideNextRequest(
+            current_step=1, mode=GuideMode.COLLABORATOR, state=GuideState(step=1),
+            user_input="hola", guide_session_id=str(uuid.uuid4())
+        )
+
+        asyncio.run(service.process_next_step(request, db, tenant=TenantContext(project_id=bob_project.id, user_id="bob")))
+        assert seen["project_id"] == bob_project.id
+        assert sorted(seen["identities"]) == ["Bob Second Voice", "Bob Voice"], seen
+        asyncio.run(service.process_next_step(request, db, tenant=TenantContext(project_id=alice_project.id, user_id="alice")))
+        assert seen["identities"] == ["Alice Voice"], seen
+        print("   ✅ No identities leak across tenants")
+
+        # TEST 5: Identidades globales de solo lectura vía API
+        print("\n👉 TEST 5: Global identities cannot be edited by a tenant...")
+        global_identity = FunctionalIdentity(project_id=None, name="Global Voice", status="active")
+        db.add(global_identity)
+        db.commit()
+        bob = TenantContext(project_id=bob_project.id, user_id="bob")
+        try:
+            update_identity(global_identity.id, IdentityUpdate(name="Hijacked"), db=db, tenant=bob)
+            raise AssertionError("Expected 403")
+        except HTTPException as e:
+            assert e.status_code == 403
+        db.refresh(global_identity)
+        assert global_identity.name == "Global Voice"
+        bob_voice = db.query(FunctionalIdentity).filter_by(name="Bob Voice").one()
+        stale = identity_catalog.get(db, bob_project.id)
+        update_identity(bob_voice.id, IdentityUpdate(name="Bob Renamed"), db=db, tenant=bob)
+        assert identity_catalog.get(db, bob_project.id) is not stale
+        print("   ✅ 403 on global identity, own identity updated and catalog invalidated")
+
+        # TEST 6: Índice por project_id
+        print("\n👉 TEST 6: project_id is indexed...")
+        for model in (FunctionalIdentity, Campaign, Post, ConnectedAccount):
+            indexed = [ix for ix in model.__table__.indexes if "project_id" in ix.columns]
+            assert indexed, f"{model.__tablename__}.project_id should be indexed"
+        print("   ✅ Indexes present")
+
+        print("\n🏁 [QA Tenant Scoping] All Tests Passed Successfully!")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    test_tenant_scoping()
@@ -0,0 +1,96 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from cryptography.fernet import Fernet
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core import security
+from app.core.security import DecryptedTokenCache, get_fernet, encrypt_token, decrypt_token, rotate_token
+
+def _account(account_id, token_enc, updated_at):
+    return SimpleNamespace(id=account_id, access_token_encrypted=token_enc, updated_at=updated_at)
+
+def test_token_cache():
+    print("\n🚀 [QA Token Cache] Starting Cipher & Decrypted Token Cache Verification...\n")
+
+    settings = security.settings
+    original = (settings.ENCRYPTION_KEY, settings.ENCRYPTION_KEYS_PREVIOUS)
+    old_key = Fernet.generate_key().decode()
+    new_key = Fernet.generate_key().decode()
+    settings.ENCRYPTION_KEY, settings.ENCRYPTION_KEYS_PREVIOUS = old_key, ""
+
+    real_decrypt = security.decrypt_token
+    calls = {"decrypt": 0}
+    def counting_decrypt(token_enc):
+        calls["decrypt"] += 1
+        return real_decrypt(token_enc)
+
+    try:
+        # TEST 1: Cipher cacheado
+        print("👉 TEST 1: Cipher instance is reused...")
+        assert get_fernet() is get_fernet()
+        print("   ✅ Same MultiFernet across calls")
+
+        # TEST 2: Rotación de claves
+        print("\n👉 TEST 2: Key rotation with MultiFernet...")
+        legacy = encrypt_token("legacy_secret")
+        settings.ENCRYPTION_KEY, settings.ENCRYPTION_KEYS_PREVIOUS = new_key, old_key
+        assert decrypt_token(legacy) == "legacy_secret", "Previous key must still decrypt"
+        rotated = rotate_token(legacy)
+        settings.ENCRYPTION_KEYS_PREVIOUS = ""
+        assert decrypt_token(rotated) == "legacy_secret", "Rotated token must decrypt with new key only"
+        print("   ✅ Old tokens readable, rotate() re-encrypts")
+
+        # TEST 3: Cache hit evita descifrar
+        print("\n👉 TEST 3: Bulk publishing decrypts once...")
+        security.decrypt_token = counting_decrypt
+        cache = DecryptedTokenCache(max_entries=2, ttl_seconds=60)
+        stamp = datetime(2026, 1, 1, 12, 0, 0)
+        account = _account(1, encrypt_token("access_1"), stamp)
+        for _ in range(20):
+            assert cache.get_access_token(account) == "access_1"
+        assert calls["decrypt"] == 1, f"Expected 1 decryption, got {calls['decrypt']}"
+        print("   ✅ 20 reads, 1 decryption")
+
+        # TEST 4: updated_at nuevo -> miss y la entrada vieja se borra
+        print("\n👉 TEST 4: Token refresh changes the cache key...")
+        stale_secret = cache._entries[(1, stamp.isoformat())][0]
+        account = _account(1, encrypt_token("access_1_refreshed"), stamp + timedelta(hours=1))
+        assert cache.get_access_token(account) == "access_1_refreshed"
+        assert calls["decrypt"] == 2
+        assert all(b == 0 for b in stale_secret), "Stale entry should be zeroed"
+        assert len(cache) == 1
+        print("   ✅ Stale token zeroed and evicted")
+
+        # TEST 5: Desconexión
+        print("\n👉 TEST 5: Disconnect zeroes and evicts...")
+        secret = next(iter(cache._entries.values()))[0]
+        assert cache.invalidate_account(1) == 1
+        assert len(cache) == 0 and all(b == 0 for b in secret)
+        print("   ✅ Entry wiped")
+
+        # TEST 6: Límite LRU y TTL
+        print("\n👉 TEST 6: Bounded size and TTL...")
+        for account_id in (2, 3, 4):
+            cache.get_access_token(_account(account_id, encrypt_token(f"access_{account_id}"), stamp))
+        assert len(cache) == 2 and (2, stamp.isoformat()) not in cache._entries
+        short = DecryptedTokenCache(ttl_seconds=0.05)
+        account = _account(5, encrypt_token("access_5"), stamp)
+        short.get_access_token(account)
+        before = calls["decrypt"]
+        time.sleep(0.1)
+        short.get_access_token(account)
+        assert calls["decrypt"] == before + 1, "Expired entry should be decrypted again"
+        print("   ✅ LRU bound and TTL expiry")
+
+        print("\n🏁 [QA Token Cache] All Tests Passed Successfully!")
+    finally:
+        security.decrypt_token = real_decrypt
+        settings.ENCRYPTION_KEY, settings.ENCRYPTION_KEYS_PREVIOUS = original
+
+if __name__ == "__main__":
+    test_token_cache()
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core import security
+from app.core.security import encrypt_token, decrypt_token
+from app.models.domain import Base, Project, ConnectedAccount
+from app.services.token_refresh_service import TokenRefreshService
+from app.services.publishers.oauth_clients import StubOAuthClient
+
+# Setup In-Memory DB for speed
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _account(project_id, name, expires_in_minutes, refresh_token="refresh_ok"):
+    return ConnectedAccount(
+        project_id=project_id,
+        provider="linkedin",
+        provider_name=name,
+        external_account_id=f"urn:li:person:{name}",
+        access_token_encrypted=encrypt_token(f"access_{name}"),
+        refresh_token_encrypted=encrypt_token(refresh_token) if refresh_token else None,
+        expires_at=datetime.utcnow() + timedelta(minutes=expires_in_minutes),
+        active=True
+    )
+
+def test_token_refresh():
+    print("\n🚀 [QA Token Refresh] Starting Background Refresh Verification...\n")
+
+    settings = security.settings
+    original_key = settings.ENCRYPTION_KEY
+    settings.ENCRYPTION_KEY = Fernet.generate_key().decode()
+
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        project = Project(name="Refresh Project")
+        db.add(project)
+        db.commit()
+
+        expiring = [_account(project.id, f"expiring_{i}", 30) for i in range(6)]
+        healthy = _account(project.id, "healthy", 60 * 24 * 30)
+        no_refresh = _account(project.id, "no_refresh", 10, refresh_token=None)
+        revoked = _account(project.id, "revoked", 10, refresh_token="refresh_revoked")
+        db.add_all(expiring + [healthy, no_refresh, revoked])
+        db.commit()
+        old_access = expiring[0].access_token_encrypted
+
+        stub = StubOAuthClient(delay=0.1, revoked={"refresh_revoked"})
+        service = TokenRefreshService(
+            session_factory=TestingSessionLocal,
+            clients={"linkedin": stub},
+            window_minutes=60,
+            concurrency=8
+        )
+
+        # TEST 1: Solo cuentas dentro de la ventana y con refresh token
+        print("👉 TEST 1: Expiring accounts are refreshed concurrently...")
+        started = time.monotonic()
+        summary = service.run_cycle()
+        elapsed = time.monotonic() - started
+        assert summary["due"] == 7, summary
+        assert summary["refreshed"] == 6 and summary["revoked"] == 1, summary
+        assert stub.calls == 7
+        assert elapsed < 0.5, f"7 refreshes with 0.1s latency should run concurrently (took {elapsed:.2f}s)"
+        print(f"   ✅ {summary} in {elapsed:.2f}s")
+
+        # TEST 2: Tokens re-cifrados y expiración extendida
+        print("\n👉 TEST 2: Results are re-encrypted...")
+        db.expire_all()
+        account = expiring[0]
+        assert account.access_token_encrypted != old_access
+        assert decrypt_token(account.access_token_encrypted).startswith("stub_access_")
+        assert decrypt_token(account.refresh_token_encrypted).startswith("stub_refresh_")
+        assert account.expires_at > datetime.utcnow() + timedelta(days=59)
+        print("   ✅ New encrypted tokens stored")
+
+        # TEST 3: Refresh token revocado se descarta (requiere reconexión)
+        print("\n👉 TEST 3: Revoked refresh token is cleared...")
+        assert revoked.refresh_token_encrypted is None
+        assert decrypt_token(healthy.access_token_encrypted) == "access_healthy"
+        print("   ✅ Revoked account flagged, healthy untouched")
+
+        # TEST 4: Segundo ciclo no hace nada
+        print("\n👉 TEST 4: Nothing left to refresh...")
+        summary = service.run_cycle()
+        assert summary["due"] == 0 and stub.calls == 7, summary
+        print("   ✅ Idle cycle")
+
+        print("\n🏁 [QA Token Refresh] All Tests Passed Successfully!")
+    finally:
+        settings.ENCRYPTION_KEY = original_key
+        db.close()
+
+if __name__ == "__main__":
+    test_token_refresh()
@@ -1,5 +1,5 @@
 import { apiClient } from './client';
-import type { Campaign, CreateCampaignRequest } from '../types';
+import type { Campaign, CampaignGenerationJob, CreateCampaignRequest } from '../types';
 
 export const campaignsApi = {
   getAll: async (projectId: number = 1): Promise<Campaign[]> => {
@@ -21,8 +21,23 @@ export const campaignsApi = {
     await apiClient.delete(`/campaigns/${id}`);
   },
 
-  generatePosts: async (id: number, count: number = 3, platform: string = 'linkedin'): Promise<any> => {
-    const response = await apiClient.post(`/campaigns/${id}/generate`, { count, platform });
+  // Encola la generación; el mismo idempotencyKey en un reintento devuelve el job existente
+  generatePosts: async (
+    id: number,
+    count: number = 3,
+    platform: string = 'linkedin',
+    idempotencyKey?: string
+  ): Promise<CampaignGenerationJob> => {
+    const response = await apiClient.post<CampaignGenerationJob>(
+      `/campaigns/${id}/generate`,
+      { count, platform },
+      idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : undefined
+    );
+    return response.data;
+  },
+
+  getGenerationJob: async (id: number, jobId: string): Promise<CampaignGenerationJob> => {
+    const response = await apiClient.get<CampaignGenerationJob>(`/campaigns/${id}/generation-jobs/${jobId}`);
     return response.data;
   },
 
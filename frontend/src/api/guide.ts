@@ -34,10 +34,10 @@ export interface GuideState {
 export interface GuideNextRequest {
   current_step: number;
   mode: GuideMode;
-  state: GuideState;
   user_input?: string;
   user_value?: string;
-  guide_session_id: string;
+  guide_session_id: string; // El estado vive en el backend bajo este id
+  identity_id?: string; // Identidad elegida en la UI (se aplica al estado server-side)
 }
 
 export interface GuideNextResponse {
@@ -46,6 +46,15 @@ export interface GuideNextResponse {
   next_step: number;
   state_patch: Partial<GuideState>;
   status?: 'success' | 'blocked' | 'error';
+  guide_session_id?: string;
+}
+
+export interface GuideSession {
+  guide_session_id: string;
+  mode?: GuideMode;
+  current_step: number;
+  state: GuideState;
+  version: number;
 }
 
 export const guideApi = {
@@ -59,5 +68,11 @@ export const guideApi = {
       console.error("❌ [API] guide.nextStep ERROR:", error);
       throw error;
     }
+  },
+
+  // Estado server-side de la sesión (retomar al abrir la página o desde otro dispositivo)
+  getSession: async (guideSessionId: string): Promise<GuideSession> => {
+    const response = await client.get(`/guide/sessions/${guideSessionId}`);
+    return response.data;
   }
 };
@@ -2,7 +2,6 @@ import React, { useState, useEffect } from 'react';
 import { GuideChat } from '../guide/GuideChat';
 import type { Message } from '../guide/GuideChat';
 import { guideApi } from '../../api/guide';
-import type { GuideState } from '../../api/guide';
 import type { Identity } from '../../api/identities';
 import { Bot, X } from 'lucide-react';
 
@@ -18,30 +17,9 @@ export const IdentityCreator: React.FC<IdentityCreatorProps> = ({ onClose, onCre
   const [messages, setMessages] = useState<Message[]>([]);
   const [isProcessing, setIsProcessing] = useState(false);
   const [currentStep, setCurrentStep] = useState(1);
-  const [guideState, setGuideState] = useState<GuideState>(() => {
-    if (mode === 'edit' && identity) {
-      const platforms = Array.isArray(identity.preferred_platforms)
-        ? identity.preferred_platforms
-        : identity.preferred_platforms
-          ? String(identity.preferred_platforms).split(',').map(p => p.trim()).filter(Boolean)
-          : [];
+  // El borrador vive en la sesión server-side; en edición el backend lo arma desde la identidad
+  const editingId = mode === 'edit' ? identity?.id : undefined;
 
-      return {
-        step: 1,
-        identity_id: identity.id,
-        identity_draft: {
-          name: identity.name,
-          purpose: identity.purpose,
-          tone: identity.tone,
-          communication_style: identity.communication_style,
-          content_limits: identity.content_limits,
-          platforms,
-        },
-      } as GuideState;
-    }
-    return { step: 1 } as GuideState;
-  });
-  
   const [sessionId] = useState(() => {
     if (typeof crypto !== 'undefined' && crypto.randomUUID) {
       return crypto.randomUUID();
@@ -64,10 +42,10 @@ export const IdentityCreator: React.FC<IdentityCreatorProps> = ({ onClose, onCre
       const response = await guideApi.nextStep({
         current_step: currentStep,
         mode: 'identity_creation',
-        state: guideState,
         user_input: userInput,
         user_value: userValue,
-        guide_session_id: sessionId
+        guide_session_id: sessionId,
+        identity_id: editingId
       });
 
       // Handle closing/completion
@@ -89,7 +67,6 @@ export const IdentityCreator: React.FC<IdentityCreatorProps> = ({ onClose, onCre
       }]);
 
       setCurrentStep(response.next_step);
-      setGuideState(prev => ({ ...prev, ...response.state_patch }));
 
     } catch (error) {
       console.error("Error in identity creation:", error);
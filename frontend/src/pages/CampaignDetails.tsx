@@ -65,17 +65,41 @@ export const CampaignDetails: React.FC = () => {
     }
   };
 
+  const newIdempotencyKey = () => {
+    if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+      return crypto.randomUUID();
+    }
+    return 'generate-' + Date.now() + '-' + Math.random().toString(36).substr(2, 9);
+  };
+
+  const refreshCampaign = async (campaignId: number) => {
+    // Sin spinner: los borradores aparecen a medida que el job los genera
+    const data = await campaignsApi.getOne(campaignId);
+    setCampaign(data);
+  };
+
   const handleGenerateContent = async () => {
     if (!campaign) return;
+    // Una clave por click: si el POST se reintenta, el backend devuelve el mismo job
+    const idempotencyKey = newIdempotencyKey();
     try {
       setGenerating(true);
-      const result = await campaignsApi.generatePosts(campaign.id, 3, 'linkedin'); // Default to 3 posts
-      
-      if (result.generated_count === 0) {
+      let job = await campaignsApi.generatePosts(campaign.id, 3, 'linkedin', idempotencyKey); // Default to 3 posts
+      let shown = 0;
+
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1500));
+        job = await campaignsApi.getGenerationJob(campaign.id, job.id);
+        if (job.completed > shown) {
+          shown = job.completed;
+          await refreshCampaign(campaign.id);
+        }
+      }
+
+      if (job.completed === 0) {
         setError('La IA no pudo generar posts. Verifica la configuración o intenta de nuevo.');
       } else {
-        // Reload campaign to show new posts
-        await loadCampaign(campaign.id);
+        await refreshCampaign(campaign.id);
         setError(null); // Clear any previous error
       }
     } catch (err) {
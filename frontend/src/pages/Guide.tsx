@@ -35,10 +35,10 @@ export const Guide: React.FC = () => {
   // ------------------------------------------------------------------
   
   // Constantes de persistencia
+  // El GuideState vive en el backend (guide_session_id); aquí solo el id, el chat y el modo
   const STORAGE_KEYS = {
     SESSION_ID: 'ara_session_id',
     MESSAGES: 'ara_messages',
-    GUIDE_STATE: 'ara_guide_state',
     MODE: 'ara_mode',
     TIMESTAMP: 'ara_timestamp'
   };
@@ -56,11 +56,11 @@ export const Guide: React.FC = () => {
         Object.values(STORAGE_KEYS).forEach(key => localStorage.removeItem(key));
         return null;
       }
+      localStorage.removeItem('ara_guide_state'); // Estado completo de versiones anteriores
 
       return {
         sessionId: localStorage.getItem(STORAGE_KEYS.SESSION_ID),
         messages: JSON.parse(localStorage.getItem(STORAGE_KEYS.MESSAGES) || '[]'),
-        guideState: JSON.parse(localStorage.getItem(STORAGE_KEYS.GUIDE_STATE) || 'null'),
         mode: localStorage.getItem(STORAGE_KEYS.MODE) as ViewMode
       };
     } catch (e) {
@@ -72,13 +72,16 @@ export const Guide: React.FC = () => {
   // Cargar sesión al inicio (una sola vez)
   const savedSession = React.useMemo(() => loadSession(), []);
 
-  const [sessionId] = useState(() => {
-    if (savedSession?.sessionId) return savedSession.sessionId;
+  const newSessionId = () => {
     if (typeof crypto !== 'undefined' && crypto.randomUUID) {
       return crypto.randomUUID();
     }
     return 'session-' + Date.now() + '-' + Math.random().toString(36).substr(2, 9);
-  });
+  };
+
+  // ?session=<id> retoma una sesión iniciada en otro dispositivo
+  const sharedSessionId = React.useMemo(() => new URLSearchParams(window.location.search).get('session'), []);
+  const [sessionId, setSessionId] = useState<string>(() => sharedSessionId || savedSession?.sessionId || newSessionId());
 
   const [mode, setMode] = useState<ViewMode>(() => savedSession?.mode || 'collaborator');
 
@@ -88,10 +91,10 @@ export const Guide: React.FC = () => {
     modeRef.current = mode;
   }, [mode]);
 
-  // Estado del negocio (La verdad)
-  const [guideState, setGuideState] = useState<GuideState>(() => savedSession?.guideState || {
-    step: 1
-  });
+  // Estado del negocio (La verdad): server-side. El cliente solo lleva el paso actual
+  // y la identidad elegida en el selector.
+  const [currentStep, setCurrentStep] = useState(1);
+  const [identityId, setIdentityId] = useState<string | undefined>(undefined);
 
   // Estado de UX (Lo que ve el usuario)
   // Inicializamos directamente con lo guardado o el mensaje default para evitar flash
@@ -122,15 +125,29 @@ export const Guide: React.FC = () => {
     const saveSession = () => {
       localStorage.setItem(STORAGE_KEYS.SESSION_ID, sessionId);
       localStorage.setItem(STORAGE_KEYS.MESSAGES, JSON.stringify(messages));
-      localStorage.setItem(STORAGE_KEYS.GUIDE_STATE, JSON.stringify(guideState));
       localStorage.setItem(STORAGE_KEYS.MODE, mode);
       localStorage.setItem(STORAGE_KEYS.TIMESTAMP, Date.now().toString());
     };
     saveSession();
-  }, [sessionId, messages, guideState, mode]);
+  }, [sessionId, messages, mode]);
 
   // Ref para controlar inicialización vs cambio de modo
   const isFirstRender = React.useRef(true);
+  // Cambio de modo al retomar una sesión: no debe reiniciarla
+  const isRestoringMode = React.useRef(false);
+
+  // Retomar la sesión server-side al abrir la página (404 = sesión aún sin turnos)
+  useEffect(() => {
+    if (!sharedSessionId && !savedSession?.sessionId) return;
+    guideApi.getSession(sessionId).then(session => {
+      setCurrentStep(session.current_step);
+      setIdentityId(session.state.identity_id);
+      if (session.mode && session.mode !== modeRef.current) {
+        isRestoringMode.current = true;
+        setMode(session.mode);
+      }
+    }).catch(() => {});
+  }, []);
 
   // Inicializar mensaje según modo (Solo cuando el usuario CAMBIA de modo, no al recargar)
   useEffect(() => {
@@ -138,6 +155,10 @@ export const Guide: React.FC = () => {
       isFirstRender.current = false;
       return;
     }
+    if (isRestoringMode.current) {
+      isRestoringMode.current = false;
+      return;
+    }
 
     const initMsg = getInitialMessage(mode);
     setMessages([{
@@ -145,7 +166,7 @@ export const Guide: React.FC = () => {
       role: 'ai',
       content: initMsg
     }]);
-    setGuideState({ step: 1, conversation_summary: "" });
+    startNewSession();
     setIsProcessing(false); // Reset processing state on mode switch
     setIsBlocked(false); // Reset blocked state on mode switch
   }, [mode]);
@@ -190,8 +211,15 @@ export const Guide: React.FC = () => {
     }]);
   };
 
+  // Nueva sesión server-side: el estado anterior queda en el backend bajo su id
+  const startNewSession = () => {
+    setSessionId(newSessionId());
+    setCurrentStep(1);
+    setIdentityId(undefined);
+  };
+
   const resetGuide = () => {
-    setGuideState({ step: 1, conversation_summary: "" });
+    startNewSession();
     setMessages([{
       id: Date.now().toString(),
       role: 'ai',
@@ -216,8 +244,6 @@ export const Guide: React.FC = () => {
   // 🗣️ FASE 3.3 — Guion Conversacional CANÓNICO
   // ------------------------------------------------------------------
   const processStep = async (userText: string, userValue?: string) => {
-    const currentStep = guideState.step;
-
     // ------------------------------------------------------------------
     // 🧠 FASE 4.1 — Backend: Guide Orchestrator
     // ------------------------------------------------------------------
@@ -225,7 +251,7 @@ export const Guide: React.FC = () => {
     // Casos especiales frontend (Confirmación final y Restart)
     if (currentStep === 6 && mode !== 'collaborator') { // En colaborador el step 6 puede ser dinámico
         if (userValue === 'create') {
-            await executeCampaignCreation(guideState);
+            await createFromSession();
             return;
         } else if (userValue === 'restart') {
             resetGuide();
@@ -237,7 +263,7 @@ export const Guide: React.FC = () => {
     // En Collaborator mode, si recibimos 'create' o 'restart' desde las opciones sugeridas
     if (mode === 'collaborator') {
         if (userValue === 'create') {
-             await executeCampaignCreation(guideState);
+             await createFromSession();
              return;
         }
         if (userValue === 'restart') {
@@ -266,10 +292,10 @@ export const Guide: React.FC = () => {
         const response = await guideApi.nextStep({
             current_step: currentStep,
             mode: requestMode, 
-            state: guideState,
             user_input: userText,
             user_value: userValue,
-            guide_session_id: sessionId // 🧠 FASE 4.2
+            guide_session_id: sessionId, // 🧠 FASE 4.2 — el backend carga y actualiza el estado
+            identity_id: identityId
         });
 
         console.log(`✅ [Guide.tsx] Received response. Next Step: ${response.next_step}, Message: "${response.assistant_message?.substring(0, 50)}..."`);
@@ -282,12 +308,8 @@ export const Guide: React.FC = () => {
             return;
         }
 
-        // Actualizar estado con el patch del backend
-        setGuideState(prev => ({
-            ...prev,
-            ...response.state_patch,
-            step: response.next_step
-        }));
+        // El backend ya aplicó el state_patch a la sesión; solo avanzamos el paso
+        setCurrentStep(response.next_step);
 
         // Mostrar respuesta de IA
         // 🛡️ FASE 4.3 - UX Contención
@@ -312,6 +334,18 @@ export const Guide: React.FC = () => {
   // ------------------------------------------------------------------
   // 🚀 FASE 3.4 — Acción Final (SIN MAGIA)
   // ------------------------------------------------------------------
+  const createFromSession = async () => {
+    try {
+      const session = await guideApi.getSession(sessionId);
+      const identity = identityId === undefined ? session.state.identity_id : identityId || undefined;
+      await executeCampaignCreation({ ...session.state, identity_id: identity });
+    } catch (error) {
+      console.error('Error loading guide session', error);
+      addMessage('ai', '❌ No pude recuperar tu sesión. Inténtalo de nuevo.');
+      setIsProcessing(false);
+    }
+  };
+
   const executeCampaignCreation = async (finalState: GuideState) => {
     try {
       setIsProcessing(true);
@@ -408,8 +442,8 @@ export const Guide: React.FC = () => {
           {mode !== 'manual_form' && mode !== 'identity_creation' && (
                <div className="relative group col-span-2 sm:col-span-1 sm:flex-1 md:flex-none">
                   <select
-                    value={guideState.identity_id || ''}
-                    onChange={(e) => setGuideState(prev => ({ ...prev, identity_id: e.target.value || undefined }))}
+                    value={identityId || ''}
+                    onChange={(e) => setIdentityId(e.target.value)}
                     className="w-full md:w-auto appearance-none bg-slate-950 border border-slate-800 hover:border-slate-700 text-slate-300 text-sm rounded-lg pl-9 pr-8 py-2 focus:outline-none focus:ring-1 focus:ring-amber-500/50 transition-all cursor-pointer min-w-[160px]"
                     title="Selecciona la identidad que Ara usará para generar el contenido"
                   >
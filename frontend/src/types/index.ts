@@ -12,6 +12,21 @@ export interface Campaign {
   posts?: Post[];
 }
 
+export interface CampaignGenerationJob {
+  id: string;
+  campaign_id: number;
+  platform: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  requested: number;
+  completed: number; // Borradores ya creados (visibles en la campaña)
+  failed: number;
+  post_ids: number[];
+  error?: string;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
+}
+
 export interface Post {
   id: number;
   campaign_id: number;